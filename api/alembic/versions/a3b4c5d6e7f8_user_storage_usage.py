@@ -0,0 +1,78 @@
+"""user_storage_usage: per-user storage ledger for O(1) quota checks.
+
+One row per user with the bytes held by their non-deleted posts, split into
+native files, derived format variants and .mkpx layers files
+(services/storage_ledger.py). Backfilled here from the same aggregate the
+quota check used to run on every upload.
+
+Revision ID: a3b4c5d6e7f8
+Revises: f2a3b4c5d6e7
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a3b4c5d6e7f8"
+down_revision = "f2a3b4c5d6e7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_storage_usage",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("native_bytes", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("derived_bytes", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("mkpx_bytes", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.Column("reconciled_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+    # mkpx is summed in its own subquery: inside the post_files join it would
+    # be counted once per format variant.
+    op.execute(
+        """
+        INSERT INTO user_storage_usage
+            (user_id, native_bytes, derived_bytes, mkpx_bytes, reconciled_at)
+        SELECT u.owner_id,
+               COALESCE(f.native, 0),
+               COALESCE(f.derived, 0),
+               COALESCE(m.mkpx, 0),
+               now()
+        FROM (
+            SELECT DISTINCT owner_id FROM posts WHERE deleted_by_user = false
+        ) u
+        LEFT JOIN (
+            SELECT p.owner_id,
+                   SUM(CASE WHEN pf.is_native THEN pf.file_bytes ELSE 0 END)
+                       AS native,
+                   SUM(CASE WHEN pf.is_native THEN 0 ELSE pf.file_bytes END)
+                       AS derived
+            FROM post_files pf
+            JOIN posts p ON p.id = pf.post_id
+            WHERE p.deleted_by_user = false
+            GROUP BY p.owner_id
+        ) f ON f.owner_id = u.owner_id
+        LEFT JOIN (
+            SELECT owner_id, SUM(mkpx_file_bytes) AS mkpx
+            FROM posts
+            WHERE deleted_by_user = false AND mkpx_file_bytes IS NOT NULL
+            GROUP BY owner_id
+        ) m ON m.owner_id = u.owner_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_storage_usage")
@@ -0,0 +1,60 @@
+"""posts discoverable flag: generated column plus partial feed indexes.
+
+Every discovery surface (Recent, promoted, hashtags, search, sitemap, player
+public channels) repeated the same six visibility predicates, and only
+ix_posts_owner_created / ix_posts_non_conformant_created could help order
+the result.
+
+1. posts.discoverable — STORED generated boolean over
+   models.DISCOVERABLE_POST_PREDICATE (playable and publicly approved).
+2. Partial indexes restricted to discoverable rows:
+   (created_at DESC, id DESC) for the newest-first feeds and
+   (promoted, created_at DESC) for the promoted feed.
+
+Adding a stored generated column rewrites posts once.
+
+Revision ID: a9b0c1d2e3f4
+Revises: f8a9b0c1d2e3
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a9b0c1d2e3f4"
+down_revision = "f8a9b0c1d2e3"
+branch_labels = None
+depends_on = None
+
+DISCOVERABLE = (
+    "visible AND NOT deleted_by_user AND NOT hidden_by_user"
+    " AND NOT hidden_by_mod AND NOT non_conformant AND public_visibility"
+)
+
+
+def upgrade() -> None:
+    op.add_column(
+        "posts",
+        sa.Column(
+            "discoverable", sa.Boolean(), sa.Computed(DISCOVERABLE, persisted=True)
+        ),
+    )
+    op.create_index(
+        "ix_posts_discoverable_created",
+        "posts",
+        [sa.text("created_at DESC"), sa.text("id DESC")],
+        postgresql_where=sa.text("discoverable"),
+    )
+    op.create_index(
+        "ix_posts_discoverable_promoted_created",
+        "posts",
+        ["promoted", sa.text("created_at DESC")],
+        postgresql_where=sa.text("discoverable"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_posts_discoverable_promoted_created", table_name="posts")
+    op.drop_index("ix_posts_discoverable_created", table_name="posts")
+    op.drop_column("posts", "discoverable")
@@ -0,0 +1,95 @@
+"""search_documents: full-text + trigram search documents for posts and users.
+
+One row per post (title/hashtags/description) and per user (handle) with a
+weighted tsvector (GIN) and normalized text (GIN trigram), read by
+services/search_index.py. Backfilled here from the current catalog.
+
+Revision ID: b4c5d6e7f8a9
+Revises: a3b4c5d6e7f8
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "b4c5d6e7f8a9"
+down_revision = "a3b4c5d6e7f8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_table(
+        "search_documents",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("entity_type", sa.String(length=10), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("owner_id", sa.Integer(), nullable=False),
+        sa.Column("search_text", sa.Text(), nullable=False),
+        sa.Column("tsv", postgresql.TSVECTOR(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.ForeignKeyConstraint(["owner_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "entity_type", "entity_id", name="uq_search_documents_entity"
+        ),
+    )
+
+    op.execute(
+        """
+        INSERT INTO search_documents
+            (entity_type, entity_id, owner_id, search_text, tsv)
+        SELECT 'post', p.id, p.owner_id,
+               lower(concat_ws(' ', p.title, array_to_string(p.hashtags, ' '))),
+               setweight(to_tsvector('simple', coalesce(p.title, '')), 'A')
+               || setweight(
+                    to_tsvector(
+                        'simple', coalesce(array_to_string(p.hashtags, ' '), '')
+                    ),
+                    'B')
+               || setweight(to_tsvector('simple', coalesce(p.description, '')), 'C')
+        FROM posts p
+        WHERE p.deleted_by_user = false
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO search_documents
+            (entity_type, entity_id, owner_id, search_text, tsv)
+        SELECT 'user', u.id, u.id, lower(u.handle),
+               setweight(to_tsvector('simple', replace(u.handle, '_', ' ')), 'A')
+        FROM users u
+        """
+    )
+
+    # Built after the backfill: one bulk build is far cheaper than
+    # maintaining the GIN indexes row by row.
+    op.create_index(
+        "ix_search_documents_tsv",
+        "search_documents",
+        ["tsv"],
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_search_documents_text_trgm",
+        "search_documents",
+        ["search_text"],
+        postgresql_using="gin",
+        postgresql_ops={"search_text": "gin_trgm_ops"},
+    )
+    op.create_index("ix_search_documents_owner", "search_documents", ["owner_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_search_documents_owner", table_name="search_documents")
+    op.drop_index("ix_search_documents_text_trgm", table_name="search_documents")
+    op.drop_index("ix_search_documents_tsv", table_name="search_documents")
+    op.drop_table("search_documents")
@@ -18,7 +18,9 @@ historical recompute:
 6. Seed the watermark to one day before the oldest surviving raw event.
 
 Backfill logic lives in app.services.view_metrics so tests (which skip
-migrations) and the manual app.tasks.backfill_view_counts task can run it.
+migrations) and the manual app.tasks.backfill_view_counts task can run it;
+the recompute below is a frozen copy of it for the view_events encoding of
+this revision (the columns were re-encoded by f8a9b0c1d2e3).
 
 Revision ID: c1d2e3f4a5b6
 Revises: a9b8c7d6e5f4
@@ -35,6 +37,31 @@ branch_labels = None
 depends_on = None
 
 
+# Frozen view_metrics.recompute_post_view_counts (all posts, raw rows after
+# the just-seeded watermark), against text view_type/viewer_ip_hash columns.
+_RECOMPUTE_SQL = """
+UPDATE posts SET view_count =
+  COALESCE((
+    SELECT SUM(
+      COALESCE((views_by_type->>'view')::int, 0)
+      + COALESCE((views_by_type->>'intentional')::int, 0))
+    FROM post_stats_daily WHERE post_stats_daily.post_id = posts.id
+  ), 0)
+  + COALESCE((
+    SELECT COUNT(DISTINCT (
+      COALESCE('u:' || view_events.viewer_user_id::text,
+               'ip:' || view_events.viewer_ip_hash),
+      (view_events.created_at AT TIME ZONE 'UTC')::date))
+    FROM view_events
+    WHERE view_events.post_id = posts.id
+      AND view_events.view_type IN ('view', 'intentional')
+      AND (view_events.created_at AT TIME ZONE 'UTC')::date > (
+        SELECT value_date FROM rollup_watermarks WHERE name = 'view_events'
+      )
+  ), 0)
+"""
+
+
 def upgrade() -> None:
     # 1-3. Schema
     op.add_column(
@@ -83,13 +110,10 @@ def upgrade() -> None:
     )
 
     # 5-6. Watermark seed, then recompute (which honors the watermark).
-    from app.services.view_metrics import (
-        recompute_post_view_counts,
-        seed_view_watermark,
-    )
+    from app.services.view_metrics import seed_view_watermark
 
     seed_view_watermark(bind)
-    recompute_post_view_counts(bind)
+    bind.execute(sa.text(_RECOMPUTE_SQL))
 
 
 def downgrade() -> None:
@@ -0,0 +1,71 @@
+"""post_lineage_closure: ancestor/descendant closure of Lineage Links.
+
+One row per (ancestor, descendant) pair reachable through live links, with
+the shortest path length, maintained by utils/lineage.py. Backfilled here
+with a depth-limited recursive walk of post_lineage.
+
+Revision ID: c5d6e7f8a9b0
+Revises: b4c5d6e7f8a9
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c5d6e7f8a9b0"
+down_revision = "b4c5d6e7f8a9"
+branch_labels = None
+depends_on = None
+
+# Mirrors utils/lineage.MAX_LINEAGE_DEPTH at the time of writing.
+MAX_LINEAGE_DEPTH = 64
+
+
+def upgrade() -> None:
+    op.create_table(
+        "post_lineage_closure",
+        sa.Column("ancestor_post_id", sa.Integer(), nullable=False),
+        sa.Column("descendant_post_id", sa.Integer(), nullable=False),
+        sa.Column("depth", sa.SmallInteger(), nullable=False),
+        sa.ForeignKeyConstraint(["ancestor_post_id"], ["posts.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(
+            ["descendant_post_id"], ["posts.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("ancestor_post_id", "descendant_post_id"),
+    )
+
+    op.execute(
+        f"""
+        WITH RECURSIVE up(descendant_id, ancestor_id, depth) AS (
+            SELECT pl.child_post_id, pl.parent_post_id, 1
+            FROM post_lineage pl
+            WHERE pl.parent_post_id IS NOT NULL
+            UNION
+            SELECT up.descendant_id, pl.parent_post_id, up.depth + 1
+            FROM up
+            JOIN post_lineage pl ON pl.child_post_id = up.ancestor_id
+            WHERE pl.parent_post_id IS NOT NULL
+              AND up.depth < {MAX_LINEAGE_DEPTH}
+        )
+        INSERT INTO post_lineage_closure
+            (ancestor_post_id, descendant_post_id, depth)
+        SELECT ancestor_id, descendant_id, min(depth)
+        FROM up
+        GROUP BY ancestor_id, descendant_id
+        """
+    )
+
+    op.create_index(
+        "ix_post_lineage_closure_descendant_depth",
+        "post_lineage_closure",
+        ["descendant_post_id", "depth"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_post_lineage_closure_descendant_depth",
+        table_name="post_lineage_closure",
+    )
+    op.drop_table("post_lineage_closure")
@@ -0,0 +1,54 @@
+"""notification_outbox: pending social notifications (transactional outbox).
+
+Request handlers append intents in their own transaction; the drainer in
+services/notification_outbox.py turns them into social_notifications rows
+in batches and deletes them. Drained in id order, so only the primary key
+is indexed.
+
+Revision ID: d6e7f8a9b0c1
+Revises: c5d6e7f8a9b0
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "d6e7f8a9b0c1"
+down_revision = "c5d6e7f8a9b0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "notification_outbox",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("notification_type", sa.String(length=50), nullable=False),
+        sa.Column("post_id", sa.Integer(), nullable=True),
+        sa.Column("actor_id", sa.Integer(), nullable=True),
+        sa.Column("actor_handle", sa.String(length=50), nullable=True),
+        sa.Column("actor_avatar_url", sa.String(length=1000), nullable=True),
+        sa.Column("emoji", sa.String(length=20), nullable=True),
+        sa.Column("comment_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("comment_preview", sa.Text(), nullable=True),
+        sa.Column("content_title", sa.String(length=200), nullable=True),
+        sa.Column("content_sqid", sa.String(length=50), nullable=True),
+        sa.Column("content_art_url", sa.String(length=1000), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["post_id"], ["posts.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["actor_id"], ["users.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("notification_outbox")
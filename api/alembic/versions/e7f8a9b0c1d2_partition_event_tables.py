@@ -0,0 +1,157 @@
+"""partition_event_tables: daily range partitions for the raw event tables.
+
+view_events, site_events and blog_post_view_events become
+PARTITION BY RANGE (created_at) with one partition per UTC day and a
+DEFAULT partition (services/event_partitions.py). The primary key widens to
+(id, created_at), as Postgres requires the partition key in it. Each table
+is rebuilt: the old heap is renamed, the partitioned table created with day
+partitions covering its rows and the coming week, the rows copied, the old
+heap dropped, then keys, foreign keys and indexes recreated under their
+original names. The exception is the two indexes on the hashed viewer/visitor
+IP (RETIRED_INDEXES). No query filters on those columns and app/models.py
+does not declare them, so they are dropped rather than rebuilt on every
+partition. downgrade() restores them.
+
+Revision ID: e7f8a9b0c1d2
+Revises: d6e7f8a9b0c1
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e7f8a9b0c1d2"
+down_revision = "d6e7f8a9b0c1"
+branch_labels = None
+depends_on = None
+
+# (foreign keys, indexes) per table, as declared in app/models.py.
+EVENT_TABLES = {
+    "view_events": (
+        [
+            ("post_id", "posts", "CASCADE"),
+            ("viewer_user_id", "users", "SET NULL"),
+            ("player_id", "players", "SET NULL"),
+        ],
+        [
+            ("ix_view_events_id", "id"),
+            ("ix_view_events_post_id", "post_id"),
+            ("ix_view_events_viewer_user_id", "viewer_user_id"),
+            ("ix_view_events_country_code", "country_code"),
+            ("ix_view_events_device_type", "device_type"),
+            ("ix_view_events_view_type", "view_type"),
+            ("ix_view_events_player_id", "player_id"),
+            ("ix_view_events_channel", "channel"),
+            ("ix_view_events_created_at", "created_at"),
+            ("ix_view_events_post_created", "post_id, created_at DESC"),
+        ],
+    ),
+    "site_events": (
+        [("user_id", "users", "SET NULL")],
+        [
+            ("ix_site_events_id", "id"),
+            ("ix_site_events_event_type", "event_type"),
+            ("ix_site_events_user_id", "user_id"),
+            ("ix_site_events_device_type", "device_type"),
+            ("ix_site_events_country_code", "country_code"),
+            ("ix_site_events_created_at", "created_at"),
+            ("ix_site_events_type_created", "event_type, created_at DESC"),
+            ("ix_site_events_created", "created_at DESC"),
+        ],
+    ),
+    "blog_post_view_events": (
+        [
+            ("blog_post_id", "blog_posts", "CASCADE"),
+            ("viewer_user_id", "users", "SET NULL"),
+        ],
+        [
+            ("ix_blog_post_view_events_id", "id"),
+            ("ix_blog_post_view_events_blog_post_id", "blog_post_id"),
+            ("ix_blog_post_view_events_viewer_user_id", "viewer_user_id"),
+            ("ix_blog_post_view_events_country_code", "country_code"),
+            ("ix_blog_post_view_events_device_type", "device_type"),
+            ("ix_blog_post_view_events_view_type", "view_type"),
+            ("ix_blog_post_view_events_created_at", "created_at"),
+            (
+                "ix_blog_post_view_events_post_created",
+                "blog_post_id, created_at DESC",
+            ),
+        ],
+    ),
+}
+
+
+# Created by the squashed schema but unused: IP hashes are only read off rows
+# already selected by post or date (unique-visitor counting), never looked up.
+# Dropped on upgrade, recreated on downgrade.
+RETIRED_INDEXES = (
+    ("ix_view_events_viewer_ip_hash", "view_events", "viewer_ip_hash"),
+    ("ix_site_events_visitor_ip_hash", "site_events", "visitor_ip_hash"),
+)
+
+
+def _replace(table: str, partition_by: str = "") -> None:
+    """Move the table aside and create its replacement (same columns and
+    defaults; keys and indexes come after the copy, in _refill)."""
+    op.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+    op.execute(
+        f"CREATE TABLE {table} (LIKE {table}_old INCLUDING DEFAULTS){partition_by}"
+    )
+
+
+def _refill(table: str, primary_key: str) -> None:
+    foreign_keys, indexes = EVENT_TABLES[table]
+    op.execute(f"INSERT INTO {table} SELECT * FROM {table}_old")
+    op.execute(f"DROP TABLE {table}_old")
+    op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY ({primary_key})")
+    for column, target, ondelete in foreign_keys:
+        op.execute(
+            f"ALTER TABLE {table} ADD FOREIGN KEY ({column}) "
+            f"REFERENCES {target} (id) ON DELETE {ondelete}"
+        )
+    for name, columns in indexes:
+        op.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+
+
+def upgrade() -> None:
+    from app.services.event_partitions import (
+        PARTITION_PRECREATE_DAYS,
+        install_event_partitioning,
+    )
+
+    for name, _table, _column in RETIRED_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+    for table in EVENT_TABLES:
+        _replace(table, " PARTITION BY RANGE (created_at)")
+
+    install_event_partitioning(op.get_bind())
+
+    for table in EVENT_TABLES:
+        # Day partitions from the oldest surviving row through next week.
+        op.execute(
+            f"""
+            SELECT ensure_event_partition('{table}', day::date)
+            FROM generate_series(
+                coalesce(
+                    (SELECT min((created_at AT TIME ZONE 'UTC')::date)
+                     FROM {table}_old),
+                    (now() AT TIME ZONE 'UTC')::date
+                ),
+                (now() AT TIME ZONE 'UTC')::date + {PARTITION_PRECREATE_DAYS},
+                interval '1 day'
+            ) AS day
+            """
+        )
+        _refill(table, "id, created_at")
+
+
+def downgrade() -> None:
+    op.execute("DROP FUNCTION IF EXISTS ensure_event_partition(text, date)")
+    op.execute("DROP FUNCTION IF EXISTS drop_event_partitions(text, date)")
+    for table in EVENT_TABLES:
+        _replace(table)
+        _refill(table, "id")
+
+    for name, table, column in RETIRED_INDEXES:
+        op.execute(f"CREATE INDEX {name} ON {table} ({column})")
@@ -0,0 +1,35 @@
+"""batch_download_requests.delivery: 'archive' (built ZIP) or 'stream'.
+
+Streamed BDRs are never materialized under /vault/bdr/; the download
+endpoint serves the ZIP on the fly from the vault files
+(services/bdr_archive.get_stream_manifest). Existing rows are archives.
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "f2a3b4c5d6e7"
+down_revision = "e1f2a3b4c5d6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "batch_download_requests",
+        sa.Column(
+            "delivery",
+            sa.String(length=10),
+            nullable=False,
+            server_default="archive",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("batch_download_requests", "delivery")
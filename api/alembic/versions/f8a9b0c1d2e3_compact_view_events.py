@@ -0,0 +1,139 @@
+"""compact_view_events: re-encode raw view events compactly.
+
+view_events rows shrink (utils/event_encoding.py):
+
+- id: random UUID -> bigint from view_events_id_seq (PK stays (id, created_at));
+- viewer_ip_hash / user_agent_hash: 64-char hex text -> 32-byte bytea;
+- device_type / view_source / view_type / channel: text -> smallint codes.
+
+The single-column indexes on id (covered by the primary key) and on the
+low-cardinality country_code/device_type/view_type/channel columns are
+dropped.
+
+Conversion goes one partition at a time: every partition is detached, the
+(then empty) parent altered, and each partition rewritten and re-attached
+with its original bounds, so no statement rewrites more than one day.
+
+Revision ID: f8a9b0c1d2e3
+Revises: e7f8a9b0c1d2
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic.
+revision = "f8a9b0c1d2e3"
+down_revision = "e7f8a9b0c1d2"
+branch_labels = None
+depends_on = None
+
+DROPPED_INDEXES = (
+    ("ix_view_events_id", "id"),
+    ("ix_view_events_country_code", "country_code"),
+    ("ix_view_events_device_type", "device_type"),
+    ("ix_view_events_view_type", "view_type"),
+    ("ix_view_events_channel", "channel"),
+)
+
+
+def _partitions() -> list[tuple[str, str]]:
+    """(name, bound expression) of every view_events partition."""
+    return [
+        tuple(row)
+        for row in op.get_bind().execute(
+            text(
+                "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+                "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'view_events'::regclass ORDER BY c.relname"
+            )
+        )
+    ]
+
+
+def _convert_partitions(alter_columns: str) -> None:
+    partitions = _partitions()
+    for name, _bound in partitions:
+        op.execute(f"ALTER TABLE view_events DETACH PARTITION {name}")
+    for table in ["view_events"] + [name for name, _bound in partitions]:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN id DROP DEFAULT")
+        op.execute(f"ALTER TABLE {table} {alter_columns}")
+    for name, bound in partitions:
+        op.execute(f"ALTER TABLE view_events ATTACH PARTITION {name} {bound}")
+
+
+def upgrade() -> None:
+    from app.utils.event_encoding import (
+        CHANNELS,
+        DEVICE_TYPES,
+        VIEW_SOURCES,
+        VIEW_TYPES,
+        digest_sql,
+        label_case_sql,
+    )
+
+    for name, _column in DROPPED_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.execute("CREATE SEQUENCE view_events_id_seq AS bigint")
+
+    _convert_partitions(
+        ", ".join(
+            [
+                "ALTER COLUMN id TYPE bigint USING nextval('view_events_id_seq')",
+                "ALTER COLUMN viewer_ip_hash TYPE bytea USING "
+                + digest_sql("viewer_ip_hash"),
+                "ALTER COLUMN user_agent_hash TYPE bytea USING "
+                + digest_sql("user_agent_hash"),
+            ]
+            + [
+                f"ALTER COLUMN {column} TYPE smallint USING "
+                + label_case_sql(labels, column)
+                for column, labels in (
+                    ("device_type", DEVICE_TYPES),
+                    ("view_source", VIEW_SOURCES),
+                    ("view_type", VIEW_TYPES),
+                    ("channel", CHANNELS),
+                )
+            ]
+        )
+    )
+
+    op.execute(
+        "ALTER TABLE view_events "
+        "ALTER COLUMN id SET DEFAULT nextval('view_events_id_seq')"
+    )
+    op.execute("ALTER SEQUENCE view_events_id_seq OWNED BY view_events.id")
+
+
+def downgrade() -> None:
+    from app.utils.event_encoding import (
+        CHANNELS,
+        DEVICE_TYPES,
+        OTHER,
+        VIEW_SOURCES,
+        VIEW_TYPES,
+    )
+
+    columns = [
+        "ALTER COLUMN id TYPE uuid USING gen_random_uuid()",
+        "ALTER COLUMN viewer_ip_hash TYPE varchar(64) "
+        "USING encode(viewer_ip_hash, 'hex')",
+        "ALTER COLUMN user_agent_hash TYPE varchar(64) "
+        "USING encode(user_agent_hash, 'hex')",
+    ]
+    for column, labels in (
+        ("device_type", DEVICE_TYPES),
+        ("view_source", VIEW_SOURCES),
+        ("view_type", VIEW_TYPES),
+        ("channel", CHANNELS),
+    ):
+        columns.append(
+            f"ALTER COLUMN {column} TYPE varchar(20) USING "
+            f"CASE WHEN {column} = 0 THEN '{OTHER}' "
+            f"ELSE (ARRAY{list(labels)!r})[{column}] END"
+        )
+    _convert_partitions(", ".join(columns))
+    op.execute("DROP SEQUENCE IF EXISTS view_events_id_seq")
+
+    for name, column in DROPPED_INDEXES:
+        op.execute(f"CREATE INDEX {name} ON view_events ({column})")
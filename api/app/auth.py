@@ -11,10 +11,17 @@ from datetime import datetime, timedelta
 import jwt
 from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from . import models
-from .deps import get_db
+from .deps import get_async_db, get_db
+from .services.auth_principal import (
+    attach_principal,
+    cache_principal,
+    fetch_principal,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -311,8 +318,6 @@ async def get_current_user(
     """
     Get current authenticated user from Bearer token.
     """
-    from . import models
-
     if not credentials:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -320,42 +325,34 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    try:
-        # Decode and verify JWT
-        payload = jwt.decode(
-            credentials.credentials, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM]
-        )
-
-        # Resolve the subject. Prefer the standard `sub` claim (public_sqid);
-        # fall back to the legacy `user_id` claim (user_key UUID) for tokens
-        # issued before the cutover. One of the two must be present.
-        sub = payload.get("sub")
-        legacy_user_id = payload.get("user_id")
-        if not sub and not legacy_user_id:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token: missing subject",
-            )
+    return resolve_token_user(db, credentials.credentials)
 
-        user = None
-        if sub:
-            user = db.query(models.User).filter(models.User.public_sqid == sub).first()
-        if user is None and legacy_user_id:
-            user_key = uuid.UUID(legacy_user_id)
-            user = (
-                db.query(models.User).filter(models.User.user_key == user_key).first()
-            )
 
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
-            )
+def resolve_token_user(db: Session, token: str) -> models.User:
+    """
+    Resolve an access token to its user, raising 401 when it is invalid or
+    the user may not authenticate.
 
-        # Check if user is allowed to authenticate
-        check_user_can_authenticate(user)
+    The body of get_current_user; resolve_token_user_async runs the same
+    steps with only the database lookup inside ``AsyncSession.run_sync``.
+    """
+    sub, iat, legacy_user_id = decode_access_token(token)
+    snapshot, generation = None, None
+    if sub and iat is not None:
+        snapshot, generation = fetch_principal(sub, iat)
+    user = load_token_user(db, sub, legacy_user_id, snapshot)
+    if snapshot is None:
+        remember_principal(sub, iat, user, generation)
+    return user
 
-        return user
 
+def decode_access_token(token: str) -> tuple[str | None, int | None, str | None]:
+    """
+    Verify an access token and return its (sub, iat, legacy user_id) claims,
+    raising 401 when it is invalid, expired or has no subject.
+    """
+    try:
+        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired"
@@ -364,10 +361,66 @@ async def get_current_user(
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
         )
-    except ValueError:
+
+    # Resolve the subject. Prefer the standard `sub` claim (public_sqid);
+    # fall back to the legacy `user_id` claim (user_key UUID) for tokens
+    # issued before the cutover. One of the two must be present.
+    sub = payload.get("sub")
+    legacy_user_id = payload.get("user_id")
+    if not sub and not legacy_user_id:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid user ID in token"
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token: missing subject",
         )
+    return sub, payload.get("iat"), legacy_user_id
+
+
+def load_token_user(
+    db: Session,
+    sub: str | None,
+    legacy_user_id: str | None,
+    snapshot: str | None = None,
+) -> models.User:
+    """
+    The user behind decoded token claims: the cached ``snapshot`` when there
+    is one, else the ``users`` row. Raises 401 when there is none or the user
+    may not authenticate. Database only, so it can run inside ``run_sync``.
+    """
+    from . import models
+
+    user = attach_principal(db, snapshot) if snapshot is not None else None
+    if user is None and sub:
+        user = db.query(models.User).filter(models.User.public_sqid == sub).first()
+    if user is None and legacy_user_id:
+        try:
+            user_key = uuid.UUID(legacy_user_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid user ID in token",
+            )
+        user = db.query(models.User).filter(models.User.user_key == user_key).first()
+
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
+        )
+
+    # Check if user is allowed to authenticate
+    check_user_can_authenticate(user)
+
+    return user
+
+
+def remember_principal(
+    sub: str | None, iat, user: models.User, generation: str | None
+) -> None:
+    """Cache a user just loaded for a ``sub``/``iat`` token (Redis only).
+
+    ``generation`` comes from the ``fetch_principal`` made before the load.
+    """
+    if sub and iat is not None and user.public_sqid == sub:
+        cache_principal(sub, iat, user, generation)
 
 
 def get_current_player(
@@ -611,6 +664,57 @@ async def get_current_user_or_anonymous(
     return AnonymousUser(ip=ip, guest_name=guest_name)
 
 
+# ============================================================================
+# ASYNC-SESSION VARIANTS
+# ============================================================================
+# For `async def` endpoints on the async session (deps.get_async_db): the same
+# resolution as above, with only the users/players lookups run on the
+# request's AsyncSession. The principal cache is a sync Redis call, so it
+# goes to the threadpool rather than block the
+# event loop. FastAPI caches get_async_db per request, so the endpoint and
+# these dependencies share one session.
+
+
+async def resolve_token_user_async(adb: AsyncSession, token: str) -> models.User:
+    """Async-session counterpart of resolve_token_user."""
+    sub, iat, legacy_user_id = decode_access_token(token)
+    snapshot, generation = None, None
+    if sub and iat is not None:
+        snapshot, generation = await run_in_threadpool(fetch_principal, sub, iat)
+    user = await adb.run_sync(load_token_user, sub, legacy_user_id, snapshot)
+    if snapshot is None:
+        await run_in_threadpool(remember_principal, sub, iat, user, generation)
+    return user
+
+
+async def get_current_user_optional_async(
+    credentials: HTTPAuthorizationCredentials | None = Depends(oauth2_scheme),
+    adb: AsyncSession = Depends(get_async_db),
+) -> models.User | None:
+    """Async-session counterpart of get_current_user_optional."""
+    if credentials is None:
+        return None
+
+    try:
+        return await resolve_token_user_async(adb, credentials.credentials)
+    except HTTPException:
+        return None
+
+
+async def get_current_user_or_anonymous_async(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials | None = Depends(oauth2_scheme),
+    adb: AsyncSession = Depends(get_async_db),
+) -> models.User | AnonymousUser:
+    """Async-session counterpart of get_current_user_or_anonymous."""
+    user = await get_current_user_optional_async(credentials, adb)
+    if user is not None:
+        return user
+
+    ip = get_client_ip(request)
+    return AnonymousUser(ip=ip, guest_name=generate_guest_name(ip))
+
+
 # ============================================================================
 # COOKIE CONFIGURATION
 # ============================================================================
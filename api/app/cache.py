@@ -17,6 +17,8 @@ except ImportError:
     REDIS_AVAILABLE = False
     redis = None
 
+from .metrics import CountingConnection, record_cache_lookup
+
 logger = logging.getLogger(__name__)
 
 # Redis connection
@@ -74,7 +76,14 @@ def get_redis_client() -> redis.Redis | None:
         else:
             db_num = 0
 
-        _redis_client = redis.from_url(redis_url, db=db_num, decode_responses=True)
+        # Plain redis:// gets the round-trip-counting connection (app/metrics.py);
+        # rediss:// and unix:// keep the connection class their scheme needs.
+        connection_kwargs = {}
+        if redis_url.startswith("redis://"):
+            connection_kwargs["connection_class"] = CountingConnection
+        _redis_client = redis.from_url(
+            redis_url, db=db_num, decode_responses=True, **connection_kwargs
+        )
         # Test connection
         _redis_client.ping()
         logger.info("Redis cache connected successfully")
@@ -100,6 +109,7 @@ def cache_get(key: str) -> Any | None:
 
     try:
         value = client.get(key)
+        record_cache_lookup(key, hit=value is not None)
         if value is None:
             return None
 
@@ -2,10 +2,11 @@ from __future__ import annotations
 
 import os
 from functools import lru_cache
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from urllib.parse import quote_plus
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 
@@ -33,7 +34,32 @@ def get_database_url() -> str:
     )
 
 
+def get_read_database_url() -> str:
+    """Get the database URL for staleness-tolerant reads (read replica).
+
+    The replica is reached with the API worker credentials at
+    ``DB_READ_HOST``/``DB_READ_PORT``; without ``DB_READ_HOST`` reads go to
+    the primary.
+    """
+    # Allow override for tests (e.g. a second local Postgres)
+    test_url = os.getenv("TEST_DATABASE_URL")
+    if test_url:
+        return os.getenv("TEST_READ_DATABASE_URL") or test_url
+
+    read_host = os.getenv("DB_READ_HOST")
+    if not read_host:
+        return get_database_url()
+
+    # Same credentials and database name as the primary (validated there)
+    primary = make_url(get_database_url())
+    return primary.set(
+        host=read_host,
+        port=int(os.getenv("DB_READ_PORT", primary.port or 5432)),
+    ).render_as_string(hide_password=False)
+
+
 DATABASE_URL = get_database_url()
+READ_DATABASE_URL = get_read_database_url()
 
 
 class Base(DeclarativeBase):
@@ -45,15 +71,83 @@ engine = create_engine(
     future=True,
     echo=os.getenv("LOG_LEVEL", "INFO").upper() == "DEBUG",
     pool_pre_ping=True,
-    # Connection pool settings for production (1K-10K MAU)
+    # Connection pool settings for production (1K-10K MAU). Each worker holds
+    # at most 30 primary connections, shared with async_engine below: 20 here
+    # (most endpoints are still sync), 10 there.
     pool_size=10,  # Base connections kept open per worker
-    max_overflow=20,  # Extra connections under load (total max: 30 per worker)
+    max_overflow=10,  # Extra connections under load (20 per worker)
     pool_timeout=20,  # Wait up to 20s for a connection before timeout
     pool_recycle=1800,  # Recycle connections after 30 minutes to prevent stale connections
 )
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
+# Async twin of `engine` for the hot read endpoints declared `async def`
+# (post page, recent and promoted feeds, comments), so their queries wait on the
+# event loop instead of holding a threadpool thread. Same URL: psycopg 3
+# speaks both. Its pool takes the remaining 10 of the per-worker budget, so
+# the two together still open at most 30 connections per worker (the old
+# sync-only total). Don't shrink the sync side further: sync sessions are
+# closed on the threadpool, so once every thread waits on an exhausted pool
+# nothing is returned until pool_timeout fires.
+async_engine = create_async_engine(
+    DATABASE_URL,
+    echo=os.getenv("LOG_LEVEL", "INFO").upper() == "DEBUG",
+    pool_pre_ping=True,
+    pool_size=5,
+    max_overflow=5,
+    pool_timeout=20,
+    pool_recycle=1800,
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False
+)
+
+# Read-replica routing. Endpoints that tolerate replication lag (stats,
+# dashboards, discovery feeds, search, sitemap) opt in with deps.get_read_db /
+# get_async_read_db; anything that must see its own writes stays on the
+# primary. Without a replica the read engines *are* the primary engines (no
+# extra pool); with one, the replica gets the same 20 + 10 split. Read
+# sessions are READ ONLY transactions either way, so a write slipping into an
+# opted-in endpoint fails in dev and tests too, not only against the replica.
+if READ_DATABASE_URL == DATABASE_URL:
+    read_engine = engine
+    async_read_engine = async_engine
+else:
+    read_engine = create_engine(
+        READ_DATABASE_URL,
+        future=True,
+        echo=os.getenv("LOG_LEVEL", "INFO").upper() == "DEBUG",
+        pool_pre_ping=True,
+        pool_size=10,
+        max_overflow=10,
+        pool_timeout=20,
+        pool_recycle=1800,
+    )
+    async_read_engine = create_async_engine(
+        READ_DATABASE_URL,
+        echo=os.getenv("LOG_LEVEL", "INFO").upper() == "DEBUG",
+        pool_pre_ping=True,
+        pool_size=5,
+        max_overflow=5,
+        pool_timeout=20,
+        pool_recycle=1800,
+    )
+
+ReadSessionLocal = sessionmaker(
+    bind=read_engine.execution_options(postgresql_readonly=True),
+    autoflush=False,
+    autocommit=False,
+    future=True,
+)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_read_engine.execution_options(postgresql_readonly=True),
+    class_=AsyncSession,
+    autoflush=False,
+)
+
 
 @lru_cache(maxsize=1)
 def get_engine():
@@ -66,3 +160,30 @@ def get_session() -> Generator[Session, None, None]:
         yield session
     finally:
         session.close()
+
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """Async counterpart of get_session.
+
+    Existing sync query code runs on it unchanged through
+    ``await session.run_sync(fn, ...)``: ``fn`` receives a regular Session
+    whose I/O is awaited on the event loop. Anything that lazy-loads
+    (serializing ORM objects included) must happen inside ``fn``.
+    """
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+def get_read_session() -> Generator[Session, None, None]:
+    """Read-only session on the replica (or the primary when none is set)."""
+    session: Session = ReadSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+async def get_async_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """Async counterpart of get_read_session."""
+    async with AsyncReadSessionLocal() as session:
+        yield session
@@ -1,11 +1,32 @@
 from __future__ import annotations
 
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from .db import get_session
+from .db import (
+    get_async_read_session,
+    get_async_session,
+    get_read_session,
+    get_session,
+)
 
 
 def get_db() -> Generator[Session, None, None]:
     yield from get_session()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async for session in get_async_session():
+        yield session
+
+
+def get_read_db() -> Generator[Session, None, None]:
+    """Read-only session for endpoints that tolerate replica lag."""
+    yield from get_read_session()
+
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    async for session in get_async_read_session():
+        yield session
@@ -47,7 +47,11 @@ from .routers import (
 )
 from .seed import ensure_seed_data
 from .errors import register_exception_handlers
-from .middleware import RequestIdMiddleware, SecurityHeadersMiddleware
+from .middleware import (
+    MetricsMiddleware,
+    RequestIdMiddleware,
+    SecurityHeadersMiddleware,
+)
 
 load_dotenv()
 
@@ -203,6 +207,16 @@ async def lifespan(app: FastAPI):
         start_request_subscriber()
         start_view_subscriber()
         start_optional_subscriber()
+
+        # Forward BDR updates published by Celery workers to PMD SSE streams.
+        from .services.bdr_events import start_bdr_event_relay
+
+        start_bdr_event_relay()
+
+        # Deliver notification intents queued by request handlers.
+        from .services.notification_outbox import start_notification_drainer
+
+        start_notification_drainer()
     logger.info("Makapix API server ready")
     yield
     # Shutdown
@@ -210,11 +224,17 @@ async def lifespan(app: FastAPI):
     # Stop MQTT subscribers
     from .mqtt.player_status import stop_status_subscriber
     from .mqtt.player_requests import stop_request_subscriber
+    from .mqtt.player_views import stop_view_subscriber
     from .mqtt.player_optional import stop_optional_subscriber
     from .mqtt.publisher import stop_publisher
+    from .services.bdr_events import stop_bdr_event_relay
+    from .services.notification_outbox import stop_notification_drainer
 
+    stop_bdr_event_relay()
+    stop_notification_drainer()
     stop_status_subscriber()
     stop_request_subscriber()
+    stop_view_subscriber()
     stop_optional_subscriber()
     stop_publisher()
 
@@ -269,6 +289,10 @@ app.add_middleware(SecurityHeadersMiddleware)
 # Add request ID middleware for audit trail correlation
 app.add_middleware(RequestIdMiddleware)
 
+# Per-request latency / SQL / Redis metrics (app/metrics.py). Added last so it
+# is the outermost middleware and times everything inside it.
+app.add_middleware(MetricsMiddleware)
+
 
 # --- App-facing JSON API (versioned) ---
 # Canonical mount is `/api/v1/...` (Caddy strips `/api`, so the app sees
@@ -0,0 +1,293 @@
+"""Request-level performance metrics in Prometheus format.
+
+What is recorded:
+  - per request (middleware.MetricsMiddleware): latency by route template,
+    method and status, plus how many SQL statements and Redis round trips the
+    request made and how long its SQL took;
+  - SQL statements: every cursor execute on any Engine (sync and async), via
+    SQLAlchemy events;
+  - Redis round trips: every command or pipeline sent by the shared client
+    (cache.get_redis_client builds it on ``CountingConnection``);
+  - cache hits/misses of cache.cache_get, per key family;
+  - Celery tasks: run time by task and outcome, and queue wait (publish to
+    start) from a timestamp header stamped at publish.
+
+Per-request totals ride in a ContextVar holding a mutable ``RequestStats``;
+the threadpool (sync endpoints) and ``AsyncSession.run_sync`` greenlets
+inherit the context, so their statements are counted against the request.
+Work outside a request (Celery tasks, MQTT subscribers) only feeds the global
+series.
+
+The API exposes its registry at ``GET /metrics`` (routers/system.py, bearer
+``METRICS_TOKEN``). The worker serves its own on ``WORKER_METRICS_PORT``
+(``start_worker_metrics_server``); prefork children share samples through
+``PROMETHEUS_MULTIPROC_DIR``.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from prometheus_client import Counter, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Small-integer buckets for per-request statement / round-trip counts.
+_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+
+REQUEST_LATENCY = Histogram(
+    "makapix_http_request_duration_seconds",
+    "HTTP request latency (route template, method, status).",
+    ["route", "method", "status"],
+)
+REQUEST_DB_QUERIES = Histogram(
+    "makapix_http_request_db_queries",
+    "SQL statements executed per HTTP request.",
+    ["route"],
+    buckets=_COUNT_BUCKETS,
+)
+REQUEST_DB_SECONDS = Histogram(
+    "makapix_http_request_db_seconds",
+    "Time spent in SQL statements per HTTP request.",
+    ["route"],
+)
+REQUEST_REDIS_CALLS = Histogram(
+    "makapix_http_request_redis_calls",
+    "Redis round trips per HTTP request.",
+    ["route"],
+    buckets=_COUNT_BUCKETS,
+)
+DB_QUERIES = Counter(
+    "makapix_db_queries_total", "SQL statements executed (all callers)."
+)
+REDIS_CALLS = Counter("makapix_redis_calls_total", "Redis round trips (all callers).")
+CACHE_REQUESTS = Counter(
+    "makapix_cache_requests_total",
+    "cache.cache_get lookups by key family and result (hit/miss).",
+    ["family", "result"],
+)
+TASK_DURATION = Histogram(
+    "makapix_celery_task_duration_seconds",
+    "Celery task run time by task and outcome.",
+    ["task", "state"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+TASK_QUEUE_WAIT = Histogram(
+    "makapix_celery_task_queue_wait_seconds",
+    "Time from publish to start of a Celery task.",
+    ["task"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+
+# Header stamped on every published task (wall clock: crosses processes).
+PUBLISHED_AT_HEADER = "makapix_published_at"
+
+
+@dataclass
+class RequestStats:
+    """Running totals for the request in flight."""
+
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    redis_calls: int = 0
+
+
+_request_stats: ContextVar[RequestStats | None] = ContextVar(
+    "makapix_request_stats", default=None
+)
+
+
+def begin_request() -> tuple[RequestStats, object]:
+    """Start accumulating for a request; returns (stats, reset token)."""
+    stats = RequestStats()
+    return stats, _request_stats.set(stats)
+
+
+def end_request(
+    token, stats: RequestStats, route: str, method: str, status: int, seconds: float
+) -> None:
+    """Record a finished request and stop accumulating."""
+    _request_stats.reset(token)
+    REQUEST_LATENCY.labels(route, method, str(status)).observe(seconds)
+    REQUEST_DB_QUERIES.labels(route).observe(stats.db_queries)
+    REQUEST_DB_SECONDS.labels(route).observe(stats.db_seconds)
+    REQUEST_REDIS_CALLS.labels(route).observe(stats.redis_calls)
+
+
+def current_request_stats() -> RequestStats | None:
+    return _request_stats.get()
+
+
+# --- SQLAlchemy -------------------------------------------------------------
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    started = conn.info.get("metrics_query_start")
+    elapsed = time.perf_counter() - started.pop() if started else 0.0
+    DB_QUERIES.inc()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += elapsed
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context) -> None:
+    # A failed execute never reaches after_cursor_execute; drop its start.
+    conn = exception_context.connection
+    started = conn.info.get("metrics_query_start") if conn is not None else None
+    if started:
+        started.pop()
+
+
+# --- Redis ------------------------------------------------------------------
+
+
+def record_redis_call() -> None:
+    REDIS_CALLS.inc()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.redis_calls += 1
+
+
+try:
+    import redis
+
+    class CountingConnection(redis.Connection):
+        """redis-py connection that counts every packet it sends.
+
+        One send is one round trip: a single command, or a whole pipeline.
+        """
+
+        def send_packed_command(self, command, check_health=True):
+            record_redis_call()
+            return super().send_packed_command(command, check_health)
+
+except ImportError:  # pragma: no cover - redis is a hard dependency in prod
+    CountingConnection = None
+
+
+# --- Cache ------------------------------------------------------------------
+
+_FAMILY_SEGMENT = re.compile(r"^[a-z_]+$")
+
+
+def cache_key_family(key: str) -> str:
+    """Low-cardinality label for a cache key: its leading word segments.
+
+    ``feed:recent:first:50`` -> ``feed:recent``; ``post_stats:123`` ->
+    ``post_stats``. At most two segments; stops at the first one holding an
+    id, cursor or other data.
+    """
+    family = []
+    for segment in key.split(":")[:2]:
+        if not _FAMILY_SEGMENT.match(segment):
+            break
+        family.append(segment)
+    return ":".join(family) or "other"
+
+
+def record_cache_lookup(key: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache_key_family(key), "hit" if hit else "miss").inc()
+
+
+# --- Celery -----------------------------------------------------------------
+
+
+def register_celery_metrics() -> None:
+    """Wire Celery signals for task duration and queue wait.
+
+    Called on import of app.tasks, so both sides are covered: the API (and
+    anything else that publishes) stamps the publish time, the worker
+    observes. Signals, not decorators, so task bodies stay untouched.
+    """
+    from celery.signals import before_task_publish, task_postrun, task_prerun
+
+    started: dict[str, float] = {}
+
+    @before_task_publish.connect(weak=False)
+    def _stamp_publish(headers=None, **_kw):
+        if headers is not None:
+            headers.setdefault(PUBLISHED_AT_HEADER, time.time())
+
+    @task_prerun.connect(weak=False)
+    def _task_start(task_id=None, task=None, **_kw):
+        started[task_id] = time.perf_counter()
+        request = getattr(task, "request", None)
+        published_at = getattr(request, PUBLISHED_AT_HEADER, None) or (
+            (getattr(request, "headers", None) or {}).get(PUBLISHED_AT_HEADER)
+        )
+        if published_at and not getattr(request, "eta", None):
+            wait = max(0.0, time.time() - float(published_at))
+            TASK_QUEUE_WAIT.labels(task.name).observe(wait)
+
+    @task_postrun.connect(weak=False)
+    def _task_end(task_id=None, task=None, state=None, **_kw):
+        start = started.pop(task_id, None)
+        if start is not None and task is not None:
+            TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(
+                time.perf_counter() - start
+            )
+
+
+# --- Exposition -------------------------------------------------------------
+
+
+def render_latest() -> tuple[bytes, str]:
+    """(body, content type) of the current samples, in text format."""
+    from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+
+    registry = REGISTRY
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import CollectorRegistry, multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def start_worker_metrics_server() -> None:
+    """Serve the worker's metrics on WORKER_METRICS_PORT (no-op when unset).
+
+    Celery runs tasks in prefork children, so their samples only reach this
+    (parent) server through PROMETHEUS_MULTIPROC_DIR. That directory must
+    exist, empty, before any app module is imported (worker/worker.py).
+    """
+    port = os.getenv("WORKER_METRICS_PORT", "").strip()
+    if not port:
+        return
+
+    from prometheus_client import CollectorRegistry, start_http_server
+
+    registry = None
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        logger.warning(
+            "WORKER_METRICS_PORT set without PROMETHEUS_MULTIPROC_DIR; "
+            "task metrics from prefork children will be missing"
+        )
+    try:
+        if registry is None:
+            start_http_server(int(port))
+        else:
+            start_http_server(int(port), registry=registry)
+        logger.info("Worker metrics served on :%s", port)
+    except Exception:
+        logger.warning("Worker metrics server failed to start", exc_info=True)
@@ -3,11 +3,15 @@
 from __future__ import annotations
 
 import os
+import time
 import uuid
 from typing import Callable
 
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from . import metrics
 
 
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
@@ -83,3 +87,46 @@ class RequestIdMiddleware(BaseHTTPMiddleware):
         response.headers["X-Request-Id"] = request_id
 
         return response
+
+
+class MetricsMiddleware:
+    """
+    Record per-request latency, SQL and Redis usage (app/metrics.py).
+
+    Pure ASGI (no BaseHTTPMiddleware task hop), installed outermost so the
+    timing covers every other middleware. Requests are labelled by route
+    template (``/p/{public_sqid}``), never the raw path; requests that match
+    no route share the ``unmatched`` label. Streaming responses (SSE) are
+    timed until the stream ends.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats, token = metrics.begin_request()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            metrics.end_request(
+                token,
+                stats,
+                route,
+                scope["method"],
+                status_code,
+                time.perf_counter() - start,
+            )
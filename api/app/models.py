@@ -7,6 +7,7 @@ from sqlalchemy import (
     BigInteger,
     Boolean,
     Column,
+    Computed,
     Date,
     DateTime,
     ForeignKey,
@@ -19,10 +20,18 @@ from sqlalchemy import (
     func,
     text,
 )
-from sqlalchemy.dialects.postgresql import ARRAY, JSON, JSONB, UUID
+from sqlalchemy.dialects.postgresql import ARRAY, JSON, JSONB, TSVECTOR, UUID
 from sqlalchemy.orm import relationship, backref, validates
 
 from .db import Base
+from .utils.event_encoding import (
+    CHANNELS,
+    DEVICE_TYPES,
+    VIEW_SOURCES,
+    VIEW_TYPES,
+    CodedLabel,
+    HexDigest,
+)
 from .utils.handle_normalize import compute_handle_skeleton, normalize_handle
 
 # ============================================================================
@@ -308,6 +317,21 @@ class PasswordResetToken(Base):
     user = relationship("User", back_populates="password_reset_tokens")
 
 
+# Rows a player (or any public listing) may ever be served; the predicate of
+# the partial AMP criteria indexes on posts. Must stay textually equivalent to
+# the filters in services/player_rpc._build_channel_query.
+PLAYABLE_POST_PREDICATE = (
+    "visible AND NOT deleted_by_user AND NOT hidden_by_user"
+    " AND NOT hidden_by_mod AND NOT non_conformant"
+)
+
+# Rows every discovery surface (Recent, promoted, hashtags, search, sitemap,
+# player public channels) may list: playable and approved by moderation.
+# Stored as the generated posts.discoverable column so each surface filters
+# on one flag that the partial feed indexes below are restricted to.
+DISCOVERABLE_POST_PREDICATE = PLAYABLE_POST_PREDICATE + " AND public_visibility"
+
+
 class Post(Base):
     """User-created post with art metadata."""
 
@@ -374,6 +398,24 @@ class Post(Base):
     alpha_actual = Column(
         Boolean, nullable=False, default=False
     )  # True if any pixel anywhere has alpha not in {0, 255}
+    # Compact AMP feature record for indexed player criteria filtering
+    # (services/player_rpc._apply_criteria_filters). native_format/_file_bytes
+    # mirror the is_native PostFile row so native criteria and file-size sorts
+    # need no post_files subquery; amp_flags packs the four transparency
+    # booleans (bit values in utils/amp_features.py) so any combination of them
+    # is one btree IN-list. NULL native_* = playlist (no files).
+    native_format = Column(String(10), nullable=True)
+    native_file_bytes = Column(Integer, nullable=True)
+    amp_flags = Column(
+        SmallInteger,
+        Computed(
+            "(transparency_meta::int"
+            " | (alpha_meta::int << 1)"
+            " | (transparency_actual::int << 2)"
+            " | (alpha_actual::int << 3))::smallint",
+            persisted=True,
+        ),
+    )
     hash = Column(
         String(64), nullable=True
     )  # SHA256 hash of the artwork bytes (dedupe + mismatch detection)
@@ -387,6 +429,9 @@ class Post(Base):
     public_visibility = Column(
         Boolean, nullable=False, default=False, index=True
     )  # Controls visibility in Recent Artworks, search, etc.
+    discoverable = Column(
+        Boolean, Computed(DISCOVERABLE_POST_PREDICATE, persisted=True)
+    )  # Maintained by Postgres; filter on this, never assign it
 
     # User deletion (soft delete with scheduled hard delete)
     deleted_by_user = Column(Boolean, nullable=False, default=False, index=True)
@@ -493,6 +538,40 @@ class Post(Base):
         Index("ix_posts_hashtags", "hashtags", postgresql_using="gin"),
         Index("ix_posts_owner_created", owner_id, created_at.desc()),
         Index("ix_posts_non_conformant_created", non_conformant, created_at.desc()),
+        # Discovery feeds (newest first), partial on the discoverable flag.
+        Index(
+            "ix_posts_discoverable_created",
+            created_at.desc(),
+            id.desc(),
+            postgresql_where=text("discoverable"),
+        ),
+        Index(
+            "ix_posts_discoverable_promoted_created",
+            promoted,
+            created_at.desc(),
+            postgresql_where=text("discoverable"),
+        ),
+        # AMP criteria indexes, partial on the withdrawal flags every player
+        # query applies (so the planner can prove the predicate).
+        Index(
+            "ix_posts_amp_native_format",
+            native_format,
+            id.desc(),
+            postgresql_where=text(PLAYABLE_POST_PREDICATE),
+        ),
+        Index(
+            "ix_posts_amp_dims",
+            width,
+            height,
+            frame_count,
+            postgresql_where=text(PLAYABLE_POST_PREDICATE),
+        ),
+        Index(
+            "ix_posts_amp_flags",
+            amp_flags,
+            id.desc(),
+            postgresql_where=text(PLAYABLE_POST_PREDICATE),
+        ),
     )
 
     @property
@@ -540,6 +619,36 @@ class PostLineage(Base):
     )
 
 
+class PostLineageClosure(Base):
+    """Transitive closure of post_lineage: one row per (ancestor, descendant)
+    pair reachable through live links, with the shortest path length.
+
+    Derived data maintained by utils/lineage.py on link creation, moderator
+    severing and post hard-delete (and rebuilt nightly), so whole-Lineage
+    reads and descendant counts are one indexed lookup instead of a
+    recursive walk. Paths longer than MAX_LINEAGE_DEPTH are not recorded.
+    Tombstone links (parent hard-deleted) contribute nothing.
+    """
+
+    __tablename__ = "post_lineage_closure"
+
+    ancestor_post_id = Column(
+        Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True
+    )
+    descendant_post_id = Column(
+        Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True
+    )
+    depth = Column(SmallInteger, nullable=False)  # >= 1, shortest path
+
+    __table_args__ = (
+        Index(
+            "ix_post_lineage_closure_descendant_depth",
+            "descendant_post_id",
+            "depth",
+        ),
+    )
+
+
 class PostFile(Base):
     """File variant for a post (one row per format per post)."""
 
@@ -562,6 +671,78 @@ class PostFile(Base):
     )
 
 
+class UserStorageUsage(Base):
+    """Per-user storage ledger (services/storage_ledger.py).
+
+    Bytes held by the user's non-deleted posts, by class: native files,
+    derived format variants (SSAFPP conversions), and attached .mkpx layers
+    files. Adjusted by delta in the same transaction as the file change, so
+    quota checks read one row instead of aggregating post_files; the
+    nightly reconcile_storage_usage task repairs any drift.
+    """
+
+    __tablename__ = "user_storage_usage"
+
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    native_bytes = Column(BigInteger, nullable=False, default=0, server_default="0")
+    derived_bytes = Column(BigInteger, nullable=False, default=0, server_default="0")
+    mkpx_bytes = Column(BigInteger, nullable=False, default=0, server_default="0")
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+    reconciled_at = Column(DateTime(timezone=True), nullable=True)
+
+    @property
+    def total_bytes(self) -> int:
+        return self.native_bytes + self.derived_bytes + self.mkpx_bytes
+
+
+class SearchDocument(Base):
+    """Search document for a post or user (services/search_index.py).
+
+    ``search_text`` is the normalized short text matched by trigram (post
+    title + hashtags, or user handle); ``tsv`` is the weighted full-text
+    vector (title/handle A, hashtags B, description C). Visibility is not
+    stored here: searches re-check it against the source row, so only text
+    edits need to reach this table.
+    """
+
+    __tablename__ = "search_documents"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entity_type = Column(String(10), nullable=False)  # "post" | "user"
+    entity_id = Column(Integer, nullable=False)
+    # Post author, or the user itself; used for block filtering and cascade.
+    owner_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    search_text = Column(Text, nullable=False)
+    tsv = Column(TSVECTOR, nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    __table_args__ = (
+        UniqueConstraint("entity_type", "entity_id", name="uq_search_documents_entity"),
+        Index("ix_search_documents_tsv", tsv, postgresql_using="gin"),
+        Index(
+            "ix_search_documents_text_trgm",
+            search_text,
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
+        Index("ix_search_documents_owner", owner_id),
+    )
+
+
 class PlaylistPost(Base):
     """Playlist post marker table (1:1 with posts rows where kind='playlist')."""
 
@@ -1167,11 +1348,16 @@ class AuditLog(Base):
 
 
 class ViewEvent(Base):
-    """Raw view event for tracking artwork views."""
+    """Raw view event for tracking artwork views.
+
+    Stored compactly (utils/event_encoding.py): bigint key, digests as
+    32-byte bytea, and smallint codes for the label columns. The ORM still
+    reads and writes hex strings and plain labels.
+    """
 
     __tablename__ = "view_events"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
     post_id = Column(
         Integer, ForeignKey("posts.id", ondelete="CASCADE"), nullable=False, index=True
     )
@@ -1180,24 +1366,24 @@ class ViewEvent(Base):
     )
 
     # Viewer identification (for unique viewer tracking)
-    viewer_ip_hash = Column(String(64), nullable=False)  # SHA256 hash of IP address
+    viewer_ip_hash = Column(HexDigest, nullable=False)  # SHA256 hash of IP address
 
     # Geographic data
-    country_code = Column(
-        String(2), nullable=True, index=True
-    )  # ISO 3166-1 alpha-2 (e.g., "US", "BR")
+    country_code = Column(String(2), nullable=True)  # ISO 3166-1 alpha-2 ("US")
 
     # Device & source information
     device_type = Column(
-        String(20), nullable=False, index=True
+        CodedLabel(DEVICE_TYPES), nullable=False
     )  # desktop, mobile, tablet, player
-    view_source = Column(String(20), nullable=False)  # web, api, widget, player
+    view_source = Column(
+        CodedLabel(VIEW_SOURCES), nullable=False
+    )  # web, api, widget, player
     view_type = Column(
-        String(20), nullable=False, index=True
-    )  # intentional, listing, search, widget
+        CodedLabel(VIEW_TYPES), nullable=False
+    )  # view, impression (+ legacy intentional, listing, search, widget)
 
     # Additional metadata
-    user_agent_hash = Column(String(64), nullable=True)  # For device fingerprinting
+    user_agent_hash = Column(HexDigest, nullable=True)  # For device fingerprinting
     referrer_domain = Column(String(255), nullable=True)  # Extracted referrer domain
 
     # Player-specific context (nullable for web views)
@@ -1217,15 +1403,21 @@ class ViewEvent(Base):
         Integer, nullable=True
     )  # Play order mode: 0=server, 1=created_at, 2=random
     channel = Column(
-        String(20), nullable=True, index=True
+        CodedLabel(CHANNELS), nullable=True
     )  # Channel being played: all, promoted, user, by_user, artwork, hashtag
     channel_context = Column(
         String(100), nullable=True
     )  # Context for channel (user_sqid for by_user, hashtag for hashtag channel)
 
     # Timestamps
+    # Part of the primary key: the table is partitioned by day on it
+    # (services/event_partitions.py).
     created_at = Column(
-        DateTime(timezone=True), nullable=False, server_default=func.now(), index=True
+        DateTime(timezone=True),
+        primary_key=True,
+        nullable=False,
+        server_default=func.now(),
+        index=True,
     )
 
     # Relationships
@@ -1240,7 +1432,10 @@ class ViewEvent(Base):
         passive_deletes=True,
     )
 
-    __table_args__ = (Index("ix_view_events_post_created", post_id, created_at.desc()),)
+    __table_args__ = (
+        Index("ix_view_events_post_created", post_id, created_at.desc()),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
 
 class PostStatsDaily(Base):
@@ -1496,8 +1691,14 @@ class SiteEvent(Base):
     )  # {endpoint, status_code, error_message, etc.}
 
     # Timestamps
+    # Part of the primary key: the table is partitioned by day on it
+    # (services/event_partitions.py).
     created_at = Column(
-        DateTime(timezone=True), nullable=False, server_default=func.now(), index=True
+        DateTime(timezone=True),
+        primary_key=True,
+        nullable=False,
+        server_default=func.now(),
+        index=True,
     )
 
     # Relationships
@@ -1510,6 +1711,7 @@ class SiteEvent(Base):
     __table_args__ = (
         Index("ix_site_events_type_created", event_type, created_at.desc()),
         Index("ix_site_events_created", created_at.desc()),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
 
 
@@ -1747,8 +1949,14 @@ class BlogPostViewEvent(Base):
     referrer_domain = Column(String(255), nullable=True)  # Extracted referrer domain
 
     # Timestamps
+    # Part of the primary key: the table is partitioned by day on it
+    # (services/event_partitions.py).
     created_at = Column(
-        DateTime(timezone=True), nullable=False, server_default=func.now(), index=True
+        DateTime(timezone=True),
+        primary_key=True,
+        nullable=False,
+        server_default=func.now(),
+        index=True,
     )
 
     # Relationships
@@ -1760,6 +1968,7 @@ class BlogPostViewEvent(Base):
 
     __table_args__ = (
         Index("ix_blog_post_view_events_post_created", blog_post_id, created_at.desc()),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
 
 
@@ -1880,6 +2089,41 @@ class SocialNotification(Base):
         return self.actor.public_sqid if self.actor is not None else None
 
 
+class NotificationOutbox(Base):
+    """
+    Pending social notification (transactional outbox).
+
+    Request handlers append an intent in their own transaction
+    (SocialNotificationService.enqueue_notification); the drainer in
+    services/notification_outbox.py rate-limits, bulk-inserts the
+    SocialNotification rows and dispatches them, then deletes the intents.
+    Columns mirror SocialNotification's denormalized fields as of the action.
+    """
+
+    __tablename__ = "notification_outbox"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    notification_type = Column(String(50), nullable=False)
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), nullable=True)
+    actor_id = Column(
+        Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True
+    )
+    actor_handle = Column(String(50), nullable=True)
+    actor_avatar_url = Column(String(1000), nullable=True)
+    emoji = Column(String(20), nullable=True)
+    comment_id = Column(UUID(as_uuid=True), nullable=True)
+    comment_preview = Column(Text, nullable=True)
+    content_title = Column(String(200), nullable=True)
+    content_sqid = Column(String(50), nullable=True)
+    content_art_url = Column(String(1000), nullable=True)
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
 # ============================================================================
 # POST MANAGEMENT DASHBOARD (PMD)
 # ============================================================================
@@ -1890,7 +2134,8 @@ class BatchDownloadRequest(Base):
     Batch Download Request (BDR) for PMD.
 
     Tracks user requests to download multiple artworks as a ZIP file.
-    ZIP files are stored in /vault/bdr/{user_sqid}/{id}.zip
+    ZIP files are stored in /vault/bdr/{user_sqid}/{id}.zip, except for
+    streamed BDRs (delivery='stream'), which are never materialized.
 
     NOTE: Playlist posts are excluded from PMD at this time. This feature
     is deferred to a future release. The server-side query filters out
@@ -1909,6 +2154,12 @@ class BatchDownloadRequest(Base):
     include_comments = Column(Boolean, nullable=False, default=False)
     include_reactions = Column(Boolean, nullable=False, default=False)
     send_email = Column(Boolean, nullable=False, default=False)
+    # 'archive': ZIP built by process_bdr_job and stored under /vault/bdr/.
+    # 'stream': no build step; the download endpoint streams the ZIP from
+    # the vault files (services/bdr_archive.get_stream_manifest).
+    delivery = Column(
+        String(10), nullable=False, default="archive", server_default="archive"
+    )
 
     # Status tracking
     # Possible statuses: pending, processing, ready, failed, expired
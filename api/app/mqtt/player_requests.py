@@ -24,16 +24,19 @@ from sqlalchemy.orm import Session, joinedload
 from .. import models
 from ..db import get_session
 from ..player_protocol.schemas import (
+    AdvanceChannelWindowRequest,
+    ChannelWindowResponse,
     EchoRequest,
     ErrorResponse,
     GetCommentsRequest,
     GetPlaysetRequest,
     GetPostRequest,
+    OpenChannelWindowRequest,
     QueryPostsRequest,
     RevokeReactionRequest,
     SubmitReactionRequest,
 )
-from ..services import player_rpc
+from ..services import channel_window, player_rpc
 from ..services.player_rpc import PlayerRpcError
 from .publisher import publish
 
@@ -169,6 +172,36 @@ def _publish_response(
     publish(topic=response_topic, payload=payload, qos=1, retain=False)
 
 
+def _publish_window_response(
+    player_key: UUID,
+    request_id: str,
+    response: ChannelWindowResponse,
+    *,
+    exclude_none: bool,
+    trim: bool = False,
+) -> None:
+    """Publish a channel-window response, pushing each page on its own topic.
+
+    The response topic carries only the window metadata; every delivered page
+    goes to ``makapix/player/{player_key}/channel/{window_id}`` so a page never
+    shares the 128 KiB budget with its siblings.
+    """
+    pages = response.pages
+    _publish_response(
+        player_key,
+        request_id,
+        response.model_copy(update={"pages": []}),
+        exclude_none=exclude_none,
+    )
+
+    page_topic = f"makapix/player/{player_key}/channel/{response.window_id}"
+    for page in pages:
+        payload = page.model_dump(mode="json", exclude_none=exclude_none)
+        if trim:
+            payload = _trim_posts_payload_to_limit(payload)
+        publish(topic=page_topic, payload=payload, qos=1, retain=False)
+
+
 def _run_handler(
     handler,
     player: models.Player,
@@ -179,12 +212,15 @@ def _run_handler(
     trim: bool = False,
     write: bool = False,
     err_prefix: str = "Internal error",
+    publish_fn=_publish_response,
 ) -> None:
     """Invoke a player_rpc handler and publish its result over MQTT.
 
     Translates ``PlayerRpcError`` into an MQTT error response and falls back to
     an ``internal_error`` response for unexpected exceptions (rolling back the
     session for write operations), preserving the prior per-handler behaviour.
+    ``publish_fn`` publishes a successful response (default: the response
+    topic only).
     """
     try:
         response = handler(player, request, db)
@@ -208,7 +244,7 @@ def _run_handler(
         )
         return
 
-    _publish_response(
+    publish_fn(
         player.player_key,
         request.request_id,
         response,
@@ -232,6 +268,38 @@ def _handle_query_posts(
     )
 
 
+def _handle_open_channel_window(
+    player: models.Player, request: OpenChannelWindowRequest, db: Session
+) -> None:
+    """Handle open_channel_window request (MQTT adapter)."""
+    _run_handler(
+        channel_window.open_channel_window,
+        player,
+        request,
+        db,
+        exclude_none=True,
+        trim=True,
+        err_prefix="Internal error opening channel window",
+        publish_fn=_publish_window_response,
+    )
+
+
+def _handle_advance_channel_window(
+    player: models.Player, request: AdvanceChannelWindowRequest, db: Session
+) -> None:
+    """Handle advance_channel_window request (MQTT adapter)."""
+    _run_handler(
+        channel_window.advance_channel_window,
+        player,
+        request,
+        db,
+        exclude_none=True,
+        trim=True,
+        err_prefix="Internal error advancing channel window",
+        publish_fn=_publish_window_response,
+    )
+
+
 def _handle_get_post(
     player: models.Player, request: GetPostRequest, db: Session
 ) -> None:
@@ -386,6 +454,12 @@ def _on_request_message(
             if request_type == "query_posts":
                 request_obj = QueryPostsRequest(**payload)
                 _handle_query_posts(player, request_obj, db)
+            elif request_type == "open_channel_window":
+                request_obj = OpenChannelWindowRequest(**payload)
+                _handle_open_channel_window(player, request_obj, db)
+            elif request_type == "advance_channel_window":
+                request_obj = AdvanceChannelWindowRequest(**payload)
+                _handle_advance_channel_window(player, request_obj, db)
             elif request_type == "get_post":
                 request_obj = GetPostRequest(**payload)
                 _handle_get_post(player, request_obj, db)
@@ -1,8 +1,10 @@
-"""MQTT subscriber for player view events (fire-and-forget).
+"""MQTT subscriber for player view events (fire-and-forget, single or batched).
 
 Transport adapter over ``app.services.player_views.record_view_event``: this
 module owns MQTT concerns (topic parsing, broker auth by player_key, acks,
 subscriber lifecycle); the ingestion logic is shared with the HTTPS backend.
+Messages are processed on the bounded pool in ``view_workers`` so a slow
+database, Redis or broker never blocks paho's network loop.
 """
 
 from __future__ import annotations
@@ -11,7 +13,7 @@ import json
 import logging
 import os
 import threading
-from typing import Any
+from typing import Any, Callable
 from uuid import UUID
 
 from paho.mqtt import client as mqtt_client
@@ -23,9 +25,12 @@ from ..services.player_views import (
     DUPLICATE,
     POST_NOT_FOUND,
     RATE_LIMITED,
+    build_view_batch_ack,
+    record_view_batch,
     record_view_event,
 )
-from .schemas import P3AViewEvent
+from .schemas import P3AViewBatch, P3AViewBatchAck, P3AViewEvent
+from .view_workers import get_view_pool, shutdown_view_pool
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +38,65 @@ logger = logging.getLogger(__name__)
 _view_client: mqtt_client.Client | None = None
 _view_client_lock = threading.Lock()
 
+# Suggested back-off in the server_busy NACK sent when the pool is full.
+BUSY_RETRY_AFTER_SECONDS = 5
+
+
+def _resolve_view_player(
+    db: Session, player_key: UUID
+) -> tuple[models.Player | None, str | None, str | None]:
+    """Authenticate the player behind a view topic.
+
+    Returns ``(player, None, None)`` or ``(None, error, error_code)`` when the
+    player is unregistered, ownerless, or its owner may not authenticate.
+    """
+    player = (
+        db.query(models.Player)
+        .filter(
+            models.Player.player_key == player_key,
+            models.Player.registration_status == "registered",
+        )
+        .first()
+    )
+
+    if not player:
+        logger.warning(f"View event from unregistered player: {player_key}")
+        return None, "Player not registered", "player_not_registered"
+
+    if not player.owner_id:
+        logger.warning(f"Player {player_key} has no owner")
+        return None, "Player has no owner", "player_no_owner"
+
+    # Match the HTTP path: a banned/deactivated owner's device must not keep
+    # recording views over MQTT.
+    from ..auth import user_can_authenticate
+
+    if not user_can_authenticate(player.owner):
+        logger.warning(
+            f"View event rejected: owner banned/deactivated for {player_key}"
+        )
+        return None, "Owner not permitted", "owner_not_permitted"
+
+    return player, None, None
+
+
+def _parse_player_topic(topic: str, action: str) -> UUID | None:
+    """Extract the player_key from ``makapix/player/{player_key}/{action}``."""
+    parts = topic.split("/")
+    if (
+        len(parts) != 4
+        or parts[0] != "makapix"
+        or parts[1] != "player"
+        or parts[3] != action
+    ):
+        logger.warning(f"Invalid {action} topic format: {topic}")
+        return None
+    try:
+        return UUID(parts[2])
+    except ValueError:
+        logger.warning(f"Invalid player_key in topic: {parts[2]}")
+        return None
+
 
 def _on_view_message(
     client: mqtt_client.Client, userdata: Any, msg: mqtt_client.MQTTMessage
@@ -47,22 +111,8 @@ def _on_view_message(
     player_key = None
     try:
         # Parse topic to extract player_key
-        parts = msg.topic.split("/")
-        if (
-            len(parts) != 4
-            or parts[0] != "makapix"
-            or parts[1] != "player"
-            or parts[3] != "view"
-        ):
-            logger.warning(f"Invalid view topic format: {msg.topic}")
-            return
-
-        player_key_str = parts[2]
-
-        try:
-            player_key = UUID(player_key_str)
-        except ValueError:
-            logger.warning(f"Invalid player_key in topic: {player_key_str}")
+        player_key = _parse_player_topic(msg.topic, "view")
+        if player_key is None:
             return
 
         # Parse payload
@@ -99,60 +149,12 @@ def _on_view_message(
         # Get database session
         db: Session = next(get_session())
         try:
-            # Authenticate player
-            player = (
-                db.query(models.Player)
-                .filter(
-                    models.Player.player_key == player_key,
-                    models.Player.registration_status == "registered",
-                )
-                .first()
-            )
-
-            if not player:
-                logger.warning(f"View event from unregistered player: {player_key}")
-                if view_event.request_ack:
-                    ack_topic = f"makapix/player/{player_key}/view/ack"
-                    ack_payload = json.dumps(
-                        {
-                            "success": False,
-                            "error": "Player not registered",
-                            "error_code": "player_not_registered",
-                        }
-                    )
-                    client.publish(ack_topic, ack_payload, qos=1)
-                return
-
-            if not player.owner_id:
-                logger.warning(f"Player {player_key} has no owner")
+            player, error, error_code = _resolve_view_player(db, player_key)
+            if player is None:
                 if view_event.request_ack:
                     ack_topic = f"makapix/player/{player_key}/view/ack"
                     ack_payload = json.dumps(
-                        {
-                            "success": False,
-                            "error": "Player has no owner",
-                            "error_code": "player_no_owner",
-                        }
-                    )
-                    client.publish(ack_topic, ack_payload, qos=1)
-                return
-
-            # Match the HTTP path: a banned/deactivated owner's device must not
-            # keep recording views over MQTT.
-            from ..auth import user_can_authenticate
-
-            if not user_can_authenticate(player.owner):
-                logger.warning(
-                    f"View event rejected: owner banned/deactivated for {player_key}"
-                )
-                if view_event.request_ack:
-                    ack_topic = f"makapix/player/{player_key}/view/ack"
-                    ack_payload = json.dumps(
-                        {
-                            "success": False,
-                            "error": "Owner not permitted",
-                            "error_code": "owner_not_permitted",
-                        }
+                        {"success": False, "error": error, "error_code": error_code}
                     )
                     client.publish(ack_topic, ack_payload, qos=1)
                 return
@@ -214,6 +216,125 @@ def _on_view_message(
         logger.error(f"Unexpected error in view event handler: {e}", exc_info=True)
 
 
+def _on_view_batch_message(
+    client: mqtt_client.Client, userdata: Any, msg: mqtt_client.MQTTMessage
+) -> None:
+    """
+    Handle a batch of buffered player view events.
+
+    Topic pattern: makapix/player/{player_key}/views
+    Optional acknowledgment (one P3AViewBatchAck with a result per event) sent
+    to: makapix/player/{player_key}/views/ack
+    """
+    batch = None
+    player_key = None
+
+    def _ack(ack: P3AViewBatchAck) -> None:
+        if batch is not None and batch.request_ack:
+            client.publish(
+                f"makapix/player/{player_key}/views/ack",
+                ack.model_dump_json(exclude_none=True),
+                qos=1,
+            )
+
+    try:
+        player_key = _parse_player_topic(msg.topic, "views")
+        if player_key is None:
+            return
+
+        try:
+            batch = P3AViewBatch(**json.loads(msg.payload.decode("utf-8")))
+        except Exception as e:
+            logger.error(f"Invalid view batch payload: {e}")
+            return
+
+        if str(player_key) != batch.player_key:
+            logger.warning(
+                f"player_key mismatch: topic={player_key}, payload={batch.player_key}"
+            )
+            _ack(
+                P3AViewBatchAck(
+                    batch_id=batch.batch_id,
+                    success=False,
+                    error="player_key mismatch between topic and payload",
+                    error_code="player_key_mismatch",
+                )
+            )
+            return
+
+        db: Session = next(get_session())
+        try:
+            player, error, error_code = _resolve_view_player(db, player_key)
+            if player is None:
+                _ack(
+                    P3AViewBatchAck(
+                        batch_id=batch.batch_id,
+                        success=False,
+                        error=error,
+                        error_code=error_code,
+                    )
+                )
+                return
+
+            results = record_view_batch(player, batch.events, db)
+            _ack(build_view_batch_ack(batch.batch_id, results))
+
+        except Exception as e:
+            logger.error(f"Error processing view batch: {e}", exc_info=True)
+            _ack(
+                P3AViewBatchAck(
+                    batch_id=batch.batch_id,
+                    success=False,
+                    error=str(e),
+                    error_code="processing_error",
+                )
+            )
+        finally:
+            db.close()
+
+    except Exception as e:
+        logger.error(f"Unexpected error in view batch handler: {e}", exc_info=True)
+
+
+def _reject_busy(client: mqtt_client.Client, msg: mqtt_client.MQTTMessage) -> None:
+    """NACK a message the ingestion pool had no room for.
+
+    Runs on the network loop, so it only peeks at the payload for
+    ``request_ack`` (and ``batch_id``); players that did not ask for an ack
+    cannot be told and the view is dropped.
+    """
+    try:
+        payload = json.loads(msg.payload.decode("utf-8"))
+    except Exception:
+        return
+    if not isinstance(payload, dict) or not payload.get("request_ack"):
+        return
+    nack = {
+        "success": False,
+        "error": "Server busy, retry later",
+        "error_code": "server_busy",
+        "retry_after": BUSY_RETRY_AFTER_SECONDS,
+    }
+    if msg.topic.endswith("/views"):
+        nack["batch_id"] = payload.get("batch_id")
+    client.publish(f"{msg.topic}/ack", json.dumps(nack), qos=1)
+
+
+def _enqueue(
+    handler: Callable[[mqtt_client.Client, Any, mqtt_client.MQTTMessage], None],
+) -> Callable[[mqtt_client.Client, Any, mqtt_client.MQTTMessage], None]:
+    """Wrap a view handler so paho's loop thread only enqueues the message."""
+
+    def on_message(
+        client: mqtt_client.Client, userdata: Any, msg: mqtt_client.MQTTMessage
+    ) -> None:
+        if not get_view_pool().submit(handler, client, userdata, msg):
+            logger.warning(f"View ingestion saturated, rejecting {msg.topic}")
+            _reject_busy(client, msg)
+
+    return on_message
+
+
 def start_view_subscriber() -> None:
     """Start MQTT subscriber for player view events (fire-and-forget)."""
     global _view_client
@@ -252,7 +373,10 @@ def start_view_subscriber() -> None:
                     logger.info("Player view event subscriber connected to MQTT broker")
                     # Subscribe to all player view topics
                     client.subscribe("makapix/player/+/view", qos=1)
-                    logger.info("Subscribed to makapix/player/+/view")
+                    client.subscribe("makapix/player/+/views", qos=1)
+                    logger.info(
+                        "Subscribed to makapix/player/+/view and makapix/player/+/views"
+                    )
                 else:
                     logger.error(
                         f"View event subscriber connection failed: {reason_code}"
@@ -265,7 +389,11 @@ def start_view_subscriber() -> None:
 
             client.on_connect = on_connect
             client.on_disconnect = on_disconnect
-            client.on_message = _on_view_message
+            # Handlers run on the ingestion pool, never on the network loop.
+            client.on_message = _enqueue(_on_view_message)
+            client.message_callback_add(
+                "makapix/player/+/views", _enqueue(_on_view_batch_message)
+            )
 
             # Connect to MQTT broker
             broker_host = os.getenv("MQTT_BROKER_HOST", "mqtt")
@@ -296,6 +424,8 @@ def stop_view_subscriber() -> None:
                 _view_client.loop_stop()
                 _view_client.disconnect()
                 _view_client = None
+                # Finish views already accepted off the wire.
+                shutdown_view_pool()
                 logger.info("Player view event subscriber stopped")
             except Exception as e:
                 logger.error(f"Error stopping view event subscriber: {e}")
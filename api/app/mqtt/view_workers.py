@@ -0,0 +1,194 @@
+"""Bounded worker pool between the MQTT network loop and view ingestion.
+
+paho runs every ``on_message`` callback on its single network-loop thread, so
+handling a view there (DB session, ownership checks, Redis dedup, Celery
+``delay()``) means one slow dependency stalls all view intake and keeps QoS 1
+messages in flight. The view subscriber instead hands each message to a
+:class:`ViewIngestPool`: a bounded queue drained by a few worker threads.
+
+When the queue is full the message is rejected immediately rather than
+blocking the network loop; the caller NACKs it (``server_busy``) if the
+player asked for an ack, and ``mqtt_view_rejected`` is counted in the view
+observability counters. A snapshot of queue depth, throughput and latency
+percentiles is published every ``REPORT_INTERVAL_SECONDS`` via
+``view_metrics.record_ingest_snapshot`` and logged by the daily
+``check_view_ingestion_health`` task.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+REPORT_INTERVAL_SECONDS = 30
+
+# Latency samples kept for the percentile snapshot.
+_LATENCY_SAMPLES = 1024
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float | None:
+    if not sorted_values:
+        return None
+    last = len(sorted_values) - 1
+    index = min(last, int(round(pct / 100 * last)))
+    return round(sorted_values[index] * 1000, 2)
+
+
+class ViewIngestPool:
+    """Fixed set of worker threads fed by a bounded FIFO queue."""
+
+    def __init__(self, workers: int, max_queue: int, name: str = "view-ingest"):
+        self.workers = max(1, workers)
+        self.max_queue = max(1, max_queue)
+        self.name = name
+        self._queue: queue.Queue = queue.Queue(maxsize=self.max_queue)
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+        self._processed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._last_report = time.monotonic()
+        self._stopping = False
+
+    def start(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            self._stopping = False
+            for i in range(self.workers):
+                thread = threading.Thread(
+                    target=self._run, name=f"{self.name}-{i}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+        logger.info(
+            f"{self.name} pool started: {self.workers} workers, "
+            f"queue capacity {self.max_queue}"
+        )
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> bool:
+        """Queue ``fn(*args)``; False (and counted) if the queue is full."""
+        if self._stopping:
+            return False
+        try:
+            self._queue.put_nowait((time.monotonic(), fn, args))
+            return True
+        except queue.Full:
+            with self._lock:
+                self._rejected += 1
+            return False
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stop accepting work, let workers drain the queue, then join them.
+
+        Bounded by ``timeout`` overall: if the workers are stuck and the queue
+        stays full, the remaining work is abandoned (the threads are daemons).
+        """
+        with self._lock:
+            threads, self._threads = self._threads, []
+            self._stopping = True
+        deadline = time.monotonic() + timeout
+        for _ in threads:
+            try:
+                self._queue.put(
+                    (0.0, None, ()), timeout=max(0.0, deadline - time.monotonic())
+                )
+            except queue.Full:
+                logger.warning(
+                    f"{self.name} pool still saturated at shutdown; abandoning "
+                    f"{self._queue.qsize()} queued task(s)"
+                )
+                break
+        for thread in threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        self._report()
+
+    def stats(self) -> dict[str, Any]:
+        """Point-in-time snapshot (latencies in ms, enqueue to completion)."""
+        with self._lock:
+            samples = sorted(self._latencies)
+            return {
+                "workers": self.workers,
+                "queue_capacity": self.max_queue,
+                "queue_depth": self._queue.qsize(),
+                "processed": self._processed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "latency_p50_ms": _percentile(samples, 50),
+                "latency_p95_ms": _percentile(samples, 95),
+                "latency_p99_ms": _percentile(samples, 99),
+            }
+
+    def _run(self) -> None:
+        while True:
+            try:
+                enqueued_at, fn, args = self._queue.get(timeout=REPORT_INTERVAL_SECONDS)
+            except queue.Empty:
+                self._maybe_report()
+                continue
+            if fn is None:
+                return
+            failed = False
+            try:
+                fn(*args)
+            except Exception as e:
+                failed = True
+                logger.error(f"{self.name} task failed: {e}", exc_info=True)
+            with self._lock:
+                self._latencies.append(time.monotonic() - enqueued_at)
+                if failed:
+                    self._failed += 1
+                else:
+                    self._processed += 1
+            self._maybe_report()
+
+    def _maybe_report(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_report < REPORT_INTERVAL_SECONDS:
+                return
+            self._last_report = now
+        self._report()
+
+    def _report(self) -> None:
+        from ..services.view_metrics import record_ingest_snapshot
+
+        record_ingest_snapshot(self.name, self.stats())
+
+
+_pool: ViewIngestPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_view_pool() -> ViewIngestPool:
+    """Process-wide view ingestion pool, started on first use.
+
+    Sized by ``MQTT_VIEW_WORKERS`` (default 4) and ``MQTT_VIEW_QUEUE_SIZE``
+    (default 1000).
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ViewIngestPool(
+                workers=int(os.getenv("MQTT_VIEW_WORKERS", "4")),
+                max_queue=int(os.getenv("MQTT_VIEW_QUEUE_SIZE", "1000")),
+            )
+        _pool.start()
+        return _pool
+
+
+def shutdown_view_pool(timeout: float = 5.0) -> None:
+    """Drain and stop the process-wide pool (no-op if never started)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(timeout)
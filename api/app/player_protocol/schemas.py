@@ -9,7 +9,7 @@ from __future__ import annotations
 
 from datetime import datetime
 from enum import Enum
-from typing import Annotated, Literal, Union
+from typing import Annotated, Any, Literal, Union
 from uuid import UUID
 
 from pydantic import BaseModel, Field, model_validator
@@ -290,6 +290,32 @@ class QueryPostsRequest(PlayerRequestBase):
     )
 
 
+class OpenChannelWindowRequest(QueryPostsRequest):
+    """Request to open a server-pushed channel window (lookahead paging).
+
+    Takes the same channel/sort/criteria fields as ``query_posts``; ``limit``
+    is the page size and ``cursor`` is ignored (windows always start at page 0).
+    """
+
+    request_type: Literal["open_channel_window"] = "open_channel_window"
+    lookahead: int = Field(
+        2,
+        ge=0,
+        le=4,
+        description="Pages delivered ahead of the page being consumed (0-4)",
+    )
+
+
+class AdvanceChannelWindowRequest(PlayerRequestBase):
+    """Report the page a player started consuming, to pull the next lookahead."""
+
+    request_type: Literal["advance_channel_window"] = "advance_channel_window"
+    window_id: str = Field(
+        ..., max_length=32, description="window_id from open_channel_window"
+    )
+    page: int = Field(..., ge=0, description="Page index now being consumed")
+
+
 class ArtworkPostPayload(BaseModel):
     """Artwork post payload for players (firmware protocol)."""
 
@@ -344,6 +370,39 @@ class QueryPostsResponse(BaseModel):
     error_code: str | None = None
 
 
+class ChannelWindowPage(BaseModel):
+    """One page of a channel window.
+
+    Over MQTT each page is published on its own to
+    ``makapix/player/{player_key}/channel/{window_id}``.
+    """
+
+    window_id: str
+    page: int
+    page_count: int
+    posts: list[PlayerPostPayload]
+    is_last: bool = False
+
+
+class ChannelWindowResponse(BaseModel):
+    """Response to open_channel_window / advance_channel_window.
+
+    ``pages`` holds the newly delivered pages. The MQTT adapter strips them
+    from the response and pushes each page separately; HTTPS returns them
+    inline.
+    """
+
+    request_id: str
+    success: bool = True
+    window_id: str
+    page_size: int
+    total_posts: int
+    page_count: int
+    pages: list[ChannelWindowPage] = Field(default_factory=list)
+    error: str | None = None
+    error_code: str | None = None
+
+
 class GetPostRequest(PlayerRequestBase):
     """Request to fetch a single post by ID."""
 
@@ -492,6 +551,64 @@ class P3AViewEvent(BaseModel):
     )
 
 
+# Upper bound on events in one batched view submission; keeps the payload well
+# under the broker's 128 KiB message limit.
+MAX_VIEW_BATCH_SIZE = 100
+
+
+class P3AViewBatch(BaseModel):
+    """
+    Batch of view events buffered by a player (e.g. while offline).
+
+    Published to: makapix/player/{player_key}/views
+    If request_ack is set, one P3AViewBatchAck is sent to:
+    makapix/player/{player_key}/views/ack
+
+    Each item has the P3AViewEvent shape without ``player_key`` and
+    ``request_ack``. Items are validated individually so one malformed event
+    does not reject the rest of the batch.
+    """
+
+    player_key: str = Field(..., description="UUID identifying the p3a device")
+    batch_id: str | None = Field(
+        None, max_length=64, description="Client correlation id echoed in the ack"
+    )
+    events: list[dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_VIEW_BATCH_SIZE,
+        description="View events in playback order, with their original timestamps",
+    )
+    request_ack: bool = Field(
+        False, description="Whether to send acknowledgment to views/ack topic"
+    )
+
+
+class P3AViewBatchItemResult(BaseModel):
+    """Outcome of one event in a view batch (``index`` into ``events``)."""
+
+    index: int
+    status: Literal[
+        "accepted", "duplicate", "rate_limited", "post_not_found", "invalid"
+    ]
+
+
+class P3AViewBatchAck(BaseModel):
+    """Acknowledgment of a view batch, one result per submitted event.
+
+    Only ``rate_limited`` items are worth resending (after ``retry_after``);
+    every other status is final.
+    """
+
+    batch_id: str | None = None
+    success: bool = True
+    accepted: int = 0
+    results: list[P3AViewBatchItemResult] = Field(default_factory=list)
+    retry_after: float | None = None
+    error: str | None = None
+    error_code: str | None = None
+
+
 # ============================================================================
 # Playset Request/Response Schemas
 # ============================================================================
@@ -578,6 +695,10 @@ __all__ = [
     "PlaylistPostPayload",
     "PlayerPostPayload",
     "QueryPostsResponse",
+    "OpenChannelWindowRequest",
+    "AdvanceChannelWindowRequest",
+    "ChannelWindowPage",
+    "ChannelWindowResponse",
     "GetPostRequest",
     "GetPostResponse",
     "SubmitReactionRequest",
@@ -589,6 +710,10 @@ __all__ = [
     "GetCommentsResponse",
     "ErrorResponse",
     "P3AViewEvent",
+    "MAX_VIEW_BATCH_SIZE",
+    "P3AViewBatch",
+    "P3AViewBatchItemResult",
+    "P3AViewBatchAck",
     "GetPlaysetRequest",
     "PlaysetChannelPayload",
     "GetPlaysetResponse",
@@ -18,8 +18,9 @@ from ..auth import (
     ensure_authenticated_user,
 )
 from ..constants import NotificationType
-from ..deps import get_db
+from ..deps import get_db, get_read_db
 from ..utils.audit import log_moderation_action
+from ..utils.lineage import refresh_closure_below
 from ..utils.view_tracking import truncate_ip
 from ..pagination import (
     apply_cursor_filter,
@@ -594,6 +595,7 @@ def sever_lineage_link(
     )
 
     db.delete(link)
+    refresh_closure_below(db, link.child_post_id)
     db.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
@@ -967,7 +969,7 @@ def list_anonymous_users(
 @router.get("/sitewide-stats", response_model=schemas.SitewideStatsResponse)
 def get_sitewide_stats(
     refresh: bool = Query(False, description="Force cache refresh"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _moderator: models.User = Depends(require_moderator),
 ) -> schemas.SitewideStatsResponse:
     """
@@ -1185,6 +1187,48 @@ def get_download_stats(
     return response
 
 
+@router.get("/storage-usage", response_model=schemas.StorageUsageResponse)
+def get_storage_usage_breakdown(
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    _moderator: models.User = Depends(require_moderator),
+) -> schemas.StorageUsageResponse:
+    """
+    Top users by stored bytes, split into native / derived / .mkpx (moderator only).
+
+    Reads the per-user storage ledger (services/storage_ledger.py), so this
+    never scans post_files.
+    """
+    from ..services.storage_quota import get_user_storage_quota
+
+    SU = models.UserStorageUsage
+    total = SU.native_bytes + SU.derived_bytes + SU.mkpx_bytes
+    rows = (
+        db.query(SU, models.User)
+        .join(models.User, models.User.id == SU.user_id)
+        .order_by(total.desc())
+        .limit(limit)
+        .all()
+    )
+    return schemas.StorageUsageResponse(
+        items=[
+            schemas.StorageUsageItem(
+                user_id=user.id,
+                handle=user.handle,
+                public_sqid=user.public_sqid,
+                native_bytes=usage.native_bytes,
+                derived_bytes=usage.derived_bytes,
+                mkpx_bytes=usage.mkpx_bytes,
+                total_bytes=usage.total_bytes,
+                quota_bytes=get_user_storage_quota(user),
+                updated_at=usage.updated_at,
+                reconciled_at=usage.reconciled_at,
+            )
+            for usage, user in rows
+        ]
+    )
+
+
 STREAK_CRITERION_DAYS = 14
 STRAGGLER_WINDOW_DAYS = 14
 
@@ -6,14 +6,27 @@ import logging
 from pathlib import Path
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.responses import FileResponse, RedirectResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
 
 from .. import models, schemas
-from ..auth import get_current_user, get_current_user_optional
-from ..deps import get_db
+from ..auth import (
+    get_current_user,
+    get_current_user_optional,
+    get_current_user_optional_async,
+)
+from ..deps import get_async_db, get_db
 from ..errors import AppError, ErrorCode
+from ..services.artwork_files import (
+    ArtworkFile,
+    cache_file,
+    describe,
+    file_response,
+    get_cached_file,
+)
 from ..utils.visibility import can_access_post
 from ..utils.site_tracking import record_site_event
 from ..vault import (
@@ -57,17 +70,33 @@ def get_post_file_path_from_storage_key(
 
 
 @router.get("/p/{public_sqid}", response_model=schemas.Post)
-def get_post_by_sqid(
+async def get_post_by_sqid(
     public_sqid: str,
     request: Request,
-    db: Session = Depends(get_db),
-    current_user: models.User | None = Depends(get_current_user_optional),
+    adb: AsyncSession = Depends(get_async_db),
+    current_user: models.User | None = Depends(get_current_user_optional_async),
 ) -> schemas.Post:
     """
     Get post by public Sqids ID (canonical URL).
 
     This is the canonical URL for posts sitewide.
     """
+    post = await adb.run_sync(_get_post_by_sqid, public_sqid, current_user)
+
+    # Record site event for page view (sitewide stats). Per-post views are
+    # NOT recorded here: fetching data is not viewing art (docs/artwork-views/
+    # D4) — clients register views through POST /post/{id}/view. GeoIP and
+    # the Celery publish block, so this runs off the event loop.
+    await run_in_threadpool(record_site_event, request, "page_view", user=current_user)
+
+    return post
+
+
+def _get_post_by_sqid(
+    db: Session,
+    public_sqid: str,
+    current_user: models.User | None,
+) -> schemas.Post:
     # Decode the Sqids ID using the single canonical alphabet (SQIDS_ALPHABET).
     from ..sqids_config import decode_sqid
 
@@ -108,11 +137,6 @@ def get_post_by_sqid(
 
     annotate_posts_with_counts(db, [post], current_user.id if current_user else None)
 
-    # Record site event for page view (sitewide stats). Per-post views are
-    # NOT recorded here: fetching data is not viewing art (docs/artwork-views/
-    # D4) — clients register views through POST /post/{id}/view.
-    record_site_event(request, "page_view", user=current_user)
-
     return schemas.Post.model_validate(post)
 
 
@@ -188,13 +212,64 @@ def download_mkpx_by_sqid(
     )
 
 
+def _get_downloadable_post(
+    db: Session,
+    post_id: int,
+    public_sqid: str,
+    current_user: models.User | None,
+) -> models.Post:
+    """Load the post behind a /d/ URL, 404ing when missing or inaccessible."""
+    post = db.query(models.Post).filter(models.Post.id == post_id).first()
+
+    # Verify public_sqid matches, then check visibility
+    if (
+        not post
+        or post.public_sqid != public_sqid
+        or not can_access_post(post, current_user)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
+        )
+    return post
+
+
+def _decode_post_sqid(public_sqid: str) -> int:
+    # Decode the Sqids ID using the single canonical alphabet (SQIDS_ALPHABET).
+    from ..sqids_config import decode_sqid
+
+    post_id = decode_sqid(public_sqid)
+    if post_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
+        )
+    return post_id
+
+
+def _cached_download(
+    post_id: int, public_sqid: str, variant: str
+) -> ArtworkFile | None:
+    """The remembered public download for this URL, if any
+    (services/artwork_files.py)."""
+    file = get_cached_file(post_id, variant)
+    if file is not None and file.sqid == public_sqid:
+        return file
+    return None
+
+
+def _remember_if_public(post: models.Post, variant: str, file: ArtworkFile) -> None:
+    # Only downloads that anyone may fetch skip the visibility check later.
+    if can_access_post(post, None):
+        cache_file(post.id, variant, file)
+
+
 @router.get("/d/{public_sqid}.{extension}")
 def download_by_sqid_format(
     public_sqid: str,
     extension: str,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: models.User | None = Depends(get_current_user_optional),
-) -> FileResponse:
+) -> Response:
     """
     Download artwork file in a specific format by public Sqids ID.
 
@@ -203,8 +278,6 @@ def download_by_sqid_format(
 
     Supported extensions: gif, png, bmp, webp
     """
-    from ..sqids_config import decode_sqid
-
     # Validate extension
     extension = extension.lower()
     valid_extensions = ["gif", "png", "bmp", "webp"]
@@ -214,31 +287,12 @@ def download_by_sqid_format(
             detail=f"Invalid extension. Supported: {', '.join(valid_extensions)}",
         )
 
-    post_id = decode_sqid(public_sqid)
-    if post_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
-        )
-
-    # Query post
-    post = db.query(models.Post).filter(models.Post.id == post_id).first()
-
-    if not post:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
-        )
-
-    # Verify public_sqid matches
-    if post.public_sqid != public_sqid:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
-        )
+    post_id = _decode_post_sqid(public_sqid)
+    file = _cached_download(post_id, public_sqid, extension)
+    if file is not None:
+        return file_response(request, file)
 
-    # Check visibility
-    if not can_access_post(post, current_user):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
-        )
+    post = _get_downloadable_post(db, post_id, public_sqid, current_user)
 
     # Check if requested format is available
     available_formats = {f.format for f in post.files}
@@ -263,62 +317,22 @@ def download_by_sqid_format(
             detail="File not found (format conversion may still be processing)",
         )
 
-    # Determine filename for download
-    filename = f"{post.title or 'artwork'}.{extension}"
-
-    # Get MIME type
-    media_type = FORMAT_TO_MIME.get(extension, "application/octet-stream")
-
-    return FileResponse(
-        path=str(file_path),
-        media_type=media_type,
-        # FileResponse(filename=...) RFC-5987-encodes Content-Disposition; a
-        # hand-built header 500s on non-Latin-1 (emoji/CJK) titles.
-        filename=filename,
+    file = describe(
+        post,
+        file_path,
+        media_type=FORMAT_TO_MIME.get(extension, "application/octet-stream"),
+        filename=f"{post.title or 'artwork'}.{extension}",
+        variant=extension,
     )
+    _remember_if_public(post, extension, file)
+    return file_response(request, file)
 
 
-@router.get("/d/{public_sqid}")
-def download_by_sqid(
-    public_sqid: str,
-    db: Session = Depends(get_db),
-    current_user: models.User | None = Depends(get_current_user_optional),
-) -> FileResponse:
-    """
-    Download artwork file by public Sqids ID.
-    """
-    # Decode the Sqids ID using the single canonical alphabet (SQIDS_ALPHABET).
-    from ..sqids_config import decode_sqid
-
-    post_id = decode_sqid(public_sqid)
-    if post_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
-        )
-
-    # Query post
-    post = db.query(models.Post).filter(models.Post.id == post_id).first()
-
-    if not post:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
-        )
-
-    # Verify public_sqid matches
-    if post.public_sqid != public_sqid:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
-        )
-
-    # Check visibility
-    if not can_access_post(post, current_user):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
-        )
-
-    # Get native format from post files
-    native_pf = next((f for f in post.files if f.is_native), None)
-    native_format = native_pf.format if native_pf else None
+def _describe_native(post: models.Post) -> ArtworkFile:
+    """Resolve a post's native file, 404ing when it is missing."""
+    # posts.native_format mirrors the is_native post_files row (NULL for
+    # playlists and legacy rows, which default to PNG)
+    native_format = post.native_format
 
     # Get file path
     file_path = get_post_file_path_from_storage_key(
@@ -330,29 +344,43 @@ def download_by_sqid(
             status_code=status.HTTP_404_NOT_FOUND, detail="File not found"
         )
 
-    # Determine filename for download
-    filename = f"{post.title or 'artwork'}{file_path.suffix}"
-
-    # Get MIME type from native format
-    media_type = (
-        FORMAT_TO_MIME.get(native_format, "image/png") if native_format else "image/png"
+    return describe(
+        post,
+        file_path,
+        media_type=FORMAT_TO_MIME.get(native_format or "png", "image/png"),
+        filename=f"{post.title or 'artwork'}{file_path.suffix}",
+        variant="native",
     )
 
-    return FileResponse(
-        path=str(file_path),
-        media_type=media_type,
-        # FileResponse(filename=...) RFC-5987-encodes Content-Disposition; a
-        # hand-built header 500s on non-Latin-1 (emoji/CJK) titles.
-        filename=filename,
-    )
+
+@router.get("/d/{public_sqid}")
+def download_by_sqid(
+    public_sqid: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: models.User | None = Depends(get_current_user_optional),
+) -> Response:
+    """
+    Download artwork file by public Sqids ID.
+    """
+    post_id = _decode_post_sqid(public_sqid)
+    file = _cached_download(post_id, public_sqid, "native")
+    if file is not None:
+        return file_response(request, file)
+
+    post = _get_downloadable_post(db, post_id, public_sqid, current_user)
+    file = _describe_native(post)
+    _remember_if_public(post, "native", file)
+    return file_response(request, file)
 
 
 @router.get("/d/{public_sqid}/upscaled")
 def download_upscaled_by_sqid(
     public_sqid: str,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: models.User | None = Depends(get_current_user_optional),
-) -> FileResponse:
+) -> Response:
     """
     Download upscaled artwork preview by public Sqids ID.
 
@@ -361,33 +389,12 @@ def download_upscaled_by_sqid(
 
     Returns 404 if the upscaled version hasn't been generated yet.
     """
-    from ..sqids_config import decode_sqid
+    post_id = _decode_post_sqid(public_sqid)
+    file = _cached_download(post_id, public_sqid, "upscaled")
+    if file is not None:
+        return file_response(request, file)
 
-    post_id = decode_sqid(public_sqid)
-    if post_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
-        )
-
-    # Query post
-    post = db.query(models.Post).filter(models.Post.id == post_id).first()
-
-    if not post:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
-        )
-
-    # Verify public_sqid matches
-    if post.public_sqid != public_sqid:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
-        )
-
-    # Check visibility
-    if not can_access_post(post, current_user):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
-        )
+    post = _get_downloadable_post(db, post_id, public_sqid, current_user)
 
     # Get upscaled file path
     file_path = get_upscaled_file_path(
@@ -400,26 +407,30 @@ def download_upscaled_by_sqid(
             detail="Upscaled version not available (may still be processing or artwork is too large to upscale)",
         )
 
-    # Determine filename for download
-    filename = f"{post.title or 'artwork'}_upscaled.webp"
-
-    return FileResponse(
-        path=str(file_path),
+    file = describe(
+        post,
+        file_path,
         media_type="image/webp",
-        # FileResponse(filename=...) RFC-5987-encodes Content-Disposition; a
-        # hand-built header 500s on non-Latin-1 (emoji/CJK) titles.
-        filename=filename,
+        filename=f"{post.title or 'artwork'}_upscaled.webp",
+        variant="upscaled",
     )
+    _remember_if_public(post, "upscaled", file)
+    return file_response(request, file)
 
 
 @router.get("/download/{storage_key}")
 def download_by_storage_key(
     storage_key: UUID,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: models.User | None = Depends(get_current_user_optional),
-) -> FileResponse:
+) -> Response:
     """
     Download artwork file by storage key (UUID).
+
+    Legacy route: conditional requests and the proxy hand-off apply, but
+    resolutions are not remembered (the cache is keyed by post id, which a
+    storage key does not carry).
     """
     # Query post
     post = db.query(models.Post).filter(models.Post.storage_key == storage_key).first()
@@ -435,35 +446,7 @@ def download_by_storage_key(
             status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
         )
 
-    # Get native format from post files
-    native_pf = next((f for f in post.files if f.is_native), None)
-    native_format = native_pf.format if native_pf else None
-
-    # Get file path
-    file_path = get_post_file_path_from_storage_key(
-        post.storage_key, native_format, post.storage_shard
-    )
-
-    if not file_path.exists():
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="File not found"
-        )
-
-    # Determine filename for download
-    filename = f"{post.title or 'artwork'}{file_path.suffix}"
-
-    # Get MIME type from native format
-    media_type = (
-        FORMAT_TO_MIME.get(native_format, "image/png") if native_format else "image/png"
-    )
-
-    return FileResponse(
-        path=str(file_path),
-        media_type=media_type,
-        # FileResponse(filename=...) RFC-5987-encodes Content-Disposition; a
-        # hand-built header 500s on non-Latin-1 (emoji/CJK) titles.
-        filename=filename,
-    )
+    return file_response(request, _describe_native(post))
 
 
 @router.get("/u/{public_sqid}", response_model=schemas.UserPublic | schemas.UserFull)
@@ -49,6 +49,8 @@ from ..services.email_verification import (
     mark_email_verified,
 )
 from ..services.rate_limit import check_rate_limit
+from ..services.search_index import index_user
+from ..services.suggest import rename_user
 from ..services.email_normalization import normalize_email
 from ..constants import TERMS_VERSION
 from ..utils.handles import generate_default_handle, validate_handle, is_handle_taken
@@ -1042,6 +1044,7 @@ def change_handle(
     db.add(audit_log)
 
     try:
+        index_user(db, current_user.id)
         db.commit()
         db.refresh(current_user)
     except IntegrityError:
@@ -1051,6 +1054,7 @@ def change_handle(
             detail="This handle is already taken",
         )
 
+    rename_user(current_user.id, old_handle, current_user.handle)
     logger.info(
         f"User {current_user.id} changed handle from '{old_handle}' to '{new_handle}'"
     )
@@ -112,15 +112,14 @@ def like_comment(
     if not existing:
         like = models.CommentLike(comment_id=commentId, user_id=current_user.id)
         db.add(like)
-        db.commit()
 
-        # Send notification to comment author
+        # Notify the comment author (outbox, same commit as the like)
         if comment.author_id:
             post = (
                 db.query(models.Post).filter(models.Post.id == comment.post_id).first()
             )
             if post:
-                SocialNotificationService.create_notification(
+                SocialNotificationService.enqueue_notification(
                     db,
                     user_id=comment.author_id,
                     notification_type=NotificationType.COMMENT_LIKE,
@@ -128,6 +127,7 @@ def like_comment(
                     actor=current_user,
                     comment=comment,
                 )
+        db.commit()
 
     return None
 
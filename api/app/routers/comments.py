@@ -6,6 +6,7 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 
 from .. import models, schemas
@@ -13,11 +14,12 @@ from ..auth import (
     AnonymousUser,
     get_current_user,
     get_current_user_or_anonymous,
+    get_current_user_or_anonymous_async,
     require_moderator,
     require_ownership,
 )
 from ..constants import NotificationType
-from ..deps import get_db
+from ..deps import get_async_db, get_db
 from ..errors import AppError, ErrorCode
 from ..services.social_notifications import SocialNotificationService
 from ..services.rate_limit import check_rate_limit
@@ -30,13 +32,15 @@ router = APIRouter(prefix="/post", tags=["Comments"])
 
 
 @router.get("/{id}/comments", response_model=schemas.Page[schemas.Comment])
-def list_comments(
+async def list_comments(
     id: int,  # Post ID (integer)
     cursor: str | None = None,
     limit: int = Query(50, ge=1, le=200),
     view: str = Query("flat", regex="^(flat|tree)$"),
-    db: Session = Depends(get_db),
-    current_user: models.User | None = Depends(get_current_user_or_anonymous),
+    adb: AsyncSession = Depends(get_async_db),
+    current_user: models.User | AnonymousUser = Depends(
+        get_current_user_or_anonymous_async
+    ),
 ) -> schemas.Page[schemas.Comment]:
     """
     List comments for a post.
@@ -46,6 +50,12 @@ def list_comments(
     Filters out comments with invalid depth (> 2) to prevent widget errors.
     Deleted comments are filtered out unless they have child comments (to maintain thread structure).
     """
+    return await adb.run_sync(_list_comments, id, limit, current_user)
+
+
+def _list_comments(
+    db: Session, id: int, limit: int, current_user: models.User | AnonymousUser
+) -> schemas.Page[schemas.Comment]:
     # Enforce post visibility: don't leak comments of hidden/unlisted/deleted
     # posts to anyone enumerating sequential post ids.
     viewer = current_user if isinstance(current_user, models.User) else None
@@ -253,13 +263,14 @@ def create_comment(
         body=payload.body,
     )
     db.add(comment)
-    db.commit()
+    db.flush()  # assigns comment.id for the notification intents
 
+    # Notifications ride the comment's commit via the outbox.
     # Create notification for post owner (only for authenticated users)
     post = target_post
     if isinstance(current_user, models.User):
         if post:
-            SocialNotificationService.create_notification(
+            SocialNotificationService.enqueue_notification(
                 db=db,
                 user_id=post.owner_id,
                 notification_type=NotificationType.COMMENT,
@@ -277,7 +288,7 @@ def create_comment(
 
             # Skip self-reply notification
             if actor is None or parent.author_id != actor.id:
-                SocialNotificationService.create_notification(
+                SocialNotificationService.enqueue_notification(
                     db=db,
                     user_id=parent.author_id,
                     notification_type=NotificationType.COMMENT_REPLY,
@@ -285,6 +296,7 @@ def create_comment(
                     actor=actor,
                     comment=comment,
                 )
+    db.commit()
 
     # Reload comment with author relationship to ensure display name is available
     comment = (
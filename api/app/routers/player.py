@@ -676,12 +676,7 @@ def _apply_public_visibility_filters(query):
         models.Post.kind.in_(["artwork", "playlist"]),
         models.Post.public_sqid.isnot(None),
         models.Post.public_sqid != "",
-        models.Post.visible,
-        ~models.Post.hidden_by_user,
-        ~models.Post.hidden_by_mod,
-        ~models.Post.non_conformant,
-        ~models.Post.deleted_by_user,
-        models.Post.public_visibility.is_(True),
+        models.Post.discoverable,
     )
 
 
@@ -26,16 +26,19 @@ from .. import models
 from ..auth import get_current_player
 from ..deps import get_db
 from ..player_protocol.schemas import (
+    AdvanceChannelWindowRequest,
     EchoRequest,
     GetCommentsRequest,
     GetPlaysetRequest,
     GetPostRequest,
+    OpenChannelWindowRequest,
+    P3AViewBatch,
     P3AViewEvent,
     QueryPostsRequest,
     RevokeReactionRequest,
     SubmitReactionRequest,
 )
-from ..services import player_rpc, player_views
+from ..services import channel_window, player_rpc, player_views
 from ..services.player_rpc import PlayerRpcError
 from ..services.rate_limit import check_rate_limit
 
@@ -47,6 +50,14 @@ router = APIRouter(tags=["Player RPC"])
 _DISPATCH = {
     "query_posts": (QueryPostsRequest, player_rpc.query_posts),
     "get_post": (GetPostRequest, player_rpc.get_post),
+    "open_channel_window": (
+        OpenChannelWindowRequest,
+        channel_window.open_channel_window,
+    ),
+    "advance_channel_window": (
+        AdvanceChannelWindowRequest,
+        channel_window.advance_channel_window,
+    ),
     "submit_reaction": (SubmitReactionRequest, player_rpc.submit_reaction),
     "revoke_reaction": (RevokeReactionRequest, player_rpc.revoke_reaction),
     "get_comments": (GetCommentsRequest, player_rpc.get_comments),
@@ -58,6 +69,8 @@ _DISPATCH = {
 # the service handler (10/60s), so it is intentionally absent here.
 _RATE_LIMITS = {
     "query_posts": ("read", 60),
+    "open_channel_window": ("read", 60),
+    "advance_channel_window": ("read", 60),
     "get_post": ("read", 60),
     "get_comments": ("read", 60),
     "get_playset": ("read", 60),
@@ -76,6 +89,7 @@ _ERROR_STATUS = {
     "missing_hashtag": 400,
     "invalid_hashtag": 400,
     "invalid_criteria": 400,
+    "invalid_page": 400,
     "player_key_mismatch": 403,
     "not_visible": 403,
     "not_available": 403,
@@ -84,11 +98,13 @@ _ERROR_STATUS = {
     "deleted": 404,
     "user_not_found": 404,
     "playset_not_found": 404,
+    "window_expired": 404,
     "unsupported_kind": 422,
     "reaction_limit_exceeded": 409,
     "rate_limited": 429,
     "rate_limit_exceeded": 429,
     "internal_error": 500,
+    "window_unavailable": 503,
 }
 _DEFAULT_ERROR_STATUS = 400
 
@@ -246,3 +262,34 @@ def player_view_endpoint(
             "error_code": "not_found",
         },
     )
+
+
+@router.post("/player/events/views")
+def player_view_batch_endpoint(
+    body: dict[str, Any] = Body(...),
+    player: models.Player = Depends(get_current_player),
+    db: Session = Depends(get_db),
+) -> JSONResponse:
+    """Report a batch of buffered view events (HTTPS equivalent of the MQTT
+    ``views`` topic).
+
+    Always 200 once the envelope is valid; per-event outcomes are in
+    ``results``. ``Retry-After`` is set when some events were rate limited.
+    """
+    data = dict(body)
+    data["player_key"] = str(player.player_key)
+    data.pop("request_ack", None)
+    try:
+        batch = P3AViewBatch(**data)
+    except ValidationError as e:
+        logger.info(f"Invalid view batch from player {player.id}: {e}")
+        return _error(None, "Invalid view batch payload", "invalid_request", 400)
+
+    results = player_views.record_view_batch(player, batch.events, db)
+    ack = player_views.build_view_batch_ack(batch.batch_id, results)
+    resp = JSONResponse(
+        status_code=200, content=ack.model_dump(mode="json", exclude_none=True)
+    )
+    if ack.retry_after is not None:
+        resp.headers["Retry-After"] = str(int(ack.retry_after) + 1)
+    return resp
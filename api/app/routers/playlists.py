@@ -12,6 +12,9 @@ from sqlalchemy.orm import Session
 from .. import models, schemas
 from ..auth import get_current_user, require_moderator, require_ownership
 from ..deps import get_db
+from ..services.channel_cache import bump_channel_version
+from ..services.home_timeline import queue_fan_out
+from ..services.search_index import index_post
 
 router = APIRouter(prefix="/playlist", tags=["Playlists"])
 
@@ -26,10 +29,14 @@ def validate_post_visibility(post_ids: list[int], db: Session) -> list[int]:
     if not post_ids:
         return []
 
+    posts = {
+        post.id: post
+        for post in db.query(models.Post).filter(models.Post.id.in_(post_ids)).all()
+    }
     valid_post_ids = []
 
     for post_id in post_ids:
-        post = db.query(models.Post).filter(models.Post.id == post_id).first()
+        post = posts.get(post_id)
 
         if not post:
             raise HTTPException(
@@ -69,35 +76,50 @@ def _get_playlist_post_by_legacy_id(id: UUID, db: Session) -> models.Post:
 
 
 def _playlist_schema_from_post(post: models.Post, db: Session) -> schemas.Playlist:
-    legacy_id = (
-        db.query(models.PlaylistPost.legacy_playlist_id)
-        .filter(models.PlaylistPost.post_id == post.id)
-        .scalar()
+    return _playlist_schemas_from_posts([post], db)[0]
+
+
+def _playlist_schemas_from_posts(
+    posts: list[models.Post], db: Session
+) -> list[schemas.Playlist]:
+    """Playlist schemas for a page of playlist posts (two queries in total)."""
+    playlist_post_ids = [post.id for post in posts]
+    if not playlist_post_ids:
+        return []
+
+    legacy_ids = dict(
+        db.query(models.PlaylistPost.post_id, models.PlaylistPost.legacy_playlist_id)
+        .filter(models.PlaylistPost.post_id.in_(playlist_post_ids))
+        .all()
     )
-    if legacy_id is None:
-        # Should not happen, but keep API stable.
-        legacy_id = uuid.uuid4()
 
-    item_ids = (
-        db.query(models.PlaylistItem.artwork_post_id)
-        .filter(models.PlaylistItem.playlist_post_id == post.id)
+    item_ids: dict[int, list[int]] = {post_id: [] for post_id in playlist_post_ids}
+    for playlist_post_id, artwork_post_id in (
+        db.query(
+            models.PlaylistItem.playlist_post_id, models.PlaylistItem.artwork_post_id
+        )
+        .filter(models.PlaylistItem.playlist_post_id.in_(playlist_post_ids))
         .order_by(models.PlaylistItem.position.asc())
         .all()
-    )
-    post_ids = [pid for (pid,) in item_ids]
-
-    return schemas.Playlist(
-        id=legacy_id,
-        owner_id=post.owner_id,
-        title=post.title,
-        description=post.description,
-        post_ids=post_ids,
-        visible=post.visible,
-        hidden_by_user=post.hidden_by_user,
-        hidden_by_mod=post.hidden_by_mod,
-        created_at=post.created_at,
-        updated_at=post.updated_at,
-    )
+    ):
+        item_ids[playlist_post_id].append(artwork_post_id)
+
+    return [
+        schemas.Playlist(
+            # Missing legacy id should not happen, but keep API stable.
+            id=legacy_ids.get(post.id) or uuid.uuid4(),
+            owner_id=post.owner_id,
+            title=post.title,
+            description=post.description,
+            post_ids=item_ids[post.id],
+            visible=post.visible,
+            hidden_by_user=post.hidden_by_user,
+            hidden_by_mod=post.hidden_by_mod,
+            created_at=post.created_at,
+            updated_at=post.updated_at,
+        )
+        for post in posts
+    ]
 
 
 @router.get("", response_model=schemas.Page[schemas.Playlist])
@@ -136,7 +158,7 @@ def list_playlists(
     playlist_posts = query.all()
 
     return schemas.Page(
-        items=[_playlist_schema_from_post(p, db) for p in playlist_posts],
+        items=_playlist_schemas_from_posts(playlist_posts, db),
         next_cursor=None,
     )
 
@@ -213,6 +235,7 @@ def create_playlist(
             )
         )
 
+    index_post(db, playlist_post.id)
     db.commit()
     db.refresh(playlist_post)
 
@@ -267,6 +290,7 @@ def update_playlist(
         playlist_post.hidden_by_mod = payload.hidden_by_mod
 
     playlist_post.metadata_modified_at = datetime.now(timezone.utc)
+    index_post(db, playlist_post.id)
 
     db.commit()
     db.refresh(playlist_post)
@@ -288,6 +312,7 @@ def delete_playlist(
     playlist_post.hidden_by_user = True
     playlist_post.metadata_modified_at = datetime.now(timezone.utc)
     db.commit()
+    bump_channel_version()
 
 
 @router.post(
@@ -308,6 +333,8 @@ def undelete_playlist(
     playlist_post.hidden_by_mod = False
     playlist_post.metadata_modified_at = datetime.now(timezone.utc)
     db.commit()
+    bump_channel_version()
+    queue_fan_out(playlist_post.id)
 
 
 @router.post("/{id}/hide", status_code=status.HTTP_201_CREATED)
@@ -322,6 +349,7 @@ def hide_playlist(
     playlist_post.hidden_by_user = True
     playlist_post.metadata_modified_at = datetime.now(timezone.utc)
     db.commit()
+    bump_channel_version()
 
 
 @router.delete("/{id}/hide", status_code=status.HTTP_204_NO_CONTENT)
@@ -336,3 +364,5 @@ def unhide_playlist(
     playlist_post.hidden_by_user = False
     playlist_post.metadata_modified_at = datetime.now(timezone.utc)
     db.commit()
+    bump_channel_version()
+    queue_fan_out(playlist_post.id)
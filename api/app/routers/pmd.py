@@ -7,7 +7,8 @@ import base64
 import json
 import logging
 import os
-from datetime import datetime, timezone
+import time
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import AsyncGenerator
 from uuid import UUID
@@ -16,14 +17,23 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
 
 from .. import models, schemas
 from ..auth import get_current_user
 from ..cache import cache_invalidate
 from ..deps import get_db
+from ..services.bdr_archive import get_stream_manifest, manifest_layout
+from ..services.bdr_events import bdr_download_url, bdr_to_dict, publish_bdr_update
+from ..services.channel_cache import bump_channel_version
+from ..services.event_bus import bdr_bus
+from ..services.home_timeline import queue_fan_out
 from ..services.post_stats import get_view_counts
+from ..services.storage_ledger import release_post_storage
+from ..services.suggest import listed_hashtags, recount_hashtags
 from ..sqids_config import decode_user_sqid
 from ..utils.audit import log_moderation_action
+from ..utils.zipstream import iter_range
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +42,12 @@ router = APIRouter(prefix="/pmd", tags=["PMD"])
 # Daily limit per user for batch download requests
 BDR_DAILY_LIMIT = 8
 
+# Download window for ready BDRs (matches process_bdr_job)
+BDR_RETENTION_DAYS = 7
+
+BDR_SSE_TIMEOUT_SECONDS = 300  # client reconnects after this
+BDR_SSE_KEEPALIVE_SECONDS = 15.0
+
 
 def encode_cursor(dt: datetime) -> str:
     """Encode datetime as base64 cursor."""
@@ -241,6 +257,7 @@ def execute_batch_action(
     # otherwise the DB claims the user hid/deleted their own content and there is
     # no accountability trail. A user acting on their own posts is unchanged.
     is_mod_action = target_user.id != current_user.id
+    listed = listed_hashtags(posts)
 
     if request.action == schemas.BatchActionType.HIDE:
         for post in posts:
@@ -262,6 +279,7 @@ def execute_batch_action(
         # Posts have no deleted_by_mod column; the soft-delete field is shared,
         # so accountability for a mod delete rests on the audit entry below.
         for post in posts:
+            release_post_storage(db, post)
             post.deleted_by_user = True
             post.deleted_by_user_date = now
         message = (
@@ -281,18 +299,25 @@ def execute_batch_action(
 
     db.commit()
 
-    # Visibility changed by a moderator — drop the feed/hashtag caches so hidden
-    # or deleted posts don't linger in cached listings for the TTL.
+    # Visibility changed — drop the feed/hashtag caches so hidden or deleted
+    # posts don't linger in cached listings (and unhidden ones reappear)
+    # without waiting for the TTL.
     if request.action in (
         schemas.BatchActionType.HIDE,
+        schemas.BatchActionType.UNHIDE,
         schemas.BatchActionType.DELETE,
     ):
         try:
             cache_invalidate("feed:recent:*")
             cache_invalidate("feed:promoted:*")
             cache_invalidate("hashtags:*")
+            bump_channel_version()
         except Exception:
             logger.warning("Failed to invalidate feed caches after PMD batch action")
+        recount_hashtags(db, [p.id for p in posts], listed)
+    if request.action == schemas.BatchActionType.UNHIDE:
+        for post in posts:
+            queue_fan_out(post.id)
 
     return schemas.BatchActionResponse(
         success=True,
@@ -436,13 +461,34 @@ def create_bdr(
         include_comments=request.include_comments,
         include_reactions=request.include_reactions,
         send_email=request.send_email,
+        delivery=request.delivery,
         artwork_count=len(request.post_ids),
         status="pending",
     )
 
+    if request.delivery == "stream":
+        # Nothing to build: the download endpoint streams the ZIP on demand.
+        now = datetime.now(timezone.utc)
+        bdr.status = "ready"
+        bdr.started_at = now
+        bdr.completed_at = now
+        bdr.expires_at = now + timedelta(days=BDR_RETENTION_DAYS)
+
     db.add(bdr)
     db.commit()
     db.refresh(bdr)
+    publish_bdr_update(bdr)
+
+    if request.delivery == "stream":
+        return schemas.CreateBDRResponse(
+            id=str(bdr.id),
+            status="ready",
+            artwork_count=len(request.post_ids),
+            created_at=bdr.created_at,
+            message="Your download is ready.",
+            expires_at=bdr.expires_at,
+            download_url=bdr_download_url(bdr),
+        )
 
     # Queue Celery task
     from ..tasks import process_bdr_job
@@ -483,9 +529,7 @@ def list_bdrs(
 
     items = []
     for bdr in bdrs:
-        download_url = None
-        if bdr.status == "ready" and bdr.file_path:
-            download_url = f"/api/pmd/bdr/{bdr.id}/download"
+        download_url = bdr_download_url(bdr)
 
         items.append(
             schemas.BDRItem(
@@ -506,6 +550,7 @@ def list_bdrs(
 @router.get("/bdr/{bdr_id}/download")
 def download_bdr(
     bdr_id: str,
+    request: Request,
     target_sqid: str | None = Query(None),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
@@ -518,6 +563,9 @@ def download_bdr(
     - BDR status is 'ready'
     - BDR has not expired
 
+    Streamed BDRs are assembled on the fly from the vault files and support
+    HTTP Range requests; archive BDRs serve the prebuilt ZIP.
+
     Moderators can download other users' BDRs by providing target_sqid.
     """
     # Resolve target user (current user or target if moderator)
@@ -548,6 +596,10 @@ def download_bdr(
     if bdr.expires_at and datetime.now(timezone.utc) > bdr.expires_at:
         raise HTTPException(status_code=410, detail="Download link has expired")
 
+    filename = f"makapix-artworks-{bdr_id[:8]}.zip"
+    if bdr.delivery == "stream":
+        return _stream_bdr(db, bdr, target_user, request, filename)
+
     # Stream file from vault
     vault_path = Path(os.getenv("VAULT_LOCATION", "/vault")) / bdr.file_path
 
@@ -557,7 +609,90 @@ def download_bdr(
     return FileResponse(
         path=vault_path,
         media_type="application/zip",
-        filename=f"makapix-artworks-{bdr_id[:8]}.zip",
+        filename=filename,
+    )
+
+
+def _parse_byte_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    Parse a single ``bytes=`` range into ``(start, stop)`` (stop exclusive).
+
+    Returns None for headers we ignore (multiple ranges, other units,
+    malformed) — the full body is sent instead, as RFC 9110 allows.
+
+    Raises:
+        HTTPException: 416 if the range lies entirely past the end.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first:
+            start = int(first)
+            stop = int(last) + 1 if last else size
+        else:
+            start, stop = max(0, size - int(last)), size
+    except ValueError:
+        return None
+    if start < 0:
+        return None
+    if start >= size:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    if stop <= start:
+        return None
+    return start, min(stop, size)
+
+
+def _stream_bdr(
+    db: Session,
+    bdr: models.BatchDownloadRequest,
+    user: models.User,
+    request: Request,
+    filename: str,
+) -> StreamingResponse:
+    """
+    Serve a streamed BDR: the ZIP is assembled from vault files per request.
+
+    The layout comes from the cached manifest, so Content-Length is exact and
+    a single byte range (honouring If-Range) can resume an interrupted
+    download.
+    """
+    try:
+        manifest = get_stream_manifest(db, bdr, user)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="File not found")
+    segments, size = manifest_layout(manifest)
+    etag = manifest["etag"]
+
+    start, stop = 0, size
+    status_code = status.HTTP_200_OK
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    }
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range == etag):
+        byte_range = _parse_byte_range(range_header, size)
+        if byte_range is not None:
+            start, stop = byte_range
+            status_code = status.HTTP_206_PARTIAL_CONTENT
+            headers["Content-Range"] = f"bytes {start}-{stop - 1}/{size}"
+    headers["Content-Length"] = str(stop - start)
+
+    return StreamingResponse(
+        iter_range(segments, start, stop),
+        status_code=status_code,
+        media_type="application/zip",
+        headers=headers,
     )
 
 
@@ -577,24 +712,6 @@ def get_user_bdrs(db: Session, user_id: int) -> list[models.BatchDownloadRequest
     )
 
 
-def bdr_to_dict(bdr: models.BatchDownloadRequest) -> dict:
-    """Convert BDR to dictionary for SSE event."""
-    download_url = None
-    if bdr.status == "ready" and bdr.file_path:
-        download_url = f"/api/pmd/bdr/{bdr.id}/download"
-
-    return {
-        "id": str(bdr.id),
-        "status": bdr.status,
-        "artwork_count": bdr.artwork_count,
-        "created_at": bdr.created_at.isoformat() if bdr.created_at else None,
-        "completed_at": bdr.completed_at.isoformat() if bdr.completed_at else None,
-        "expires_at": bdr.expires_at.isoformat() if bdr.expires_at else None,
-        "error_message": bdr.error_message,
-        "download_url": download_url,
-    }
-
-
 def format_sse_event(event_type: str, data: dict) -> str:
     """Format data as SSE event string."""
     return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
@@ -610,8 +727,11 @@ async def bdr_sse_stream(
     """
     Server-Sent Events stream for BDR status updates.
 
-    The client connects and receives updates whenever a BDR's status changes.
-    Events are sent as JSON with the BDR data.
+    The client connects, receives a snapshot of its recent BDRs, then every
+    update pushed by services/bdr_events.publish_bdr_update: status changes
+    and, while a ZIP is being built, build progress (``progress`` = percent
+    of artworks packed). The stream never polls — the DB session is
+    released right after the snapshot.
 
     Connection stays open until client disconnects or server timeout (5 minutes).
 
@@ -619,7 +739,7 @@ async def bdr_sse_stream(
 
     Event format:
         event: bdr_update
-        data: {"id": "...", "status": "ready", ...}
+        data: {"id": "...", "status": "ready", "progress": null, ...}
     """
     # Validate moderator access and owner protection before starting stream
     target_user = get_target_user(db, target_sqid, current_user)
@@ -627,52 +747,43 @@ async def bdr_sse_stream(
 
     async def event_generator() -> AsyncGenerator[str, None]:
         """Generate SSE events."""
+        # Subscribe BEFORE the snapshot: an update landing in between is
+        # sent twice (harmless, clients replace by id) rather than lost.
+        queue = await bdr_bus.subscribe(target_user_id)
+        try:
+            snapshot = await run_in_threadpool(
+                lambda: [bdr_to_dict(bdr) for bdr in get_user_bdrs(db, target_user_id)]
+            )
+            # The push loop below never touches the database.
+            await run_in_threadpool(db.close)
+            for item in snapshot:
+                yield format_sse_event("bdr_update", item)
+
+            # Send heartbeat to confirm connection
+            yield format_sse_event(
+                "connected", {"message": "SSE connection established"}
+            )
 
-        # Track last known states to detect changes
-        last_states: dict[str, tuple[str, datetime | None]] = {}
-
-        # Send initial state immediately
-        initial_bdrs = get_user_bdrs(db, target_user_id)
-        for bdr in initial_bdrs:
-            last_states[str(bdr.id)] = (bdr.status, bdr.completed_at)
-            yield format_sse_event("bdr_update", bdr_to_dict(bdr))
-
-        # Send heartbeat to confirm connection
-        yield format_sse_event("connected", {"message": "SSE connection established"})
-
-        timeout_at = datetime.now(timezone.utc).timestamp() + 300  # 5 minute timeout
-        poll_interval = 5  # seconds
-
-        while datetime.now(timezone.utc).timestamp() < timeout_at:
-            # Check if client disconnected
-            if await request.is_disconnected():
-                break
-
-            # Wait before next poll
-            await asyncio.sleep(poll_interval)
-
-            # Refresh database session
-            db.expire_all()
-
-            # Check for updates
-            current_bdrs = get_user_bdrs(db, target_user_id)
-
-            for bdr in current_bdrs:
-                bdr_id = str(bdr.id)
-                current_state = (bdr.status, bdr.completed_at)
-
-                # Check if state changed
-                if bdr_id not in last_states or last_states[bdr_id] != current_state:
-                    last_states[bdr_id] = current_state
-                    yield format_sse_event("bdr_update", bdr_to_dict(bdr))
-
-            # Send periodic keepalive (comment line)
-            yield ": keepalive\n\n"
-
-        # Connection timeout - send close event
-        yield format_sse_event(
-            "timeout", {"message": "Connection timeout, please reconnect"}
-        )
+            deadline = time.monotonic() + BDR_SSE_TIMEOUT_SECONDS
+            while (remaining := deadline - time.monotonic()) > 0:
+                if await request.is_disconnected():
+                    return
+                try:
+                    item = await asyncio.wait_for(
+                        queue.get(),
+                        timeout=min(BDR_SSE_KEEPALIVE_SECONDS, remaining),
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse_event("bdr_update", item)
+
+            # Connection timeout - send close event
+            yield format_sse_event(
+                "timeout", {"message": "Connection timeout, please reconnect"}
+            )
+        finally:
+            await bdr_bus.unsubscribe(target_user_id, queue)
 
     return StreamingResponse(
         event_generator(),
@@ -27,18 +27,21 @@ from fastapi import (
 from fastapi.responses import RedirectResponse
 from PIL import Image
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
 
 from .. import models, schemas
 from ..auth import (
     check_ownership,
     get_current_user,
     get_current_user_optional,
+    get_current_user_optional_async,
     require_moderator,
     require_ownership,
 )
 from ..cache import cache_get, cache_set, cache_invalidate
-from ..deps import get_db
+from ..deps import get_async_read_db, get_db
 from ..pagination import (
     apply_cursor_filter,
     create_page_response,
@@ -58,13 +61,26 @@ from ..utils.site_tracking import record_site_event
 from ..utils.visibility import can_access_post
 from ..utils import provenance
 from ..utils.lineage import (
+    MAX_LINEAGE_DEPTH,
     create_lineage_links,
+    descendant_counts,
+    detach_post_from_lineage,
+    lineage_of,
     notify_remix_published,
     resolve_declared_parents,
 )
 from ..services.post_stats import annotate_posts_with_counts, get_user_liked_post_ids
+from ..services.storage_ledger import (
+    adjust_post_storage,
+    post_storage_bytes,
+    release_post_storage,
+)
 from ..services.storage_quota import check_storage_quota, format_quota_error
+from ..services.channel_cache import bump_channel_version
+from ..services.home_timeline import queue_fan_out
 from ..services.rate_limit import check_rate_limit
+from ..services.search_index import index_post
+from ..services.suggest import bump_hashtags, listed_hashtags, recount_hashtags
 from ..services.social_notifications import SocialNotificationService
 from ..errors import AppError, ErrorCode
 from ..vault import (
@@ -311,7 +327,7 @@ def list_posts(
                     )
                 )
             else:
-                query = query.filter(models.Post.public_visibility == True)
+                query = query.filter(models.Post.discoverable == True)
 
     # Apply monitored hashtag filtering (unless viewing own posts)
     if not is_viewing_own_posts:
@@ -474,19 +490,10 @@ def list_posts(
     # of the active sort, so page 2 of width/height/file_bytes/reactions/... hit
     # a type mismatch or getattr(Post, sort) AttributeError — a 500.
     # ------------------------------------------------------------------
-    from sqlalchemy import and_, func as sa_func, or_, select as sa_select
+    from sqlalchemy import and_, func as sa_func, or_
 
     sort_desc = order == "desc"
 
-    native_bytes_subq = (
-        sa_select(models.PostFile.file_bytes)
-        .where(
-            models.PostFile.post_id == models.Post.id,
-            models.PostFile.is_native == True,
-        )
-        .correlate(models.Post)
-        .scalar_subquery()
-    )
     reaction_count_expr = sa_func.coalesce(
         db.query(sa_func.count(models.Reaction.id))
         .filter(models.Reaction.post_id == models.Post.id)
@@ -504,7 +511,7 @@ def list_posts(
         "height": (models.Post.height, False),
         "frame_count": (models.Post.frame_count, False),
         "unique_colors": (models.Post.unique_colors, False),
-        "file_bytes": (native_bytes_subq, False),
+        "file_bytes": (models.Post.native_file_bytes, False),
         "reactions": (reaction_count_expr, False),
     }
     if reacted_at_col is not None:
@@ -867,7 +874,8 @@ async def upload_artwork(
             details=({"post_id": dup.id, "sqid": dup.public_sqid} if dup else None),
         )
 
-    # Create native PostFile row
+    # Create native PostFile row (mirrored into posts.native_format for
+    # indexed player criteria filtering)
     native_file = models.PostFile(
         post_id=post.id,
         format=file_format,
@@ -875,6 +883,9 @@ async def upload_artwork(
         is_native=True,
     )
     db.add(native_file)
+    post.native_format = file_format
+    post.native_file_bytes = native_file.file_bytes
+    adjust_post_storage(db, post, native=file_size)
 
     # Generate public_sqid from the assigned id
     from ..sqids_config import encode_id
@@ -916,7 +927,14 @@ async def upload_artwork(
             mkpx_saved = True
             post.mkpx_file_bytes = mkpx_size
             post.mkpx_attached_at = now
+            adjust_post_storage(db, post, mkpx=mkpx_size)
 
+        # One `remix` notification per distinct parent owner (L12), queued in
+        # the outbox by this same commit.
+        if parents:
+            notify_remix_published(db, post, current_user, parents)
+
+        index_post(db, post.id)
         db.commit()
         db.refresh(post)
     except Exception as e:
@@ -953,7 +971,10 @@ async def upload_artwork(
     # Invalidate feed caches since a new post was created
     if public_visibility:
         cache_invalidate("feed:recent:*")
+        queue_fan_out(post.id)
+        bump_hashtags(post.hashtags)
     cache_invalidate("hashtags:*")
+    bump_channel_version()
 
     message = "Artwork uploaded successfully"
     if not public_visibility:
@@ -963,14 +984,6 @@ async def upload_artwork(
             " shared with anyone via its direct link."
         )
 
-    # One `remix` notification per distinct parent owner (L12). Never fail
-    # the committed upload over a notification hiccup.
-    if parents:
-        try:
-            notify_remix_published(db, post, current_user, parents)
-        except Exception as e:
-            logger.error(f"Failed to send remix notifications for post {post.id}: {e}")
-
     # Record site event for upload
     record_site_event(request, "upload", user=current_user)
 
@@ -982,12 +995,12 @@ async def upload_artwork(
 
 
 @router.get("/recent", response_model=schemas.Page[schemas.Post])
-def list_recent_posts(
+async def list_recent_posts(
     request: Request,
     cursor: str | None = None,
     limit: int = Query(50, ge=1, le=200),
-    db: Session = Depends(get_db),
-    current_user: models.User | None = Depends(get_current_user_optional),
+    adb: AsyncSession = Depends(get_async_read_db),
+    current_user: models.User | None = Depends(get_current_user_optional_async),
 ) -> schemas.Page[schemas.Post]:
     """
     List recent posts (visible only) with infinite scroll support.
@@ -996,45 +1009,67 @@ def list_recent_posts(
     Uses cursor-based pagination for efficient infinite scroll.
     Cached for 2 minutes due to high churn rate.
     """
-    # Create cache key based on cursor and limit
+    # Only the queries run on the session; the Redis cache and the site event
+    # (GeoIP, Celery publish) are blocking calls, so they go to the threadpool.
     # All users see the same results (moderator-only views are in Moderator Dashboard)
     cache_key = f"feed:recent:{cursor or 'first'}:{limit}"
 
-    # Try to get from cache
-    cached_result = cache_get(cache_key)
+    cached_result = await run_in_threadpool(cache_get, cache_key)
     if cached_result:
-        response = schemas.Page(**cached_result)
-        # Apply monitored hashtag filtering (user-specific)
-        response.items = filter_posts_by_monitored_hashtags(
-            response.items, current_user
-        )
-        # Apply block filtering (user-specific, post-cache; docs/ugc-safety/ D10)
-        from ..utils.blocks import filter_items_by_blocks
-
-        response.items = filter_items_by_blocks(
-            response.items, db, current_user.id if current_user else None
-        )
-        # Add user-specific like status if authenticated
-        if current_user and response.items:
-            post_ids = [item.id for item in response.items]
-            liked_ids = get_user_liked_post_ids(db, post_ids, current_user.id)
-            for item in response.items:
-                item.user_has_liked = item.id in liked_ids
-        # Record site event for page view (even on cache hit)
-        record_site_event(request, "page_view", user=current_user)
-        return response
+        response = await adb.run_sync(
+            _personalize_recent_posts, cached_result, current_user
+        )
+    else:
+        response, cached_result = await adb.run_sync(
+            _list_recent_posts, cursor, limit, current_user
+        )
+        # Cache for 2 minutes (120 seconds) - shorter due to high churn
+        # Note: Cache stores base data; monitored hashtag filtering and user_has_liked
+        # are applied when retrieving from cache
+        await run_in_threadpool(cache_set, cache_key, cached_result, ttl=120)
 
+    # Record site event for page view (even on cache hit)
+    await run_in_threadpool(record_site_event, request, "page_view", user=current_user)
+    return response
+
+
+def _personalize_recent_posts(
+    db: Session, cached_result: dict, current_user: models.User | None
+) -> schemas.Page[schemas.Post]:
+    response = schemas.Page[schemas.Post](**cached_result)
+    # Apply monitored hashtag filtering (user-specific)
+    response.items = filter_posts_by_monitored_hashtags(response.items, current_user)
+    # Apply block filtering (user-specific, post-cache; docs/ugc-safety/ D10)
+    from ..utils.blocks import filter_items_by_blocks
+
+    response.items = filter_items_by_blocks(
+        response.items, db, current_user.id if current_user else None
+    )
+    # Add user-specific like status if authenticated
+    if current_user and response.items:
+        post_ids = [item.id for item in response.items]
+        liked_ids = get_user_liked_post_ids(db, post_ids, current_user.id)
+        for item in response.items:
+            item.user_has_liked = item.id in liked_ids
+    return response
+
+
+def _list_recent_posts(
+    db: Session,
+    cursor: str | None,
+    limit: int,
+    current_user: models.User | None,
+) -> tuple[schemas.Page[schemas.Post], dict]:
+    """The viewer's page and the shared, unfiltered page to cache."""
     query = (
         db.query(models.Post)
-        .options(joinedload(models.Post.owner), joinedload(models.Post.license))
+        .options(
+            joinedload(models.Post.owner).selectinload(models.User.badges),
+            joinedload(models.Post.license),
+        )
         .filter(
             models.Post.kind == "artwork",
-            models.Post.visible == True,
-            models.Post.hidden_by_mod == False,
-            models.Post.hidden_by_user == False,
-            models.Post.non_conformant == False,
-            models.Post.public_visibility == True,  # Only show publicly visible posts
-            models.Post.deleted_by_user == False,  # Exclude user-deleted posts
+            models.Post.discoverable == True,
         )
     )
 
@@ -1062,11 +1097,7 @@ def list_recent_posts(
         items=[schemas.Post.model_validate(p) for p in page_data["items"]],
         next_cursor=page_data["next_cursor"],
     )
-
-    # Cache for 2 minutes (120 seconds) - shorter due to high churn
-    # Note: Cache stores base data; monitored hashtag filtering and user_has_liked
-    # are applied when retrieving from cache
-    cache_set(cache_key, response.model_dump(), ttl=120)
+    cached_result = response.model_dump()
 
     # Apply monitored hashtag filtering (user-specific, after caching)
     response.items = filter_posts_by_monitored_hashtags(response.items, current_user)
@@ -1078,10 +1109,7 @@ def list_recent_posts(
         response.items, db, current_user.id if current_user else None
     )
 
-    # Record site event for page view
-    record_site_event(request, "page_view", user=current_user)
-
-    return response
+    return response, cached_result
 
 
 @router.get("/{storage_key}", response_model=schemas.Post)
@@ -1254,6 +1282,7 @@ def update_post(
         )
 
     require_ownership(post.owner_id, current_user)
+    listed = listed_hashtags([post])
 
     hashtags_changed = False
     if payload.title is not None:
@@ -1295,14 +1324,17 @@ def update_post(
     from datetime import datetime, timezone
 
     post.metadata_modified_at = datetime.now(timezone.utc)
+    index_post(db, post.id)
 
     db.commit()
     db.refresh(post)
+    recount_hashtags(db, [post.id], listed)
 
     if hashtags_changed:
         cache_invalidate("feed:recent:*")
         cache_invalidate("feed:promoted:*")
         cache_invalidate("hashtags:*")
+        bump_channel_version()
 
     return schemas.Post.model_validate(post)
 
@@ -1357,6 +1389,7 @@ def update_mod_hashtags(
     old_mod = post.mod_hashtags or []
     added = [t for t in new_mod if t not in old_mod]
     removed = [t for t in old_mod if t not in new_mod]
+    diff = " ".join([f"+#{t}" for t in added] + [f"−#{t}" for t in removed])
 
     # Build fresh lists (ARRAY columns aren't mutation-tracked). The append
     # line runs even on a no-op replace so re-submitting the same set repairs
@@ -1369,15 +1402,27 @@ def update_mod_hashtags(
     from datetime import datetime, timezone
 
     post.metadata_modified_at = datetime.now(timezone.utc)
+    index_post(db, post.id)
+    if added or removed:
+        # Delivered to clients in `comment_preview` (D13); the service
+        # self-skips when the moderator edits their own post.
+        SocialNotificationService.enqueue_notification(
+            db=db,
+            user_id=post.owner_id,
+            notification_type=NotificationType.MOD_HASHTAGS_UPDATED,
+            post=post,
+            actor=moderator,
+            extra_preview=diff,
+        )
     db.commit()
     db.refresh(post)
 
     cache_invalidate("feed:recent:*")
     cache_invalidate("feed:promoted:*")
     cache_invalidate("hashtags:*")
+    bump_channel_version()
 
     if added or removed:
-        diff = " ".join([f"+#{t}" for t in added] + [f"−#{t}" for t in removed])
         log_moderation_action(
             db=db,
             actor_id=moderator.id,
@@ -1387,16 +1432,6 @@ def update_mod_hashtags(
             reason_code=payload.reason_code,
             note=f"{diff} — {payload.note}" if payload.note else diff,
         )
-        # Delivered to clients in `comment_preview` (D13); the service
-        # self-skips when the moderator edits their own post.
-        SocialNotificationService.create_notification(
-            db=db,
-            user_id=post.owner_id,
-            notification_type=NotificationType.MOD_HASHTAGS_UPDATED,
-            post=post,
-            actor=moderator,
-            extra_preview=diff,
-        )
 
     return schemas.Post.model_validate(post)
 
@@ -1478,6 +1513,7 @@ async def attach_mkpx(
         )
 
     now = datetime.now(timezone.utc)
+    adjust_post_storage(db, post, mkpx=mkpx_size - (post.mkpx_file_bytes or 0))
     post.mkpx_file_bytes = mkpx_size
     post.mkpx_attached_at = now
     post.metadata_modified_at = now
@@ -1512,6 +1548,7 @@ def detach_mkpx(
 
     from datetime import datetime, timezone
 
+    adjust_post_storage(db, post, mkpx=-post.mkpx_file_bytes)
     post.mkpx_file_bytes = None
     post.mkpx_attached_at = None
     post.metadata_modified_at = datetime.now(timezone.utc)
@@ -1544,8 +1581,11 @@ def delete_post(
     from datetime import datetime, timezone
 
     now = datetime.now(timezone.utc)
+    listed = listed_hashtags([post])
 
-    # Mark as deleted by user (frees hash for re-upload)
+    # Mark as deleted by user (frees hash for re-upload) and release its
+    # bytes from the owner's storage ledger
+    release_post_storage(db, post)
     post.deleted_by_user = True
     post.deleted_by_user_date = now
 
@@ -1553,11 +1593,13 @@ def delete_post(
     post.visible = False
     post.hidden_by_user = True
     db.commit()
+    recount_hashtags(db, [id], listed)
 
     # Invalidate feed caches
     cache_invalidate("feed:recent:*")
     cache_invalidate("feed:promoted:*")
     cache_invalidate("hashtags:*")
+    bump_channel_version()
 
 
 @router.delete(
@@ -1617,7 +1659,9 @@ def permanent_delete_post(
         # Continue with deletion even if audit logging fails
 
     # Delete the post from database
+    listed = listed_hashtags([post])
     try:
+        detach_post_from_lineage(db, post.id)
         db.delete(post)
         db.commit()
     except Exception as e:
@@ -1633,8 +1677,10 @@ def permanent_delete_post(
         cache_invalidate("feed:recent:*")
         cache_invalidate("feed:promoted:*")
         cache_invalidate("hashtags:*")
+        bump_channel_version()
     except Exception as e:
         logger.warning(f"Failed to invalidate caches after deleting post {id}: {e}")
+    recount_hashtags(db, [id], listed)
 
 
 @router.post("/{id}/hide", status_code=status.HTTP_201_CREATED)
@@ -1657,6 +1703,7 @@ def hide_post(
         )
 
     by = payload.by if payload else "user"
+    listed = listed_hashtags([post])
 
     if by == "mod":
         # Check moderator role
@@ -1681,11 +1728,13 @@ def hide_post(
         post.hidden_by_user = True
 
     db.commit()
+    recount_hashtags(db, [id], listed)
 
     # Invalidate feed caches since post visibility changed
     cache_invalidate("feed:recent:*")
     cache_invalidate("feed:promoted:*")
     cache_invalidate("hashtags:*")
+    bump_channel_version()
 
 
 @router.delete("/{id}/hide", status_code=status.HTTP_204_NO_CONTENT)
@@ -1717,6 +1766,7 @@ def unhide_post(
     if not is_moderator:
         require_ownership(post.owner_id, current_user)
 
+    listed = listed_hashtags([post])
     post.hidden_by_user = False
     # Moderators can unhide mod-hidden posts
     if is_moderator and post.hidden_by_mod:
@@ -1730,11 +1780,14 @@ def unhide_post(
             target_id=id,
         )
     db.commit()
+    recount_hashtags(db, [id], listed)
 
     # Invalidate feed caches since post visibility changed
     cache_invalidate("feed:recent:*")
     cache_invalidate("feed:promoted:*")
     cache_invalidate("hashtags:*")
+    bump_channel_version()
+    queue_fan_out(post.id)
 
 
 @router.post(
@@ -1763,10 +1816,27 @@ def promote_post(
 
     post.promoted = True
     post.promoted_category = payload.category
+
+    # Notify the artwork owner about the promotion (outbox, same commit)
+    _CATEGORY_DISPLAY = {
+        "frontpage": "Recommended",
+        "editor-pick": "Editor's Pick",
+        "weekly-pack": "Weekly Pack",
+        "daily's-best": "Daily's Best",
+    }
+    SocialNotificationService.enqueue_notification(
+        db=db,
+        user_id=post.owner_id,
+        notification_type=NotificationType.POST_PROMOTED,
+        post=post,
+        actor=_moderator,
+        extra_preview=_CATEGORY_DISPLAY.get(payload.category, payload.category),
+    )
     db.commit()
 
     # Invalidate promoted feed cache
     cache_invalidate("feed:promoted:*")
+    bump_channel_version()
 
     # Log to audit
     log_moderation_action(
@@ -1779,22 +1849,6 @@ def promote_post(
         note=payload.note,
     )
 
-    # Notify the artwork owner about the promotion
-    _CATEGORY_DISPLAY = {
-        "frontpage": "Recommended",
-        "editor-pick": "Editor's Pick",
-        "weekly-pack": "Weekly Pack",
-        "daily's-best": "Daily's Best",
-    }
-    SocialNotificationService.create_notification(
-        db=db,
-        user_id=post.owner_id,
-        notification_type=NotificationType.POST_PROMOTED,
-        post=post,
-        actor=_moderator,
-        extra_preview=_CATEGORY_DISPLAY.get(payload.category, payload.category),
-    )
-
     return schemas.PromotePostResponse(promoted=True, category=payload.category)
 
 
@@ -1825,6 +1879,7 @@ def demote_post(
 
     # Invalidate promoted feed cache
     cache_invalidate("feed:promoted:*")
+    bump_channel_version()
 
     # Log to audit
     log_moderation_action(
@@ -1859,12 +1914,25 @@ def approve_public_visibility(
             status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
         )
 
+    listed = listed_hashtags([post])
     post.public_visibility = True
+    # Tell the author their post is now publicly released (outbox, same
+    # commit).
+    SocialNotificationService.enqueue_notification(
+        db=db,
+        user_id=post.owner_id,
+        notification_type=NotificationType.POST_APPROVED,
+        post=post,
+        actor=moderator,
+    )
     db.commit()
 
     # Invalidate feed caches since public visibility changed
     cache_invalidate("feed:recent:*")
     cache_invalidate("hashtags:*")
+    bump_channel_version()
+    queue_fan_out(post.id)
+    recount_hashtags(db, [id], listed)
 
     # Log to audit
     log_moderation_action(
@@ -1875,19 +1943,6 @@ def approve_public_visibility(
         target_id=id,
     )
 
-    # Tell the author their post is now publicly released. Never fail the
-    # committed approval over a notification hiccup.
-    try:
-        SocialNotificationService.create_notification(
-            db=db,
-            user_id=post.owner_id,
-            notification_type=NotificationType.POST_APPROVED,
-            post=post,
-            actor=moderator,
-        )
-    except Exception as e:
-        logger.error(f"Failed to send post_approved notification for post {id}: {e}")
-
     return schemas.PublicVisibilityResponse(post_id=id, public_visibility=True)
 
 
@@ -1914,12 +1969,15 @@ def revoke_public_visibility(
             status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
         )
 
+    listed = listed_hashtags([post])
     post.public_visibility = False
     db.commit()
+    recount_hashtags(db, [id], listed)
 
     # Invalidate feed caches since public visibility changed
     cache_invalidate("feed:recent:*")
     cache_invalidate("hashtags:*")
+    bump_channel_version()
 
     # Log to audit
     log_moderation_action(
@@ -2186,6 +2244,7 @@ async def replace_artwork(
         )
 
     # Delete all existing PostFile rows and create new native row
+    held = post_storage_bytes(post)
     for pf in list(post.files):
         db.delete(pf)
     db.flush()
@@ -2196,6 +2255,15 @@ async def replace_artwork(
         is_native=True,
     )
     db.add(native_file)
+    post.native_format = file_format
+    post.native_file_bytes = native_file.file_bytes
+    adjust_post_storage(
+        db,
+        post,
+        native=file_bytes - held["native"],
+        derived=-held["derived"],
+        mkpx=-held["mkpx"],
+    )
 
     # Replacing the artwork drops any attached .mkpx layers file — it would
     # no longer match the rendered artwork (docs/mkpx-upload/ D4). Columns
@@ -2229,6 +2297,17 @@ async def replace_artwork(
         models.SocialNotification.content_art_url.isnot(None),
     ).update({"content_art_url": new_art_url}, synchronize_session=False)
 
+    # Notify owners of parents that were *newly* linked by this replace —
+    # re-declared existing parents were skipped, so no duplicate pings.
+    # Queued in the outbox by the commit below.
+    if newly_linked_sqids:
+        notify_remix_published(
+            db,
+            post,
+            current_user,
+            [p for p in new_parents if p.public_sqid in newly_linked_sqids],
+        )
+
     # Write the new vault file, then commit. The old file is never touched
     # here, so any failure leaves the post fully consistent on the old key;
     # the only stranding risk is the just-written new file, unlinked below.
@@ -2273,19 +2352,7 @@ async def replace_artwork(
     # Cached feed payloads embed art_url, which just changed
     cache_invalidate("feed:recent:*")
     cache_invalidate("feed:promoted:*")
-
-    # Notify owners of parents that were *newly* linked by this replace —
-    # re-declared existing parents were skipped, so no duplicate pings.
-    if newly_linked_sqids:
-        try:
-            notify_remix_published(
-                db,
-                post,
-                current_user,
-                [p for p in new_parents if p.public_sqid in newly_linked_sqids],
-            )
-        except Exception as e:
-            logger.error(f"Failed to send remix notifications for post {post.id}: {e}")
+    bump_channel_version()
 
     logger.info(
         "Artwork replaced for post %s by user %s",
@@ -2418,6 +2485,72 @@ def list_post_children(
     )
 
 
+@router.get("/{id}/lineage", response_model=schemas.LineageGraphResponse)
+def get_post_lineage(
+    id: int,
+    max_depth: int = Query(8, ge=1, le=MAX_LINEAGE_DEPTH),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> schemas.LineageGraphResponse:
+    """Whole Lineage of a post — every ancestor and descendant within
+    ``max_depth`` links, nearest first — with the links between them, for
+    rendering the remix tree (login-gated, L8).
+
+    Read from the lineage closure table (utils/lineage.py), so the cost does
+    not grow with tree depth. Posts the viewer cannot see (L10) and deleted
+    posts are left out together with their links.
+    """
+    post = db.query(models.Post).filter(models.Post.id == id).first()
+    if not post or post.kind != "artwork" or not can_access_post(post, current_user):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
+        )
+
+    entries = lineage_of(db, post.id, max_depth)
+    truncated = len(entries) > limit
+    entries = entries[:limit]
+    depth_by_id = dict(entries)
+    rows = (
+        db.query(models.Post).filter(models.Post.id.in_(depth_by_id)).all()
+        if depth_by_id
+        else []
+    )
+    visible = [
+        p for p in rows if not p.deleted_by_user and can_access_post(p, current_user)
+    ]
+    annotate_posts_with_counts(db, visible, current_user.id)
+    visible.sort(key=lambda p: (abs(depth_by_id[p.id]), depth_by_id[p.id], p.id))
+
+    sqid_by_id = {p.id: p.public_sqid for p in visible}
+    sqid_by_id[post.id] = post.public_sqid
+    links = (
+        db.query(models.PostLineage.parent_post_id, models.PostLineage.child_post_id)
+        .filter(
+            models.PostLineage.child_post_id.in_(sqid_by_id),
+            models.PostLineage.parent_post_id.in_(sqid_by_id),
+        )
+        .all()
+    )
+    return schemas.LineageGraphResponse(
+        root_sqid=post.public_sqid,
+        nodes=[
+            schemas.LineageNode(
+                post=schemas.Post.model_validate(p), depth=depth_by_id[p.id]
+            )
+            for p in visible
+        ],
+        edges=[
+            schemas.LineageEdge(
+                parent_sqid=sqid_by_id[parent_id], child_sqid=sqid_by_id[child_id]
+            )
+            for parent_id, child_id in links
+        ],
+        descendant_count=descendant_counts(db, [post.id]).get(post.id, 0),
+        truncated=truncated,
+    )
+
+
 @router.get(
     "/{id}/admin-notes",
     response_model=schemas.AdminNoteList,
@@ -259,11 +259,11 @@ def add_reaction(
         emoji=emoji,
     )
     db.add(reaction)
-    db.commit()
 
-    # Create notification for post owner (only for authenticated users)
+    # Notify the post owner (only for authenticated users); queued in the
+    # outbox by the same commit as the reaction.
     if isinstance(current_user, models.User):
-        SocialNotificationService.create_notification(
+        SocialNotificationService.enqueue_notification(
             db=db,
             user_id=target_post.owner_id,
             notification_type=NotificationType.REACTION,
@@ -271,6 +271,7 @@ def add_reaction(
             actor=current_user,
             emoji=emoji,
         )
+    db.commit()
 
 
 @router.delete(
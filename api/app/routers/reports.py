@@ -20,13 +20,16 @@ from sqlalchemy.orm import Session
 
 from .. import models, schemas
 from ..auth import get_current_user_optional, get_trusted_client_ip, require_moderator
+from ..cache import cache_invalidate
 from ..constants import NotificationType
 from ..deps import get_db
 from ..errors import AppError, ErrorCode
 from ..pagination import apply_cursor_filter, create_page_response
 from ..services import email as email_service
+from ..services.channel_cache import bump_channel_version
 from ..services.rate_limit import check_rate_limit
 from ..services.social_notifications import SocialNotificationService
+from ..services.suggest import listed_hashtags, recount_hashtags
 from ..utils.audit import ensure_system_user, log_moderation_action
 
 logger = logging.getLogger(__name__)
@@ -284,6 +287,7 @@ def update_report(
         "take_down" if payload.action_taken == "delete" else payload.action_taken
     )
     action_applied = False
+    listed: dict[int, list[str]] = {}
     if action_taken and action_taken != "none":
         if report.target_type == "user":
             # target_id is the user's public_sqid (D9)
@@ -325,6 +329,7 @@ def update_report(
                     detail=f"Target post {report.target_id} not found",
                 )
 
+            listed = listed_hashtags([target_post])
             if action_taken == "hide":
                 target_post.hidden_by_mod = True
                 action_applied = True
@@ -375,6 +380,17 @@ def update_report(
     db.commit()
     db.refresh(report)
 
+    # A hidden or taken-down post must drop out of cached listings now.
+    if action_applied and report.target_type == "post":
+        try:
+            cache_invalidate("feed:recent:*")
+            cache_invalidate("feed:promoted:*")
+            cache_invalidate("hashtags:*")
+            bump_channel_version()
+        except Exception:
+            logger.warning("Failed to invalidate feed caches after report action")
+        recount_hashtags(db, [int(report.target_id)], listed)
+
     # Log actions to audit log after commit
     if action_applied and action_taken:
         action_name = {
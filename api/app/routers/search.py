@@ -8,21 +8,29 @@ from datetime import datetime, timedelta, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import JSONResponse
-from sqlalchemy import func, or_
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from .. import models, schemas
-from ..auth import get_current_user, get_current_user_optional
+from ..auth import (
+    get_current_user,
+    get_current_user_optional,
+    get_current_user_optional_async,
+)
 from ..cache import cache_get, cache_set
 from ..constants import MONITORED_HASHTAGS
-from ..deps import get_db
+from ..deps import get_async_read_db, get_db, get_read_db
 from ..pagination import (
     apply_cursor_filter,
     create_page_response,
     encode_cursor,
     decode_cursor,
 )
+from ..services.home_timeline import read_timeline
+from ..services.search_index import ENTITY_TYPES, search_documents
+from ..services.suggest import SUGGEST_MAX_RESULTS, suggest_hashtags, suggest_users
 from ..services.post_stats import annotate_posts_with_counts, get_user_liked_post_ids
 from ..utils.monitored_hashtags import (
     apply_monitored_hashtag_filter,
@@ -44,227 +52,149 @@ router = APIRouter(prefix="", tags=["Search", "Feed", "Hashtags"])
 @router.get("/search", response_model=schemas.SearchResults, tags=["Search"])
 def search_all(
     q: str | None = None,
-    types: list[str] = Query(["users", "posts", "playlists"]),
+    types: list[str] = Query(["users", "posts"]),
     badge: str | None = None,
     cursor: str | None = None,
     limit: int = Query(50, ge=1, le=200),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user),
 ) -> schemas.SearchResults:
     """
-    Multi-type search using PostgreSQL trigram similarity.
+    Unified ranked search over users and posts.
 
-    Supports searching users, posts, and hashtags with relevance ranking.
-    Uses cursor-based pagination for efficient results.
+    Matches the maintained search documents (services/search_index.py) by
+    prefix full-text and trigram word similarity, ranks both types on one
+    scale, and pages with a stable (score, id) keyset cursor. With
+    ``hashtags`` among ``types``, or a query starting with ``#``, it lists
+    posts carrying exactly that hashtag instead, newest first.
     """
     if not q or not q.strip():
         return schemas.SearchResults(items=[], next_cursor=None)
 
     q_normalized = q.strip().lower()
+    if "hashtags" in types or q_normalized.startswith("#"):
+        return _search_hashtag_posts(
+            db, q_normalized.lstrip("#"), cursor, limit, current_user
+        )
+
+    entity_types = {ENTITY_TYPES[t] for t in types if t in ENTITY_TYPES}
+    hits, next_cursor = search_documents(
+        db, current_user, q_normalized, entity_types, cursor, limit
+    )
+
+    post_ids = [entity_id for kind, entity_id in hits if kind == "post"]
+    user_ids = [entity_id for kind, entity_id in hits if kind == "user"]
+    posts = (
+        {
+            p.id: p
+            for p in db.query(models.Post).filter(models.Post.id.in_(post_ids)).all()
+        }
+        if post_ids
+        else {}
+    )
+    users = (
+        {
+            u.id: u
+            for u in db.query(models.User).filter(models.User.id.in_(user_ids)).all()
+        }
+        if user_ids
+        else {}
+    )
+    if posts:
+        annotate_posts_with_counts(db, list(posts.values()), current_user.id)
+
     results: list[
         schemas.SearchResultUser
         | schemas.SearchResultPost
         | schemas.SearchResultPlaylist
     ] = []
-
-    # Search users with trigram similarity (search by handle only)
-    # Note: Moderator-only views are in the Moderator Dashboard, not here
-    if "users" in types:
-        user_query = db.query(
-            models.User,
-            func.similarity(models.User.handle, q_normalized).label("similarity"),
-        ).filter(
-            func.similarity(models.User.handle, q_normalized) > 0.1,
-        )
-
-        # Apply visibility filters (same for all users)
-        user_query = user_query.filter(
-            models.User.hidden_by_user == False,
-            models.User.hidden_by_mod == False,
-            models.User.non_conformant == False,
-            models.User.deactivated == False,
-            # Banned users 404 on their profile; they must not be discoverable
-            # via search either (banned_until is non-NULL when banned, including
-            # the permanent-ban sentinel).
-            models.User.banned_until.is_(None),
-            models.User.email_verified == True,
-            ~models.User.roles.cast(JSONB).contains(
-                ["owner"]
-            ),  # Always hide owner from search
-        )
-
-        # Hide users the viewer has blocked (docs/ugc-safety/ D10)
-        from ..utils.blocks import apply_block_filter
-
-        user_query = apply_block_filter(user_query, models.User.id, current_user.id)
-
-        # Apply cursor pagination (using similarity as sort field)
-        if cursor:
-            cursor_data = decode_cursor(cursor)
-            if cursor_data:
-                last_id, last_similarity = cursor_data
-                user_query = user_query.filter(
-                    func.similarity(models.User.handle, q_normalized)
-                    < float(last_similarity)
-                    if last_similarity
-                    else True
+    for kind, entity_id in hits:
+        if kind == "post" and entity_id in posts:
+            results.append(
+                schemas.SearchResultPost(
+                    post=schemas.Post.model_validate(posts[entity_id])
                 )
-
-        # Order by similarity descending, then by ID
-        users_with_similarity = (
-            user_query.order_by(
-                func.similarity(models.User.handle, q_normalized).desc(),
-                models.User.id.desc(),
             )
-            .limit((limit // len(types)) + 1)
-            .all()
-        )
-
-        for user_obj, similarity_score in users_with_similarity[: limit // len(types)]:
+        elif kind == "user" and entity_id in users:
             results.append(
                 schemas.SearchResultUser(
-                    user=schemas.UserPublic.model_validate(user_obj)
+                    user=schemas.UserPublic.model_validate(users[entity_id])
                 )
             )
 
-    # Search posts with trigram similarity
-    if "posts" in types:
-        post_query = db.query(
-            models.Post,
-            func.greatest(
-                func.similarity(models.Post.title, q_normalized),
-                func.coalesce(
-                    func.similarity(models.Post.description, q_normalized), 0.0
-                ),
-            ).label("similarity"),
-        ).filter(
-            or_(
-                func.similarity(models.Post.title, q_normalized) > 0.1,
-                func.similarity(models.Post.description, q_normalized) > 0.1,
-            )
-        )
-
-        # Apply visibility filters (same for all users)
-        post_query = post_query.filter(
-            models.Post.visible == True,
-            models.Post.hidden_by_mod == False,
-            models.Post.hidden_by_user == False,
-            models.Post.non_conformant == False,
-            models.Post.public_visibility == True,  # Only show publicly visible posts
-            models.Post.deleted_by_user == False,  # Exclude user-deleted posts
-        )
-
-        # Apply monitored hashtag filtering
-        post_query = apply_monitored_hashtag_filter(
-            post_query, models.Post, current_user
-        )
-
-        # Hide posts by users the viewer has blocked (docs/ugc-safety/ D10)
-        from ..utils.blocks import apply_block_filter
-
-        post_query = apply_block_filter(
-            post_query, models.Post.owner_id, current_user.id
-        )
+    return schemas.SearchResults(items=results, next_cursor=next_cursor)
 
-        # Apply cursor pagination
-        if cursor:
-            cursor_data = decode_cursor(cursor)
-            if cursor_data:
-                last_id, last_similarity = cursor_data
-                post_query = post_query.filter(
-                    func.greatest(
-                        func.similarity(models.Post.title, q_normalized),
-                        func.coalesce(
-                            func.similarity(models.Post.description, q_normalized), 0.0
-                        ),
-                    )
-                    < float(last_similarity)
-                    if last_similarity
-                    else True
-                )
 
-        # Order by similarity descending, then by created_at
-        posts_with_similarity = (
-            post_query.order_by(
-                func.greatest(
-                    func.similarity(models.Post.title, q_normalized),
-                    func.coalesce(
-                        func.similarity(models.Post.description, q_normalized), 0.0
-                    ),
-                ).desc(),
-                models.Post.created_at.desc(),
-            )
-            .limit((limit // len(types)) + 1)
-            .all()
-        )
+def _search_hashtag_posts(
+    db: Session,
+    hashtag: str,
+    cursor: str | None,
+    limit: int,
+    current_user: models.User,
+) -> schemas.SearchResults:
+    """Posts tagged exactly ``hashtag`` (GIN ix_posts_hashtags), newest first."""
+    if not hashtag:
+        return schemas.SearchResults(items=[], next_cursor=None)
 
-        # Extract post objects and add counts
-        post_objs = [
-            post_obj for post_obj, _ in posts_with_similarity[: limit // len(types)]
-        ]
-        if post_objs:
-            annotate_posts_with_counts(db, post_objs, current_user.id)
+    post_query = db.query(models.Post).filter(
+        models.Post.hashtags.contains([hashtag]),
+        models.Post.discoverable == True,
+    )
+    post_query = apply_monitored_hashtag_filter(post_query, models.Post, current_user)
 
-        for post_obj in post_objs:
-            results.append(
-                schemas.SearchResultPost(post=schemas.Post.model_validate(post_obj))
-            )
+    # Hide posts by users the viewer has blocked (docs/ugc-safety/ D10)
+    from ..utils.blocks import apply_block_filter
 
-    # Search hashtags (check if query matches any hashtag)
-    if "hashtags" in types or q_normalized.startswith("#"):
-        hashtag = q_normalized.lstrip("#")
-        if hashtag:
-            post_query = db.query(models.Post).filter(
-                models.Post.hashtags.contains([hashtag])
-            )
+    post_query = apply_block_filter(post_query, models.Post.owner_id, current_user.id)
+    post_query = apply_cursor_filter(
+        post_query, models.Post, cursor, "created_at", sort_desc=True
+    )
+    posts = (
+        post_query.order_by(models.Post.created_at.desc(), models.Post.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    page_data = create_page_response(posts, limit, cursor, "created_at")
+    if page_data["items"]:
+        annotate_posts_with_counts(db, page_data["items"], current_user.id)
+
+    return schemas.SearchResults(
+        items=[
+            schemas.SearchResultPost(post=schemas.Post.model_validate(p))
+            for p in page_data["items"]
+        ],
+        next_cursor=page_data["next_cursor"],
+    )
 
-            # Apply visibility filters (same for all users)
-            post_query = post_query.filter(
-                models.Post.visible == True,
-                models.Post.hidden_by_mod == False,
-                models.Post.hidden_by_user == False,
-                models.Post.non_conformant == False,
-                models.Post.public_visibility
-                == True,  # Only show publicly visible posts
-                models.Post.deleted_by_user == False,  # Exclude user-deleted posts
-            )
 
-            # Apply monitored hashtag filtering
-            post_query = apply_monitored_hashtag_filter(
-                post_query, models.Post, current_user
-            )
+@router.get("/search/suggest", response_model=schemas.SuggestResponse, tags=["Search"])
+def search_suggest(
+    q: str,
+    types: list[str] = Query(["users", "hashtags"]),
+    limit: int = Query(8, ge=1, le=SUGGEST_MAX_RESULTS),
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_user),
+) -> schemas.SuggestResponse:
+    """
+    Prefix completions for the user and hashtag pickers.
 
-            # Limit results
-            hashtag_posts = (
-                post_query.order_by(models.Post.created_at.desc())
-                .limit(limit // len(types))
-                .all()
+    Served from precomputed per-prefix buckets (services/suggest.py), ranked
+    by follower count / public post count; meant to be called per keystroke.
+    """
+    users = suggest_users(db, current_user, q, limit) if "users" in types else []
+    hashtags = suggest_hashtags(current_user, q, limit) if "hashtags" in types else []
+    return schemas.SuggestResponse(
+        users=[
+            schemas.SuggestUser(
+                public_sqid=user.public_sqid,
+                handle=user.handle,
+                avatar_url=user.avatar_url,
+                follower_count=followers,
             )
-
-            # Add counts
-            if hashtag_posts:
-                annotate_posts_with_counts(db, hashtag_posts, current_user.id)
-
-            for post_obj in hashtag_posts:
-                results.append(
-                    schemas.SearchResultPost(post=schemas.Post.model_validate(post_obj))
-                )
-
-    # Generate next cursor if we have more results
-    next_cursor = None
-    if len(results) > limit:
-        results = results[:limit]
-        # For mixed results, create cursor from the last item
-        if results:
-            last_result = results[-1]
-            if hasattr(last_result, "post") and last_result.post:
-                next_cursor = encode_cursor(
-                    str(last_result.post.id), last_result.post.created_at.isoformat()
-                )
-            elif hasattr(last_result, "user") and last_result.user:
-                next_cursor = encode_cursor(str(last_result.user.id))
-
-    return schemas.SearchResults(items=results, next_cursor=next_cursor)
+            for user, followers in users
+        ],
+        hashtags=[schemas.HashtagItem(tag=tag, count=count) for tag, count in hashtags],
+    )
 
 
 @router.get("/hashtags", response_model=schemas.HashtagList, tags=["Hashtags"])
@@ -273,7 +203,7 @@ async def list_hashtags(
     sort: str = Query("alphabetical", regex="^(alphabetical|popularity|recent)$"),
     cursor: str | None = None,
     limit: int = Query(50, ge=1, le=200),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User | None = Depends(get_current_user_optional),
 ) -> schemas.HashtagList:
     """
@@ -293,12 +223,7 @@ async def list_hashtags(
 
     # Build base query for visible posts
     base_query = db.query(models.Post).filter(
-        models.Post.visible == True,
-        models.Post.hidden_by_mod == False,
-        models.Post.hidden_by_user == False,
-        models.Post.non_conformant == False,
-        models.Post.public_visibility == True,  # Only show publicly visible posts
-        models.Post.deleted_by_user == False,  # Exclude user-deleted posts
+        models.Post.discoverable == True,
     )
 
     # Apply search filter if provided
@@ -381,7 +306,7 @@ async def list_hashtag_posts(
     tag: str,
     cursor: str | None = None,
     limit: int = Query(50, ge=1, le=200),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User | None = Depends(get_current_user_optional),
 ) -> schemas.Page[schemas.Post]:
     """
@@ -400,7 +325,7 @@ async def list_hashtag_posts(
     # Try to get from cache
     cached_result = cache_get(cache_key)
     if cached_result:
-        response = schemas.Page(**cached_result)
+        response = schemas.Page[schemas.Post](**cached_result)
         # Apply monitored hashtag filtering (user-specific)
         response.items = filter_posts_by_monitored_hashtags(
             response.items, current_user
@@ -419,12 +344,7 @@ async def list_hashtag_posts(
 
     # Apply visibility filters (same for all users)
     query = query.filter(
-        models.Post.visible == True,
-        models.Post.hidden_by_mod == False,
-        models.Post.hidden_by_user == False,
-        models.Post.non_conformant == False,
-        models.Post.public_visibility == True,  # Only show publicly visible posts
-        models.Post.deleted_by_user == False,  # Exclude user-deleted posts
+        models.Post.discoverable == True,
     )
 
     # Note: Monitored hashtag filtering is applied in-memory after fetching
@@ -469,7 +389,7 @@ async def list_hashtags_with_stats(
     sort: str = Query("popularity", regex="^(alphabetical|popularity|recent)$"),
     cursor: str | None = None,
     limit: int = Query(15, ge=1, le=50),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User | None = Depends(get_current_user_optional),
 ) -> schemas.HashtagStatsList:
     """
@@ -492,12 +412,7 @@ async def list_hashtags_with_stats(
 
     # Build base query for visible posts
     base_query = db.query(models.Post).filter(
-        models.Post.visible == True,
-        models.Post.hidden_by_mod == False,
-        models.Post.hidden_by_user == False,
-        models.Post.non_conformant == False,
-        models.Post.public_visibility == True,  # Only show publicly visible posts
-        models.Post.deleted_by_user == False,  # Exclude user-deleted posts
+        models.Post.discoverable == True,
     )
 
     # Apply search filter if provided
@@ -629,7 +544,7 @@ async def list_hashtags_with_stats(
     tags=["Hashtags"],
 )
 async def get_top_hashtags(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user),
 ) -> schemas.TopHashtagsResponse:
     """
@@ -648,12 +563,7 @@ async def get_top_hashtags(
 
     # Build base query for visible posts
     base_query = db.query(models.Post).filter(
-        models.Post.visible == True,
-        models.Post.hidden_by_mod == False,
-        models.Post.hidden_by_user == False,
-        models.Post.non_conformant == False,
-        models.Post.public_visibility == True,
-        models.Post.deleted_by_user == False,
+        models.Post.discoverable == True,
     )
 
     # Get all matching posts
@@ -705,7 +615,7 @@ async def get_top_hashtags(
 
 
 @router.get("/feed/promoted", response_model=schemas.Page[schemas.Post], tags=["Feed"])
-def feed_promoted(
+async def feed_promoted(
     cursor: str | None = None,
     limit: int = Query(50, ge=1, le=200),
     fields: str | None = Query(
@@ -714,8 +624,8 @@ def feed_promoted(
         "(e.g. 'id,title,art_url,width,height'). "
         "When set, each Post object only contains the listed fields.",
     ),
-    db: Session = Depends(get_db),
-    current_user: models.User | None = Depends(get_current_user_optional),
+    adb: AsyncSession = Depends(get_async_read_db),
+    current_user: models.User | None = Depends(get_current_user_optional_async),
 ) -> schemas.Page[schemas.Post]:
     """
     Promoted posts feed with infinite scroll support.
@@ -740,37 +650,60 @@ def feed_promoted(
     # All users see the same results (moderator-only views are in Moderator Dashboard)
     cache_key = f"feed:promoted:{cursor or 'first'}:{limit}"
 
-    # Try to get from cache
-    cached_result = cache_get(cache_key)
+    # Only the queries run on the session; the Redis cache is a blocking
+    # client, so it goes to the threadpool.
+    cached_result = await run_in_threadpool(cache_get, cache_key)
     if cached_result:
-        response = schemas.Page(**cached_result)
-        # Apply monitored hashtag filtering (user-specific)
-        response.items = filter_posts_by_monitored_hashtags(
-            response.items, current_user
+        response = await adb.run_sync(
+            _personalize_promoted, cached_result, current_user
+        )
+    else:
+        response, cached_result = await adb.run_sync(
+            _feed_promoted, cursor, limit, current_user
+        )
+        # Cache for 5 minutes
+        await run_in_threadpool(
+            cache_set, cache_key, cached_result, ttl=PROMOTED_FEED_CACHE_TTL
         )
-        # Add user-specific like status if authenticated
-        if current_user and response.items:
-            post_ids = [item.id for item in response.items]
-            liked_ids = get_user_liked_post_ids(db, post_ids, current_user.id)
-            for item in response.items:
-                item.user_has_liked = item.id in liked_ids
-        if field_set is not None:
-            return _filter_page_fields(response, field_set)
-        return response
 
+    if field_set is not None:
+        return _filter_page_fields(response, field_set)
+    return response
+
+
+def _personalize_promoted(
+    db: Session, cached_result: dict, current_user: models.User | None
+) -> schemas.Page[schemas.Post]:
+    response = schemas.Page[schemas.Post](**cached_result)
+    # Apply monitored hashtag filtering (user-specific)
+    response.items = filter_posts_by_monitored_hashtags(response.items, current_user)
+    # Add user-specific like status if authenticated
+    if current_user and response.items:
+        post_ids = [item.id for item in response.items]
+        liked_ids = get_user_liked_post_ids(db, post_ids, current_user.id)
+        for item in response.items:
+            item.user_has_liked = item.id in liked_ids
+    return response
+
+
+def _feed_promoted(
+    db: Session,
+    cursor: str | None,
+    limit: int,
+    current_user: models.User | None,
+) -> tuple[schemas.Page[schemas.Post], dict]:
+    """The viewer's page and the shared, unfiltered page to cache."""
     from sqlalchemy.orm import joinedload
 
     query = (
         db.query(models.Post)
-        .options(joinedload(models.Post.owner))
+        .options(
+            joinedload(models.Post.owner).selectinload(models.User.badges),
+            joinedload(models.Post.license),
+        )
         .filter(
             models.Post.promoted == True,
-            models.Post.visible == True,
-            models.Post.hidden_by_mod == False,
-            models.Post.hidden_by_user == False,
-            models.Post.non_conformant == False,
-            models.Post.public_visibility == True,  # Only show publicly visible posts
-            models.Post.deleted_by_user == False,  # Exclude user-deleted posts
+            models.Post.discoverable == True,
         )
     )
 
@@ -798,16 +731,12 @@ def feed_promoted(
         items=[schemas.Post.model_validate(p) for p in page_data["items"]],
         next_cursor=page_data["next_cursor"],
     )
-
-    # Cache for 5 minutes
-    cache_set(cache_key, response.model_dump(), ttl=PROMOTED_FEED_CACHE_TTL)
+    cached_result = response.model_dump()
 
     # Apply monitored hashtag filtering (user-specific, after caching)
     response.items = filter_posts_by_monitored_hashtags(response.items, current_user)
 
-    if field_set is not None:
-        return _filter_page_fields(response, field_set)
-    return response
+    return response, cached_result
 
 
 def _filter_page_fields(response: schemas.Page, field_set: set[str]) -> JSONResponse:
@@ -827,42 +756,20 @@ def feed_following(
     current_user: models.User = Depends(get_current_user),
 ) -> schemas.Page[schemas.Post]:
     """
-    Feed from followed users.
+    Feed from followed users, newest first, with keyset cursor pagination.
 
-    TODO: Implement join with follows table
-    TODO: Implement cursor pagination
-    TODO: Consider caching or pre-computed feed
+    Served from the viewer's home timeline (services/home_timeline.py), so a
+    page costs O(limit) regardless of how many users the viewer follows.
+    Stays on the threadpool: reading the timeline interleaves Redis calls
+    with its queries.
     """
-    # Get list of followed user IDs
-    following_ids = [
-        f.following_id
-        for f in db.query(models.Follow.following_id)
-        .filter(models.Follow.follower_id == current_user.id)
-        .all()
-    ]
-
-    if not following_ids:
-        return schemas.Page(items=[], next_cursor=None)
-
-    query = db.query(models.Post).filter(
-        models.Post.owner_id.in_(following_ids),
-        models.Post.visible == True,
-        models.Post.hidden_by_mod == False,
-        models.Post.hidden_by_user == False,  # author-hidden posts must not leak
-        models.Post.non_conformant == False,
-        models.Post.public_visibility == True,  # Only show publicly visible posts
-        models.Post.deleted_by_user == False,  # Exclude user-deleted posts
-    )
-
-    # Apply monitored hashtag filtering
-    query = apply_monitored_hashtag_filter(query, models.Post, current_user)
-
-    posts = query.order_by(models.Post.created_at.desc()).limit(limit).all()
+    page_data = read_timeline(db, current_user, cursor, limit)
+    posts = page_data["items"]
 
     # Add reaction and comment counts, and user liked status
     annotate_posts_with_counts(db, posts, current_user.id)
 
     return schemas.Page(
         items=[schemas.Post.model_validate(p) for p in posts],
-        next_cursor=None,
+        next_cursor=page_data["next_cursor"],
     )
@@ -28,7 +28,7 @@ from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Session
 
 from .. import models
-from ..deps import get_db
+from ..deps import get_read_db
 
 logger = logging.getLogger(__name__)
 
@@ -59,7 +59,7 @@ def _abs(path: str) -> str:
 
 
 @router.get("/sitemap.xml")
-def sitemap(db: Session = Depends(get_db)) -> Response:
+def sitemap(db: Session = Depends(get_read_db)) -> Response:
     """Render the public sitemap as XML."""
     rows: list[str] = []
 
@@ -84,14 +84,9 @@ def sitemap(db: Session = Depends(get_db)) -> Response:
         )
         .filter(
             models.Post.kind == "artwork",
-            models.Post.deleted_by_user.is_(False),
             models.Post.public_sqid.isnot(None),
             models.Post.public_sqid != "",
-            models.Post.visible.is_(True),
-            models.Post.hidden_by_mod.is_(False),
-            models.Post.hidden_by_user.is_(False),
-            models.Post.non_conformant.is_(False),
-            models.Post.public_visibility.is_(True),
+            models.Post.discoverable,
         )
         .order_by(models.Post.created_at.desc())
         .limit(MAX_POSTS + 1)
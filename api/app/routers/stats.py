@@ -11,7 +11,7 @@ from sqlalchemy.orm import Session
 
 from .. import models, schemas
 from ..auth import get_current_user
-from ..deps import get_db
+from ..deps import get_read_db
 from ..services.stats import get_post_stats, invalidate_post_stats_cache
 
 logger = logging.getLogger(__name__)
@@ -23,7 +23,7 @@ router = APIRouter(prefix="/post", tags=["Statistics"])
 async def get_post_statistics(
     id: int,  # Changed from UUID to int
     refresh: bool = Query(False, description="Force cache refresh"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user),
 ) -> schemas.PostStatsResponse:
     """
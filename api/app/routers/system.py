@@ -1,14 +1,17 @@
-"""System endpoints (health, config)."""
+"""System endpoints (health, config, metrics)."""
 
 from __future__ import annotations
 
 import hashlib
+import hmac
 import os
 import time
 
-from fastapi import APIRouter, Request, Response
+from fastapi import APIRouter, HTTPException, Request, Response, status
 
 from .. import schemas, vault
+from ..metrics import render_latest
+from ..settings import metrics_token
 
 router = APIRouter(prefix="", tags=["System"])
 
@@ -25,6 +28,25 @@ def get_health() -> schemas.HealthResponse:
     return schemas.HealthResponse(status="ok", uptime_s=uptime_s)
 
 
+@router.get("/metrics", include_in_schema=False)
+def get_metrics(request: Request) -> Response:
+    """
+    Prometheus scrape endpoint (app/metrics.py).
+
+    Answers only ``Authorization: Bearer $METRICS_TOKEN``; 404 otherwise,
+    including when no token is configured.
+    """
+    token = metrics_token()
+    supplied = request.headers.get("authorization", "")
+    if not token or not hmac.compare_digest(
+        supplied.encode(), f"Bearer {token}".encode()
+    ):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
+
+
 def _build_config() -> schemas.Config:
     """Assemble the public client config from server-authoritative sources.
 
@@ -30,7 +30,7 @@ from ..constants import MONITORED_HASHTAGS, NotificationType
 from ..avatar_vault import ALLOWED_MIME_TYPES as AVATAR_ALLOWED_MIME_TYPES
 from ..avatar_vault import get_avatar_url, save_avatar_image
 from ..avatar_vault import try_delete_avatar_by_public_url
-from ..deps import get_db
+from ..deps import get_db, get_read_db
 from ..utils.handles import validate_handle, is_handle_taken
 from ..pagination import (
     apply_cursor_filter,
@@ -39,6 +39,10 @@ from ..pagination import (
     encode_cursor,
 )
 from ..services.blog_post_stats import annotate_blog_posts_with_counts
+from ..services.home_timeline import invalidate_timeline
+from ..services.notification_counts import invalidate_unread
+from ..services.search_index import index_user
+from ..services.suggest import bump_user, rename_user
 from ..services.post_stats import annotate_posts_with_counts
 from ..services.artist_dashboard import get_artist_stats, get_posts_stats_list
 
@@ -448,6 +452,7 @@ def update_user(
             )
 
         # Preserve original case
+        old_handle = user.handle
         user.handle = new_handle
 
     # Update fields
@@ -491,8 +496,12 @@ def update_user(
             )
         user.approved_hashtags = list(payload.approved_hashtags)
 
+    if payload.handle is not None:
+        index_user(db, user.id)
     db.commit()
     db.refresh(user)
+    if payload.handle is not None:
+        rename_user(user.id, old_handle, user.handle)
 
     return schemas.UserFull.model_validate(user)
 
@@ -1037,7 +1046,7 @@ def get_artist_dashboard(
     user_key: str,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user),
 ) -> schemas.ArtistDashboardResponse:
     """
@@ -1434,6 +1443,8 @@ def follow_user(
 
     # Invalidate stats cache for target user
     invalidate_user_profile_stats_cache(db, target_user.id)
+    invalidate_timeline(current_user.id)
+    bump_user(target_user.id, target_user.handle, 1)
 
     follower_count = (
         db.query(func.count(models.Follow.id))
@@ -1484,6 +1495,8 @@ def unfollow_user(
     if deleted:
         # Invalidate stats cache for target user
         invalidate_user_profile_stats_cache(db, target_user.id)
+        invalidate_timeline(current_user.id)
+        bump_user(target_user.id, target_user.handle, -1)
 
     follower_count = (
         db.query(func.count(models.Follow.id))
@@ -1566,6 +1579,9 @@ def block_user(
 
     db.add(models.UserBlock(blocker_id=current_user.id, blocked_id=target_user.id))
     db.commit()
+    invalidate_timeline(current_user.id, target_user.id)
+    # The blocked user's notifications drop out of the unread badge.
+    invalidate_unread(current_user.id)
 
 
 @router.delete("/u/{public_sqid}/block", status_code=status.HTTP_204_NO_CONTENT)
@@ -1595,6 +1611,8 @@ def unblock_user(
         models.UserBlock.blocked_id == target_user.id,
     ).delete(synchronize_session=False)
     db.commit()
+    invalidate_timeline(current_user.id, target_user.id)
+    invalidate_unread(current_user.id)
 
 
 @router.get("/u/{public_sqid}/followers", response_model=schemas.FollowersResponse)
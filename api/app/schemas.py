@@ -449,6 +449,34 @@ class LineageParentsResponse(BaseModel):
     items: list[LineageParentSlot]
 
 
+class LineageNode(BaseModel):
+    """One post of a Lineage graph; depth < 0 for ancestors, > 0 for
+    descendants (shortest path)."""
+
+    post: Post
+    depth: int
+
+
+class LineageEdge(BaseModel):
+    """One Lineage Link between two posts of the graph."""
+
+    parent_sqid: str
+    child_sqid: str
+
+
+class LineageGraphResponse(BaseModel):
+    """Whole Lineage of a post for remix-tree rendering
+    (GET /post/{id}/lineage). Only viewer-visible posts and the links between
+    them are included."""
+
+    root_sqid: str
+    nodes: list[LineageNode]
+    edges: list[LineageEdge]
+    # Publicly visible descendants at any depth (not capped by limit/depth)
+    descendant_count: int
+    truncated: bool
+
+
 class RemixReceivedItem(BaseModel):
     """A viewer-visible Remix of one of the caller's works (GET /me/remixes)."""
 
@@ -1772,6 +1800,22 @@ class SearchResults(BaseModel):
     next_cursor: str | None = None
 
 
+class SuggestUser(BaseModel):
+    """User completion for the handle picker."""
+
+    public_sqid: str | None = None
+    handle: str
+    avatar_url: str | None = None
+    follower_count: int
+
+
+class SuggestResponse(BaseModel):
+    """Prefix completions, most popular first."""
+
+    users: list[SuggestUser] = []
+    hashtags: list[HashtagItem] = []
+
+
 # ============================================================================
 # RATE LIMIT SCHEMAS
 # ============================================================================
@@ -2060,6 +2104,27 @@ class VaultShardingStatsResponse(BaseModel):
     computed_at: datetime
 
 
+class StorageUsageItem(BaseModel):
+    """One user's storage ledger row (services/storage_ledger.py)."""
+
+    user_id: int
+    handle: str
+    public_sqid: str | None = None
+    native_bytes: int
+    derived_bytes: int
+    mkpx_bytes: int
+    total_bytes: int
+    quota_bytes: int
+    updated_at: datetime
+    reconciled_at: datetime | None = None
+
+
+class StorageUsageResponse(BaseModel):
+    """Top storage consumers by ledger total (moderator only)."""
+
+    items: list[StorageUsageItem]
+
+
 # ============================================================================
 # ARTIST DASHBOARD SCHEMAS
 # ============================================================================
@@ -2284,6 +2349,9 @@ class CreateBDRRequest(BaseModel):
     include_comments: bool = False
     include_reactions: bool = False
     send_email: bool = False
+    # 'archive' builds a ZIP in the background (and emails when send_email is
+    # set); 'stream' opts into an on-demand ZIP that is ready immediately.
+    delivery: Literal["archive", "stream"] = "archive"
 
 
 class CreateBDRResponse(BaseModel):
@@ -2294,6 +2362,9 @@ class CreateBDRResponse(BaseModel):
     artwork_count: int
     created_at: datetime
     message: str
+    # Set right away for streamed BDRs, which are ready on creation
+    expires_at: datetime | None = None
+    download_url: str | None = None
 
 
 class BDRItem(BaseModel):
@@ -0,0 +1,206 @@
+"""Resolution and delivery of artwork downloads (routers/artwork.py).
+
+The /d/ download routes used to load the post and its files, stat the vault
+file and stream it through the API on every request. Now:
+
+- A resolved download (vault path, media type, filename, validators) is
+  remembered in Redis under ``artfile:{post_id}``, one hash field per
+  variant ("native", a format extension, "upscaled"). Only downloads that
+  anyone may fetch are remembered, so a hit needs no database access and no
+  visibility check. Any flushed change to the post or its files drops the
+  hash after commit (session hooks at the bottom); entries also expire after
+  ``ARTWORK_FILE_TTL_SECONDS``.
+- Requests carrying a matching ``If-None-Match`` (or, without one, an
+  ``If-Modified-Since`` not older than the artwork) get a 304. The ETag is
+  derived from the stored artwork hash, so it needs no file read.
+- With ``VAULT_ACCEL_REDIRECT_PREFIX`` set (settings), the body is handed to
+  the proxy with an ``X-Accel-Redirect`` header naming the vault-relative
+  path; Caddy serves it from its read-only vault mount
+  (deploy/stack/docker-compose.*.yml). Unset (tests, bare local runs), the
+  API streams the file itself.
+
+Without Redis every request resolves from the database.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from pathlib import Path
+from urllib.parse import quote
+
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..cache import get_redis_client
+from ..settings import vault_accel_redirect_prefix
+from ..vault import get_vault_location
+
+logger = logging.getLogger(__name__)
+
+ARTWORK_FILE_KEY = "artfile:{post_id}"
+ARTWORK_FILE_TTL_SECONDS = 3600
+
+# Downloads revalidate every time: a sqid URL keeps its identity across
+# replace-artwork, so its bytes can change (unlike vault URLs).
+DOWNLOAD_CACHE_CONTROL = "no-cache"
+
+# session.info key: ids of posts whose files changed in the open transaction.
+_CHANGED_KEY = "artwork_files_changed"
+
+
+@dataclass
+class ArtworkFile:
+    """A resolved download: where the bytes are and how to describe them."""
+
+    sqid: str | None
+    path: str  # relative to the vault root
+    media_type: str
+    filename: str
+    etag: str
+    last_modified: str  # IMF-fixdate
+
+
+def describe(
+    post: models.Post, path: Path, media_type: str, filename: str, variant: str
+) -> ArtworkFile:
+    """Build the ArtworkFile for one variant of a post."""
+    modified = post.artwork_modified_at or post.created_at
+    if modified is None:
+        modified = datetime.now(timezone.utc)
+    elif modified.tzinfo is None:
+        modified = modified.replace(tzinfo=timezone.utc)
+    return ArtworkFile(
+        sqid=post.public_sqid,
+        path=str(path.relative_to(get_vault_location())),
+        media_type=media_type,
+        filename=filename,
+        etag=f'"{post.hash or post.storage_key}.{variant}"',
+        last_modified=format_datetime(modified.astimezone(timezone.utc), usegmt=True),
+    )
+
+
+def _key(post_id: int) -> str:
+    return ARTWORK_FILE_KEY.format(post_id=post_id)
+
+
+def get_cached_file(post_id: int, variant: str) -> ArtworkFile | None:
+    """The remembered download for this variant, or None."""
+    client = get_redis_client()
+    if client is None:
+        return None
+    try:
+        raw = client.hget(_key(post_id), variant)
+        return ArtworkFile(**json.loads(raw)) if raw else None
+    except Exception as e:
+        logger.warning(f"Artwork file cache read error: {e}")
+        return None
+
+
+def cache_file(post_id: int, variant: str, file: ArtworkFile) -> None:
+    """Remember a publicly downloadable variant (best effort)."""
+    client = get_redis_client()
+    if client is None:
+        return
+    try:
+        pipe = client.pipeline(transaction=False)
+        pipe.hset(_key(post_id), variant, json.dumps(asdict(file)))
+        pipe.expire(_key(post_id), ARTWORK_FILE_TTL_SECONDS, nx=True)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Artwork file cache write error: {e}")
+
+
+def invalidate_files(*post_ids: int) -> None:
+    """Forget every remembered variant of these posts."""
+    client = get_redis_client()
+    if client is None or not post_ids:
+        return
+    try:
+        client.delete(*[_key(post_id) for post_id in post_ids])
+    except Exception as e:
+        logger.warning(f"Artwork file cache invalidation error: {e}")
+
+
+def _not_modified(request: Request, file: ArtworkFile) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or file.etag in tags or f"W/{file.etag}" in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return since >= parsedate_to_datetime(file.last_modified)
+    return False
+
+
+def _content_disposition(filename: str) -> str:
+    # Same encoding as FileResponse(filename=...): RFC 5987 for non-ASCII.
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def file_response(
+    request: Request, file: ArtworkFile, cache_control: str = DOWNLOAD_CACHE_CONTROL
+) -> Response:
+    """304, proxy hand-off, or streamed file for a resolved download."""
+    headers = {
+        "ETag": file.etag,
+        "Last-Modified": file.last_modified,
+        "Cache-Control": cache_control,
+    }
+    if _not_modified(request, file):
+        return Response(status_code=304, headers=headers)
+
+    prefix = vault_accel_redirect_prefix()
+    if prefix:
+        headers["X-Accel-Redirect"] = f"{prefix}/{quote(file.path)}"
+        headers["Content-Disposition"] = _content_disposition(file.filename)
+        return Response(media_type=file.media_type, headers=headers)
+
+    return FileResponse(
+        path=str(get_vault_location() / file.path),
+        media_type=file.media_type,
+        # FileResponse(filename=...) RFC-5987-encodes Content-Disposition; a
+        # hand-built header 500s on non-Latin-1 (emoji/CJK) titles.
+        filename=file.filename,
+        headers=headers,
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session: Session, flush_context) -> None:
+    changed = set()
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, models.Post) and (
+            obj in session.deleted or session.is_modified(obj)
+        ):
+            changed.add(obj.id)
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, models.PostFile) and obj.post_id is not None:
+            changed.add(obj.post_id)
+    if changed:
+        session.info.setdefault(_CHANGED_KEY, set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    changed = session.info.pop(_CHANGED_KEY, None)
+    if changed:
+        invalidate_files(*changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_CHANGED_KEY, None)
@@ -0,0 +1,199 @@
+"""Short-lived cache of authenticated principals.
+
+``get_current_user`` runs on nearly every authenticated request and used to
+load the ``users`` row each time. The row is now snapshotted in Redis for
+``PRINCIPAL_TTL_SECONDS``:
+
+- ``auth:principal:{public_sqid}`` is a hash with one field per access token
+  (its ``iat``), each holding a JSON snapshot of the user's columns. The TTL
+  is set when the hash is created (EXPIRE NX), so a busy user's snapshot is
+  still reloaded at least once per TTL.
+- A hit rebuilds the ``User`` and attaches it to the request session without
+  a query (``Session.merge(load=False)``); relationships still lazy-load, and
+  ban/deactivation checks still run on the snapshot.
+- Any flushed change to a ``User`` (ban, unban, role change, profile edit,
+  deactivation, deletion) drops that user's hash once the transaction commits
+  (the session hooks at the bottom), so the next request reloads the row.
+  ``invalidate_principal`` is the explicit hook for writes made outside the
+  ORM.
+- Invalidation also bumps ``auth:principal:gen:{public_sqid}``. A miss reads
+  that generation before loading the row, and the snapshot is written only
+  if it is unchanged, so a request that loaded the row before a ban committed
+  cannot re-cache the pre-ban user after the hash was dropped.
+
+Without Redis (or on any Redis error) every request reads the database.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, event
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from .. import models
+from ..cache import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL_KEY = "auth:principal:{sqid}"
+PRINCIPAL_TTL_SECONDS = 60
+GENERATION_KEY = "auth:principal:gen:{sqid}"
+# Far longer than any request, so a generation read at the start of one is
+# still there to compare against when it writes its snapshot.
+GENERATION_TTL_SECONDS = 24 * 3600
+
+# Write the snapshot only if no invalidation happened since the caller read
+# the generation (ARGV[1]); the TTL is set when the hash is created.
+_CACHE_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+  return 0
+end
+redis.call('HSET', KEYS[1], ARGV[2], ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[4], 'NX')
+return 1
+"""
+
+# session.info key: public_sqids of users changed in the open transaction.
+_CHANGED_KEY = "auth_principal_changed"
+
+_COLUMNS = [
+    (attr.key, attr.columns[0].type) for attr in models.User.__mapper__.column_attrs
+]
+
+
+def _key(sqid: str) -> str:
+    return PRINCIPAL_KEY.format(sqid=sqid)
+
+
+def _generation_key(sqid: str) -> str:
+    return GENERATION_KEY.format(sqid=sqid)
+
+
+def _dump(user: models.User) -> str:
+    values = {}
+    for name, _type in _COLUMNS:
+        value = getattr(user, name)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, uuid.UUID):
+            value = str(value)
+        values[name] = value
+    return json.dumps(values)
+
+
+def _load(raw: str) -> models.User:
+    values = json.loads(raw)
+    user = models.User()
+    for name, type_ in _COLUMNS:
+        value = values.get(name)
+        if value is not None and isinstance(type_, DateTime):
+            value = datetime.fromisoformat(value)
+        elif value is not None and isinstance(type_, UUID):
+            value = uuid.UUID(value)
+        # Loaded state, not a change: no validators, no pending UPDATE.
+        set_committed_value(user, name, value)
+    make_transient_to_detached(user)
+    return user
+
+
+def fetch_principal(sqid: str, iat) -> tuple[str | None, str | None]:
+    """The cached snapshot for this token (None on a miss) and the user's
+    current generation, to pass to ``cache_principal`` after a miss (None
+    when Redis is unavailable, which disables the write).
+
+    Redis only, so async callers can run it off the event loop and pass the
+    snapshot to ``attach_principal`` inside their session's ``run_sync``.
+    """
+    client = get_redis_client()
+    if client is None:
+        return None, None
+    try:
+        pipe = client.pipeline(transaction=False)
+        pipe.hget(_key(sqid), str(iat))
+        pipe.get(_generation_key(sqid))
+        snapshot, generation = pipe.execute()
+        return snapshot, generation or "0"
+    except Exception as e:
+        logger.warning(f"Auth principal cache read error: {e}")
+        return None, None
+
+
+def attach_principal(db: Session, snapshot: str) -> models.User | None:
+    """Rebuild a snapshot's user and attach it to ``db`` without a query."""
+    try:
+        return db.merge(_load(snapshot), load=False)
+    except Exception as e:
+        logger.warning(f"Auth principal cache read error: {e}")
+        return None
+
+
+def cache_principal(sqid: str, iat, user: models.User, generation: str | None) -> None:
+    """Snapshot a freshly loaded user for this token (best effort).
+
+    ``generation`` is the one ``fetch_principal`` returned before the user
+    was loaded; the write is skipped if the user was invalidated since.
+    """
+    client = get_redis_client()
+    if client is None or generation is None:
+        return
+    try:
+        client.eval(
+            _CACHE_SCRIPT,
+            2,
+            _key(sqid),
+            _generation_key(sqid),
+            generation,
+            str(iat),
+            _dump(user),
+            PRINCIPAL_TTL_SECONDS,
+        )
+    except Exception as e:
+        logger.warning(f"Auth principal cache write error: {e}")
+
+
+def invalidate_principal(*sqids: str | None) -> None:
+    """Drop the cached snapshots of these users (every token) and bump their
+    generations, so loads already in flight do not re-cache them."""
+    sqids = [sqid for sqid in sqids if sqid]
+    client = get_redis_client()
+    if client is None or not sqids:
+        return
+    try:
+        pipe = client.pipeline()
+        for sqid in sqids:
+            pipe.incr(_generation_key(sqid))
+            pipe.expire(_generation_key(sqid), GENERATION_TTL_SECONDS)
+            pipe.delete(_key(sqid))
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Auth principal cache invalidation error: {e}")
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session: Session, flush_context) -> None:
+    changed = [
+        obj.public_sqid
+        for obj in list(session.dirty) + list(session.deleted)
+        if isinstance(obj, models.User)
+        and (obj in session.deleted or session.is_modified(obj))
+    ]
+    if changed:
+        session.info.setdefault(_CHANGED_KEY, set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    changed = session.info.pop(_CHANGED_KEY, None)
+    if changed:
+        invalidate_principal(*changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_CHANGED_KEY, None)
@@ -0,0 +1,473 @@
+"""Batch Download Request (BDR) archive contents and ZIP assembly.
+
+``collect_bdr_contents`` decides what goes into a BDR — artwork files in the
+order the user selected them, plus ``metadata.json`` and the optional
+``comments.json`` / ``reactions.json`` — without touching the vault beyond a
+``stat()`` per file. ``write_bdr_archive`` then streams vault files straight
+into the archive (no temp copies): PNG/GIF/WebP are already compressed and
+are STORED, everything else is deflated. Vault reads run on a small thread
+pool ahead of the single sequential writer.
+
+Streamed BDRs (``delivery='stream'``) skip the build entirely: the download
+endpoint lays out an all-STORED archive from a cached manifest
+(``get_stream_manifest``) and serves it — including byte ranges — directly
+from the vault files. The cached manifest is revalidated against the posts and
+the vault files on every request, so it is rebuilt when either changed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .. import models, vault
+from ..cache import cache_get, cache_set
+from ..utils.zipstream import (
+    STORED,
+    ResumableZipWriter,
+    Segment,
+    ZipMember,
+    dos_datetime,
+    make_member,
+    stored_layout,
+)
+
+logger = logging.getLogger(__name__)
+
+# Formats whose payload is already compressed; deflating them again costs CPU
+# and saves next to nothing.
+COMPRESSED_FORMATS = frozenset({"png", "gif", "webp"})
+
+READ_WORKERS = 4
+
+# Streamed-BDR manifests are cached for at most this long (and never past
+# the BDR's expiry); a miss or a stale entry just recomputes it.
+MANIFEST_CACHE_TTL_SECONDS = 24 * 3600
+
+
+@dataclass
+class BDRArtworkFile:
+    """One artwork file destined for ``artworks/`` in the archive."""
+
+    archive_name: str
+    source_path: Path
+    file_format: str
+    size: int
+    mtime: datetime | None
+
+    @property
+    def compress(self) -> bool:
+        return self.file_format not in COMPRESSED_FORMATS
+
+
+@dataclass
+class BDRContents:
+    """Everything a BDR archive contains, in archive order."""
+
+    artworks: list[BDRArtworkFile] = field(default_factory=list)
+    documents: dict[str, bytes] = field(default_factory=dict)
+    generated_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+def _dump(data: dict) -> bytes:
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def _comments_by_artwork(
+    db: Session, post_ids: list[int], id_to_sqid: dict[int, str]
+) -> dict[str, list[dict]]:
+    rows = (
+        db.query(models.Comment, models.User.handle)
+        .outerjoin(models.User, models.User.id == models.Comment.author_id)
+        .filter(
+            models.Comment.post_id.in_(post_ids),
+            models.Comment.hidden_by_mod == False,
+            models.Comment.deleted_by_owner == False,
+            models.Comment.deleted_by_mod == False,
+        )
+        .order_by(models.Comment.created_at)
+        .all()
+    )
+    comments_by_post: dict[str, list[dict]] = {}
+    for comment, handle in rows:
+        sqid = id_to_sqid.get(comment.post_id)
+        if not sqid:
+            continue
+        comments_by_post.setdefault(sqid, []).append(
+            {
+                "id": str(comment.id),
+                "author_handle": handle or "anonymous",
+                "body": comment.body,
+                "created_at": comment.created_at.isoformat(),
+            }
+        )
+    return comments_by_post
+
+
+def _reactions_by_artwork(
+    db: Session, post_ids: list[int], id_to_sqid: dict[int, str]
+) -> dict[str, dict[str, int]]:
+    rows = (
+        db.query(
+            models.Reaction.post_id,
+            models.Reaction.emoji,
+            func.count(models.Reaction.id).label("count"),
+        )
+        .filter(models.Reaction.post_id.in_(post_ids))
+        .group_by(models.Reaction.post_id, models.Reaction.emoji)
+        .all()
+    )
+    reactions_by_post: dict[str, dict[str, int]] = {}
+    for post_id, emoji, count in rows:
+        sqid = id_to_sqid.get(post_id)
+        if sqid:
+            reactions_by_post.setdefault(sqid, {})[emoji] = count
+    return reactions_by_post
+
+
+def collect_bdr_contents(
+    db: Session,
+    bdr: models.BatchDownloadRequest,
+    user: models.User,
+    generated_at: datetime | None = None,
+) -> BDRContents:
+    """
+    Resolve the files and JSON documents for a BDR.
+
+    Artworks keep the order of ``bdr.post_ids`` so the archive layout is
+    deterministic. Deleted posts are left out; posts whose native file is
+    missing from the vault are logged and left out of both the archive and
+    ``metadata.json``.
+    ``generated_at`` defaults to now; streamed BDRs pin it so rebuilding
+    the manifest yields the same bytes.
+
+    Raises:
+        ValueError: If none of the requested posts exist.
+    """
+    posts = (
+        db.query(models.Post)
+        .filter(
+            models.Post.id.in_(bdr.post_ids),
+            models.Post.deleted_by_user == False,
+        )
+        .all()
+    )
+    if not posts:
+        raise ValueError("No posts found")
+    order = {post_id: i for i, post_id in enumerate(bdr.post_ids)}
+    posts.sort(key=lambda p: order.get(p.id, len(order)))
+
+    contents = BDRContents()
+    if generated_at is not None:
+        contents.generated_at = generated_at
+    stamp = contents.generated_at.isoformat()
+    artworks_meta = []
+    for post in posts:
+        native_pf = next((f for f in post.files if f.is_native), None)
+        if not (post.storage_key and native_pf):
+            logger.warning(f"Cannot locate artwork for post {post.id}")
+            continue
+        fmt = native_pf.format
+        source_path = vault.get_artwork_file_path(
+            post.storage_key,
+            vault.FORMAT_TO_EXT.get(fmt, f".{fmt}"),
+            storage_shard=post.storage_shard,
+        )
+        try:
+            size = source_path.stat().st_size
+        except OSError:
+            logger.warning(f"Vault file not found: {source_path}")
+            continue
+
+        filename = f"{post.public_sqid}.{fmt}"
+        contents.artworks.append(
+            BDRArtworkFile(
+                archive_name=f"artworks/{filename}",
+                source_path=source_path,
+                file_format=fmt,
+                size=size,
+                mtime=post.created_at,
+            )
+        )
+        artworks_meta.append(
+            {
+                "sqid": post.public_sqid,
+                "filename": filename,
+                "title": post.title,
+                "description": post.description,
+                "created_at": post.created_at.isoformat(),
+                "width": post.width,
+                "height": post.height,
+                "frame_count": post.frame_count,
+                "file_format": fmt,
+                "hashtags": post.hashtags or [],
+                "mod_hashtags": post.mod_hashtags or [],
+            }
+        )
+
+    contents.documents["metadata.json"] = _dump(
+        {
+            "generated_at": stamp,
+            "user_handle": user.handle,
+            "artwork_count": len(posts),
+            "artworks": artworks_meta,
+        }
+    )
+
+    id_to_sqid = {p.id: p.public_sqid for p in posts}
+    if bdr.include_comments:
+        contents.documents["comments.json"] = _dump(
+            {
+                "generated_at": stamp,
+                "comments_by_artwork": _comments_by_artwork(
+                    db, bdr.post_ids, id_to_sqid
+                ),
+            }
+        )
+    if bdr.include_reactions:
+        contents.documents["reactions.json"] = _dump(
+            {
+                "generated_at": stamp,
+                "reactions_by_artwork": _reactions_by_artwork(
+                    db, bdr.post_ids, id_to_sqid
+                ),
+            }
+        )
+    return contents
+
+
+def _encode_artwork(artwork: BDRArtworkFile) -> tuple[ZipMember, bytes]:
+    """Read one vault file and encode it (runs on a reader thread)."""
+    return make_member(
+        artwork.archive_name,
+        artwork.source_path.read_bytes(),
+        compress=artwork.compress,
+        mtime=artwork.mtime,
+    )
+
+
+def write_bdr_archive(
+    contents: BDRContents,
+    zip_path: Path,
+    read_workers: int = READ_WORKERS,
+    on_progress: Callable[[int], None] | None = None,
+) -> int:
+    """
+    Build the archive at ``zip_path`` and return its size in bytes.
+
+    A partial build left by an earlier attempt (``{zip_path}.part`` plus its
+    journal) is resumed: members already written are skipped. At most
+    ``2 * read_workers`` files are read ahead of the writer, which bounds
+    memory regardless of BDR size. ``on_progress`` is called with the number
+    of artworks packed so far (resumed ones included).
+    """
+    writer = ResumableZipWriter(zip_path)
+    try:
+        done = writer.completed
+        if done:
+            logger.info(f"Resuming {zip_path.name} after {len(done)} members")
+        pending = [a for a in contents.artworks if a.archive_name not in done]
+        packed = len(contents.artworks) - len(pending)
+        if on_progress is not None:
+            on_progress(packed)
+
+        with ThreadPoolExecutor(
+            max_workers=read_workers, thread_name_prefix="bdr-read"
+        ) as pool:
+            window: deque = deque()
+            remaining = iter(pending)
+            for artwork in remaining:
+                window.append(pool.submit(_encode_artwork, artwork))
+                if len(window) >= 2 * read_workers:
+                    break
+            while window:
+                member, payload = window.popleft().result()
+                writer.add_encoded(member, payload)
+                packed += 1
+                if on_progress is not None:
+                    on_progress(packed)
+                artwork = next(remaining, None)
+                if artwork is not None:
+                    window.append(pool.submit(_encode_artwork, artwork))
+
+        for name, data in contents.documents.items():
+            if name not in done:
+                writer.add(name, data, compress=True, mtime=contents.generated_at)
+        return writer.finish()
+    finally:
+        writer.close()
+
+
+def _crc32_file(path: Path) -> tuple[int, int, int]:
+    """CRC-32, size and mtime (ns) of a file, read in one pass."""
+    crc = 0
+    size = 0
+    with open(path, "rb") as f:
+        mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+        while chunk := f.read(256 * 1024):
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+    return crc & 0xFFFFFFFF, size, mtime_ns
+
+
+def build_stream_manifest(
+    contents: BDRContents, read_workers: int = READ_WORKERS
+) -> dict:
+    """
+    Describe an all-STORED archive of ``contents`` as JSON-safe data.
+
+    This is the only pass over the artwork bytes (for their CRCs); serving
+    the archive afterwards needs just the manifest and the vault files.
+    """
+    with ThreadPoolExecutor(
+        max_workers=read_workers, thread_name_prefix="bdr-crc"
+    ) as pool:
+        checksums = list(
+            pool.map(_crc32_file, [a.source_path for a in contents.artworks])
+        )
+
+    members = []
+    for artwork, (crc, size, mtime_ns) in zip(
+        contents.artworks, checksums, strict=True
+    ):
+        dos_time, dos_date = dos_datetime(artwork.mtime)
+        members.append(
+            {
+                "name": artwork.archive_name,
+                "crc": crc,
+                "size": size,
+                "dos_time": dos_time,
+                "dos_date": dos_date,
+                "path": str(artwork.source_path),
+                "mtime_ns": mtime_ns,
+            }
+        )
+    dos_time, dos_date = dos_datetime(contents.generated_at)
+    for name, data in contents.documents.items():
+        members.append(
+            {
+                "name": name,
+                "crc": zlib.crc32(data) & 0xFFFFFFFF,
+                "size": len(data),
+                "dos_time": dos_time,
+                "dos_date": dos_date,
+                "data": data.decode("utf-8"),
+            }
+        )
+
+    _, total = manifest_layout({"members": members})
+    digest = hashlib.sha256(
+        json.dumps(members, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    return {"etag": f'"{digest[:32]}"', "size": total, "members": members}
+
+
+def manifest_layout(manifest: dict) -> tuple[list[Segment], int]:
+    """Segments and total size of the archive a manifest describes."""
+    entries = []
+    for m in manifest["members"]:
+        member = ZipMember(
+            name=m["name"],
+            method=STORED,
+            crc=m["crc"],
+            size=m["size"],
+            compressed_size=m["size"],
+            dos_time=m["dos_time"],
+            dos_date=m["dos_date"],
+        )
+        source = m["data"].encode("utf-8") if "data" in m else Path(m["path"])
+        entries.append((member, source))
+    return stored_layout(entries)
+
+
+def _manifest_key(bdr_id) -> str:
+    return f"bdr:manifest:{bdr_id}"
+
+
+def _source_fingerprint(db: Session, bdr: models.BatchDownloadRequest) -> str:
+    """Digest of the BDR's live posts and their last modification times.
+
+    Changes when a post is deleted, or its artwork or metadata is edited.
+    """
+    rows = (
+        db.query(
+            models.Post.id,
+            models.Post.artwork_modified_at,
+            models.Post.metadata_modified_at,
+        )
+        .filter(
+            models.Post.id.in_(bdr.post_ids),
+            models.Post.deleted_by_user == False,
+        )
+        .order_by(models.Post.id)
+        .all()
+    )
+    state = [
+        [post_id, str(artwork_modified_at), str(metadata_modified_at)]
+        for post_id, artwork_modified_at, metadata_modified_at in rows
+    ]
+    return hashlib.sha256(json.dumps(state).encode("utf-8")).hexdigest()[:32]
+
+
+def _files_unchanged(manifest: dict) -> bool:
+    """Whether every vault file in a manifest still has its recorded size/mtime."""
+    for m in manifest["members"]:
+        if "path" not in m:
+            continue
+        try:
+            st = os.stat(m["path"])
+        except OSError:
+            return False
+        if st.st_size != m["size"] or st.st_mtime_ns != m.get("mtime_ns"):
+            return False
+    return True
+
+
+def get_stream_manifest(
+    db: Session, bdr: models.BatchDownloadRequest, user: models.User
+) -> dict:
+    """
+    Cached manifest for a streamed BDR, computed on first download.
+
+    Cached until the BDR expires (at most ``MANIFEST_CACHE_TTL_SECONDS``) so
+    every range request of one download sees the same layout. Before it is
+    served the cached entry is checked against the posts (deleted or edited
+    since) and the vault files (size/mtime); a stale entry is rebuilt, which
+    changes the ETag so an in-flight If-Range resume restarts cleanly rather
+    than splicing two different archives. Without Redis it is recomputed per
+    request; ``generated_at`` is pinned to the BDR's creation time so that
+    stays byte-identical unless the data changed.
+    """
+    key = _manifest_key(bdr.id)
+    source = _source_fingerprint(db, bdr)
+    cached = cache_get(key)
+    if (
+        isinstance(cached, dict)
+        and "members" in cached
+        and cached.get("source") == source
+        and _files_unchanged(cached)
+    ):
+        return cached
+
+    contents = collect_bdr_contents(db, bdr, user, generated_at=bdr.created_at)
+    manifest = build_stream_manifest(contents)
+    manifest["source"] = source
+
+    ttl = MANIFEST_CACHE_TTL_SECONDS
+    if bdr.expires_at is not None:
+        remaining = (bdr.expires_at - datetime.now(timezone.utc)).total_seconds()
+        ttl = max(1, min(ttl, int(remaining)))
+    cache_set(key, manifest, ttl=ttl)
+    return manifest
@@ -0,0 +1,153 @@
+"""Push delivery of Batch Download Request (BDR) updates to the PMD SSE stream.
+
+BDRs change state in the Celery worker (``process_bdr_job``,
+``cleanup_expired_bdrs``) and in request handlers (``create_bdr``), but the
+SSE streams live in the API process, so the in-process ``bdr_bus`` alone
+cannot carry them. Publishers call :func:`publish_bdr_update`, which sends
+the event over Redis pub/sub (``BDR_EVENTS_CHANNEL``); a relay thread in
+each API process (:func:`start_bdr_event_relay`, started from the app
+lifespan) forwards it onto ``bdr_bus`` for ``GET /pmd/bdr/sse``.
+
+Delivery is best-effort: without Redis, or with no stream connected, the
+event is dropped and the client catches up from the snapshot it receives on
+(re)connect.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from typing import Any
+
+from .. import models
+from ..cache import get_redis_client
+from .event_bus import bdr_bus
+
+logger = logging.getLogger(__name__)
+
+BDR_EVENTS_CHANNEL = "bdr:events"
+
+
+def bdr_download_url(bdr: models.BatchDownloadRequest) -> str | None:
+    """Download URL once a BDR can be downloaded, else None."""
+    if bdr.status != "ready":
+        return None
+    if bdr.delivery != "stream" and not bdr.file_path:
+        return None
+    return f"/api/pmd/bdr/{bdr.id}/download"
+
+
+def bdr_to_dict(bdr: models.BatchDownloadRequest, progress: int | None = None) -> dict:
+    """Convert BDR to dictionary for SSE event.
+
+    ``progress`` is the percentage of artworks packed, sent while a build is
+    running; it is None in snapshots and status transitions.
+    """
+    return {
+        "id": str(bdr.id),
+        "status": bdr.status,
+        "artwork_count": bdr.artwork_count,
+        "created_at": bdr.created_at.isoformat() if bdr.created_at else None,
+        "completed_at": bdr.completed_at.isoformat() if bdr.completed_at else None,
+        "expires_at": bdr.expires_at.isoformat() if bdr.expires_at else None,
+        "error_message": bdr.error_message,
+        "download_url": bdr_download_url(bdr),
+        "progress": progress,
+    }
+
+
+def publish_bdr_update(
+    bdr: models.BatchDownloadRequest, progress: int | None = None
+) -> None:
+    """Announce a BDR's current state (call after committing it)."""
+    client = get_redis_client()
+    if client is None:
+        return
+    message = {"user_id": bdr.user_id, "bdr": bdr_to_dict(bdr, progress)}
+    try:
+        client.publish(BDR_EVENTS_CHANNEL, json.dumps(message))
+    except Exception as e:
+        logger.warning(f"Failed to publish BDR update {bdr.id}: {e}")
+
+
+class ProgressReporter:
+    """Publishes build progress, at most once per whole-percent change."""
+
+    def __init__(self, bdr: models.BatchDownloadRequest, total: int):
+        self.bdr = bdr
+        self.total = max(1, total)
+        self._last = -1
+
+    def __call__(self, packed: int) -> None:
+        percent = min(100, packed * 100 // self.total)
+        if percent != self._last:
+            self._last = percent
+            publish_bdr_update(self.bdr, progress=percent)
+
+
+# ---------------------------------------------------------------------------
+# Relay (API process)
+# ---------------------------------------------------------------------------
+
+_relay_thread: threading.Thread | None = None
+_relay_stop = threading.Event()
+
+# Poll timeout for the pub/sub socket; bounds how long shutdown waits.
+_RELAY_POLL_SECONDS = 1.0
+_RELAY_RETRY_SECONDS = 5.0
+
+
+def _forward(raw: Any) -> None:
+    try:
+        message = json.loads(raw)
+        user_id = int(message["user_id"])
+        bdr = message["bdr"]
+    except (ValueError, TypeError, KeyError) as e:
+        logger.warning(f"Malformed BDR event dropped: {e}")
+        return
+    bdr_bus.publish_threadsafe(user_id, bdr)
+
+
+def _relay_loop() -> None:
+    while not _relay_stop.is_set():
+        client = get_redis_client()
+        if client is None:
+            _relay_stop.wait(_RELAY_RETRY_SECONDS)
+            continue
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(BDR_EVENTS_CHANNEL)
+            while not _relay_stop.is_set():
+                message = pubsub.get_message(timeout=_RELAY_POLL_SECONDS)
+                if message and message.get("type") == "message":
+                    _forward(message["data"])
+        except Exception as e:
+            logger.warning(f"BDR event relay error, resubscribing: {e}")
+            _relay_stop.wait(_RELAY_RETRY_SECONDS)
+        finally:
+            try:
+                pubsub.close()
+            except Exception:
+                pass
+
+
+def start_bdr_event_relay() -> None:
+    """Start forwarding Redis BDR events onto ``bdr_bus`` (idempotent)."""
+    global _relay_thread
+    if _relay_thread is not None and _relay_thread.is_alive():
+        return
+    _relay_stop.clear()
+    _relay_thread = threading.Thread(
+        target=_relay_loop, name="bdr-event-relay", daemon=True
+    )
+    _relay_thread.start()
+    logger.info("BDR event relay started")
+
+
+def stop_bdr_event_relay() -> None:
+    global _relay_thread
+    _relay_stop.set()
+    if _relay_thread is not None:
+        _relay_thread.join(_RELAY_POLL_SECONDS * 2)
+        _relay_thread = None
@@ -0,0 +1,243 @@
+"""Shared player channel result cache.
+
+Many players run identical channel queries (``all``, ``promoted``, popular
+hashtags) with identical criteria and sort. Instead of running each one from
+scratch per player and per page, the ordered post-id list of a channel is
+computed once and kept in Redis under a key derived from the *normalized*
+request: channel, hashtag, target user, AMP criteria, sort and seed.
+
+What is shared vs. per-owner:
+
+- The cached list applies every filter that is the same for all viewers
+  (channel, public/withdrawal flags, criteria, ordering).
+- The player owner's monitored-hashtag preferences are applied afterwards,
+  in memory: alongside the ids the cache records which monitored hashtags each
+  post carries (almost always none).
+- Channels whose contents depend on the viewer (``user`` — the owner's own,
+  including pending posts — and ``reactions`` with its keyset cursor) and
+  unseeded ``random`` sorts are never cached.
+
+Invalidation is version-based: every key embeds the current value of
+``CHANNEL_VERSION_KEY``, which ``bump_channel_version`` increments wherever a
+post is published, hidden, deleted, promoted or otherwise changes discovery
+state. Stale lists are never looked up again (an open channel window keeps
+reading the list it was opened on) and simply expire. Hydration re-checks
+the visibility flags, so a path that forgets to bump can only produce a
+shorter page, never leak a withdrawn post.
+
+N players on the same channel therefore cost one list query per invalidation
+epoch (plus one primary-key lookup per page).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+
+from sqlalchemy.orm import Session, joinedload
+
+from .. import models
+from ..cache import cache_get, cache_set, get_redis_client
+from ..constants import MONITORED_HASHTAGS
+from ..player_protocol.schemas import QueryPostsRequest
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_VERSION_KEY = "player:channels:version"
+
+# Longest id list kept per channel (20 pages of 50). Deeper pages fall back to
+# a direct query.
+MAX_CACHED_IDS = 1000
+
+# Safety-net lifetime; normal invalidation is via the version bump.
+CHANNEL_LIST_TTL_SECONDS = 10 * 60
+
+# Channels whose results are identical for every viewer.
+_SHAREABLE_CHANNELS = frozenset({"all", "artwork", "promoted", "by_user", "hashtag"})
+
+
+def bump_channel_version() -> None:
+    """Invalidate every cached channel list (call after discovery-state changes)."""
+    client = get_redis_client()
+    if not client:
+        return
+    try:
+        client.incr(CHANNEL_VERSION_KEY)
+    except Exception as e:
+        logger.warning(f"Failed to bump player channel cache version: {e}")
+
+
+def _current_version() -> str | None:
+    client = get_redis_client()
+    if not client:
+        return None
+    try:
+        return str(client.get(CHANNEL_VERSION_KEY) or 0)
+    except Exception as e:
+        logger.warning(f"Failed to read player channel cache version: {e}")
+        return None
+
+
+def is_shareable(request: QueryPostsRequest) -> bool:
+    """Whether a channel request yields the same ordered list for every viewer."""
+    if request.channel not in _SHAREABLE_CHANNELS:
+        return False
+    if request.sort == "random" and request.random_seed is None:
+        return False
+    return True
+
+
+def _normalized_params(request: QueryPostsRequest, target_user_id: int | None) -> dict:
+    """Reduce a request to the parameters that determine its ordered result."""
+    channel = "all" if request.channel == "artwork" else request.channel
+    # reacted_at outside the reactions channel falls back to server_order.
+    sort = "server_order" if request.sort == "reacted_at" else request.sort
+    params: dict = {"channel": channel, "sort": sort}
+    if channel == "hashtag":
+        params["hashtag"] = (request.hashtag or "").strip().lower()
+    if channel == "by_user":
+        params["user_id"] = target_user_id
+    if sort == "random":
+        # Matches the setseed() quantisation in _build_channel_query.
+        params["seed"] = request.random_seed % 1000000
+    if request.criteria:
+        params["criteria"] = sorted(
+            json.dumps([c.field.value, c.op.value, c.value], separators=(",", ":"))
+            for c in request.criteria
+        )
+    return params
+
+
+def _cache_key(version: str, params: dict) -> str:
+    digest = hashlib.sha256(
+        json.dumps(params, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()[:32]
+    return f"player:channel:v{version}:{digest}"
+
+
+def _compute_entry(
+    player: models.Player, request: QueryPostsRequest, db: Session
+) -> dict:
+    """Run the shared channel query and build the cache entry."""
+    from .player_rpc import _build_channel_query
+
+    query = _build_channel_query(
+        player, request, db, ids_only=True, owner_filters=False
+    ).add_columns(models.Post.hashtags)
+    rows = query.limit(MAX_CACHED_IDS + 1).all()
+
+    complete = len(rows) <= MAX_CACHED_IDS
+    rows = rows[:MAX_CACHED_IDS]
+    monitored: dict[str, list[str]] = {}
+    for post_id, hashtags in rows:
+        tags = set(hashtags or []) & MONITORED_HASHTAGS
+        if tags:
+            monitored[str(post_id)] = sorted(tags)
+
+    return {
+        "ids": [post_id for post_id, _ in rows],
+        "monitored": monitored,
+        "complete": complete,
+    }
+
+
+def excluded_hashtags(player: models.Player) -> frozenset[str]:
+    """Monitored hashtags the player owner has not opted into."""
+    return frozenset(MONITORED_HASHTAGS - set(player.owner.approved_hashtags or []))
+
+
+def filter_entry_ids(entry: dict, excluded: frozenset[str]) -> list[int]:
+    """Apply an owner's monitored-hashtag exclusions to a cached entry."""
+    monitored = entry.get("monitored") or {}
+    if not (excluded and monitored):
+        return list(entry["ids"])
+    return [
+        post_id
+        for post_id in entry["ids"]
+        if not excluded.intersection(monitored.get(str(post_id), ()))
+    ]
+
+
+def get_channel_entry(
+    player: models.Player,
+    request: QueryPostsRequest,
+    db: Session,
+    *,
+    target_user_id: int | None = None,
+) -> tuple[str, dict] | None:
+    """Return ``(key, entry)`` for a shareable channel, computing it on a miss.
+
+    The entry is the unfiltered shared list; apply ``filter_entry_ids`` for a
+    given owner. Returns None when the request is not shareable or Redis is
+    unavailable.
+    """
+    if not is_shareable(request):
+        return None
+    version = _current_version()
+    if version is None:
+        return None
+
+    key = _cache_key(version, _normalized_params(request, target_user_id))
+    entry = cache_get(key)
+    if not isinstance(entry, dict) or "ids" not in entry:
+        entry = _compute_entry(player, request, db)
+        cache_set(key, entry, ttl=CHANNEL_LIST_TTL_SECONDS)
+    return key, entry
+
+
+def pin_entry(key: str, *, ttl: int) -> None:
+    """Keep a cached entry alive for at least ``ttl`` seconds from now."""
+    client = get_redis_client()
+    if not client:
+        return
+    try:
+        client.expire(key, ttl, gt=True)
+    except Exception as e:
+        logger.warning(f"Failed to extend player channel list {key}: {e}")
+
+
+def load_entry(key: str, *, ttl: int) -> dict | None:
+    """Read a cached entry by key and pin it for at least ``ttl`` seconds.
+
+    Used by channel windows, which keep reading the list they were opened on
+    (even after a version bump) for as long as the window is in use. Returns
+    None once the entry has expired.
+    """
+    entry = cache_get(key)
+    if not isinstance(entry, dict) or "ids" not in entry:
+        return None
+    pin_entry(key, ttl=ttl)
+    return entry
+
+
+def load_posts_in_order(
+    db: Session,
+    ids: list[int],
+    *,
+    public_only: bool,
+) -> list[models.Post]:
+    """Load posts by id preserving ``ids`` order, re-checking visibility.
+
+    Posts withdrawn since the id list was computed (deleted, hidden,
+    non-conformant, or — with ``public_only`` — no longer publicly visible)
+    are silently dropped.
+    """
+    if not ids:
+        return []
+    query = (
+        db.query(models.Post)
+        .options(joinedload(models.Post.owner))
+        .filter(
+            models.Post.id.in_(ids),
+            ~models.Post.deleted_by_user,
+            models.Post.visible,
+            ~models.Post.hidden_by_user,
+            ~models.Post.hidden_by_mod,
+            ~models.Post.non_conformant,
+        )
+    )
+    if public_only:
+        query = query.filter(models.Post.public_visibility.is_(True))
+    by_id = {post.id: post for post in query.all()}
+    return [by_id[post_id] for post_id in ids if post_id in by_id]
@@ -0,0 +1,237 @@
+"""Channel windows: server-pushed lookahead paging for players.
+
+A player paging through a channel with ``query_posts`` pays one broker round
+trip and one full channel query per page, and stalls at every page boundary
+while the next page is fetched. A *channel window* replaces that loop:
+
+1. ``open_channel_window`` resolves the channel's ordered post ids **once**
+   (capped at ``MAX_WINDOW_POSTS``) and records the window in Redis under a
+   short-lived ``window_id``. It returns page 0 plus ``lookahead`` further
+   pages.
+2. ``advance_channel_window`` is sent as the player *starts* consuming a page;
+   the server returns (MQTT: pushes) every page up to ``page + lookahead`` that
+   has not been delivered yet, so the next page is already on the device by
+   the time it is needed.
+
+For shareable channels the id list is the shared channel cache entry
+(``app.services.channel_cache``), keyed by the normalized channel, sort and
+seed rather than by player: opening a window on a popular channel usually
+costs no list query at all, and the per-player window state only references
+that entry (plus the owner's monitored-hashtag exclusions) instead of holding
+its own copy of up to ``MAX_WINDOW_POSTS`` ids. Only viewer-specific channels
+(``user``, ``reactions``, unseeded ``random``) store their ids inline. Pages
+are hydrated from the id slice with a primary-key lookup, which also re-checks
+the withdrawal flags (deleted/hidden/non-conformant) so a post removed after
+the window opened is dropped rather than served. Ordering is the exact
+ordering of ``query_posts`` (the same query builder is used), frozen at open
+time — including ``random`` without a seed.
+
+Like ``player_rpc`` this module is transport-agnostic: handlers return
+``ChannelWindowResponse`` and the MQTT adapter decides how pages are published.
+"""
+
+from __future__ import annotations
+
+import logging
+import secrets
+
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..cache import cache_get, cache_set
+from ..player_protocol.schemas import (
+    AdvanceChannelWindowRequest,
+    ChannelWindowPage,
+    ChannelWindowResponse,
+    OpenChannelWindowRequest,
+)
+from . import channel_cache
+from .player_rpc import (
+    PlayerRpcError,
+    _build_channel_query,
+    _build_post_payloads,
+    _resolve_include_fields,
+    _shared_channel_entry,
+)
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on ids frozen into one window (20 pages of 50). Players that
+# reach the end simply open a new window.
+MAX_WINDOW_POSTS = 1000
+
+# Idle lifetime of a window; every advance refreshes it.
+WINDOW_TTL_SECONDS = 15 * 60
+
+
+def _window_key(player: models.Player, window_id: str) -> str:
+    return f"player:window:{player.id}:{window_id}"
+
+
+def _page_count(total: int, page_size: int) -> int:
+    return max(1, -(-total // page_size))
+
+
+def _window_expired(window_id: str) -> PlayerRpcError:
+    return PlayerRpcError(
+        "window_expired", f"Channel window '{window_id}' not found or expired"
+    )
+
+
+def _load_window(player: models.Player, window_id: str) -> dict:
+    state = cache_get(_window_key(player, window_id))
+    if not isinstance(state, dict) or not ("ids" in state or "list_key" in state):
+        raise _window_expired(window_id)
+    return state
+
+
+def _window_ids(window_id: str, state: dict) -> list[int]:
+    """Resolve a window's ordered ids, from the shared list it references."""
+    if "list_key" not in state:
+        return state["ids"]
+    entry = channel_cache.load_entry(state["list_key"], ttl=WINDOW_TTL_SECONDS)
+    if entry is None:
+        raise _window_expired(window_id)
+    excluded = frozenset(state.get("excluded") or ())
+    return channel_cache.filter_entry_ids(entry, excluded)[:MAX_WINDOW_POSTS]
+
+
+def _save_window(player: models.Player, window_id: str, state: dict) -> None:
+    if not cache_set(_window_key(player, window_id), state, ttl=WINDOW_TTL_SECONDS):
+        raise PlayerRpcError(
+            "window_unavailable",
+            "Channel windows are temporarily unavailable; use query_posts",
+        )
+
+
+def _hydrate_page(
+    window_id: str,
+    page: int,
+    state: dict,
+    ids: list[int],
+    db: Session,
+) -> ChannelWindowPage:
+    """Load one page of the window from its cached id slice."""
+    page_size: int = state["page_size"]
+    page_count = _page_count(len(ids), page_size)
+    page_ids = ids[page * page_size : (page + 1) * page_size]
+
+    posts = channel_cache.load_posts_in_order(
+        db, page_ids, public_only=state.get("public_only", False)
+    )
+
+    include_fields = _resolve_include_fields(state.get("include_fields"))
+    return ChannelWindowPage(
+        window_id=window_id,
+        page=page,
+        page_count=page_count,
+        posts=_build_post_payloads(posts, include_fields, db),
+        is_last=page >= page_count - 1,
+    )
+
+
+def _deliver_pages(
+    player: models.Player,
+    window_id: str,
+    state: dict,
+    ids: list[int],
+    through_page: int,
+    db: Session,
+) -> list[ChannelWindowPage]:
+    """Hydrate every undelivered page up to ``through_page`` and record them."""
+    page_count = _page_count(len(ids), state["page_size"])
+    first = state["delivered_through"] + 1
+    last = min(through_page, page_count - 1)
+
+    pages = [
+        _hydrate_page(window_id, p, state, ids, db) for p in range(first, last + 1)
+    ]
+    if pages:
+        state["delivered_through"] = last
+    _save_window(player, window_id, state)
+    return pages
+
+
+def open_channel_window(
+    player: models.Player,
+    request: OpenChannelWindowRequest,
+    db: Session,
+) -> ChannelWindowResponse:
+    """Handle an open_channel_window request."""
+    state = {
+        "public_only": request.channel not in ("user", "reactions"),
+        "page_size": request.limit,
+        "lookahead": request.lookahead,
+        "include_fields": request.include_fields,
+        "delivered_through": -1,
+    }
+    shared = _shared_channel_entry(player, request, db)
+    if shared is not None:
+        list_key, entry = shared
+        excluded = channel_cache.excluded_hashtags(player)
+        ids = channel_cache.filter_entry_ids(entry, excluded)[:MAX_WINDOW_POSTS]
+        # Pin the shared list for the window's lifetime.
+        channel_cache.pin_entry(list_key, ttl=WINDOW_TTL_SECONDS)
+        state["list_key"] = list_key
+        state["excluded"] = sorted(excluded)
+    else:
+        query = _build_channel_query(player, request, db, ids_only=True)
+        ids = [row[0] for row in query.limit(MAX_WINDOW_POSTS).all()]
+        state["ids"] = ids
+
+    window_id = secrets.token_hex(8)
+    pages = _deliver_pages(player, window_id, state, ids, request.lookahead, db)
+
+    logger.info(
+        f"open_channel_window for player {player.player_key}: "
+        f"channel={request.channel}, posts={len(ids)}, pages={len(pages)}"
+    )
+
+    return ChannelWindowResponse(
+        request_id=request.request_id,
+        window_id=window_id,
+        page_size=request.limit,
+        total_posts=len(ids),
+        page_count=_page_count(len(ids), request.limit),
+        pages=pages,
+    )
+
+
+def advance_channel_window(
+    player: models.Player,
+    request: AdvanceChannelWindowRequest,
+    db: Session,
+) -> ChannelWindowResponse:
+    """Handle an advance_channel_window request.
+
+    ``request.page`` is the page the player has started consuming; pages up to
+    ``page + lookahead`` that were not delivered yet are returned. Re-sending
+    the same page is a cheap no-op (no pages, window TTL refreshed).
+    """
+    state = _load_window(player, request.window_id)
+    ids = _window_ids(request.window_id, state)
+    total = len(ids)
+    page_count = _page_count(total, state["page_size"])
+    if request.page >= page_count:
+        raise PlayerRpcError(
+            "invalid_page",
+            f"Page {request.page} is beyond the window ({page_count} pages)",
+        )
+
+    pages = _deliver_pages(
+        player,
+        request.window_id,
+        state,
+        ids,
+        request.page + state["lookahead"],
+        db,
+    )
+
+    return ChannelWindowResponse(
+        request_id=request.request_id,
+        window_id=request.window_id,
+        page_size=state["page_size"],
+        total_posts=total,
+        page_count=page_count,
+        pages=pages,
+    )
@@ -1,10 +1,13 @@
 """In-process per-user pub/sub buses for live SSE delivery.
 
-Two isolated buses share one implementation:
+Three isolated buses share one implementation:
 - ``player_bus`` — player capability/state events (MQTT subscriber threads
   publish; the player SSE endpoint forwards to the browser).
 - ``notification_bus`` — social notifications (request handlers publish
   post-commit; the /realtime/notifications SSE endpoint forwards).
+- ``bdr_bus`` — Batch Download Request updates, fed by the Redis relay in
+  services/bdr_events.py (the publishers run in Celery workers); the
+  /pmd/bdr/sse endpoint forwards.
 
 They must stay separate instances: the player SSE re-emits raw bus events,
 so notification events on the same queues would leak into player streams.
@@ -78,3 +81,4 @@ class UserEventBus:
 
 player_bus = UserEventBus("player")
 notification_bus = UserEventBus("notifications")
+bdr_bus = UserEventBus("bdr")
@@ -0,0 +1,162 @@
+"""Daily range partitions for the raw event tables.
+
+``view_events``, ``site_events`` and ``blog_post_view_events`` are
+partitioned by ``RANGE (created_at)`` into one partition per UTC day
+(``view_events_p20261018`` covers [2026-10-18 00:00, 2026-10-19 00:00) UTC),
+plus a ``<table>_default`` partition that catches anything no day partition
+covers (a missed maintenance run, far-off backdated timestamps).
+
+- ``maintain_event_partitions`` (daily beat task) creates the partitions for
+  the retention window and ``PARTITION_PRECREATE_DAYS`` ahead, so inserts
+  land in day partitions. Rows already sitting in the default partition for
+  a newly created day are moved into it.
+- The rollups retire whole days with ``drop_event_partitions`` once they are
+  rolled past their cutoff, instead of a large ``DELETE`` — no dead tuples,
+  no vacuum debt. Only stragglers in the default partition are deleted.
+- Readers filter on ``created_at`` ranges, so the planner prunes to the days
+  they ask for.
+
+The API worker role does not own these tables, so the DDL runs through two
+``SECURITY DEFINER`` functions (installed by the migration, and by the test
+conftest via ``install_event_partitioning``) that only accept the tables
+listed here.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+PARTITIONED_EVENT_TABLES = ("view_events", "site_events", "blog_post_view_events")
+
+# Raw events are kept for 7 days; players may backdate views that far
+# (services/player_views.py), so partitions exist for the whole window.
+PARTITION_RETENTION_DAYS = 7
+PARTITION_PRECREATE_DAYS = 7
+
+_TABLE_LIST_SQL = ", ".join(f"'{table}'" for table in PARTITIONED_EVENT_TABLES)
+
+_ENSURE_PARTITION_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION ensure_event_partition(parent text, day date)
+RETURNS boolean
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    part text := parent || '_p' || to_char(day, 'YYYYMMDD');
+    lo timestamptz := day::timestamp AT TIME ZONE 'UTC';
+    hi timestamptz := (day + 1)::timestamp AT TIME ZONE 'UTC';
+BEGIN
+    IF parent NOT IN ({_TABLE_LIST_SQL}) THEN
+        RAISE EXCEPTION 'not a partitioned event table: %', parent;
+    END IF;
+    IF to_regclass(part) IS NOT NULL THEN
+        RETURN false;
+    END IF;
+    EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS)', part, parent);
+    -- ATTACH refuses a range the default partition still has rows for.
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM %I WHERE created_at >= $1 '
+        'AND created_at < $2 RETURNING *) INSERT INTO %I SELECT * FROM moved',
+        parent || '_default', part
+    ) USING lo, hi;
+    EXECUTE format(
+        'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        parent, part, lo, hi
+    );
+    RETURN true;
+END;
+$$
+"""
+
+_DROP_PARTITIONS_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION drop_event_partitions(parent text, before_day date)
+RETURNS integer
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    part text;
+    dropped integer := 0;
+BEGIN
+    IF parent NOT IN ({_TABLE_LIST_SQL}) THEN
+        RAISE EXCEPTION 'not a partitioned event table: %', parent;
+    END IF;
+    FOR part IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = parent::regclass
+          AND c.relname ~ ('^' || parent || '_p[0-9]{{8}}$')
+          AND to_date(right(c.relname, 8), 'YYYYMMDD') < before_day
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format('DROP TABLE %I', part);
+        dropped := dropped + 1;
+    END LOOP;
+    RETURN dropped;
+END;
+$$
+"""
+
+
+def partition_name(table: str, day: date) -> str:
+    return f"{table}_p{day:%Y%m%d}"
+
+
+def default_partition(table: str) -> str:
+    return f"{table}_default"
+
+
+def install_event_partitioning(conn: Connection) -> None:
+    """Create the default partitions and the DDL functions (run as owner)."""
+    for table in PARTITIONED_EVENT_TABLES:
+        conn.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {default_partition(table)} "
+                f"PARTITION OF {table} DEFAULT"
+            )
+        )
+    conn.execute(text(_ENSURE_PARTITION_FUNCTION))
+    conn.execute(text(_DROP_PARTITIONS_FUNCTION))
+
+
+def ensure_event_partitions(db: Session, start: date, end: date) -> int:
+    """Create the missing day partitions for [start, end] on every event
+    table. Returns the number created."""
+    created = 0
+    for table in PARTITIONED_EVENT_TABLES:
+        day = start
+        while day <= end:
+            created += bool(
+                db.execute(
+                    text("SELECT ensure_event_partition(:table, :day)"),
+                    {"table": table, "day": day},
+                ).scalar()
+            )
+            day += timedelta(days=1)
+    return created
+
+
+def maintain_event_partitions(db: Session, today: date) -> int:
+    """Cover the retention window and the next PARTITION_PRECREATE_DAYS."""
+    return ensure_event_partitions(
+        db,
+        today - timedelta(days=PARTITION_RETENTION_DAYS),
+        today + timedelta(days=PARTITION_PRECREATE_DAYS),
+    )
+
+
+def drop_event_partitions(db: Session, table: str, before_day: date) -> int:
+    """Drop ``table``'s day partitions for days strictly before
+    ``before_day``. Runs in the caller's transaction. Returns the number
+    dropped."""
+    return db.execute(
+        text("SELECT drop_event_partitions(:table, :before_day)"),
+        {"table": table, "before_day": before_day},
+    ).scalar()
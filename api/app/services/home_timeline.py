@@ -0,0 +1,454 @@
+"""Home timeline for GET /feed/following.
+
+Each user's timeline is a Redis sorted set ``timeline:home:{user_id}`` of
+post ids scored by ``created_at`` (epoch seconds), capped at
+``TIMELINE_MAX_ENTRIES``. Two delivery modes, chosen per author:
+
+- fan-out-on-write — when a post becomes feed-eligible, the
+  ``fan_out_post_to_timelines`` task adds it to every follower's timeline
+  that is currently materialized;
+- fan-out-on-read — authors with at least ``HEAVY_AUTHOR_FOLLOWERS``
+  followers are never fanned out (one post would mean that many writes).
+  Readers merge their recent posts from Postgres instead; the set of heavy
+  authors is small, so this stays bounded whatever the viewer follows.
+
+An author crossing the threshold upwards needs no cleanup: posts fanned out
+earlier stay in timelines and reads de-duplicate them against the merge. An
+author dropping below it (``demote_heavy_authors``) has recent posts that are
+in no timeline, so their followers' timelines are dropped and rebuilt on read.
+
+A timeline is built from Postgres on first read (or after invalidation,
+or once its TTL lapses) and carries a sentinel member at +inf so "built but
+empty" differs from "not built". Reads hydrate one page of ids and re-check
+eligibility, the follow edge, blocks and monitored hashtags, so stale
+entries (deleted/hidden posts, dropped follows) never leak; globally
+ineligible ids are pruned as they are seen. Pages past the end of a capped
+timeline, and every page when Redis is unavailable, come from the plain
+Postgres query.
+
+Cursors are the usual keyset ``(id, created_at)`` pair (app/pagination.py).
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import and_, exists, func
+from sqlalchemy.orm import Query, Session, joinedload
+
+from .. import models
+from ..cache import get_redis_client
+from ..pagination import create_page_response, decode_cursor
+from ..utils.blocks import apply_block_filter
+from ..utils.monitored_hashtags import apply_monitored_hashtag_filter
+
+logger = logging.getLogger(__name__)
+
+TIMELINE_MAX_ENTRIES = 800
+TIMELINE_TTL_SECONDS = 7 * 24 * 3600
+HEAVY_AUTHOR_FOLLOWERS = 5000
+HEAVY_AUTHORS_KEY = "timeline:heavy_authors"
+HEAVY_AUTHORS_TTL_SECONDS = 3600
+# Last computed heavy set, kept without expiry to detect demotions.
+HEAVY_AUTHORS_SEEN_KEY = "timeline:heavy_authors:seen"
+
+# Sorts above every post; survives ZREMRANGEBYRANK trimming from the bottom.
+_SENTINEL = "built"
+# Ids read from Redis per round trip, as a multiple of the page size.
+_READ_BATCH_FACTOR = 2
+
+# Add a post to a timeline only if it is already materialized (a missing
+# timeline is rebuilt in full on read), then trim to the cap + sentinel.
+_FAN_OUT_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+  redis.call('ZADD', KEYS[1], ARGV[1], ARGV[2])
+  redis.call('ZREMRANGEBYRANK', KEYS[1], 0, -(tonumber(ARGV[3]) + 2))
+  return 1
+end
+return 0
+"""
+
+
+def timeline_key(user_id: int) -> str:
+    return f"timeline:home:{user_id}"
+
+
+def _score(created_at: datetime) -> float:
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return created_at.timestamp()
+
+
+def _eligible(query: Query) -> Query:
+    """Posts that may appear in anyone's following feed."""
+    return query.filter(
+        models.Post.discoverable == True,
+        models.Post.public_sqid.isnot(None),
+    )
+
+
+def is_feed_eligible(post: models.Post) -> bool:
+    """In-memory counterpart of ``_eligible``."""
+    return bool(
+        post.visible
+        and not post.hidden_by_mod
+        and not post.hidden_by_user
+        and not post.non_conformant
+        and post.public_visibility
+        and not post.deleted_by_user
+        and post.public_sqid
+    )
+
+
+def _followed_by(viewer_id: int):
+    return exists().where(
+        and_(
+            models.Follow.follower_id == viewer_id,
+            models.Follow.following_id == models.Post.owner_id,
+        )
+    )
+
+
+def _viewer_feed_query(db: Session, viewer: models.User) -> Query:
+    """Eligible posts by authors the viewer follows, with viewer filters.
+
+    Eager-loads what schemas.Post serializes (owner with badges, license), so
+    a page costs a fixed number of statements however many authors it spans.
+    """
+    query = (
+        _eligible(db.query(models.Post))
+        .options(
+            joinedload(models.Post.owner).selectinload(models.User.badges),
+            joinedload(models.Post.license),
+        )
+        .filter(_followed_by(viewer.id))
+    )
+    query = apply_block_filter(query, models.Post.owner_id, viewer.id)
+    return apply_monitored_hashtag_filter(query, models.Post, viewer)
+
+
+def _before(query: Query, key: tuple[float, int] | None) -> Query:
+    """Keyset filter: strictly older than ``key`` in (created_at, id) order."""
+    if key is None:
+        return query
+    created_at = datetime.fromtimestamp(key[0], tz=timezone.utc)
+    return query.filter(
+        (models.Post.created_at < created_at)
+        | ((models.Post.created_at == created_at) & (models.Post.id < key[1]))
+    )
+
+
+def _newest_first(query: Query) -> Query:
+    return query.order_by(models.Post.created_at.desc(), models.Post.id.desc())
+
+
+def _cursor_key(cursor: str | None) -> tuple[float, int] | None:
+    data = decode_cursor(cursor)
+    if not data or data[1] is None:
+        return None
+    last_id, sort_value = data
+    try:
+        created_at = datetime.fromisoformat(str(sort_value).replace("Z", "+00:00"))
+        return (_score(created_at), int(last_id))
+    except ValueError:
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Heavy authors (fan-out-on-read)
+# ---------------------------------------------------------------------------
+
+
+def get_heavy_authors(db: Session, client=None) -> set[int]:
+    """Ids of authors delivered by fan-out-on-read.
+
+    Cached in Redis for an hour and recomputed from the follows table (one
+    grouped scan of the following_id index) when missing. Authors that left
+    the set since the previous computation are demoted.
+    """
+    client = client or get_redis_client()
+    if client is not None:
+        try:
+            if client.exists(HEAVY_AUTHORS_KEY):
+                return {int(m) for m in client.smembers(HEAVY_AUTHORS_KEY) if m != "-"}
+        except Exception as e:
+            logger.warning(f"Failed to read heavy authors: {e}")
+
+    rows = (
+        db.query(models.Follow.following_id)
+        .group_by(models.Follow.following_id)
+        .having(func.count(models.Follow.id) >= HEAVY_AUTHOR_FOLLOWERS)
+        .all()
+    )
+    heavy = {row[0] for row in rows}
+    if client is not None:
+        try:
+            previous = {
+                int(m) for m in client.smembers(HEAVY_AUTHORS_SEEN_KEY) if m != "-"
+            }
+            pipe = client.pipeline()
+            pipe.delete(HEAVY_AUTHORS_KEY, HEAVY_AUTHORS_SEEN_KEY)
+            # "-" keeps the key present when there are no heavy authors.
+            pipe.sadd(HEAVY_AUTHORS_KEY, "-", *heavy)
+            pipe.expire(HEAVY_AUTHORS_KEY, HEAVY_AUTHORS_TTL_SECONDS)
+            pipe.sadd(HEAVY_AUTHORS_SEEN_KEY, "-", *heavy)
+            pipe.execute()
+            demote_heavy_authors(db, previous - heavy, client)
+        except Exception as e:
+            logger.warning(f"Failed to cache heavy authors: {e}")
+    return heavy
+
+
+def demote_heavy_authors(db: Session, author_ids: set[int], client=None) -> None:
+    """Switch authors from fan-out-on-read back to fan-out-on-write.
+
+    Their posts since they became heavy were never fanned out, so every
+    follower's materialized timeline is dropped (the next read rebuilds it
+    with them). Followers number fewer than ``HEAVY_AUTHOR_FOLLOWERS`` by now.
+    """
+    client = client or get_redis_client()
+    if client is None or not author_ids:
+        return
+    follower_ids = (
+        db.query(models.Follow.follower_id)
+        .filter(models.Follow.following_id.in_(author_ids))
+        .distinct()
+        .yield_per(1000)
+    )
+    pipe = client.pipeline(transaction=False)
+    pipe.srem(HEAVY_AUTHORS_KEY, *author_ids)
+    pipe.srem(HEAVY_AUTHORS_SEEN_KEY, *author_ids)
+    for (follower_id,) in follower_ids:
+        pipe.delete(timeline_key(follower_id))
+    pipe.execute()
+    logger.info(f"Demoted heavy authors {sorted(author_ids)} to fan-out-on-write")
+
+
+# ---------------------------------------------------------------------------
+# Writes
+# ---------------------------------------------------------------------------
+
+
+def fan_out_post(db: Session, post: models.Post) -> int:
+    """Push a feed-eligible post into its author's followers' timelines.
+
+    Returns the number of timelines updated (0 for heavy authors, whose
+    posts are merged on read).
+    """
+    client = get_redis_client()
+    if client is None or not is_feed_eligible(post):
+        return 0
+
+    followers = (
+        db.query(func.count(models.Follow.id))
+        .filter(models.Follow.following_id == post.owner_id)
+        .scalar()
+        or 0
+    )
+    if followers >= HEAVY_AUTHOR_FOLLOWERS:
+        if client.exists(HEAVY_AUTHORS_KEY):
+            client.sadd(HEAVY_AUTHORS_KEY, post.owner_id)
+        client.sadd(HEAVY_AUTHORS_SEEN_KEY, post.owner_id)
+        return 0
+    if client.sismember(HEAVY_AUTHORS_SEEN_KEY, post.owner_id):
+        # Delivered on read until now; the rebuilt timelines include this post.
+        demote_heavy_authors(db, {post.owner_id}, client)
+        return 0
+
+    script = client.register_script(_FAN_OUT_SCRIPT)
+    score = _score(post.created_at)
+    follower_ids = (
+        db.query(models.Follow.follower_id)
+        .filter(models.Follow.following_id == post.owner_id)
+        .yield_per(1000)
+    )
+    pipe = client.pipeline(transaction=False)
+    for (follower_id,) in follower_ids:
+        script(
+            keys=[timeline_key(follower_id)],
+            args=[score, post.id, TIMELINE_MAX_ENTRIES],
+            client=pipe,
+        )
+    return sum(pipe.execute())
+
+
+def queue_fan_out(post_id: int) -> None:
+    """Queue ``fan_out_post_to_timelines``; never fails the caller."""
+    try:
+        from ..tasks import fan_out_post_to_timelines
+
+        fan_out_post_to_timelines.delay(post_id)
+    except Exception as e:
+        logger.error(f"Failed to queue timeline fan-out for post {post_id}: {e}")
+
+
+def invalidate_timeline(*user_ids: int) -> None:
+    """Drop materialized timelines; the next read rebuilds them.
+
+    Call after the viewer's follow graph changes (follow, unfollow, block,
+    unblock).
+    """
+    client = get_redis_client()
+    if client is None or not user_ids:
+        return
+    try:
+        client.delete(*(timeline_key(user_id) for user_id in user_ids))
+    except Exception as e:
+        logger.warning(f"Failed to invalidate timelines {user_ids}: {e}")
+
+
+def rebuild_timeline(db: Session, user_id: int, client, heavy: set[int]) -> None:
+    """Materialize a timeline from Postgres (newest fanned-out-author posts)."""
+    query = _eligible(db.query(models.Post.id, models.Post.created_at)).filter(
+        _followed_by(user_id)
+    )
+    if heavy:
+        query = query.filter(models.Post.owner_id.notin_(heavy))
+    rows = _newest_first(query).limit(TIMELINE_MAX_ENTRIES).all()
+
+    key = timeline_key(user_id)
+    entries = {str(post_id): _score(created_at) for post_id, created_at in rows}
+    entries[_SENTINEL] = float("inf")
+    pipe = client.pipeline()
+    pipe.delete(key)
+    pipe.zadd(key, entries)
+    pipe.expire(key, TIMELINE_TTL_SECONDS)
+    pipe.execute()
+
+
+# ---------------------------------------------------------------------------
+# Reads
+# ---------------------------------------------------------------------------
+
+
+def _timeline_posts(
+    db: Session,
+    viewer: models.User,
+    client,
+    key: tuple[float, int] | None,
+    want: int,
+) -> tuple[list[models.Post], bool]:
+    """Up to ``want`` posts from the materialized timeline, after ``key``.
+
+    Returns (posts, exhausted_capped): the flag is set when the timeline ran
+    out but was at its cap, i.e. older posts may exist in Postgres only.
+    """
+    tkey = timeline_key(viewer.id)
+    posts: list[models.Post] = []
+    batch = max(want, 1) * _READ_BATCH_FACTOR
+    max_score: float | str = "+inf" if key is None else key[0]
+    while len(posts) < want:
+        raw = client.zrevrangebyscore(
+            tkey, max_score, "-inf", start=0, num=batch, withscores=True
+        )
+        entries = sorted(
+            (
+                (score, int(member))
+                for member, score in raw
+                if member != _SENTINEL and (key is None or (score, int(member)) < key)
+            ),
+            reverse=True,
+        )
+        if entries:
+            by_id = {
+                p.id: p
+                for p in _viewer_feed_query(db, viewer)
+                .filter(models.Post.id.in_([post_id for _, post_id in entries]))
+                .all()
+            }
+            posts.extend(by_id[post_id] for _, post_id in entries if post_id in by_id)
+            _prune(db, client, tkey, [pid for _, pid in entries if pid not in by_id])
+            key = entries[-1]
+            max_score = key[0]
+        if len(raw) < batch:
+            capped = client.zcard(tkey) - 1 >= TIMELINE_MAX_ENTRIES
+            return posts[:want], capped
+        if not entries:
+            # A full batch of ties at one score already seen; step past it.
+            max_score = f"({max_score}"
+    return posts[:want], False
+
+
+def _prune(db: Session, client, tkey: str, candidates: list[int]) -> None:
+    """Remove ids that are no longer eligible for anyone's feed."""
+    if not candidates:
+        return
+    alive = {
+        row[0]
+        for row in _eligible(db.query(models.Post.id))
+        .filter(models.Post.id.in_(candidates))
+        .all()
+    }
+    dead = [str(post_id) for post_id in candidates if post_id not in alive]
+    if dead:
+        client.zrem(tkey, *dead)
+
+
+def read_timeline(
+    db: Session, viewer: models.User, cursor: str | None, limit: int
+) -> dict:
+    """One page of the viewer's following feed.
+
+    Returns the ``create_page_response`` dict (items, next_cursor).
+    """
+    key = _cursor_key(cursor)
+    client = get_redis_client()
+    if client is None:
+        return _database_page(db, viewer, key, limit)
+
+    try:
+        heavy = get_heavy_authors(db, client)
+        if not client.exists(timeline_key(viewer.id)):
+            rebuild_timeline(db, viewer.id, client, heavy)
+        posts, capped = _timeline_posts(db, viewer, client, key, limit + 1)
+    except Exception as e:
+        logger.warning(f"Home timeline unavailable for user {viewer.id}: {e}")
+        return _database_page(db, viewer, key, limit)
+
+    if capped and len(posts) <= limit:
+        # Past the end of a capped timeline: continue from Postgres.
+        tail_key = (_score(posts[-1].created_at), posts[-1].id) if posts else key
+        tail = _viewer_feed_query(db, viewer)
+        if heavy:
+            tail = tail.filter(models.Post.owner_id.notin_(heavy))
+        posts += _newest_first(_before(tail, tail_key)).limit(limit + 1).all()
+
+    followed_heavy = _followed_heavy_authors(db, viewer.id, heavy)
+    if followed_heavy:
+        merged = _viewer_feed_query(db, viewer).filter(
+            models.Post.owner_id.in_(followed_heavy)
+        )
+        posts += _newest_first(_before(merged, key)).limit(limit + 1).all()
+
+    unique = {p.id: p for p in posts}
+    ordered = sorted(
+        unique.values(), key=lambda p: (_score(p.created_at), p.id), reverse=True
+    )
+    return create_page_response(ordered[: limit + 1], limit, cursor, "created_at")
+
+
+def _followed_heavy_authors(db: Session, viewer_id: int, heavy: set[int]) -> list[int]:
+    if not heavy:
+        return []
+    rows = (
+        db.query(models.Follow.following_id)
+        .filter(
+            models.Follow.follower_id == viewer_id,
+            models.Follow.following_id.in_(heavy),
+        )
+        .all()
+    )
+    return [row[0] for row in rows]
+
+
+def _database_page(
+    db: Session, viewer: models.User, key: tuple[float, int] | None, limit: int
+) -> dict:
+    """The following feed straight from Postgres (no Redis)."""
+    posts = (
+        _newest_first(_before(_viewer_feed_query(db, viewer), key))
+        .limit(limit + 1)
+        .all()
+    )
+    return create_page_response(posts, limit, None, "created_at")
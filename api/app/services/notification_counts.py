@@ -0,0 +1,179 @@
+"""Maintained per-user unread social-notification counters.
+
+The badge count (GET /social-notifications/unread-count and the SSE
+``connected`` greeting) is read from ``notif:unread:{user_id}`` in Redis
+instead of counting unread rows on every call. The counter matches the list
+surface: unread rows whose actor the recipient has not blocked.
+
+- A missing key is computed once from the database (the block-filtered
+  COUNT) and stored with SET NX, so a concurrent adjustment is never
+  overwritten by a stale recount.
+- Creates, mark-read, mark-all-read and deletes adjust an existing key in
+  place (``adjust_unread`` / ``set_unread``); adjusting a missing key is a
+  no-op, since the next read recomputes it anyway.
+- Changes that would need a per-row block check (block/unblock, retention
+  cleanup, cascades from post or account deletion) drop the key
+  (``invalidate_unread``) or are repaired by ``reconcile_unread_counts``,
+  which recounts every live key in grouped queries.
+
+Keys expire after ``UNREAD_COUNT_TTL_SECONDS`` so idle users cost nothing.
+Without Redis, every read falls back to the COUNT.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from sqlalchemy import and_, exists, func
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..cache import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+UNREAD_KEY = "notif:unread:{user_id}"
+UNREAD_COUNT_TTL_SECONDS = 86400
+RECONCILE_BATCH_SIZE = 500
+
+# INCRBY only if the key exists (never resurrect a dropped counter with a
+# partial value), clamped at zero; refreshes the TTL.
+_ADJUST_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return nil
+end
+local n = redis.call('INCRBY', KEYS[1], ARGV[1])
+if n < 0 then
+    redis.call('SET', KEYS[1], 0)
+    n = 0
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return n
+"""
+
+
+def _key(user_id: int) -> str:
+    return UNREAD_KEY.format(user_id=user_id)
+
+
+def _not_blocked(user_id_col, actor_id_col):
+    """Notification visible to its recipient: system row, or actor not
+    blocked by the recipient (mirrors apply_block_filter)."""
+    return ~exists().where(
+        and_(
+            models.UserBlock.blocker_id == user_id_col,
+            models.UserBlock.blocked_id == actor_id_col,
+        )
+    )
+
+
+def count_unread(db: Session, user_id: int) -> int:
+    """Block-filtered unread count straight from the database."""
+    SN = models.SocialNotification
+    return (
+        db.query(func.count(SN.id))
+        .filter(
+            SN.user_id == user_id,
+            SN.is_read == False,
+            _not_blocked(SN.user_id, SN.actor_id),
+        )
+        .scalar()
+        or 0
+    )
+
+
+def get_unread_count(db: Session, user_id: int) -> int:
+    """Unread count from the counter, computing it on a miss."""
+    client = get_redis_client()
+    if client is None:
+        return count_unread(db, user_id)
+    try:
+        cached = client.get(_key(user_id))
+        if cached is not None:
+            return max(int(cached), 0)
+    except Exception as e:
+        logger.warning(f"Failed to read unread counter for user {user_id}: {e}")
+        return count_unread(db, user_id)
+
+    count = count_unread(db, user_id)
+    try:
+        client.set(_key(user_id), count, ex=UNREAD_COUNT_TTL_SECONDS, nx=True)
+    except Exception as e:
+        logger.warning(f"Failed to store unread counter for user {user_id}: {e}")
+    return count
+
+
+def adjust_unread(user_id: int, delta: int) -> None:
+    """Add ``delta`` to an existing counter (no-op when absent)."""
+    client = get_redis_client()
+    if client is None or delta == 0:
+        return
+    try:
+        client.eval(_ADJUST_SCRIPT, 1, _key(user_id), delta, UNREAD_COUNT_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Failed to adjust unread counter for user {user_id}: {e}")
+        invalidate_unread(user_id)
+
+
+def set_unread(user_id: int, count: int) -> None:
+    """Overwrite the counter with a known value (e.g. 0 after mark-all-read)."""
+    client = get_redis_client()
+    if client is None:
+        return
+    try:
+        client.set(_key(user_id), count, ex=UNREAD_COUNT_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Failed to set unread counter for user {user_id}: {e}")
+
+
+def invalidate_unread(*user_ids: int) -> None:
+    """Drop counters so the next read recounts."""
+    client = get_redis_client()
+    if client is None or not user_ids:
+        return
+    try:
+        client.delete(*(_key(user_id) for user_id in user_ids))
+    except Exception as e:
+        logger.warning(f"Failed to invalidate unread counters {user_ids}: {e}")
+
+
+def reconcile_unread_counts(db: Session) -> dict[str, int]:
+    """Recount every live counter and repair the ones that drifted.
+
+    Returns:
+        {"checked": counters examined, "repaired": counters corrected}
+    """
+    client = get_redis_client()
+    if client is None:
+        return {"checked": 0, "repaired": 0}
+
+    prefix = UNREAD_KEY.format(user_id="")
+    user_ids = [
+        int(key[len(prefix) :]) for key in client.scan_iter(f"{prefix}*", count=1000)
+    ]
+    SN = models.SocialNotification
+    checked = repaired = 0
+    for start in range(0, len(user_ids), RECONCILE_BATCH_SIZE):
+        batch = user_ids[start : start + RECONCILE_BATCH_SIZE]
+        actual = dict(
+            db.query(SN.user_id, func.count(SN.id))
+            .filter(
+                SN.user_id.in_(batch),
+                SN.is_read == False,
+                _not_blocked(SN.user_id, SN.actor_id),
+            )
+            .group_by(SN.user_id)
+            .all()
+        )
+        stored = client.mget([_key(user_id) for user_id in batch])
+        pipe = client.pipeline(transaction=False)
+        for user_id, value in zip(batch, stored, strict=True):
+            if value is None:
+                continue  # expired or dropped since the scan
+            checked += 1
+            count = actual.get(user_id, 0)
+            if int(value) != count:
+                repaired += 1
+                pipe.set(_key(user_id), count, ex=UNREAD_COUNT_TTL_SECONDS, xx=True)
+        pipe.execute()
+    return {"checked": checked, "repaired": repaired}
@@ -0,0 +1,231 @@
+"""Transactional outbox for social notifications.
+
+Interactive handlers (reactions, comments, comment likes, remix publishing,
+moderation actions on posts) call
+``SocialNotificationService.enqueue_notification``, which only adds a
+``notification_outbox`` row to the caller's transaction — no extra commit,
+no Redis round trip on the request path. ``drain_notification_outbox``
+then turns pending intents into inbox rows in batches:
+
+1. claims up to ``OUTBOX_BATCH_SIZE`` intents (``FOR UPDATE SKIP LOCKED``,
+   so concurrent drainers never double-deliver);
+2. applies the per actor→recipient rate limit for the whole batch in one
+   pipelined INCRBY round trip (same keys and limit as create_notification);
+3. bulk-inserts the SocialNotification rows and deletes the intents in one
+   commit;
+4. dispatches the batch (unread counters + SSE bus) with one block query.
+
+Who drains:
+- In the API process, a drainer thread (``start_notification_drainer``,
+  started from the app lifespan) is woken by an ``after_commit`` hook as
+  soon as a session that enqueued commits, and also polls.
+- Where no drainer thread runs (tests, scripts, Celery workers), the hook
+  drains inline on a fresh session right after the commit.
+- The ``drain_notification_outbox`` Celery task sweeps every minute as a
+  safety net for intents left by a process that died before draining.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import defaultdict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, selectinload
+
+from .. import models
+from ..cache import get_redis_client
+from .social_notifications import (
+    MAX_NOTIFICATIONS_PER_HOUR_PER_PAIR,
+    OUTBOX_PENDING_KEY,
+    RATE_LIMIT_KEY,
+    SocialNotificationService,
+)
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_BATCH_SIZE = 500
+RATE_LIMIT_WINDOW_SECONDS = 3600
+
+_INTENT_FIELDS = (
+    "user_id",
+    "notification_type",
+    "post_id",
+    "actor_id",
+    "actor_handle",
+    "actor_avatar_url",
+    "emoji",
+    "comment_id",
+    "comment_preview",
+    "content_title",
+    "content_sqid",
+    "content_art_url",
+    "created_at",
+)
+
+
+def _rate_limited(intents: list[models.NotificationOutbox]) -> set[int]:
+    """Ids of intents over the per-pair hourly limit (fails open)."""
+    by_key: dict[str, list[models.NotificationOutbox]] = defaultdict(list)
+    for intent in intents:
+        if intent.actor_id is not None:
+            key = RATE_LIMIT_KEY.format(
+                actor_id=intent.actor_id, recipient_id=intent.user_id
+            )
+            by_key[key].append(intent)
+    client = get_redis_client()
+    if client is None or not by_key:
+        return set()
+
+    try:
+        pipe = client.pipeline(transaction=False)
+        for key, group in by_key.items():
+            pipe.incrby(key, len(group))
+        totals = pipe.execute()
+        for (key, group), total in zip(by_key.items(), totals, strict=True):
+            if total == len(group):
+                # First actions in the window, set expiry
+                pipe.expire(key, RATE_LIMIT_WINDOW_SECONDS)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Outbox rate limit check error: {e}")
+        return set()  # Fail open
+
+    limited: set[int] = set()
+    for (key, group), total in zip(by_key.items(), totals, strict=True):
+        allowed = max(0, MAX_NOTIFICATIONS_PER_HOUR_PER_PAIR - (total - len(group)))
+        for intent in group[allowed:]:
+            limited.add(intent.id)
+        if len(group) > allowed:
+            logger.warning(
+                f"Rate limit exceeded for notifications ({key}): "
+                f"{len(group) - allowed} dropped"
+            )
+    return limited
+
+
+def drain_notification_outbox(db: Session, limit: int = OUTBOX_BATCH_SIZE) -> int:
+    """Deliver one batch of pending intents. Returns the intents consumed."""
+    intents = (
+        db.query(models.NotificationOutbox)
+        .order_by(models.NotificationOutbox.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    if not intents:
+        db.rollback()
+        return 0
+
+    limited = _rate_limited(intents)
+    notifications = [
+        models.SocialNotification(
+            **{field: getattr(intent, field) for field in _INTENT_FIELDS}
+        )
+        for intent in intents
+        if intent.id not in limited
+    ]
+    db.add_all(notifications)
+    db.flush()
+    notification_ids = [n.id for n in notifications]
+    db.query(models.NotificationOutbox).filter(
+        models.NotificationOutbox.id.in_([intent.id for intent in intents])
+    ).delete(synchronize_session=False)
+    db.commit()
+
+    if notification_ids:
+        logger.info(f"Delivered {len(notification_ids)} notifications from the outbox")
+        try:
+            delivered = (
+                db.query(models.SocialNotification)
+                .options(selectinload(models.SocialNotification.actor))
+                .filter(models.SocialNotification.id.in_(notification_ids))
+                .order_by(models.SocialNotification.created_at)
+                .all()
+            )
+            SocialNotificationService.dispatch_notifications(db, delivered)
+        except Exception as e:
+            logger.warning(f"Outbox dispatch failed (rows are stored): {e}")
+    return len(intents)
+
+
+def drain_all(db: Session) -> int:
+    """Drain until the outbox is empty. Returns the intents consumed."""
+    total = 0
+    while (drained := drain_notification_outbox(db)) > 0:
+        total += drained
+    return total
+
+
+# ---------------------------------------------------------------------------
+# Drainer thread (API process)
+# ---------------------------------------------------------------------------
+
+_drainer_thread: threading.Thread | None = None
+_drainer_stop = threading.Event()
+_drainer_wake = threading.Event()
+
+# Poll interval when no commit wakes the drainer; bounds shutdown wait.
+_DRAINER_POLL_SECONDS = 2.0
+
+
+def _drainer_running() -> bool:
+    return _drainer_thread is not None and _drainer_thread.is_alive()
+
+
+def _drainer_loop() -> None:
+    from ..db import SessionLocal
+
+    while not _drainer_stop.is_set():
+        _drainer_wake.wait(_DRAINER_POLL_SECONDS)
+        _drainer_wake.clear()
+        db = SessionLocal()
+        try:
+            drain_all(db)
+        except Exception as e:
+            logger.warning(f"Notification outbox drain failed: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+
+def start_notification_drainer() -> None:
+    """Start the outbox drainer thread (idempotent)."""
+    global _drainer_thread
+    if _drainer_running():
+        return
+    _drainer_stop.clear()
+    _drainer_thread = threading.Thread(
+        target=_drainer_loop, name="notification-outbox-drainer", daemon=True
+    )
+    _drainer_thread.start()
+    logger.info("Notification outbox drainer started")
+
+
+def stop_notification_drainer() -> None:
+    global _drainer_thread
+    _drainer_stop.set()
+    _drainer_wake.set()
+    if _drainer_thread is not None:
+        _drainer_thread.join(_DRAINER_POLL_SECONDS * 2)
+        _drainer_thread = None
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    if not session.info.pop(OUTBOX_PENDING_KEY, False):
+        return
+    if _drainer_running():
+        _drainer_wake.set()
+        return
+    # No drainer in this process: deliver now on a separate session (the
+    # committing one is mid-transition and cannot run queries here).
+    inline = Session(bind=session.get_bind())
+    try:
+        drain_all(inline)
+    except Exception as e:
+        logger.warning(f"Inline notification outbox drain failed: {e}")
+        inline.rollback()
+    finally:
+        inline.close()
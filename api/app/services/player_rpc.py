@@ -16,7 +16,7 @@ import logging
 from datetime import datetime, timezone
 from typing import Any
 
-from sqlalchemy import and_, exists, func, or_, text
+from sqlalchemy import and_, exists, false, func, or_, text
 from sqlalchemy.orm import Session, joinedload
 
 from .. import models
@@ -43,10 +43,12 @@ from ..player_protocol.schemas import (
     SubmitReactionRequest,
     SubmitReactionResponse,
 )
+from ..utils.amp_features import AMP_FLAG_BITS, allowed_flag_values
 from ..utils.monitored_hashtags import (
     apply_monitored_hashtag_filter,
     post_has_unapproved_monitored_hashtags,
 )
+from . import channel_cache
 from .playset import PlaysetService
 from .rate_limit import check_rate_limit
 
@@ -133,17 +135,31 @@ def _build_artwork_payload(
     )
 
 
+def _playlist_sizes(db: Session, playlist_post_ids: list[int]) -> dict[int, int]:
+    """Item count of each playlist, in one grouped query."""
+    if not playlist_post_ids:
+        return {}
+    rows = (
+        db.query(
+            models.PlaylistItem.playlist_post_id, func.count(models.PlaylistItem.id)
+        )
+        .filter(models.PlaylistItem.playlist_post_id.in_(playlist_post_ids))
+        .group_by(models.PlaylistItem.playlist_post_id)
+        .all()
+    )
+    return {playlist_post_id: count for playlist_post_id, count in rows}
+
+
 def _build_playlist_payload(
     playlist_post: models.Post,
     db: Session,
+    total_artworks: int | None = None,
 ) -> PlaylistPostPayload:
-    # Total artworks is the full playlist size.
-    total_artworks = (
-        db.query(func.count(models.PlaylistItem.id))
-        .filter(models.PlaylistItem.playlist_post_id == playlist_post.id)
-        .scalar()
-        or 0
-    )
+    # Total artworks is the full playlist size (batched by _build_post_payloads).
+    if total_artworks is None:
+        total_artworks = _playlist_sizes(db, [playlist_post.id]).get(
+            playlist_post.id, 0
+        )
 
     return PlaylistPostPayload(
         post_id=playlist_post.id,
@@ -159,6 +175,31 @@ def _build_playlist_payload(
     )
 
 
+def _resolve_include_fields(requested: list[str] | None) -> set[str] | None:
+    """Intersect requested include_fields with the supported optional fields."""
+    if not requested:
+        return None
+    return set(requested) & OPTIONAL_ARTWORK_FIELDS
+
+
+def _build_post_payloads(
+    posts: list[models.Post],
+    include_fields: set[str] | None,
+    db: Session,
+) -> list[PlayerPostPayload]:
+    """Build wire payloads for a page of posts (artworks and playlists)."""
+    sizes = _playlist_sizes(db, [post.id for post in posts if post.kind == "playlist"])
+    payload_posts: list[PlayerPostPayload] = []
+    for post in posts:
+        if post.kind == "artwork":
+            payload_posts.append(_build_artwork_payload(post, include_fields))
+        elif post.kind == "playlist":
+            payload_posts.append(
+                _build_playlist_payload(post, db, sizes.get(post.id, 0))
+            )
+    return payload_posts
+
+
 def _apply_criteria_filters(
     query,
     criteria: list[FilterCriterion],
@@ -176,7 +217,9 @@ def _apply_criteria_filters(
     if not criteria:
         return query, None
 
-    # Map field names to Post model columns (direct Post fields)
+    # Map field names to Post model columns (direct Post fields).
+    # native_file_format reads the denormalized posts.native_format, which
+    # ix_posts_amp_native_format serves without touching post_files.
     field_to_column = {
         "width": models.Post.width,
         "height": models.Post.height,
@@ -184,10 +227,7 @@ def _apply_criteria_filters(
         "min_frame_duration_ms": models.Post.min_frame_duration_ms,
         "max_frame_duration_ms": models.Post.max_frame_duration_ms,
         "unique_colors": models.Post.unique_colors,
-        "transparency_meta": models.Post.transparency_meta,
-        "alpha_meta": models.Post.alpha_meta,
-        "transparency_actual": models.Post.transparency_actual,
-        "alpha_actual": models.Post.alpha_actual,
+        "native_file_format": models.Post.native_format,
         "kind": models.Post.kind,
     }
 
@@ -201,12 +241,8 @@ def _apply_criteria_filters(
     # Conditions for any PostFile row (file_format, file_bytes)
     pf_conditions = [models.PostFile.post_id == models.Post.id]
     has_pf_criteria = False
-    # Separate conditions for native PostFile row (native_file_format)
-    native_pf_conditions = [
-        models.PostFile.post_id == models.Post.id,
-        models.PostFile.is_native == True,  # noqa: E712
-    ]
-    has_native_pf_criteria = False
+    # Boolean transparency criteria, folded into one amp_flags IN-list
+    flag_criteria: list[tuple[str, str, bool]] = []
 
     def _build_condition(column, op, value, idx):
         if op == "eq":
@@ -238,12 +274,10 @@ def _apply_criteria_filters(
         value = criterion.value
 
         try:
-            if field_name == "native_file_format":
-                # Native format — separate EXISTS with is_native=True
-                native_pf_conditions.append(
-                    _build_condition(models.PostFile.format, op, value, i)
-                )
-                has_native_pf_criteria = True
+            if field_name in AMP_FLAG_BITS:
+                if op not in ("eq", "neq"):
+                    raise ValueError(f"Unknown operator in criterion {i}: {op}")
+                flag_criteria.append((field_name, op, value))
             elif field_name in postfile_field_to_column:
                 # PostFile criteria — collected into EXISTS subquery
                 pf_col = postfile_field_to_column[field_name]
@@ -261,8 +295,9 @@ def _apply_criteria_filters(
     if has_pf_criteria:
         filters.append(exists().where(*pf_conditions))
 
-    if has_native_pf_criteria:
-        filters.append(exists().where(*native_pf_conditions))
+    if flag_criteria:
+        allowed = allowed_flag_values(flag_criteria)
+        filters.append(models.Post.amp_flags.in_(allowed) if allowed else false())
 
     if filters:
         query = query.filter(and_(*filters))
@@ -304,28 +339,55 @@ def _resolve_target_user(
     return target_user
 
 
+def _normalize_channel_hashtag(hashtag: str | None) -> str:
+    """Validate and normalize the hashtag of a ``hashtag`` channel request."""
+    if not hashtag:
+        raise PlayerRpcError(
+            "missing_hashtag", "hashtag is required when channel='hashtag'"
+        )
+
+    # Normalize hashtag (lowercase, strip) to match how they're stored
+    hashtag_normalized = hashtag.strip().lower()
+    if not hashtag_normalized:
+        raise PlayerRpcError("invalid_hashtag", "hashtag cannot be empty")
+    return hashtag_normalized
+
+
 # ============================================================================
 # Request handlers
 # ============================================================================
 
 
-def query_posts(
+def _build_channel_query(
     player: models.Player,
     request: QueryPostsRequest,
     db: Session,
-) -> QueryPostsResponse:
-    """Handle a query_posts request."""
+    *,
+    ids_only: bool = False,
+    owner_filters: bool = True,
+):
+    """Build the filtered, sorted (unpaginated) post query for a channel request.
+
+    Shared by ``query_posts`` and the channel-window handlers in
+    ``app.services.channel_window`` so both page through exactly the same
+    ordering. With ``ids_only`` the query selects ``Post.id`` (first column of
+    each row) instead of loading full Post entities. With ``owner_filters``
+    off, the player owner's monitored-hashtag preferences are not applied, so
+    the result can be shared between players (``app.services.channel_cache``
+    applies them afterwards). Raises PlayerRpcError on an invalid
+    channel/criteria request.
+    """
     is_reactions_channel = request.channel == "reactions"
 
     # Build base query (include both artwork and playlist posts)
-    query = (
-        db.query(models.Post)
-        .options(joinedload(models.Post.owner))
-        .filter(
-            models.Post.kind.in_(["artwork", "playlist"]),
-            models.Post.public_sqid.isnot(None),
-            models.Post.public_sqid != "",
-        )
+    if ids_only:
+        query = db.query(models.Post.id)
+    else:
+        query = db.query(models.Post).options(joinedload(models.Post.owner))
+    query = query.filter(
+        models.Post.kind.in_(["artwork", "playlist"]),
+        models.Post.public_sqid.isnot(None),
+        models.Post.public_sqid != "",
     )
 
     # Apply channel filter
@@ -369,16 +431,7 @@ def query_posts(
         )
     elif request.channel == "hashtag":
         # Query posts by hashtag
-        if not request.hashtag:
-            raise PlayerRpcError(
-                "missing_hashtag", "hashtag is required when channel='hashtag'"
-            )
-
-        # Normalize hashtag (lowercase, strip) to match how they're stored
-        hashtag_normalized = request.hashtag.strip().lower()
-        if not hashtag_normalized:
-            raise PlayerRpcError("invalid_hashtag", "hashtag cannot be empty")
-
+        hashtag_normalized = _normalize_channel_hashtag(request.hashtag)
         query = query.filter(models.Post.hashtags.contains([hashtag_normalized]))
     elif request.channel == "artwork":
         # Protocol compatibility: do not exclude playlists (per server policy).
@@ -401,8 +454,8 @@ def query_posts(
         ~models.Post.non_conformant,
     )
 
-    # Apply public_visibility filter unless viewing own posts
-    # Posts pending approval are visible only to their owner.
+    # Apply public_visibility filter (via the discoverable flag) unless
+    # viewing own posts. Posts pending approval are visible only to their owner.
     # For the reactions channel, also exempt posts owned by the player's
     # own owner — matches the /reacted-posts HTTP endpoint behaviour where
     # a viewer sees their own private posts that others have reacted to.
@@ -415,10 +468,11 @@ def query_posts(
                 )
             )
         else:
-            query = query.filter(models.Post.public_visibility.is_(True))
+            query = query.filter(models.Post.discoverable)
 
     # Apply monitored hashtag filtering based on player owner's preferences
-    query = apply_monitored_hashtag_filter(query, models.Post, player.owner)
+    if owner_filters:
+        query = apply_monitored_hashtag_filter(query, models.Post, player.owner)
 
     # Apply AMP criteria filters
     if request.criteria:
@@ -449,6 +503,112 @@ def query_posts(
         # "server_order" - use id order (insertion order)
         query = query.order_by(models.Post.id.desc())
 
+    return query
+
+
+def _parse_offset_cursor(cursor: str | None) -> int:
+    if not cursor:
+        return 0
+    try:
+        return int(cursor)
+    except ValueError:
+        logger.warning(f"Invalid cursor: {cursor}")
+        return 0
+
+
+def _shared_channel_entry(
+    player: models.Player,
+    request: QueryPostsRequest,
+    db: Session,
+) -> tuple[str, dict] | None:
+    """Validate a shareable channel request and fetch its shared cache entry.
+
+    Thin wrapper over ``channel_cache.get_channel_entry`` that raises the same
+    PlayerRpcErrors as the direct query path before touching the cache.
+    """
+    target_user_id: int | None = None
+    if request.channel == "by_user":
+        target_user_id = _resolve_target_user(
+            request.user_handle, request.user_sqid, "by_user", db
+        ).id
+    elif request.channel == "hashtag":
+        _normalize_channel_hashtag(request.hashtag)
+
+    return channel_cache.get_channel_entry(
+        player, request, db, target_user_id=target_user_id
+    )
+
+
+def _shared_channel_ids(
+    player: models.Player,
+    request: QueryPostsRequest,
+    db: Session,
+) -> tuple[list[int], bool] | None:
+    """Owner-filtered ids of a shareable channel (see ``_shared_channel_entry``)."""
+    result = _shared_channel_entry(player, request, db)
+    if result is None:
+        return None
+    _, entry = result
+    ids = channel_cache.filter_entry_ids(entry, channel_cache.excluded_hashtags(player))
+    return ids, bool(entry.get("complete"))
+
+
+def _query_posts_from_shared_list(
+    player: models.Player,
+    request: QueryPostsRequest,
+    db: Session,
+) -> QueryPostsResponse | None:
+    """Serve a shareable query_posts page from the shared channel cache.
+
+    Returns None when the cache cannot answer (Redis down, or the page lies
+    beyond the cached depth of a truncated list) so the caller queries the
+    database directly. Pagination is the same offset cursor as the direct path.
+    """
+    result = _shared_channel_ids(player, request, db)
+    if result is None:
+        return None
+    ids, complete = result
+
+    offset = _parse_offset_cursor(request.cursor)
+    page_ids = ids[offset : offset + request.limit + 1]
+    if not complete and offset + request.limit + 1 > len(ids):
+        return None
+
+    has_more = len(page_ids) > request.limit
+    posts = channel_cache.load_posts_in_order(
+        db, page_ids[: request.limit], public_only=True
+    )
+    payload_posts = _build_post_payloads(
+        posts, _resolve_include_fields(request.include_fields), db
+    )
+
+    logger.info(
+        f"query_posts for player {player.player_key}: {len(payload_posts)} posts "
+        f"(shared channel cache)"
+    )
+
+    return QueryPostsResponse(
+        request_id=request.request_id,
+        posts=payload_posts,
+        next_cursor=str(offset + request.limit) if has_more else None,
+        has_more=has_more,
+    )
+
+
+def query_posts(
+    player: models.Player,
+    request: QueryPostsRequest,
+    db: Session,
+) -> QueryPostsResponse:
+    """Handle a query_posts request."""
+    if channel_cache.is_shareable(request):
+        response = _query_posts_from_shared_list(player, request, db)
+        if response is not None:
+            return response
+
+    is_reactions_channel = request.channel == "reactions"
+    query = _build_channel_query(player, request, db)
+
     # Apply cursor pagination
     offset = 0
     if is_reactions_channel:
@@ -468,11 +628,7 @@ def query_posts(
         query = query.limit(request.limit + 1)
     else:
         # Offset-based pagination for every other channel
-        if request.cursor:
-            try:
-                offset = int(request.cursor)
-            except ValueError:
-                logger.warning(f"Invalid cursor: {request.cursor}")
+        offset = _parse_offset_cursor(request.cursor)
         query = query.offset(offset).limit(request.limit + 1)
 
     # Execute query
@@ -495,19 +651,12 @@ def query_posts(
         else:
             next_cursor = str(offset + request.limit)
 
-    # Compute valid include_fields set
-    include_fields: set[str] | None = None
-    if request.include_fields:
-        include_fields = set(request.include_fields) & OPTIONAL_ARTWORK_FIELDS
-
     # Build response payload posts
-    payload_posts: list[PlayerPostPayload] = []
-    for row in posts:
-        post = row.Post if is_reactions_channel else row
-        if post.kind == "artwork":
-            payload_posts.append(_build_artwork_payload(post, include_fields))
-        elif post.kind == "playlist":
-            payload_posts.append(_build_playlist_payload(post, db))
+    payload_posts = _build_post_payloads(
+        [row.Post if is_reactions_channel else row for row in posts],
+        _resolve_include_fields(request.include_fields),
+        db,
+    )
 
     logger.info(
         f"query_posts for player {player.player_key}: {len(payload_posts)} posts"
@@ -555,10 +704,7 @@ def get_post(
             "content_not_approved", "Post contains content not approved by user"
         )
 
-    # Compute valid include_fields set
-    include_fields: set[str] | None = None
-    if request.include_fields:
-        include_fields = set(request.include_fields) & OPTIONAL_ARTWORK_FIELDS
+    include_fields = _resolve_include_fields(request.include_fields)
 
     if post.kind == "artwork":
         payload_post: PlayerPostPayload = _build_artwork_payload(post, include_fields)
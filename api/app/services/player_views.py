@@ -5,6 +5,8 @@ limiting, post-existence and self-view checks, and async dispatch to the
 ``write_view_event`` Celery task. Both transports call :func:`record_view_event`
 with an authenticated ``Player`` and a validated ``P3AViewEvent`` and translate
 the returned status into their own response (an MQTT ack or an HTTP status).
+Buffered views submitted together go through :func:`record_view_batch`, which
+applies the same rules with bulk Redis/DB round trips.
 """
 
 from __future__ import annotations
@@ -12,11 +14,17 @@ from __future__ import annotations
 import logging
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from typing import Any
 
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
 from .. import models
-from ..player_protocol.schemas import P3AViewEvent
+from ..player_protocol.schemas import (
+    P3AViewBatchAck,
+    P3AViewBatchItemResult,
+    P3AViewEvent,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +37,7 @@ DUPLICATE = "duplicate"
 RATE_LIMITED = "rate_limited"
 POST_NOT_FOUND = "post_not_found"
 SELF_VIEW = "self_view"  # accepted, but intentionally not recorded
+INVALID = "invalid"  # batch item failed validation
 
 
 @dataclass
@@ -74,43 +83,47 @@ def record_view_event(
         logger.warning(f"View event for non-existent post: {event.post_id}")
         return ViewIngestResult(POST_NOT_FOUND)
 
-    # Don't record a view if the player's owner is the post's owner.
-    if player.owner_id == post.owner_id:
-        logger.debug(
-            f"Skipped self-view for post {event.post_id} by player {player_key}"
-        )
-        return ViewIngestResult(SELF_VIEW)
+    result, event_data = _prepare_view(
+        player, event, post.owner_id, created_at=datetime.now(timezone.utc)
+    )
+    if event_data is None:
+        return result
 
     from ..tasks import write_view_event
-    from ..utils.view_tracking import ViewSource, hash_ip, visitor_key
-    from .rate_limit import check_and_set_daily_view_dedup
+
+    write_view_event.delay(event_data)
+    logger.info(f"Recorded view for post {event.post_id} from player {player_key}")
+    return result
+
+
+def _view_type(event: P3AViewEvent) -> str:
+    """Map p3a's intent to the canonical model (docs/artwork-views/ D6).
+
+    An explicit artwork request is an Artwork View, channel playback is an
+    Impression.
+    """
     from .view_metrics import IMPRESSION, VIEW
 
-    # Map p3a's intent to the canonical model (docs/artwork-views/ D6):
-    # an explicit artwork request is an Artwork View, channel playback is an
-    # Impression.
     if event.intent == "artwork":
-        view_type = VIEW
-    elif event.intent == "channel":
-        view_type = IMPRESSION
-    else:
+        return VIEW
+    if event.intent != "channel":
         logger.warning(
             f"Unexpected intent value: {event.intent}, defaulting to impression"
         )
-        view_type = IMPRESSION
+    return IMPRESSION
 
-    # Views count once per (Visitor, artwork, UTC day). The player's owner is
-    # the Visitor (same identity space as their web sessions), so an owner's
-    # web View and their player's View of the same artwork collapse to one.
-    if view_type == VIEW:
-        if check_and_set_daily_view_dedup(
-            visitor_key(player.owner_id, ""), event.post_id
-        ):
-            logger.debug(
-                f"Daily-deduped player view: owner={player.owner_id}, "
-                f"post={event.post_id}"
-            )
-            return ViewIngestResult(DUPLICATE)
+
+def _event_data(
+    player: models.Player,
+    event: P3AViewEvent,
+    view_type: str,
+    *,
+    created_at: datetime,
+) -> dict:
+    """Build the ``write_view_event(s)`` payload for an accepted view."""
+    from ..utils.view_tracking import ViewSource, hash_ip
+
+    player_key = str(player.player_key)
 
     # Reject "1970-01-01T00:00:00Z" (unsynced device) -> store NULL local time.
     local_datetime = event.timestamp if event.timestamp != UNSYNC_TIMESTAMP else None
@@ -125,7 +138,7 @@ def record_view_event(
     # Players use a synthetic IP hash derived from their key.
     player_ip_hash = hash_ip(f"player:{player_key}")
 
-    event_data = {
+    return {
         "post_id": str(event.post_id),
         "viewer_user_id": str(player.owner_id),
         "viewer_ip_hash": player_ip_hash,
@@ -135,7 +148,7 @@ def record_view_event(
         "view_type": view_type,
         "user_agent_hash": None,
         "referrer_domain": None,
-        "created_at": datetime.now(timezone.utc).isoformat(),
+        "created_at": created_at.isoformat(),
         # Player-specific fields
         "player_id": str(player.id),
         "local_datetime": local_datetime,
@@ -145,6 +158,242 @@ def record_view_event(
         "channel_context": channel_context,
     }
 
-    write_view_event.delay(event_data)
-    logger.info(f"Recorded view for post {event.post_id} from player {player_key}")
-    return ViewIngestResult(RECORDED)
+
+def _prepare_view(
+    player: models.Player,
+    event: P3AViewEvent,
+    post_owner_id: int,
+    *,
+    created_at: datetime,
+) -> tuple[ViewIngestResult, dict | None]:
+    """Apply the self-view and daily-dedup rules and build the task payload.
+
+    Returns ``(result, event_data)``; ``event_data`` is None when the view is
+    accepted-but-skipped (self-view) or deduplicated, and otherwise holds the
+    ``write_view_event`` payload for the caller to dispatch.
+    """
+    player_key = str(player.player_key)
+
+    # Don't record a view if the player's owner is the post's owner.
+    if player.owner_id == post_owner_id:
+        logger.debug(
+            f"Skipped self-view for post {event.post_id} by player {player_key}"
+        )
+        return ViewIngestResult(SELF_VIEW), None
+
+    from ..utils.view_tracking import visitor_key
+    from .rate_limit import check_and_set_daily_view_dedup
+    from .view_metrics import VIEW
+
+    view_type = _view_type(event)
+
+    # Views count once per (Visitor, artwork, UTC day). The player's owner is
+    # the Visitor (same identity space as their web sessions), so an owner's
+    # web View and their player's View of the same artwork collapse to one.
+    if view_type == VIEW:
+        if check_and_set_daily_view_dedup(
+            visitor_key(player.owner_id, ""), event.post_id
+        ):
+            logger.debug(
+                f"Daily-deduped player view: owner={player.owner_id}, "
+                f"post={event.post_id}"
+            )
+            return ViewIngestResult(DUPLICATE), None
+
+    return ViewIngestResult(RECORDED), _event_data(
+        player, event, view_type, created_at=created_at
+    )
+
+
+def _batch_created_at(timestamp: str, now: datetime) -> datetime:
+    """When a buffered view happened, for ``view_events.created_at``.
+
+    The device's original UTC timestamp is used when it is synced and falls
+    within the current UTC day; earlier days have already been consumed by
+    ``rollup_view_events``, so older (or future, or unparseable) timestamps
+    fall back to the server time, like the single-event path.
+    """
+    if timestamp == UNSYNC_TIMESTAMP:
+        return now
+    try:
+        when = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    except ValueError:
+        return now
+    if when.tzinfo is None:
+        return now
+    when = when.astimezone(timezone.utc)
+    day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if day_start <= when <= now:
+        return when
+    return now
+
+
+def record_view_batch(
+    player: models.Player, raw_events: list[dict[str, Any]], db: Session
+) -> list[ViewIngestResult]:
+    """Ingest a batch of buffered view events for an authenticated player.
+
+    Same rules as :func:`record_view_event`, applied in bulk: each item is
+    validated on its own, retransmissions (60s window) and daily-deduped Views
+    are found with pipelined Redis lookups, posts are loaded with one query,
+    and only the views that will actually be recorded draw from the player's
+    batch budget (``reserve_player_view_budget``), in submission order.
+    Everything accepted is written by a single ``write_view_events`` task.
+    Returns one result per input item, in order.
+    """
+    from ..utils.view_tracking import visitor_key
+    from .rate_limit import (
+        claim_daily_views,
+        find_daily_view_duplicates,
+        find_view_duplicates,
+        mark_views_seen,
+        release_player_view_budget,
+        reserve_player_view_budget,
+    )
+    from .view_metrics import VIEW
+
+    player_key = str(player.player_key)
+    results: list[ViewIngestResult | None] = [None] * len(raw_events)
+
+    # 1. Validate and drop in-batch repeats.
+    candidates: list[tuple[int, P3AViewEvent]] = []
+    seen: set[tuple[int, str]] = set()
+    for index, raw in enumerate(raw_events):
+        try:
+            if not isinstance(raw, dict):
+                raise ValueError("event must be an object")
+            event = P3AViewEvent(**{**raw, "player_key": player_key})
+        except (ValidationError, ValueError, TypeError):
+            results[index] = ViewIngestResult(INVALID)
+            continue
+        dedup_id = (event.post_id, event.timestamp)
+        if dedup_id in seen:
+            results[index] = ViewIngestResult(DUPLICATE)
+            continue
+        seen.add(dedup_id)
+        candidates.append((index, event))
+
+    # 2. Retransmissions of events accepted recently.
+    duplicates = find_view_duplicates(
+        player_key, [(e.post_id, e.timestamp) for _, e in candidates]
+    )
+    fresh = []
+    for (index, event), duplicate in zip(candidates, duplicates, strict=True):
+        if duplicate:
+            results[index] = ViewIngestResult(DUPLICATE)
+        else:
+            fresh.append((index, event))
+
+    # 3. One query for post existence/ownership; missing posts and self-views
+    # are settled here and never touch the budget.
+    owners: dict[int, int] = {}
+    if fresh:
+        owners = dict(
+            db.query(models.Post.id, models.Post.owner_id)
+            .filter(models.Post.id.in_({e.post_id for _, e in fresh}))
+            .all()
+        )
+    typed: list[tuple[int, P3AViewEvent, str]] = []
+    for index, event in fresh:
+        if event.post_id not in owners:
+            results[index] = ViewIngestResult(POST_NOT_FOUND)
+        elif owners[event.post_id] == player.owner_id:
+            results[index] = ViewIngestResult(SELF_VIEW)
+        else:
+            typed.append((index, event, _view_type(event)))
+
+    # 4. Views count once per (owner, artwork, UTC day) — see _prepare_view —
+    # checked for the whole batch in one round trip.
+    visitor = visitor_key(player.owner_id, "")
+    view_post_ids = [e.post_id for _, e, t in typed if t == VIEW]
+    counted = dict(
+        zip(
+            view_post_ids,
+            find_daily_view_duplicates(visitor, view_post_ids),
+            strict=True,
+        )
+    )
+    recordable: list[tuple[int, P3AViewEvent, str]] = []
+    for index, event, view_type in typed:
+        if view_type == VIEW:
+            if counted[event.post_id]:
+                results[index] = ViewIngestResult(DUPLICATE)
+                continue
+            counted[event.post_id] = True
+        recordable.append((index, event, view_type))
+
+    # 5. Count-based budget for the views that will be recorded, granted in
+    # submission order.
+    granted, retry_after = reserve_player_view_budget(player_key, len(recordable))
+    for index, _, _ in recordable[granted:]:
+        results[index] = ViewIngestResult(RATE_LIMITED, retry_after)
+    recordable = recordable[:granted]
+
+    # 6. Claim the retransmit keys, then the daily View slots of the winners;
+    # losing either race means a concurrent submission got there first, and
+    # the budget drawn for it is handed back.
+    claimed = mark_views_seen(
+        player_key, [(e.post_id, e.timestamp) for _, e, _ in recordable]
+    )
+    lost = {
+        index for (index, _, _), ok in zip(recordable, claimed, strict=True) if not ok
+    }
+    view_winners = [
+        (index, event)
+        for index, event, view_type in recordable
+        if view_type == VIEW and index not in lost
+    ]
+    daily = claim_daily_views(visitor, [e.post_id for _, e in view_winners])
+    lost.update(
+        index for (index, _), ok in zip(view_winners, daily, strict=True) if not ok
+    )
+    release_player_view_budget(player_key, len(lost))
+
+    now = datetime.now(timezone.utc)
+    to_write: list[dict] = []
+    for index, event, view_type in recordable:
+        if index in lost:
+            results[index] = ViewIngestResult(DUPLICATE)
+            continue
+        results[index] = ViewIngestResult(RECORDED)
+        to_write.append(
+            _event_data(
+                player,
+                event,
+                view_type,
+                created_at=_batch_created_at(event.timestamp, now),
+            )
+        )
+
+    if to_write:
+        from ..tasks import write_view_events
+
+        write_view_events.delay(to_write)
+    logger.info(
+        f"View batch from player {player_key}: {len(raw_events)} submitted, "
+        f"{len(to_write)} recorded"
+    )
+    return results  # type: ignore[return-value]
+
+
+def build_view_batch_ack(
+    batch_id: str | None, results: list[ViewIngestResult]
+) -> P3AViewBatchAck:
+    """Translate batch results into the transport-neutral batch acknowledgment.
+
+    ``RECORDED`` and ``SELF_VIEW`` both read as ``accepted`` to the device,
+    matching the single-event ack.
+    """
+    items = []
+    retry_after = None
+    for index, result in enumerate(results):
+        status = "accepted" if result.status in (RECORDED, SELF_VIEW) else result.status
+        items.append(P3AViewBatchItemResult(index=index, status=status))
+        if result.retry_after is not None:
+            retry_after = max(retry_after or 0.0, result.retry_after)
+    return P3AViewBatchAck(
+        batch_id=batch_id,
+        accepted=sum(1 for item in items if item.status == "accepted"),
+        results=items,
+        retry_after=retry_after,
+    )
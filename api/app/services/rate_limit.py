@@ -254,6 +254,21 @@ def check_web_view_rate_limit(
         return True, None
 
 
+def _daily_view_dedup_key(visitor: tuple[str, str], post_id: int, now) -> str:
+    scope, ident = visitor
+    return f"viewdedup:{scope}:{ident}:{post_id}:{now.strftime('%Y%m%d')}"
+
+
+def _daily_view_dedup_ttl(now) -> int:
+    """Seconds until just past the next UTC midnight."""
+    from datetime import timedelta
+
+    next_midnight = (now + timedelta(days=1)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    return max(60, int((next_midnight - now).total_seconds()) + 60)
+
+
 def check_and_set_daily_view_dedup(visitor: tuple[str, str], post_id: int) -> bool:
     """
     Per-day Artwork View dedup (docs/artwork-views/ D2): a Visitor counts at
@@ -272,27 +287,79 @@ def check_and_set_daily_view_dedup(visitor: tuple[str, str], post_id: int) -> bo
         True if this View was already counted today (suppress), False if fresh
         (and the slot is now marked).
     """
-    from datetime import datetime, timedelta, timezone
+    from datetime import datetime, timezone
 
     client = get_redis_client()
     if not client:
         return False
 
     try:
-        scope, ident = visitor
         now = datetime.now(timezone.utc)
-        key = f"viewdedup:{scope}:{ident}:{post_id}:{now.strftime('%Y%m%d')}"
-        next_midnight = (now + timedelta(days=1)).replace(
-            hour=0, minute=0, second=0, microsecond=0
+        was_set = client.set(
+            _daily_view_dedup_key(visitor, post_id, now),
+            "1",
+            nx=True,
+            ex=_daily_view_dedup_ttl(now),
         )
-        ttl = max(60, int((next_midnight - now).total_seconds()) + 60)
-        was_set = client.set(key, "1", nx=True, ex=ttl)
         return not bool(was_set)
     except Exception as e:
         logger.error(f"Daily view dedup check error: {e}")
         return False
 
 
+def find_daily_view_duplicates(
+    visitor: tuple[str, str], post_ids: list[int]
+) -> list[bool]:
+    """
+    Bulk lookup of check_and_set_daily_view_dedup's slots, in one pipelined
+    round trip. Only checks; call claim_daily_views for the views recorded.
+
+    Returns one flag per post id, True if that View was already counted
+    today (fails open to all False when Redis is unavailable).
+    """
+    from datetime import datetime, timezone
+
+    client = get_redis_client()
+    if not client or not post_ids:
+        return [False] * len(post_ids)
+
+    try:
+        now = datetime.now(timezone.utc)
+        pipe = client.pipeline(transaction=False)
+        for post_id in post_ids:
+            pipe.exists(_daily_view_dedup_key(visitor, post_id, now))
+        return [bool(hit) for hit in pipe.execute()]
+    except Exception as e:
+        logger.error(f"Bulk daily view dedup check error: {e}")
+        return [False] * len(post_ids)
+
+
+def claim_daily_views(visitor: tuple[str, str], post_ids: list[int]) -> list[bool]:
+    """
+    Mark the per-day View slots for ``post_ids`` (SET NX, pipelined).
+
+    Returns one flag per post id, True if this call marked it and False if a
+    concurrent View of the same artwork was counted first. Fails open to all
+    True when Redis is unavailable.
+    """
+    from datetime import datetime, timezone
+
+    client = get_redis_client()
+    if not client or not post_ids:
+        return [True] * len(post_ids)
+
+    try:
+        now = datetime.now(timezone.utc)
+        ttl = _daily_view_dedup_ttl(now)
+        pipe = client.pipeline(transaction=False)
+        for post_id in post_ids:
+            pipe.set(_daily_view_dedup_key(visitor, post_id, now), "1", nx=True, ex=ttl)
+        return [bool(ok) for ok in pipe.execute()]
+    except Exception as e:
+        logger.error(f"Bulk daily view dedup marking error: {e}")
+        return [True] * len(post_ids)
+
+
 def check_view_duplicate(player_key: str, post_id: int, timestamp: str) -> bool:
     """
     Check if a view event is a duplicate.
@@ -334,3 +401,135 @@ def check_view_duplicate(player_key: str, post_id: int, timestamp: str) -> bool:
         logger.error(f"View deduplication check error: {e}")
         # Fail open - allow potentially duplicate view
         return False
+
+
+# Batched player views (docs/player/reporting.md) draw from a per-player count
+# budget instead of the 1-per-5s gate: the same sustained rate, but a player
+# reconnecting after a gap can flush its buffered views in one message.
+PLAYER_VIEW_BATCH_LIMIT = 720
+PLAYER_VIEW_BATCH_WINDOW_SECONDS = 3600
+
+
+def _view_dedup_key(player_key: str, post_id: int, timestamp: str) -> str:
+    return f"view_dedup:{player_key}:{post_id}:{timestamp}"
+
+
+def find_view_duplicates(player_key: str, items: list[tuple[int, str]]) -> list[bool]:
+    """
+    Bulk variant of check_view_duplicate's lookup, in one pipelined round trip.
+
+    Only checks — no dedup keys are set, so events rejected later (e.g. rate
+    limited) can be resent. Call mark_views_seen for the events accepted.
+
+    Args:
+        player_key: Player's unique key (UUID as string)
+        items: (post_id, timestamp) pairs
+
+    Returns:
+        One flag per item, True if the event was already seen (fails open to
+        all False when Redis is unavailable)
+    """
+    client = get_redis_client()
+    if not client or not items:
+        return [False] * len(items)
+
+    try:
+        pipe = client.pipeline(transaction=False)
+        for post_id, timestamp in items:
+            pipe.exists(_view_dedup_key(player_key, post_id, timestamp))
+        return [bool(hit) for hit in pipe.execute()]
+    except Exception as e:
+        logger.error(f"Bulk view deduplication check error: {e}")
+        return [False] * len(items)
+
+
+def mark_views_seen(player_key: str, items: list[tuple[int, str]]) -> list[bool]:
+    """
+    Set the dedup keys for accepted events (SET NX, same 60s expiry).
+
+    Returns one flag per item, True if this call marked it and False if
+    another submission marked it first (a concurrent retransmission). Fails
+    open to all True when Redis is unavailable.
+    """
+    client = get_redis_client()
+    if not client or not items:
+        return [True] * len(items)
+
+    try:
+        pipe = client.pipeline(transaction=False)
+        for post_id, timestamp in items:
+            pipe.set(
+                _view_dedup_key(player_key, post_id, timestamp), "1", nx=True, ex=60
+            )
+        return [bool(ok) for ok in pipe.execute()]
+    except Exception as e:
+        logger.error(f"Bulk view dedup marking error: {e}")
+        return [True] * len(items)
+
+
+def reserve_player_view_budget(player_key: str, count: int) -> tuple[int, float | None]:
+    """
+    Reserve up to ``count`` views from the player's batch budget.
+
+    Uses a fixed-window counter (PLAYER_VIEW_BATCH_LIMIT per
+    PLAYER_VIEW_BATCH_WINDOW_SECONDS). Views that do not fit are handed back
+    so a partially rate-limited batch only consumes what it was granted.
+
+    Args:
+        player_key: Player's unique key (UUID as string)
+        count: Number of views the batch wants to record
+
+    Returns:
+        Tuple of (granted: int, retry_after: float | None)
+        - granted: How many of the ``count`` views may be recorded
+        - retry_after: Seconds until the window resets (only set when
+          granted < count)
+    """
+    client = get_redis_client()
+
+    if not client or count <= 0:
+        return count, None
+
+    key = f"ratelimit:player_view_batch:{player_key}"
+    try:
+        pipe = client.pipeline()
+        pipe.incrby(key, count)
+        pipe.ttl(key)
+        total, ttl = pipe.execute()
+        if ttl is None or ttl < 0:
+            # First reservation of this window.
+            client.expire(key, PLAYER_VIEW_BATCH_WINDOW_SECONDS)
+            ttl = PLAYER_VIEW_BATCH_WINDOW_SECONDS
+
+        used_before = int(total) - count
+        granted = max(0, min(count, PLAYER_VIEW_BATCH_LIMIT - used_before))
+        if granted == count:
+            return count, None
+
+        client.decrby(key, count - granted)
+        retry_after = float(ttl) if ttl and ttl > 0 else 0.0
+        logger.debug(
+            f"Player {player_key} view batch limited: {granted}/{count} granted, "
+            f"retry after {retry_after}s"
+        )
+        return granted, retry_after
+
+    except Exception as e:
+        logger.error(f"Player view batch budget error for '{player_key}': {e}")
+        # Fail open - allow request if Redis error
+        return count, None
+
+
+def release_player_view_budget(player_key: str, count: int) -> None:
+    """
+    Hand back ``count`` views reserved with reserve_player_view_budget that
+    were not recorded after all (e.g. lost a dedup race).
+    """
+    client = get_redis_client()
+    if not client or count <= 0:
+        return
+
+    try:
+        client.decrby(f"ratelimit:player_view_batch:{player_key}", count)
+    except Exception as e:
+        logger.error(f"Player view batch budget release error for '{player_key}': {e}")
@@ -0,0 +1,253 @@
+"""Search documents and ranked search for GET /search.
+
+One ``search_documents`` row per post and per user holds the searchable text
+in two indexed forms:
+
+- ``tsv`` — weighted full-text vector ('simple' config, so no stemming of
+  handles or tags): post title / user handle at weight A, hashtags B,
+  description C. GIN-indexed; queries use prefix terms (``pixel:*``) so
+  partial words match while typing.
+- ``search_text`` — lowercased title + hashtags (posts) or handle (users),
+  GIN trigram-indexed for typo-tolerant ``word_similarity`` matches.
+
+Both kinds of result are ranked together by ``ts_rank_cd + word_similarity``
+(rounded, so it compares exactly in cursors) with the document id as the
+tie-break: the keyset cursor ``(score, id)`` is unique and stable across
+pages.
+
+Documents are written by explicit calls on text edits (``index_post`` /
+``index_user``), a short-window refresh for new users
+(``refresh_recent_user_documents``), and a nightly full rebuild that also
+drops orphans (``rebuild_search_documents``). Visibility, bans, blocks and
+monitored hashtags are checked against the source rows at query time, so
+documents never need updating for moderation changes.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import Numeric, and_, cast, func, literal, or_, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..pagination import decode_cursor, encode_cursor
+from ..utils.blocks import apply_block_filter
+from ..utils.monitored_hashtags import apply_monitored_hashtag_filter
+
+logger = logging.getLogger(__name__)
+
+TS_CONFIG = "simple"
+# Query terms beyond this are ignored (bounds the tsquery and trigram work).
+MAX_QUERY_TERMS = 8
+# Window re-indexed by the periodic user refresh; wider than its interval.
+USER_REFRESH_WINDOW_MINUTES = 15
+
+ENTITY_TYPES = {"posts": "post", "users": "user"}
+
+_POST_DOCS_SQL = """
+SELECT 'post', p.id, p.owner_id,
+       lower(concat_ws(' ', p.title, array_to_string(p.hashtags, ' '))),
+       setweight(to_tsvector('simple', coalesce(p.title, '')), 'A')
+       || setweight(
+            to_tsvector('simple', coalesce(array_to_string(p.hashtags, ' '), '')),
+            'B')
+       || setweight(to_tsvector('simple', coalesce(p.description, '')), 'C')
+FROM posts p
+WHERE p.deleted_by_user = false
+"""
+
+_USER_DOCS_SQL = """
+SELECT 'user', u.id, u.id, lower(u.handle),
+       setweight(to_tsvector('simple', replace(u.handle, '_', ' ')), 'A')
+FROM users u
+WHERE true
+"""
+
+_UPSERT_SQL = """
+INSERT INTO search_documents (entity_type, entity_id, owner_id, search_text, tsv)
+{select}
+ON CONFLICT (entity_type, entity_id) DO UPDATE
+SET owner_id = EXCLUDED.owner_id,
+    search_text = EXCLUDED.search_text,
+    tsv = EXCLUDED.tsv,
+    updated_at = now()
+WHERE search_documents.search_text IS DISTINCT FROM EXCLUDED.search_text
+   OR search_documents.tsv IS DISTINCT FROM EXCLUDED.tsv
+   OR search_documents.owner_id IS DISTINCT FROM EXCLUDED.owner_id
+"""
+
+_DELETE_ORPHANS_SQL = """
+DELETE FROM search_documents d
+WHERE (d.entity_type = 'post' AND NOT EXISTS (
+          SELECT 1 FROM posts p
+          WHERE p.id = d.entity_id AND p.deleted_by_user = false))
+   OR (d.entity_type = 'user' AND NOT EXISTS (
+          SELECT 1 FROM users u WHERE u.id = d.entity_id))
+"""
+
+
+# ---------------------------------------------------------------------------
+# Maintenance
+# ---------------------------------------------------------------------------
+
+
+def index_post(db: Session, post_id: int) -> None:
+    """(Re)index one post's text in the current transaction (no commit)."""
+    db.flush()
+    db.execute(
+        text(_UPSERT_SQL.format(select=_POST_DOCS_SQL + " AND p.id = :id")),
+        {"id": post_id},
+    )
+
+
+def index_user(db: Session, user_id: int) -> None:
+    """(Re)index one user's handle in the current transaction (no commit)."""
+    db.flush()
+    db.execute(
+        text(_UPSERT_SQL.format(select=_USER_DOCS_SQL + " AND u.id = :id")),
+        {"id": user_id},
+    )
+
+
+def refresh_recent_user_documents(db: Session) -> int:
+    """Index users created or updated within the refresh window.
+
+    New accounts are created on several auth paths; this catches all of
+    them without a hook per path. Returns the number of rows written.
+    """
+    result = db.execute(
+        text(
+            _UPSERT_SQL.format(
+                select=_USER_DOCS_SQL + " AND greatest(u.created_at, u.updated_at)"
+                " > now() - make_interval(mins => :minutes)"
+            )
+        ),
+        {"minutes": USER_REFRESH_WINDOW_MINUTES},
+    )
+    db.commit()
+    return result.rowcount
+
+
+def rebuild_search_documents(db: Session) -> dict[str, int]:
+    """Re-derive every document from its source row and drop orphans.
+
+    Rows whose text is unchanged are skipped by the upsert's WHERE, so a
+    nightly run rewrites only drifted documents.
+
+    Returns:
+        {"posts": post rows written, "users": user rows written,
+         "deleted": orphan rows removed}
+    """
+    posts = db.execute(text(_UPSERT_SQL.format(select=_POST_DOCS_SQL))).rowcount
+    users = db.execute(text(_UPSERT_SQL.format(select=_USER_DOCS_SQL))).rowcount
+    deleted = db.execute(text(_DELETE_ORPHANS_SQL)).rowcount
+    db.commit()
+    return {"posts": posts, "users": users, "deleted": deleted}
+
+
+# ---------------------------------------------------------------------------
+# Search
+# ---------------------------------------------------------------------------
+
+
+def query_terms(q: str) -> list[str]:
+    """Lowercased word terms of a query (punctuation and quotes dropped)."""
+    return re.findall(r"\w+", q.lower())[:MAX_QUERY_TERMS]
+
+
+def _visible_post(db: Session, viewer: models.User | None):
+    SD = models.SearchDocument
+    query = db.query(models.Post.id).filter(
+        models.Post.id == SD.entity_id,
+        models.Post.discoverable == True,
+    )
+    return apply_monitored_hashtag_filter(query, models.Post, viewer).exists()
+
+
+def _visible_user(db: Session):
+    SD = models.SearchDocument
+    return (
+        db.query(models.User.id)
+        .filter(
+            models.User.id == SD.entity_id,
+            models.User.hidden_by_user == False,
+            models.User.hidden_by_mod == False,
+            models.User.non_conformant == False,
+            models.User.deactivated == False,
+            # Banned users 404 on their profile; they must not be discoverable
+            # via search either (banned_until is non-NULL when banned).
+            models.User.banned_until.is_(None),
+            models.User.email_verified == True,
+            # Always hide owner from search
+            ~models.User.roles.cast(JSONB).contains(["owner"]),
+        )
+        .exists()
+    )
+
+
+def _decode_search_cursor(cursor: str | None) -> tuple[Decimal, int] | None:
+    data = decode_cursor(cursor)
+    if not data or data[1] is None:
+        return None
+    try:
+        return Decimal(str(data[1])), int(data[0])
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def search_documents(
+    db: Session,
+    viewer: models.User | None,
+    q: str,
+    entity_types: set[str],
+    cursor: str | None,
+    limit: int,
+) -> tuple[list[tuple[str, int]], str | None]:
+    """Ranked page of matching, visible documents.
+
+    Returns ([(entity_type, entity_id), ...], next_cursor).
+    """
+    terms = query_terms(q)
+    if not terms or not entity_types:
+        return [], None
+
+    SD = models.SearchDocument
+    tsquery = func.to_tsquery(TS_CONFIG, " & ".join(f"{t}:*" for t in terms))
+    phrase = " ".join(terms)
+    score = func.round(
+        cast(
+            func.ts_rank_cd(SD.tsv, tsquery, 1)
+            + func.word_similarity(phrase, SD.search_text),
+            Numeric,
+        ),
+        6,
+    )
+
+    query = db.query(SD.id, SD.entity_type, SD.entity_id, score.label("score")).filter(
+        SD.entity_type.in_(entity_types),
+        or_(SD.tsv.op("@@")(tsquery), literal(phrase).op("<%")(SD.search_text)),
+        or_(
+            and_(SD.entity_type == "post", _visible_post(db, viewer)),
+            and_(SD.entity_type == "user", _visible_user(db)),
+        ),
+    )
+    # Hide content by (and profiles of) users the viewer has blocked (D10)
+    query = apply_block_filter(query, SD.owner_id, viewer.id if viewer else None)
+
+    after = _decode_search_cursor(cursor)
+    if after is not None:
+        last_score, last_id = after
+        query = query.filter(
+            or_(score < last_score, and_(score == last_score, SD.id < last_id))
+        )
+
+    rows = query.order_by(score.desc(), SD.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(str(rows[-1].id), str(rows[-1].score))
+    return [(row.entity_type, row.entity_id) for row in rows], next_cursor
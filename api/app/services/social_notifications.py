@@ -12,11 +12,12 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 from uuid import UUID
 
-from sqlalchemy import func, or_, and_
+from sqlalchemy import and_, or_, tuple_, update
 from sqlalchemy.orm import Session, selectinload
 
 from .. import models, schemas
 from ..cache import rate_limit_check
+from ..services import notification_counts
 from ..services.event_bus import notification_bus
 
 if TYPE_CHECKING:
@@ -24,6 +25,9 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Session.info flag set by enqueue_notification (read by notification_outbox)
+OUTBOX_PENDING_KEY = "notification_outbox_pending"
+
 # Cache key patterns
 RATE_LIMIT_KEY = "social_notif:rate:{actor_id}:{recipient_id}"
 
@@ -48,6 +52,9 @@ class SocialNotificationService:
         """
         Create a social notification and dispatch it live over the SSE bus.
 
+        Commits immediately. Request handlers that commit their own work
+        should use enqueue_notification instead (outbox, no extra commit).
+
         Args:
             db: Database session
             user_id: ID of user to notify (post owner)
@@ -76,17 +83,7 @@ class SocialNotificationService:
                 )
                 return None
 
-        # Prepare comment preview
-        comment_preview = None
-        comment_id = None
-        if comment:
-            comment_id = comment.id
-            if comment.body:
-                comment_preview = comment.body[:100]
-                if len(comment.body) > 100:
-                    comment_preview += "..."
-        elif extra_preview:
-            comment_preview = extra_preview
+        comment_id, comment_preview = _comment_fields(comment, extra_preview)
 
         # Create notification record
         notification = models.SocialNotification(
@@ -117,6 +114,56 @@ class SocialNotificationService:
 
         return notification
 
+    @staticmethod
+    def enqueue_notification(
+        db: Session,
+        user_id: int,
+        notification_type: str,
+        post: models.Post,
+        actor: models.User | None = None,
+        emoji: str | None = None,
+        comment: models.Comment | None = None,
+        extra_preview: str | None = None,
+    ) -> models.NotificationOutbox | None:
+        """
+        Append a social notification intent to the caller's transaction.
+
+        Same arguments as create_notification, but nothing is committed and
+        no Redis call is made here: the intent becomes visible with the
+        caller's commit, and the outbox drainer (services/
+        notification_outbox.py) rate-limits, inserts and dispatches it in
+        batches. Use this from request handlers that commit anyway.
+
+        Returns:
+            The pending intent, or None if skipped (self-action)
+        """
+        if actor and actor.id == user_id:
+            logger.debug(f"Skipping self-notification for user {user_id}")
+            return None
+
+        comment_id, comment_preview = _comment_fields(comment, extra_preview)
+        intent = models.NotificationOutbox(
+            user_id=user_id,
+            notification_type=notification_type,
+            post_id=post.id,
+            actor_id=actor.id if actor else None,
+            actor_handle=actor.handle if actor else "Anonymous",
+            actor_avatar_url=actor.avatar_url if actor else None,
+            emoji=emoji,
+            comment_id=comment_id,
+            comment_preview=comment_preview,
+            content_title=post.title,
+            content_sqid=post.public_sqid,
+            content_art_url=post.art_url,
+        )
+        # Registers the after_commit hook that wakes the drainer once the
+        # caller commits.
+        from . import notification_outbox  # noqa: F401
+
+        db.add(intent)
+        db.info[OUTBOX_PENDING_KEY] = True
+        return intent
+
     @staticmethod
     def create_system_notification(
         db: Session,
@@ -174,9 +221,9 @@ class SocialNotificationService:
         """
         Get unread notification count for a user.
 
-        Computed directly from the database (rides the partial index
-        ix_social_notifications_user_unread), block-filtered to match the
-        list surface — the count is always consistent, no counter to drift.
+        Read from the maintained per-user counter (services/
+        notification_counts.py), block-filtered to match the list surface;
+        a missing counter is recomputed from the database.
 
         Args:
             db: Database session
@@ -185,14 +232,7 @@ class SocialNotificationService:
         Returns:
             Unread notification count
         """
-        from ..utils.blocks import apply_block_filter
-
-        query = db.query(func.count(models.SocialNotification.id)).filter(
-            models.SocialNotification.user_id == user_id,
-            models.SocialNotification.is_read == False,
-        )
-        query = apply_block_filter(query, models.SocialNotification.actor_id, user_id)
-        return query.scalar() or 0
+        return notification_counts.get_unread_count(db, user_id)
 
     @staticmethod
     def list_notifications(
@@ -284,22 +324,33 @@ class SocialNotificationService:
         Returns:
             Number of notifications updated
         """
-        count = (
-            db.query(models.SocialNotification)
-            .filter(
-                models.SocialNotification.id.in_(notification_ids),
-                models.SocialNotification.user_id == user_id,
-                models.SocialNotification.is_read == False,
-            )
-            .update(
-                {"is_read": True, "read_at": datetime.utcnow()},
-                synchronize_session=False,
+        from ..utils.blocks import blocked_ids_for
+
+        actor_ids = (
+            db.execute(
+                update(models.SocialNotification)
+                .where(
+                    models.SocialNotification.id.in_(notification_ids),
+                    models.SocialNotification.user_id == user_id,
+                    models.SocialNotification.is_read == False,
+                )
+                .values(is_read=True, read_at=datetime.utcnow())
+                .returning(models.SocialNotification.actor_id)
+                .execution_options(synchronize_session=False)
             )
+            .scalars()
+            .all()
         )
 
         db.commit()
 
-        return count
+        # Rows from blocked actors were never part of the count.
+        blocked = blocked_ids_for(db, user_id) if actor_ids else set()
+        notification_counts.adjust_unread(
+            user_id, -sum(1 for actor_id in actor_ids if actor_id not in blocked)
+        )
+
+        return len(actor_ids)
 
     @staticmethod
     def mark_all_as_read(db: Session, user_id: int) -> int:
@@ -326,6 +377,7 @@ class SocialNotificationService:
         )
 
         db.commit()
+        notification_counts.set_unread(user_id, 0)
 
         return count
 
@@ -354,9 +406,19 @@ class SocialNotificationService:
         if not notification:
             return False
 
+        was_unread = not notification.is_read
+        actor_id = notification.actor_id
         db.delete(notification)
         db.commit()
 
+        if was_unread:
+            from ..utils.blocks import viewer_has_blocked
+
+            if actor_id is None or not viewer_has_blocked(
+                db, viewer_id=user_id, author_id=actor_id
+            ):
+                notification_counts.adjust_unread(user_id, -1)
+
         return True
 
     # =========================================================================
@@ -366,29 +428,67 @@ class SocialNotificationService:
     @staticmethod
     def _dispatch_notification(
         db: Session, notification: models.SocialNotification
+    ) -> None:
+        """Live-delivery dispatch of one committed notification."""
+        SocialNotificationService.dispatch_notifications(db, [notification])
+
+    @staticmethod
+    def dispatch_notifications(
+        db: Session, notifications: list[models.SocialNotification]
     ) -> None:
         """
-        Live-delivery dispatch: in-process SSE bus.
+        Live-delivery dispatch: unread counter + in-process SSE bus.
 
-        Runs post-commit in the request thread; a crash here loses only the
-        live event — the inbox row survives and the next SSE `connected`
-        greeting / list backfill reconciles the client.
+        Runs post-commit (request thread or outbox drainer); a crash here
+        loses only the live event — the inbox row survives and the next SSE
+        `connected` greeting / list backfill reconciles the client.
 
         Live delivery is gated on the recipient's blocks (D10): the row is
         always created (unblock reveals history), but a blocked actor's
-        activity must not reach the recipient live.
+        activity must not reach the recipient live. One query covers the
+        whole batch.
         """
-        from ..utils.blocks import viewer_has_blocked
-
-        if notification.actor_id is not None and viewer_has_blocked(
-            db, viewer_id=notification.user_id, author_id=notification.actor_id
-        ):
-            return
-
-        # Full REST shape (resolves actor_public_sqid while the session is
-        # open); identical to GET /v1/social-notifications/ items so SSE
-        # clients can treat both sources uniformly and dedupe by id.
-        payload = schemas.SocialNotification.model_validate(notification).model_dump(
-            mode="json"
-        )
-        notification_bus.publish_threadsafe(notification.user_id, payload)
+        pairs = {
+            (n.user_id, n.actor_id) for n in notifications if n.actor_id is not None
+        }
+        blocked: set[tuple[int, int]] = set()
+        if pairs:
+            blocked = set(
+                db.query(models.UserBlock.blocker_id, models.UserBlock.blocked_id)
+                .filter(
+                    tuple_(
+                        models.UserBlock.blocker_id, models.UserBlock.blocked_id
+                    ).in_(pairs)
+                )
+                .all()
+            )
+
+        for notification in notifications:
+            if (notification.user_id, notification.actor_id) in blocked:
+                continue
+
+            # Blocked actors' rows are excluded from the badge too.
+            notification_counts.adjust_unread(notification.user_id, 1)
+
+            # Full REST shape (resolves actor_public_sqid while the session is
+            # open); identical to GET /v1/social-notifications/ items so SSE
+            # clients can treat both sources uniformly and dedupe by id.
+            payload = schemas.SocialNotification.model_validate(
+                notification
+            ).model_dump(mode="json")
+            notification_bus.publish_threadsafe(notification.user_id, payload)
+
+
+def _comment_fields(
+    comment: models.Comment | None, extra_preview: str | None
+) -> tuple[UUID | None, str | None]:
+    """(comment_id, comment_preview) for a notification: the first 100
+    characters of the comment, else the free-text ``extra_preview``."""
+    if comment:
+        preview = None
+        if comment.body:
+            preview = comment.body[:100]
+            if len(comment.body) > 100:
+                preview += "..."
+        return comment.id, preview
+    return None, extra_preview
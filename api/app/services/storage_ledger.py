@@ -0,0 +1,242 @@
+"""Per-user storage ledger (models.UserStorageUsage).
+
+Quota checks used to aggregate ``post_files.file_bytes`` and
+``posts.mkpx_file_bytes`` over the user's whole catalog on every upload,
+replace and .mkpx attach. The ledger keeps those totals in one row per user,
+split by class:
+
+- ``native``  — the is_native post_files row of each post;
+- ``derived`` — SSAFPP format variants (the other post_files rows);
+- ``mkpx``    — attached .mkpx layers files.
+
+Write paths adjust it by delta in the same transaction as the file change
+(``adjust_post_storage`` / ``release_post_storage``; never commit here), so
+a rollback undoes both. Only non-deleted posts count, matching the old
+aggregate: soft-deleting a post releases its bytes at once. The nightly
+``reconcile_storage_usage`` task recomputes the aggregate and repairs any
+drift (e.g. a write path that bypassed the ledger). The upscaled preview has
+no DB record and, as before, does not count toward the quota.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import case, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from .. import models
+
+logger = logging.getLogger(__name__)
+
+
+def post_storage_bytes(post: models.Post) -> dict[str, int]:
+    """Bytes a post holds, by storage class."""
+    native = derived = 0
+    for pf in post.files:
+        if pf.is_native:
+            native += pf.file_bytes
+        else:
+            derived += pf.file_bytes
+    return {"native": native, "derived": derived, "mkpx": post.mkpx_file_bytes or 0}
+
+
+def adjust_storage_usage(
+    db: Session, user_id: int, *, native: int = 0, derived: int = 0, mkpx: int = 0
+) -> None:
+    """Add deltas to a user's ledger row (created on first use). No commit."""
+    if not (native or derived or mkpx):
+        return
+    table = models.UserStorageUsage.__table__
+    stmt = pg_insert(models.UserStorageUsage).values(
+        user_id=user_id, native_bytes=native, derived_bytes=derived, mkpx_bytes=mkpx
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={
+            "native_bytes": table.c.native_bytes + native,
+            "derived_bytes": table.c.derived_bytes + derived,
+            "mkpx_bytes": table.c.mkpx_bytes + mkpx,
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(stmt)
+
+
+def adjust_post_storage(
+    db: Session, post: models.Post, *, native: int = 0, derived: int = 0, mkpx: int = 0
+) -> None:
+    """Ledger delta for a file change on ``post``; ignored once it is deleted."""
+    if post.deleted_by_user:
+        return
+    adjust_storage_usage(db, post.owner_id, native=native, derived=derived, mkpx=mkpx)
+
+
+def release_post_storage(db: Session, post: models.Post) -> None:
+    """Release a post's bytes; call just before soft-deleting it."""
+    if post.deleted_by_user:
+        return
+    held = post_storage_bytes(post)
+    adjust_storage_usage(
+        db,
+        post.owner_id,
+        native=-held["native"],
+        derived=-held["derived"],
+        mkpx=-held["mkpx"],
+    )
+
+
+def compute_storage_usage(
+    db: Session, user_id: int | None = None
+) -> dict[int, dict[str, int]]:
+    """
+    Aggregate storage per user straight from post_files/posts.
+
+    This is the full scan the ledger replaces; only seeding and
+    reconciliation use it. Restricted to one user when ``user_id`` is given.
+    """
+    pf = models.PostFile
+    files_q = (
+        db.query(
+            models.Post.owner_id,
+            func.sum(case((pf.is_native, pf.file_bytes), else_=0)),
+            func.sum(case((pf.is_native, 0), else_=pf.file_bytes)),
+        )
+        .join(pf, pf.post_id == models.Post.id)
+        .filter(models.Post.deleted_by_user == False)
+        .group_by(models.Post.owner_id)
+    )
+    # Separate aggregate: summing mkpx_file_bytes inside the PostFile join
+    # would multiply it by the number of format-variant rows per post.
+    mkpx_q = (
+        db.query(models.Post.owner_id, func.sum(models.Post.mkpx_file_bytes))
+        .filter(
+            models.Post.deleted_by_user == False,
+            models.Post.mkpx_file_bytes.isnot(None),
+        )
+        .group_by(models.Post.owner_id)
+    )
+    if user_id is not None:
+        files_q = files_q.filter(models.Post.owner_id == user_id)
+        mkpx_q = mkpx_q.filter(models.Post.owner_id == user_id)
+
+    usage: dict[int, dict[str, int]] = {}
+    for owner_id, native, derived in files_q.all():
+        usage[owner_id] = {"native": int(native), "derived": int(derived), "mkpx": 0}
+    for owner_id, mkpx in mkpx_q.all():
+        usage.setdefault(owner_id, {"native": 0, "derived": 0, "mkpx": 0})
+        usage[owner_id]["mkpx"] = int(mkpx or 0)
+    return usage
+
+
+def get_storage_usage(db: Session, user_id: int) -> models.UserStorageUsage:
+    """
+    The user's ledger row, or an unsaved one computed from the aggregate.
+
+    Read-only: a missing row (a user with no file change since the ledger was
+    introduced — the migration backfills existing users) is answered from
+    ``compute_storage_usage`` without writing, so quota checks never insert
+    or flush on a read path. The first delta creates the row, and the nightly
+    reconcile seeds any that are still missing.
+    """
+    row = db.get(models.UserStorageUsage, user_id)
+    if row is not None:
+        return row
+    held = compute_storage_usage(db, user_id).get(
+        user_id, {"native": 0, "derived": 0, "mkpx": 0}
+    )
+    return models.UserStorageUsage(
+        user_id=user_id,
+        native_bytes=held["native"],
+        derived_bytes=held["derived"],
+        mkpx_bytes=held["mkpx"],
+    )
+
+
+def seed_storage_usage(db: Session, user_id: int) -> models.UserStorageUsage:
+    """Create the user's ledger row from the aggregate if missing. No commit."""
+    held = compute_storage_usage(db, user_id).get(
+        user_id, {"native": 0, "derived": 0, "mkpx": 0}
+    )
+    stmt = (
+        pg_insert(models.UserStorageUsage)
+        .values(
+            user_id=user_id,
+            native_bytes=held["native"],
+            derived_bytes=held["derived"],
+            mkpx_bytes=held["mkpx"],
+            reconciled_at=datetime.now(timezone.utc),
+        )
+        .on_conflict_do_nothing(index_elements=["user_id"])
+    )
+    db.execute(stmt)
+    db.flush()
+    return db.get(models.UserStorageUsage, user_id)
+
+
+def reconcile_storage_usage(db: Session) -> dict[str, int]:
+    """
+    Compare every ledger row with the aggregate and repair drift.
+
+    The full comparison runs without locks; each drifted user is then
+    re-checked under a row lock (so a concurrent delta is not clobbered)
+    and corrected in its own short transaction.
+
+    Returns:
+        {"users": ledger rows checked, "repaired": rows corrected,
+         "created": missing rows inserted}
+    """
+    expected = compute_storage_usage(db)
+    rows = {r.user_id: r for r in db.query(models.UserStorageUsage).all()}
+    zero = {"native": 0, "derived": 0, "mkpx": 0}
+
+    def _matches(row, held) -> bool:
+        return (
+            row.native_bytes == held["native"]
+            and row.derived_bytes == held["derived"]
+            and row.mkpx_bytes == held["mkpx"]
+        )
+
+    drifted = [
+        user_id
+        for user_id in set(rows) | set(expected)
+        if user_id not in rows
+        or not _matches(rows[user_id], expected.get(user_id, zero))
+    ]
+    now = datetime.now(timezone.utc)
+    db.query(models.UserStorageUsage).update(
+        {models.UserStorageUsage.reconciled_at: now}, synchronize_session=False
+    )
+    db.commit()
+
+    repaired = created = 0
+    for user_id in drifted:
+        row = (
+            db.query(models.UserStorageUsage)
+            .filter(models.UserStorageUsage.user_id == user_id)
+            .with_for_update()
+            .first()
+        )
+        held = compute_storage_usage(db, user_id).get(user_id, zero)
+        if row is None:
+            if held == zero:
+                db.rollback()
+                continue
+            seed_storage_usage(db, user_id)
+            created += 1
+        elif not _matches(row, held):
+            logger.warning(
+                f"Storage ledger drift for user {user_id}: "
+                f"ledger=({row.native_bytes}, {row.derived_bytes}, {row.mkpx_bytes}) "
+                f"actual=({held['native']}, {held['derived']}, {held['mkpx']})"
+            )
+            row.native_bytes = held["native"]
+            row.derived_bytes = held["derived"]
+            row.mkpx_bytes = held["mkpx"]
+            row.reconciled_at = now
+            repaired += 1
+        db.commit()
+
+    return {"users": len(rows), "repaired": repaired, "created": created}
@@ -2,10 +2,10 @@
 
 from __future__ import annotations
 
-from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from .. import models
+from .storage_ledger import get_storage_usage
 
 # Storage quota tiers (in bytes)
 QUOTA_TIER_NEW = 100 * 1024 * 1024  # 100MB for reputation < 100
@@ -42,10 +42,11 @@ def get_user_storage_quota(user: models.User) -> int:
 
 def get_user_storage_used(db: Session, user_id: int) -> int:
     """
-    Calculate storage used by non-deleted posts.
+    Storage used by non-deleted posts (native files, derived formats, .mkpx).
 
     Only counts posts where deleted_by_user is False.
-    Storage is freed only after permanent deletion by cleanup job.
+    Read from the per-user ledger (services/storage_ledger.py) — one row,
+    independent of catalog size.
 
     Args:
         db: Database session
@@ -54,27 +55,7 @@ def get_user_storage_used(db: Session, user_id: int) -> int:
     Returns:
         Storage used in bytes
     """
-    result = (
-        db.query(func.coalesce(func.sum(models.PostFile.file_bytes), 0))
-        .join(models.Post, models.PostFile.post_id == models.Post.id)
-        .filter(
-            models.Post.owner_id == user_id,
-            models.Post.deleted_by_user == False,
-        )
-        .scalar()
-    )
-    # Attached .mkpx layers files count too. Separate aggregate: summing the
-    # column inside the PostFile join would multiply it by the number of
-    # format-variant rows per post.
-    mkpx_result = (
-        db.query(func.coalesce(func.sum(models.Post.mkpx_file_bytes), 0))
-        .filter(
-            models.Post.owner_id == user_id,
-            models.Post.deleted_by_user == False,
-        )
-        .scalar()
-    )
-    return int(result) + int(mkpx_result)
+    return get_storage_usage(db, user_id).total_bytes
 
 
 def check_storage_quota(
@@ -0,0 +1,342 @@
+"""Prefix suggestions for the user and hashtag pickers (GET /search/suggest).
+
+For every prefix (up to ``SUGGEST_MAX_PREFIX`` characters) of every handle
+and hashtag, Redis keeps a sorted set of the ``SUGGEST_BUCKET_SIZE`` most
+popular completions — users by follower count, hashtags by the number of
+public posts carrying them. A keystroke is then one ZREVRANGE on
+``suggest:{version}:{kind}:p:{prefix}``: O(log n + k), no table scan.
+
+- ``rebuild_suggestions`` (hourly task) computes the buckets from two
+  grouped queries and writes them under a fresh version, then flips
+  ``suggest:version`` so readers never see a half-built index; the previous
+  version expires.
+- Between rebuilds, follows/unfollows (``bump_user``), handle changes
+  (``rename_user``), post publishing (``bump_hashtags``) and hiding,
+  unhiding or deleting posts (``recount_hashtags``) adjust the live version
+  in place. Canonical scores live in a per-kind hash so a member
+  pushed out of a bucket re-enters with its true score.
+
+User hits are re-read from Postgres (a primary-key lookup of at most ``k``
+rows) to drop users who became ineligible or are blocked by the viewer, and
+to return current display fields. Without Redis, suggestions are empty and
+the pickers fall back to full search.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import time
+from collections import defaultdict
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..cache import get_redis_client
+from ..constants import MONITORED_HASHTAGS
+from ..utils.blocks import blocked_ids_for
+
+logger = logging.getLogger(__name__)
+
+SUGGEST_MAX_PREFIX = 12
+SUGGEST_BUCKET_SIZE = 50
+SUGGEST_MAX_RESULTS = 20
+VERSION_KEY = "suggest:version"
+# A replaced version lingers this long for readers that already resolved it.
+RETIRED_VERSION_TTL_SECONDS = 120
+
+USER = "user"
+TAG = "tag"
+
+
+def _prefixes(term: str) -> list[str]:
+    term = term.lower()
+    return [term[:i] for i in range(1, min(len(term), SUGGEST_MAX_PREFIX) + 1)]
+
+
+def _bucket_key(version: str, kind: str, prefix: str) -> str:
+    return f"suggest:{version}:{kind}:p:{prefix}"
+
+
+def _score_key(version: str, kind: str) -> str:
+    return f"suggest:{version}:{kind}:score"
+
+
+def _eligible_users(query):
+    """Users that may appear in suggestions (same gates as search)."""
+    return query.filter(
+        models.User.hidden_by_user == False,
+        models.User.hidden_by_mod == False,
+        models.User.non_conformant == False,
+        models.User.deactivated == False,
+        models.User.banned_until.is_(None),
+        models.User.email_verified == True,
+        ~models.User.roles.cast(JSONB).contains(["owner"]),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Rebuild
+# ---------------------------------------------------------------------------
+
+
+def _top_buckets(entries) -> dict[str, list[tuple[int, str]]]:
+    """prefix -> top SUGGEST_BUCKET_SIZE (score, member) for (term, member, score)."""
+    buckets: dict[str, list[tuple[int, str]]] = defaultdict(list)
+    for term, member, score in entries:
+        for prefix in _prefixes(term):
+            bucket = buckets[prefix]
+            if len(bucket) < SUGGEST_BUCKET_SIZE:
+                heapq.heappush(bucket, (score, member))
+            elif (score, member) > bucket[0]:
+                heapq.heapreplace(bucket, (score, member))
+    return buckets
+
+
+def rebuild_suggestions(db: Session) -> dict[str, int]:
+    """Recompute every bucket under a new version and switch readers to it.
+
+    Returns:
+        {"users": users indexed, "hashtags": hashtags indexed,
+         "buckets": prefix sets written}
+    """
+    client = get_redis_client()
+    if client is None:
+        return {"users": 0, "hashtags": 0, "buckets": 0}
+
+    followers = (
+        db.query(
+            models.Follow.following_id,
+            func.count(models.Follow.id).label("followers"),
+        )
+        .group_by(models.Follow.following_id)
+        .subquery()
+    )
+    users = (
+        _eligible_users(
+            db.query(
+                models.User.id,
+                models.User.handle,
+                func.coalesce(followers.c.followers, 0),
+            ).outerjoin(followers, followers.c.following_id == models.User.id)
+        )
+    ).all()
+
+    tag = func.unnest(models.Post.hashtags).label("tag")
+    tag_rows = (
+        db.query(tag, func.count().label("posts"))
+        .filter(
+            models.Post.discoverable == True,
+        )
+        .group_by("tag")
+        .all()
+    )
+
+    version = str(int(time.time() * 1000))
+    written = 0
+    pipe = client.pipeline(transaction=False)
+    for kind, entries in (
+        (USER, [(handle, str(user_id), n) for user_id, handle, n in users]),
+        (TAG, [(t, t, n) for t, n in tag_rows]),
+    ):
+        for prefix, bucket in _top_buckets(entries).items():
+            pipe.zadd(
+                _bucket_key(version, kind, prefix),
+                {member: score for score, member in bucket},
+            )
+            written += 1
+            if written % 1000 == 0:
+                pipe.execute()
+        scores = {member: score for _, member, score in entries}
+        if scores:
+            pipe.hset(_score_key(version, kind), mapping=scores)
+    pipe.execute()
+
+    previous = client.getset(VERSION_KEY, version)
+    if previous:
+        _retire(client, previous)
+    return {"users": len(users), "hashtags": len(tag_rows), "buckets": written}
+
+
+def _retire(client, version: str) -> None:
+    """Expire every key of a replaced version."""
+    pipe = client.pipeline(transaction=False)
+    for key in client.scan_iter(f"suggest:{version}:*", count=1000):
+        pipe.expire(key, RETIRED_VERSION_TTL_SECONDS)
+    pipe.execute()
+
+
+# ---------------------------------------------------------------------------
+# Incremental updates
+# ---------------------------------------------------------------------------
+
+
+def _live(client) -> str | None:
+    return client.get(VERSION_KEY) if client is not None else None
+
+
+def _place(pipe, version: str, kind: str, term: str, member: str, score) -> None:
+    for prefix in _prefixes(term):
+        key = _bucket_key(version, kind, prefix)
+        pipe.zadd(key, {member: score})
+        pipe.zremrangebyrank(key, 0, -(SUGGEST_BUCKET_SIZE + 1))
+
+
+def bump_user(user_id: int, handle: str, delta: int) -> None:
+    """Adjust a user's follower score (follow/unfollow)."""
+    client = get_redis_client()
+    version = _live(client)
+    if version is None:
+        return
+    try:
+        score = client.hincrby(_score_key(version, USER), str(user_id), delta)
+        pipe = client.pipeline(transaction=False)
+        _place(pipe, version, USER, handle, str(user_id), max(score, 0))
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to update user suggestions for {user_id}: {e}")
+
+
+def rename_user(user_id: int, old_handle: str, new_handle: str) -> None:
+    """Move a user's entries from the old handle's prefixes to the new one's."""
+    client = get_redis_client()
+    version = _live(client)
+    if version is None or old_handle.lower() == new_handle.lower():
+        return
+    try:
+        score = client.hget(_score_key(version, USER), str(user_id))
+        pipe = client.pipeline(transaction=False)
+        for prefix in _prefixes(old_handle):
+            pipe.zrem(_bucket_key(version, USER, prefix), str(user_id))
+        if score is not None:
+            _place(pipe, version, USER, new_handle, str(user_id), int(score))
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to update user suggestions for {user_id}: {e}")
+
+
+def bump_hashtags(hashtags: list[str] | None, delta: int = 1) -> None:
+    """Count a newly public post's hashtags (``delta=-1`` to uncount them)."""
+    client = get_redis_client()
+    version = _live(client)
+    if version is None or not hashtags:
+        return
+    try:
+        score_key = _score_key(version, TAG)
+        pipe = client.pipeline(transaction=False)
+        for tag in hashtags:
+            pipe.hincrby(score_key, tag, delta)
+        scores = pipe.execute()
+        for tag, score in zip(hashtags, scores, strict=True):
+            _place(pipe, version, TAG, tag, tag, max(score, 0))
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to update hashtag suggestions: {e}")
+
+
+def listed_hashtags(posts) -> dict[int, list[str]]:
+    """Hashtags of the currently discoverable ``posts``, by post id.
+
+    Take it before changing visibility flags or tags, and hand it to
+    ``recount_hashtags`` after the commit.
+    """
+    return {p.id: list(p.hashtags or []) for p in posts if p.discoverable}
+
+
+def recount_hashtags(
+    db: Session, post_ids: list[int], before: dict[int, list[str]]
+) -> None:
+    """Count tags of posts that entered discovery and uncount those that left.
+
+    ``before`` is ``listed_hashtags`` of the same posts ahead of the change;
+    a post that no longer exists counts as having left.
+    """
+    if not post_ids or _live(get_redis_client()) is None:
+        return
+    after = {
+        post_id: tags or []
+        for post_id, tags in db.query(models.Post.id, models.Post.hashtags).filter(
+            models.Post.id.in_(post_ids),
+            models.Post.discoverable == True,
+        )
+    }
+    added: list[str] = []
+    removed: list[str] = []
+    for post_id in before.keys() | after.keys():
+        old, new = set(before.get(post_id, ())), set(after.get(post_id, ()))
+        added.extend(new - old)
+        removed.extend(old - new)
+    bump_hashtags(added)
+    bump_hashtags(removed, delta=-1)
+
+
+# ---------------------------------------------------------------------------
+# Reads
+# ---------------------------------------------------------------------------
+
+
+def _top(client, version: str, kind: str, q: str, fetch: int) -> list[tuple]:
+    prefix = q[:SUGGEST_MAX_PREFIX]
+    hits = client.zrevrange(
+        _bucket_key(version, kind, prefix), 0, fetch - 1, withscores=True
+    )
+    return [(member, int(score)) for member, score in hits]
+
+
+def suggest_users(
+    db: Session, viewer: models.User | None, q: str, limit: int
+) -> list[tuple[models.User, int]]:
+    """Top users whose handle starts with ``q``, as (user, follower_count)."""
+    q = q.strip().lower().lstrip("@")
+    client = get_redis_client()
+    version = _live(client)
+    if not q or version is None:
+        return []
+
+    # Over-fetch to absorb ineligible/blocked users and, for queries longer
+    # than the indexed prefix, non-matching tails.
+    hits = _top(client, version, USER, q, min(limit * 2, SUGGEST_BUCKET_SIZE))
+    ids = [int(member) for member, _ in hits]
+    if not ids:
+        return []
+    users = {
+        u.id: u
+        for u in _eligible_users(
+            db.query(models.User).filter(models.User.id.in_(ids))
+        ).all()
+    }
+    blocked = blocked_ids_for(db, viewer.id if viewer else None)
+    results = []
+    for member, score in hits:
+        user = users.get(int(member))
+        if user is None or user.id in blocked:
+            continue
+        if not user.handle.lower().startswith(q):
+            continue
+        results.append((user, score))
+        if len(results) == limit:
+            break
+    return results
+
+
+def suggest_hashtags(
+    viewer: models.User | None, q: str, limit: int
+) -> list[tuple[str, int]]:
+    """Top hashtags starting with ``q``, as (tag, public post count)."""
+    q = q.strip().lower().lstrip("#")
+    client = get_redis_client()
+    version = _live(client)
+    if not q or version is None:
+        return []
+
+    approved = set(viewer.approved_hashtags or []) if viewer else set()
+    hidden = MONITORED_HASHTAGS - approved
+    hits = _top(client, version, TAG, q, min(limit * 2, SUGGEST_BUCKET_SIZE))
+    results = [
+        (tag, count)
+        for tag, count in hits
+        if tag.startswith(q) and tag not in hidden and count > 0
+    ]
+    return results[:limit]
@@ -13,11 +13,14 @@ UTC day); an **Impression** is passive playback exposure. Never summed.
 from __future__ import annotations
 
 import logging
+import os
 from datetime import date, datetime, timedelta, timezone
 
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from ..utils.event_encoding import VIEW_TYPES, label_code
+
 logger = logging.getLogger(__name__)
 
 # Canonical ViewEvent.view_type values (post-redesign).
@@ -165,15 +168,20 @@ UPDATE posts SET view_count =
   + COALESCE((
     SELECT COUNT(DISTINCT (
       COALESCE('u:' || view_events.viewer_user_id::text,
-               'ip:' || view_events.viewer_ip_hash),
+               'ip:' || encode(view_events.viewer_ip_hash, 'hex')),
       (view_events.created_at AT TIME ZONE 'UTC')::date))
     FROM view_events
     WHERE view_events.post_id = posts.id
-      AND view_events.view_type IN ('view', 'intentional')
+      AND view_events.view_type IN ({view_codes})
       {raw_filter}
   ), 0)
 """
 
+# view_type codes counted as Artwork Views (utils/event_encoding.py).
+_VIEW_CODES = ", ".join(
+    str(label_code(VIEW_TYPES, view_type)) for view_type in (VIEW, "intentional")
+)
+
 
 def recompute_post_view_counts(conn, post_ids: list[int] | None = None) -> int:
     """Rebuild posts.view_count from daily aggregates + raw view events.
@@ -198,7 +206,7 @@ def recompute_post_view_counts(conn, post_ids: list[int] | None = None) -> int:
         if watermark is not None
         else ""
     )
-    sql = _RECOMPUTE_SQL.format(raw_filter=raw_filter)
+    sql = _RECOMPUTE_SQL.format(raw_filter=raw_filter, view_codes=_VIEW_CODES)
     params: dict = {}
     if watermark is not None:
         params["watermark"] = watermark
@@ -252,3 +260,82 @@ def get_view_counter(name: str, day: date | None = None) -> int:
         return int(raw) if raw else 0
     except Exception:  # pragma: no cover - defensive
         return 0
+
+
+# ---------------------------------------------------------------------------
+# MQTT view-ingestion pool snapshot (mqtt/view_workers.py) — fail-open
+# ---------------------------------------------------------------------------
+
+# A few report intervals: a snapshot older than this means the API process
+# (and its pool) is gone, so it simply disappears.
+_SNAPSHOT_TTL_SECONDS = 5 * 60
+
+
+def _instance_id() -> str:
+    """This process, among every API process publishing pool snapshots."""
+    import socket
+
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _snapshot_key(pool: str, instance: str) -> str:
+    return f"viewobs:pool:{pool}:{instance}"
+
+
+def record_ingest_snapshot(pool: str, snapshot: dict) -> None:
+    """Publish the latest queue/latency snapshot of this process's pool.
+
+    Each process writes its own key, so a deployment running several API
+    replicas keeps one snapshot per replica. Newly rejected messages since
+    this process's previous snapshot are also added to the day-keyed
+    ``mqtt_view_rejected`` counter. Never raises.
+    """
+    try:
+        import json
+
+        from ..cache import get_redis_client
+
+        client = get_redis_client()
+        if not client:
+            return
+        key = _snapshot_key(pool, _instance_id())
+        previous = client.get(key)
+        prev_rejected = json.loads(previous).get("rejected", 0) if previous else 0
+        newly_rejected = snapshot.get("rejected", 0) - prev_rejected
+        if newly_rejected < 0:  # pool restarted; its counters began again
+            newly_rejected = snapshot.get("rejected", 0)
+        pipe = client.pipeline()
+        pipe.setex(key, _SNAPSHOT_TTL_SECONDS, json.dumps(snapshot))
+        if newly_rejected:
+            counter = _counter_key("mqtt_view_rejected", utc_today())
+            pipe.incrby(counter, newly_rejected)
+            pipe.expire(counter, _COUNTER_TTL_SECONDS)
+        pipe.execute()
+    except Exception:  # pragma: no cover - defensive
+        logger.debug(f"Failed to record ingest snapshot for {pool}", exc_info=True)
+
+
+def get_ingest_snapshots(pool: str = "view-ingest") -> dict[str, dict]:
+    """Latest snapshot of an ingestion pool per process (``host:pid``).
+
+    Empty when no process has reported recently or Redis is unavailable.
+    """
+    try:
+        import json
+
+        from ..cache import get_redis_client
+
+        client = get_redis_client()
+        if not client:
+            return {}
+        prefix = _snapshot_key(pool, "")
+        keys = sorted(client.scan_iter(f"{prefix}*"))
+        if not keys:
+            return {}
+        snapshots = {}
+        for key, raw in zip(keys, client.mget(keys), strict=True):
+            if raw:
+                snapshots[key[len(prefix) :]] = json.loads(raw)
+        return snapshots
+    except Exception:  # pragma: no cover - defensive
+        return {}
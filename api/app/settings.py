@@ -73,3 +73,26 @@ def vault_public_base_url() -> str:
             "vault asset URLs cannot be generated without it"
         )
     return url
+
+
+def vault_accel_redirect_prefix() -> str:
+    """Return the proxy's internal prefix for vault downloads ("" = off).
+
+    When set (e.g. ``/_vault``), artwork download routes answer with an
+    ``X-Accel-Redirect: <prefix>/<vault-relative path>`` header and an empty
+    body, and the reverse proxy serves the file from its own vault mount
+    (services/artwork_files.py). Unset, the API streams the file itself.
+    Read at call time so tests can monkeypatch the environment.
+    """
+    return os.environ.get("VAULT_ACCEL_REDIRECT_PREFIX", "").rstrip("/")
+
+
+def metrics_token() -> str:
+    """Return the bearer token guarding ``GET /metrics`` ("" = endpoint off).
+
+    The API sits behind the public proxy, so the Prometheus endpoint only
+    answers scrapers presenting ``Authorization: Bearer <token>``; unset, it
+    404s like any unknown path. Read at call time so tests can monkeypatch
+    the environment.
+    """
+    return os.environ.get("METRICS_TOKEN", "").strip()
@@ -1,11 +1,9 @@
 from __future__ import annotations
 
 import hashlib
-import json
 import logging
 import os
 import uuid
-import zipfile
 from pathlib import Path
 from typing import Any
 
@@ -15,6 +13,11 @@ from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
 
+# Registers the session hooks that drop cached principals and artwork
+# downloads when a task changes a user or a post (services/auth_principal.py,
+# services/artwork_files.py).
+from .services import artwork_files, auth_principal  # noqa: E402,F401
+from .metrics import register_celery_metrics  # noqa: E402
 
 DEFAULT_REDIS = "redis://cache:6379/0"
 
@@ -24,6 +27,10 @@ celery_app = Celery(
     backend=os.getenv("CELERY_RESULT_BACKEND", DEFAULT_REDIS),
 )
 
+# Task duration and queue-wait metrics (app/metrics.py). Every process that
+# imports this module publishes tasks, and the worker also runs them.
+register_celery_metrics()
+
 celery_app.conf.update(
     task_default_queue="default",
     task_serializer="json",
@@ -65,6 +72,30 @@ celery_app.conf.update(
             "schedule": 21600.0,  # Every 6 hours
             "options": {"queue": "default"},
         },
+        "rebuild-suggestions": {
+            "task": "app.tasks.rebuild_suggestions",
+            "schedule": 3600.0,  # Every hour
+            "options": {"queue": "default"},
+        },
+        # Safety-net sweep of the notification outbox (the API drainer
+        # normally empties it within seconds) — services/notification_outbox.py.
+        "drain-notification-outbox": {
+            "task": "app.tasks.drain_notification_outbox",
+            "schedule": 60.0,  # Every minute
+            "options": {"queue": "default"},
+        },
+        # Repairs unread-notification counters left stale by cascades
+        # (post/account deletion) — services/notification_counts.py.
+        "reconcile-unread-counts": {
+            "task": "app.tasks.reconcile_unread_counts",
+            "schedule": 600.0,  # Every 10 minutes
+            "options": {"queue": "default"},
+        },
+        "refresh-user-search-documents": {
+            "task": "app.tasks.refresh_user_search_documents",
+            "schedule": 300.0,  # Every 5 minutes
+            "options": {"queue": "default"},
+        },
         # --- Daily jobs: fixed wall-clock times -------------------------------
         # crontab() schedules fire at a fixed local time in the beat timezone
         # (America/New_York), so these all run at the stated US Eastern time
@@ -72,13 +103,23 @@ celery_app.conf.update(
         # low-traffic window so they don't pile onto the worker (concurrency=2)
         # at once.
         #
+        # Creates the raw event tables' day partitions a week ahead (services/
+        # event_partitions.py); runs just before the window, ahead of the
+        # rollups that drop old ones.
+        "maintain-event-partitions": {
+            "task": "app.tasks.maintain_event_partitions",
+            "schedule": crontab(minute=45, hour=0),  # 00:45 ET
+            "options": {"queue": "default"},
+        },
+        #
         # Ownership for the view/site-event pipeline (docs/artwork-views/ D10):
         # rollup_view_events is the SOLE owner of view_events. It rolls complete
         # UTC days past a persisted watermark (rollup_watermarks.view_events)
         # into post_stats_daily AND writes the site-level player slice of
         # site_stats_daily, reconciles posts.view_count, advances the watermark,
-        # and deletes rolled events past the 7-day retention — all in one
-        # transaction, so a failed run leaves everything intact for the next.
+        # and drops the day partitions of rolled events past the 7-day
+        # retention — all in one transaction, so a failed run leaves everything
+        # intact for the next.
         # rollup_site_events consumes site_events ONLY (it previously consumed
         # player view events with its own later cutoff, which permanently lost
         # a 1-hour band of player views from post stats daily). There is
@@ -149,6 +190,13 @@ celery_app.conf.update(
             "schedule": crontab(minute=30, hour=4),  # 04:30 ET
             "options": {"queue": "default"},
         },
+        # Re-derives the Lineage closure table from post_lineage (utils/
+        # lineage.py). Runs after the 03:30 deleted-posts cleanup.
+        "rebuild-lineage-closure": {
+            "task": "app.tasks.rebuild_lineage_closure",
+            "schedule": crontab(minute=40, hour=4),  # 04:40 ET
+            "options": {"queue": "default"},
+        },
         # Notification retention (docs/notification-architecture/ N5): delete
         # read rows older than 90 days and all rows older than 365 days.
         # No ordering dependency.
@@ -157,6 +205,20 @@ celery_app.conf.update(
             "schedule": crontab(minute=45, hour=4),  # 04:45 ET
             "options": {"queue": "default"},
         },
+        # Repairs drift in the per-user storage ledger (services/
+        # storage_ledger.py). No ordering dependency.
+        "reconcile-storage-usage": {
+            "task": "app.tasks.reconcile_storage_usage",
+            "schedule": crontab(minute=50, hour=4),  # 04:50 ET
+            "options": {"queue": "default"},
+        },
+        # Re-derives search documents from posts/users and drops orphans
+        # (services/search_index.py). No ordering dependency.
+        "rebuild-search-documents": {
+            "task": "app.tasks.rebuild_search_documents",
+            "schedule": crontab(minute=55, hour=4),  # 04:55 ET
+            "options": {"queue": "default"},
+        },
         "renew-crl-if-needed": {
             "task": "app.tasks.renew_crl_if_needed",
             "schedule": crontab(minute=0, hour=5),  # 05:00 ET
@@ -178,6 +240,8 @@ def check_post_hash(self, post_id: str) -> dict[str, Any]:
     """
     from . import models, vault
     from .db import SessionLocal
+    from .services.channel_cache import bump_channel_version
+    from .services.home_timeline import queue_fan_out
 
     db = SessionLocal()
     try:
@@ -222,6 +286,7 @@ def check_post_hash(self, post_id: str) -> dict[str, Any]:
             # Mark as non-conformant
             post.non_conformant = True
             db.commit()
+            bump_channel_version()
 
             # Log to audit log (system action)
             # Note: We need a system user or use a special UUID for automated actions
@@ -240,6 +305,8 @@ def check_post_hash(self, post_id: str) -> dict[str, Any]:
             if post.non_conformant:
                 post.non_conformant = False
                 db.commit()
+                bump_channel_version()
+                queue_fan_out(post.id)
 
             return {
                 "status": "match",
@@ -263,6 +330,8 @@ def periodic_check_post_hashes(self) -> dict[str, Any]:
     """
     from . import models, vault
     from .db import SessionLocal
+    from .services.channel_cache import bump_channel_version
+    from .services.home_timeline import queue_fan_out
     from .utils.audit import log_moderation_action, get_system_user_id
 
     db = SessionLocal()
@@ -328,6 +397,7 @@ def periodic_check_post_hashes(self) -> dict[str, Any]:
                     # Mark as non-conformant
                     post.non_conformant = True
                     db.commit()
+                    bump_channel_version()
                     mismatch_count += 1
 
                     # Log to audit log with system user
@@ -356,6 +426,8 @@ def periodic_check_post_hashes(self) -> dict[str, Any]:
                         )
                         post.non_conformant = False
                         db.commit()
+                        bump_channel_version()
+                        queue_fan_out(post.id)
 
                 checked_count += 1
 
@@ -465,6 +537,70 @@ def mirror_github_avatar(self, user_id: int) -> dict[str, Any]:
         db.close()
 
 
+def _add_view_event(db, event_data: dict) -> int:
+    """Stage a ViewEvent row built from serialized ``event_data``; returns post_id."""
+    from datetime import datetime
+    from uuid import UUID
+    from . import models
+
+    # Parse post_id as int (no longer UUID)
+    post_id = int(event_data["post_id"])
+    viewer_user_id = (
+        int(event_data["viewer_user_id"]) if event_data.get("viewer_user_id") else None
+    )
+
+    # Parse player_id as UUID if present
+    player_id = None
+    if event_data.get("player_id"):
+        try:
+            player_id = UUID(event_data["player_id"])
+        except (ValueError, TypeError):
+            logger.warning(
+                f"Invalid player_id in event_data: {event_data.get('player_id')}"
+            )
+
+    # Parse datetime
+    created_at = datetime.fromisoformat(event_data["created_at"])
+
+    db.add(
+        models.ViewEvent(
+            post_id=post_id,
+            viewer_user_id=viewer_user_id,
+            viewer_ip_hash=event_data["viewer_ip_hash"],
+            country_code=event_data.get("country_code"),
+            device_type=event_data["device_type"],
+            view_source=event_data["view_source"],
+            view_type=event_data["view_type"],
+            user_agent_hash=event_data.get("user_agent_hash"),
+            referrer_domain=event_data.get("referrer_domain"),
+            created_at=created_at,
+            # Player-specific fields (nullable)
+            player_id=player_id,
+            local_datetime=event_data.get("local_datetime"),
+            local_timezone=event_data.get("local_timezone"),
+            play_order=event_data.get("play_order"),
+            channel=event_data.get("channel"),
+            channel_context=event_data.get("channel_context"),
+        )
+    )
+    return post_id
+
+
+def _bump_view_counts(db, view_counts: dict[int, int]) -> None:
+    """Add accepted Artwork Views to the denormalized public counters.
+
+    Runs in the caller's transaction (docs/artwork-views/ D11). The nightly
+    rollup recomputes the exact value, so any drift self-heals.
+    """
+    from . import models
+
+    for post_id, n in view_counts.items():
+        db.query(models.Post).filter(models.Post.id == post_id).update(
+            {models.Post.view_count: models.Post.view_count + n},
+            synchronize_session=False,
+        )
+
+
 @celery_app.task(
     name="app.tasks.write_view_event",
     bind=True,
@@ -499,74 +635,67 @@ def write_view_event(self, event_data: dict) -> None:
             - channel: Channel name or None
             - channel_context: Channel context (user_sqid or hashtag) or None
     """
-    from datetime import datetime
-    from uuid import UUID
-    from . import models
     from .db import SessionLocal
 
     db = SessionLocal()
     try:
-        # Parse post_id as int (no longer UUID)
-        post_id = int(event_data["post_id"])
-        viewer_user_id = (
-            int(event_data["viewer_user_id"])
-            if event_data.get("viewer_user_id")
-            else None
-        )
+        post_id = _add_view_event(db, event_data)
+        if event_data["view_type"] == "view":
+            _bump_view_counts(db, {post_id: 1})
 
-        # Parse player_id as UUID if present
-        player_id = None
-        if event_data.get("player_id"):
-            try:
-                player_id = UUID(event_data["player_id"])
-            except (ValueError, TypeError):
-                logger.warning(
-                    f"Invalid player_id in event_data: {event_data.get('player_id')}"
-                )
+        db.commit()
 
-        # Parse datetime
-        created_at = datetime.fromisoformat(event_data["created_at"])
+        logger.debug(f"Wrote deferred view event for post {post_id}")
 
-        # Create view event
-        view_event = models.ViewEvent(
-            id=uuid.uuid4(),
-            post_id=post_id,
-            viewer_user_id=viewer_user_id,
-            viewer_ip_hash=event_data["viewer_ip_hash"],
-            country_code=event_data.get("country_code"),
-            device_type=event_data["device_type"],
-            view_source=event_data["view_source"],
-            view_type=event_data["view_type"],
-            user_agent_hash=event_data.get("user_agent_hash"),
-            referrer_domain=event_data.get("referrer_domain"),
-            created_at=created_at,
-            # Player-specific fields (nullable)
-            player_id=player_id,
-            local_datetime=event_data.get("local_datetime"),
-            local_timezone=event_data.get("local_timezone"),
-            play_order=event_data.get("play_order"),
-            channel=event_data.get("channel"),
-            channel_context=event_data.get("channel_context"),
-        )
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to write deferred view event: {e}", exc_info=True)
+        raise  # Re-raise to trigger Celery retry
+    finally:
+        db.close()
 
-        db.add(view_event)
 
-        # Accepted Artwork Views bump the denormalized public counter in the
-        # same transaction (docs/artwork-views/ D11). The nightly rollup
-        # recomputes the exact value, so any drift self-heals.
-        if event_data["view_type"] == "view":
-            db.query(models.Post).filter(models.Post.id == post_id).update(
-                {models.Post.view_count: models.Post.view_count + 1},
-                synchronize_session=False,
-            )
+@celery_app.task(
+    name="app.tasks.write_view_events",
+    bind=True,
+    ignore_result=True,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    max_retries=3,
+)
+def write_view_events(self, events: list[dict]) -> None:
+    """
+    Write a batch of view events in one transaction.
+
+    Used by batched player view submission (services/player_views.py
+    ``record_view_batch``): one task message and one commit per batch instead
+    of one per event. Each item has the ``write_view_event`` shape; view_count
+    bumps are aggregated per post. A retry replays the whole batch, which is
+    safe because nothing was committed.
+    """
+    from collections import Counter
+
+    from .db import SessionLocal
+
+    if not events:
+        return
+
+    db = SessionLocal()
+    try:
+        view_counts: Counter[int] = Counter()
+        for event_data in events:
+            post_id = _add_view_event(db, event_data)
+            if event_data["view_type"] == "view":
+                view_counts[post_id] += 1
+        _bump_view_counts(db, view_counts)
 
         db.commit()
 
-        logger.debug(f"Wrote deferred view event for post {post_id}")
+        logger.debug(f"Wrote {len(events)} deferred view events")
 
     except Exception as e:
         db.rollback()
-        logger.error(f"Failed to write deferred view event: {e}", exc_info=True)
+        logger.error(f"Failed to write deferred view batch: {e}", exc_info=True)
         raise  # Re-raise to trigger Celery retry
     finally:
         db.close()
@@ -752,9 +881,11 @@ def rollup_view_events(self) -> dict[str, Any]:
        from post stats daily and double-counted on failure.
     3. Reconcile posts.view_count for affected posts (view_metrics).
     4. Advance the watermark to yesterday.
-    5. Delete raw events that are BOTH rolled (day <= watermark) AND past
-       the 7-day retention — readers stitch daily rows <= watermark with raw
-       events after it, so rolled-but-retained rows never double count.
+    5. Retire raw events that are BOTH rolled (day <= watermark) AND past
+       the 7-day retention — by dropping whole day partitions, plus a DELETE
+       of stragglers in the default partition (services/event_partitions.py).
+       Readers stitch daily rows <= watermark with raw events after it, so
+       rolled-but-retained rows never double count.
 
     Everything happens in ONE transaction: a failure leaves raw events and
     the watermark intact for the next run — no data loss, no double count.
@@ -768,6 +899,11 @@ def rollup_view_events(self) -> dict[str, Any]:
     from sqlalchemy import text as sa_text
     from . import models
     from .db import SessionLocal
+    from .services.event_partitions import (
+        PARTITION_RETENTION_DAYS,
+        default_partition,
+        drop_event_partitions,
+    )
     from .services.view_metrics import (
         VIEW,
         canonical_view_type,
@@ -1033,9 +1169,14 @@ def rollup_view_events(self) -> dict[str, Any]:
         if affected_post_ids:
             recompute_post_view_counts(db, post_ids=sorted(affected_post_ids))
 
+        # Whole days that are rolled AND past retention go with their
+        # partition; only stragglers in the default partition are deleted.
+        dropped_partitions = drop_event_partitions(
+            db, "view_events", utc_today() - timedelta(days=PARTITION_RETENTION_DAYS)
+        )
         deleted_count = db.execute(
             sa_text(
-                "DELETE FROM view_events "
+                f"DELETE FROM {default_partition('view_events')} "
                 "WHERE (created_at AT TIME ZONE 'UTC')::date <= :wm "
                 "AND created_at < now() - interval '7 days'"
             ),
@@ -1046,13 +1187,15 @@ def rollup_view_events(self) -> dict[str, Any]:
 
         logger.info(
             f"Rolled up {rolled_up} daily aggregates across {days_processed} days, "
-            f"deleted {deleted_count} old events, watermark -> {yesterday}"
+            f"dropped {dropped_partitions} partitions, deleted {deleted_count} "
+            f"old events, watermark -> {yesterday}"
         )
         return {
             "status": "success",
             "days": days_processed,
             "rolled_up": rolled_up,
             "deleted": deleted_count,
+            "dropped_partitions": dropped_partitions,
         }
 
     except Exception:
@@ -1077,24 +1220,33 @@ def rollup_blog_post_view_events(self) -> dict[str, Any]:
     cutoff-based design — do not port it to the watermark pipeline.
 
     This task:
-    1. Selects blog post view events older than 7 days
+    1. Selects blog post view events from complete UTC days older than 7 days
     2. Aggregates them by (blog_post_id, date)
     3. Upserts into blog_post_stats_daily table
-    4. Deletes the old raw events
+    4. Drops the rolled day partitions (and deletes stragglers from the
+       default partition — services/event_partitions.py)
 
     Runs daily at 01:30 US Eastern (configured in beat_schedule).
     """
     from datetime import datetime, timedelta, timezone
-    from sqlalchemy import func, cast, Date
+    from sqlalchemy import func, cast, Date, text
     from . import models
     from .db import SessionLocal
+    from .services.event_partitions import (
+        PARTITION_RETENTION_DAYS,
+        default_partition,
+        drop_event_partitions,
+    )
+    from .services.view_metrics import utc_today
 
     db = SessionLocal()
     try:
         logger.info("Starting blog post view events rollup task")
 
-        # Get events older than 7 days
-        cutoff_date = datetime.now(timezone.utc) - timedelta(days=7)
+        # Get events older than 7 days, cut at a UTC day boundary so the
+        # rolled days' partitions can be dropped whole.
+        cutoff_day = utc_today() - timedelta(days=PARTITION_RETENTION_DAYS)
+        cutoff_date = datetime.combine(cutoff_day, datetime.min.time(), timezone.utc)
 
         # Query events to aggregate, grouped by blog_post_id and date
         old_events = (
@@ -1104,6 +1256,8 @@ def rollup_blog_post_view_events(self) -> dict[str, Any]:
         )
 
         if not old_events:
+            drop_event_partitions(db, "blog_post_view_events", cutoff_day)
+            db.commit()
             logger.info("No old blog post view events to roll up")
             return {"status": "success", "rolled_up": 0, "deleted": 0}
 
@@ -1193,12 +1347,15 @@ def rollup_blog_post_view_events(self) -> dict[str, Any]:
 
             rolled_up += 1
 
-        # Delete old events
-        deleted_count = (
-            db.query(models.BlogPostViewEvent)
-            .filter(models.BlogPostViewEvent.created_at < cutoff_date)
-            .delete(synchronize_session=False)
-        )
+        # Retire old events: drop whole day partitions, delete stragglers
+        drop_event_partitions(db, "blog_post_view_events", cutoff_day)
+        deleted_count = db.execute(
+            text(
+                f"DELETE FROM {default_partition('blog_post_view_events')} "
+                "WHERE created_at < :cutoff"
+            ),
+            {"cutoff": cutoff_date},
+        ).rowcount
 
         db.commit()
 
@@ -1262,19 +1419,26 @@ def rollup_site_events(self) -> dict[str, Any]:
     Daily task: Roll up site events older than 7 days into daily aggregates.
 
     This task:
-    1. Selects site events older than 7 days (in batches to avoid memory issues)
+    1. Selects site events from complete UTC days older than 7 days (in
+       batches to avoid memory issues)
     2. Aggregates them by date
     3. Upserts into site_stats_daily table
-    4. Deletes the old raw events
+    4. Drops the rolled day partitions (and deletes stragglers from the
+       default partition — services/event_partitions.py)
 
     Uses batched processing to handle large datasets without OOM errors.
     Runs daily at 02:00 US Eastern (configured in beat_schedule).
     """
     from datetime import datetime, timedelta, timezone, date
-    from sqlalchemy import func
+    from sqlalchemy import func, text
     from . import models
     from .db import SessionLocal
-    from .services.view_metrics import SITE_EVENTS_WATERMARK, set_watermark
+    from .services.event_partitions import (
+        PARTITION_RETENTION_DAYS,
+        default_partition,
+        drop_event_partitions,
+    )
+    from .services.view_metrics import SITE_EVENTS_WATERMARK, set_watermark, utc_today
     from .utils.view_tracking import visitor_key
 
     BATCH_SIZE = 10000  # Process events in batches of 10,000
@@ -1283,8 +1447,11 @@ def rollup_site_events(self) -> dict[str, Any]:
     try:
         logger.info("Starting site events rollup task")
 
-        # Get events older than 7 days
-        cutoff_date = datetime.now(timezone.utc) - timedelta(days=7)
+        # Get events older than 7 days, cut at a UTC day boundary so every
+        # rolled day is complete and its partition can be dropped whole.
+        cutoff_day = utc_today() - timedelta(days=PARTITION_RETENTION_DAYS)
+        cutoff_date = datetime.combine(cutoff_day, datetime.min.time(), timezone.utc)
+        last_rolled_day = cutoff_day - timedelta(days=1)
 
         # Count total events to process
         total_count = (
@@ -1298,7 +1465,8 @@ def rollup_site_events(self) -> dict[str, Any]:
             # "rolled through the cutoff date" is vacuously true, and readers
             # need the boundary (max(SiteStatsDaily.date) no longer works —
             # rollup_view_events also writes rows, up to yesterday).
-            set_watermark(db, SITE_EVENTS_WATERMARK, cutoff_date.date())
+            set_watermark(db, SITE_EVENTS_WATERMARK, last_rolled_day)
+            drop_event_partitions(db, "site_events", cutoff_day)
             db.commit()
             logger.info("No old site events to roll up")
             return {"status": "success", "rolled_up": 0, "deleted": 0}
@@ -1592,29 +1760,33 @@ def rollup_site_events(self) -> dict[str, Any]:
             if rolled_up % 100 == 0:
                 db.commit()
 
-        # Delete old site events. view_events deletion is owned exclusively
-        # by rollup_view_events (docs/artwork-views/ D10).
-        deleted_count = (
-            db.query(models.SiteEvent)
-            .filter(models.SiteEvent.created_at < cutoff_date)
-            .delete(synchronize_session=False)
-        )
+        # Retire the rolled site events: whole day partitions are dropped,
+        # stragglers in the default partition deleted. view_events deletion
+        # is owned exclusively by rollup_view_events (docs/artwork-views/ D10).
+        dropped_partitions = drop_event_partitions(db, "site_events", cutoff_day)
+        deleted_count = db.execute(
+            text(
+                f"DELETE FROM {default_partition('site_events')} "
+                "WHERE created_at < :cutoff"
+            ),
+            {"cutoff": cutoff_date},
+        ).rowcount
 
         # Record how far daily rows now carry the site-event fields (the
-        # partial cutoff date is the max rolled date, matching the old
-        # max(SiteStatsDaily.date) reader semantics).
-        set_watermark(db, SITE_EVENTS_WATERMARK, cutoff_date.date())
+        # last complete day rolled).
+        set_watermark(db, SITE_EVENTS_WATERMARK, last_rolled_day)
 
         db.commit()
 
         logger.info(
-            f"Rolled up {rolled_up} daily site aggregates, "
-            f"deleted {deleted_count} old site events"
+            f"Rolled up {rolled_up} daily site aggregates, dropped "
+            f"{dropped_partitions} partitions, deleted {deleted_count} old site events"
         )
         return {
             "status": "success",
             "rolled_up": rolled_up,
             "deleted": deleted_count,
+            "dropped_partitions": dropped_partitions,
         }
 
     except Exception:
@@ -1800,6 +1972,11 @@ def cleanup_social_notifications(self) -> dict[str, Any]:
                 f"Social-notification retention: {deleted_read} read>90d, "
                 f"{deleted_old} all>365d"
             )
+        if deleted_old:
+            # Rows over 365 days may have been unread.
+            from .services.notification_counts import reconcile_unread_counts
+
+            reconcile_unread_counts(db)
 
         return {
             "status": "success",
@@ -2091,6 +2268,233 @@ def cleanup_unverified_accounts(self) -> dict[str, Any]:
         db.close()
 
 
+@celery_app.task(
+    bind=True, name="app.tasks.fan_out_post_to_timelines", ignore_result=True
+)
+def fan_out_post_to_timelines(self, post_id: int) -> None:
+    """
+    Push a newly feed-eligible post into its followers' home timelines
+    (services/home_timeline.py). Queued on upload, moderator approval,
+    unhide/undelete and a cleared non_conformant flag; ineligible posts and
+    heavy authors are no-ops.
+    """
+    from . import models
+    from .db import SessionLocal
+    from .services.home_timeline import fan_out_post
+
+    db = SessionLocal()
+    try:
+        post = db.query(models.Post).filter(models.Post.id == post_id).first()
+        if post is None:
+            return
+        updated = fan_out_post(db, post)
+        logger.debug(f"Fanned out post {post_id} to {updated} timelines")
+    except Exception:
+        logger.error(f"Error fanning out post {post_id}", exc_info=True)
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True, name="app.tasks.rebuild_lineage_closure")
+def rebuild_lineage_closure(self) -> dict[str, Any]:
+    """
+    Daily task: re-derive the post_lineage_closure table from post_lineage
+    (utils/lineage.rebuild_lineage_closure), repairing any drift left by
+    paths that bypass the incremental maintenance.
+
+    Runs daily at 04:40 US Eastern (configured in beat_schedule).
+    """
+    from .db import SessionLocal
+    from .utils.lineage import rebuild_lineage_closure as rebuild
+
+    db = SessionLocal()
+    try:
+        rows = rebuild(db)
+        logger.info(f"Lineage closure rebuilt: {rows} rows")
+        return {"status": "success", "rows": rows}
+    except Exception:
+        logger.error("Error in rebuild_lineage_closure task", exc_info=True)
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True, name="app.tasks.maintain_event_partitions")
+def maintain_event_partitions(self) -> dict[str, Any]:
+    """
+    Daily task: create the day partitions of view_events, site_events and
+    blog_post_view_events for the retention window and the week ahead
+    (services/event_partitions.py). Retiring old partitions is left to the
+    rollups, which only drop days they have rolled.
+
+    Runs daily at 00:45 US Eastern (configured in beat_schedule).
+    """
+    from .db import SessionLocal
+    from .services.event_partitions import maintain_event_partitions as maintain
+    from .services.view_metrics import utc_today
+
+    db = SessionLocal()
+    try:
+        created = maintain(db, utc_today())
+        db.commit()
+        logger.info(f"Event partitions maintained: {created} created")
+        return {"status": "success", "created": created}
+    except Exception:
+        logger.error("Error in maintain_event_partitions task", exc_info=True)
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True, name="app.tasks.reconcile_storage_usage")
+def reconcile_storage_usage(self) -> dict[str, Any]:
+    """
+    Daily task: recompute per-user storage from post_files/posts and repair
+    ledger rows that drifted (services/storage_ledger.reconcile_storage_usage).
+
+    Runs daily at 04:50 US Eastern (configured in beat_schedule).
+    """
+    from .db import SessionLocal
+    from .services import storage_ledger
+
+    db = SessionLocal()
+    try:
+        result = storage_ledger.reconcile_storage_usage(db)
+        if result["repaired"] or result["created"]:
+            logger.warning(f"Storage ledger reconciled with drift: {result}")
+        else:
+            logger.info(f"Storage ledger reconciled, no drift: {result}")
+        return result
+    except Exception:
+        logger.error("Error in reconcile_storage_usage task", exc_info=True)
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True, name="app.tasks.drain_notification_outbox")
+def drain_notification_outbox(self) -> dict[str, Any]:
+    """
+    Deliver notification intents still pending in the outbox
+    (services/notification_outbox.drain_all), e.g. after an API restart.
+
+    Runs every minute (configured in beat_schedule). Live SSE events from
+    this process reach no stream; clients resync on reconnect.
+    """
+    from .db import SessionLocal
+    from .services import notification_outbox
+
+    db = SessionLocal()
+    try:
+        drained = notification_outbox.drain_all(db)
+        if drained:
+            logger.info(f"Notification outbox sweep delivered {drained} intents")
+        return {"status": "success", "drained": drained}
+    except Exception:
+        logger.error("Error in drain_notification_outbox task", exc_info=True)
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True, name="app.tasks.reconcile_unread_counts")
+def reconcile_unread_counts(self) -> dict[str, Any]:
+    """
+    Recount every live unread-notification counter and repair drift
+    (services/notification_counts.reconcile_unread_counts).
+
+    Runs every 10 minutes (configured in beat_schedule).
+    """
+    from .db import SessionLocal
+    from .services import notification_counts
+
+    db = SessionLocal()
+    try:
+        result = notification_counts.reconcile_unread_counts(db)
+        if result["repaired"]:
+            logger.info(f"Unread counters reconciled with drift: {result}")
+        return result
+    except Exception:
+        logger.error("Error in reconcile_unread_counts task", exc_info=True)
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True, name="app.tasks.refresh_user_search_documents")
+def refresh_user_search_documents(self) -> dict[str, Any]:
+    """
+    Index users created or updated in the last few minutes, so new accounts
+    become searchable without a hook on every registration path.
+
+    Runs every 5 minutes (configured in beat_schedule).
+    """
+    from .db import SessionLocal
+    from .services.search_index import refresh_recent_user_documents
+
+    db = SessionLocal()
+    try:
+        return {"indexed": refresh_recent_user_documents(db)}
+    except Exception:
+        logger.error("Error in refresh_user_search_documents task", exc_info=True)
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True, name="app.tasks.rebuild_suggestions")
+def rebuild_suggestions(self) -> dict[str, Any]:
+    """
+    Recompute the handle/hashtag prefix suggestion buckets
+    (services/suggest.rebuild_suggestions) and switch readers to them.
+
+    Runs every hour (configured in beat_schedule); incremental updates from
+    follows, handle changes and publishing keep it fresh in between.
+    """
+    from .db import SessionLocal
+    from .services import suggest
+
+    db = SessionLocal()
+    try:
+        result = suggest.rebuild_suggestions(db)
+        logger.info(f"Suggestions rebuilt: {result}")
+        return result
+    except Exception:
+        logger.error("Error in rebuild_suggestions task", exc_info=True)
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True, name="app.tasks.rebuild_search_documents")
+def rebuild_search_documents(self) -> dict[str, Any]:
+    """
+    Daily task: re-derive every search document from its post/user row and
+    delete orphans (services/search_index.rebuild_search_documents).
+
+    Runs daily at 04:55 US Eastern (configured in beat_schedule).
+    """
+    from .db import SessionLocal
+    from .services import search_index
+
+    db = SessionLocal()
+    try:
+        result = search_index.rebuild_search_documents(db)
+        logger.info(f"Search documents rebuilt: {result}")
+        return result
+    except Exception:
+        logger.error("Error in rebuild_search_documents task", exc_info=True)
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
 @celery_app.task(bind=True, name="app.tasks.check_view_ingestion_health")
 def check_view_ingestion_health(self) -> dict[str, Any]:
     """
@@ -2107,6 +2511,7 @@ def check_view_ingestion_health(self) -> dict[str, Any]:
     from datetime import timedelta
     from .db import SessionLocal
     from .services.view_metrics import (
+        get_ingest_snapshots,
         get_view_counter,
         get_view_watermark,
         utc_today,
@@ -2145,13 +2550,23 @@ def check_view_ingestion_health(self) -> dict[str, Any]:
             "site_bot_dropped",
             "dedup_suppressed",
             "rate_limited",
+            "mqtt_view_rejected",
         )
     }
+    # Live MQTT ingestion pools (queue depth, latency percentiles), one per API
+    # process that reported in the last few minutes.
+    ingest_pool = get_ingest_snapshots()
 
     if problems:
-        logger.error(f"View ingestion health: {'; '.join(problems)} | {counters}")
+        logger.error(
+            f"View ingestion health: {'; '.join(problems)} | {counters} "
+            f"| pool {ingest_pool}"
+        )
     else:
-        logger.info(f"View ingestion health OK (watermark {watermark}) | {counters}")
+        logger.info(
+            f"View ingestion health OK (watermark {watermark}) | {counters} "
+            f"| pool {ingest_pool}"
+        )
 
     return {
         "status": "success",
@@ -2159,6 +2574,7 @@ def check_view_ingestion_health(self) -> dict[str, Any]:
         "problems": problems,
         "watermark": str(watermark),
         "counters": counters,
+        "ingest_pool": ingest_pool,
     }
 
 
@@ -2210,6 +2626,8 @@ def cleanup_deleted_posts(self) -> dict[str, Any]:
     from .db import get_session
     from . import vault
     from .cache import cache_invalidate
+    from .services.channel_cache import bump_channel_version
+    from .utils.lineage import detach_post_from_lineage
 
     db = next(get_session())
     try:
@@ -2261,6 +2679,7 @@ def cleanup_deleted_posts(self) -> dict[str, Any]:
                 # Delete the row and commit per post (cascades to comments,
                 # reactions, admin_notes, ...). Per-post commits keep each
                 # deletion atomic with respect to its file removal.
+                detach_post_from_lineage(db, post_id)
                 db.delete(post)
                 db.commit()
                 deleted_count += 1
@@ -2300,6 +2719,7 @@ def cleanup_deleted_posts(self) -> dict[str, Any]:
             cache_invalidate("feed:recent:*")
             cache_invalidate("feed:promoted:*")
             cache_invalidate("hashtags:*")
+            bump_channel_version()
         except Exception as e:
             logger.warning(f"Failed to invalidate caches: {e}")
 
@@ -2585,6 +3005,7 @@ def process_ssafpp(self, post_id: int) -> dict[str, Any]:
 
         formats_available = [native_format]
         conversion_results = {}
+        derived_bytes_added = 0  # storage ledger delta for new PostFile rows
 
         # Open source image
         source_image = Image.open(BytesIO(source_bytes))
@@ -2632,14 +3053,16 @@ def process_ssafpp(self, post_id: int) -> dict[str, Any]:
                     .first()
                 )
                 if row_exists is None:
+                    healed_bytes = target_path.stat().st_size
                     db.add(
                         models.PostFile(
                             post_id=post.id,
                             format=target_format,
-                            file_bytes=target_path.stat().st_size,
+                            file_bytes=healed_bytes,
                             is_native=False,
                         )
                     )
+                    derived_bytes_added += healed_bytes
                     conversion_results[target_format] = "exists (healed row)"
                 else:
                     conversion_results[target_format] = "exists"
@@ -2754,6 +3177,7 @@ def process_ssafpp(self, post_id: int) -> dict[str, Any]:
                     is_native=False,
                 )
                 db.merge(pf)
+                derived_bytes_added += converted_bytes
 
                 logger.info(f"Created {target_format} for post {post_id}")
 
@@ -2892,7 +3316,11 @@ def process_ssafpp(self, post_id: int) -> dict[str, Any]:
             )
             return {"status": "skipped", "message": "storage_key rotated mid-task"}
 
-        # Commit PostFile rows created during conversion
+        # Commit PostFile rows created during conversion, with their bytes
+        # in the owner's storage ledger
+        from .services.storage_ledger import adjust_post_storage
+
+        adjust_post_storage(db, post, derived=derived_bytes_added)
         db.commit()
 
         final_formats = sorted(set(formats_available))
@@ -2952,30 +3380,32 @@ def process_bdr_job(self, bdr_id: str) -> dict[str, Any]:
     Steps:
     1. Load BDR record and validate
     2. Update status to 'processing'
-    3. Fetch all post data
-    4. Download artwork files from vault/URLs
-    5. Build ZIP with artworks + metadata JSON files
-    6. Save ZIP to vault
-    7. Update BDR record with file info
-    8. Send email notification (if requested)
-    9. Update status to 'ready'
+    3. Resolve archive contents (services/bdr_archive.collect_bdr_contents)
+    4. Stream vault files + metadata JSON straight into the ZIP in the vault
+       (no temp copies; PNG/GIF/WebP stored, the rest deflated)
+    5. Update BDR record with file info
+    6. Send email notification (if requested)
+    7. Update status to 'ready'
 
     On failure:
-    - Update status to 'failed' with error message
-    - Celery will retry up to 3 times with exponential backoff
+    - Celery will retry up to 3 times with exponential backoff. The BDR stays
+      'processing' between attempts and the next attempt resumes the
+      partially written ZIP instead of starting over.
+    - After the last attempt, update status to 'failed' with error message
+      and remove the partial ZIP.
     """
-    import shutil
-    import tempfile
     from datetime import datetime, timezone, timedelta
     from uuid import UUID
 
-    from sqlalchemy import func
-
-    from . import models, vault
+    from . import models
     from .db import SessionLocal
+    from .services.bdr_archive import collect_bdr_contents, write_bdr_archive
+    from .services.bdr_events import ProgressReporter, publish_bdr_update
     from .sqids_config import sqids
+    from .utils.zipstream import discard_partial_archive
 
     db = SessionLocal()
+    zip_path = None
     try:
         logger.info(f"Processing BDR job: {bdr_id}")
 
@@ -2999,6 +3429,7 @@ def process_bdr_job(self, bdr_id: str) -> dict[str, Any]:
         bdr.status = "processing"
         bdr.started_at = datetime.now(timezone.utc)
         db.commit()
+        publish_bdr_update(bdr)
 
         # Load user info
         user = db.query(models.User).filter(models.User.id == bdr.user_id).first()
@@ -3007,100 +3438,9 @@ def process_bdr_job(self, bdr_id: str) -> dict[str, Any]:
 
         user_sqid = user.public_sqid or sqids.encode([user.id])
 
-        # Load posts with their data
-        posts = db.query(models.Post).filter(models.Post.id.in_(bdr.post_ids)).all()
-
-        if not posts:
-            raise ValueError("No posts found")
-
-        # Build metadata
-        metadata = {
-            "generated_at": datetime.now(timezone.utc).isoformat(),
-            "user_handle": user.handle,
-            "artwork_count": len(posts),
-            "artworks": [],
-        }
+        # Resolve archive contents (artwork order follows bdr.post_ids)
+        contents = collect_bdr_contents(db, bdr, user)
 
-        # Load comments if requested
-        comments_data = None
-        if bdr.include_comments:
-            comments = (
-                db.query(models.Comment)
-                .filter(
-                    models.Comment.post_id.in_(bdr.post_ids),
-                    models.Comment.hidden_by_mod == False,
-                    models.Comment.deleted_by_owner == False,
-                    models.Comment.deleted_by_mod == False,
-                )
-                .all()
-            )
-
-            # Group by post_id, then by post_sqid
-            comments_by_post = {}
-            post_id_to_sqid = {p.id: p.public_sqid for p in posts}
-
-            for comment in comments:
-                sqid = post_id_to_sqid.get(comment.post_id)
-                if sqid:
-                    if sqid not in comments_by_post:
-                        comments_by_post[sqid] = []
-
-                    # Get author handle
-                    author_handle = None
-                    if comment.author_id:
-                        author = (
-                            db.query(models.User.handle)
-                            .filter(models.User.id == comment.author_id)
-                            .first()
-                        )
-                        author_handle = author[0] if author else "anonymous"
-                    else:
-                        author_handle = "anonymous"
-
-                    comments_by_post[sqid].append(
-                        {
-                            "id": str(comment.id),
-                            "author_handle": author_handle,
-                            "body": comment.body,
-                            "created_at": comment.created_at.isoformat(),
-                        }
-                    )
-
-            comments_data = {
-                "generated_at": datetime.now(timezone.utc).isoformat(),
-                "comments_by_artwork": comments_by_post,
-            }
-
-        # Load reactions if requested
-        reactions_data = None
-        if bdr.include_reactions:
-            reactions = (
-                db.query(
-                    models.Reaction.post_id,
-                    models.Reaction.emoji,
-                    func.count(models.Reaction.id).label("count"),
-                )
-                .filter(models.Reaction.post_id.in_(bdr.post_ids))
-                .group_by(models.Reaction.post_id, models.Reaction.emoji)
-                .all()
-            )
-
-            post_id_to_sqid = {p.id: p.public_sqid for p in posts}
-            reactions_by_post = {}
-
-            for post_id, emoji, count in reactions:
-                sqid_val = post_id_to_sqid.get(post_id)
-                if sqid_val:
-                    if sqid_val not in reactions_by_post:
-                        reactions_by_post[sqid_val] = {}
-                    reactions_by_post[sqid_val][emoji] = count
-
-            reactions_data = {
-                "generated_at": datetime.now(timezone.utc).isoformat(),
-                "reactions_by_artwork": reactions_by_post,
-            }
-
-        # Create ZIP file
         vault_base = Path(os.getenv("VAULT_LOCATION", "/vault"))
         bdr_dir = vault_base / "bdr" / user_sqid
         bdr_dir.mkdir(parents=True, exist_ok=True)
@@ -3108,98 +3448,23 @@ def process_bdr_job(self, bdr_id: str) -> dict[str, Any]:
         zip_filename = f"{bdr_id}.zip"
         zip_path = bdr_dir / zip_filename
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            tmpdir_path = Path(tmpdir)
-            artworks_dir = tmpdir_path / "artworks"
-            artworks_dir.mkdir()
-
-            # Download and add artworks
-            for post in posts:
-                try:
-                    # Determine file extension from native PostFile
-                    native_pf = next((f for f in post.files if f.is_native), None)
-                    native_fmt = native_pf.format if native_pf else "png"
-                    ext = f".{native_fmt}"
-
-                    artwork_filename = f"{post.public_sqid}{ext}"
-
-                    # Get artwork file from vault using storage_key and storage_shard
-                    if post.storage_key and native_pf:
-                        source_path = vault.get_artwork_file_path(
-                            post.storage_key,
-                            vault.FORMAT_TO_EXT.get(native_fmt, f".{native_fmt}"),
-                            storage_shard=post.storage_shard,
-                        )
-                        if source_path.exists():
-                            shutil.copy(source_path, artworks_dir / artwork_filename)
-                        else:
-                            logger.warning(f"Vault file not found: {source_path}")
-                            continue
-                    else:
-                        logger.warning(f"Cannot locate artwork for post {post.id}")
-                        continue
-
-                    # Add to metadata
-                    metadata["artworks"].append(
-                        {
-                            "sqid": post.public_sqid,
-                            "filename": artwork_filename,
-                            "title": post.title,
-                            "description": post.description,
-                            "created_at": post.created_at.isoformat(),
-                            "width": post.width,
-                            "height": post.height,
-                            "frame_count": post.frame_count,
-                            "file_format": native_fmt,
-                            "hashtags": post.hashtags or [],
-                            "mod_hashtags": post.mod_hashtags or [],
-                        }
-                    )
-
-                except Exception as e:
-                    logger.error(f"Failed to process artwork {post.id}: {e}")
-                    # Continue with other artworks
-
-            # Write metadata.json
-            (tmpdir_path / "metadata.json").write_text(
-                json.dumps(metadata, indent=2, ensure_ascii=False)
-            )
-
-            # Write comments.json if requested
-            if comments_data:
-                (tmpdir_path / "comments.json").write_text(
-                    json.dumps(comments_data, indent=2, ensure_ascii=False)
-                )
-
-            # Write reactions.json if requested
-            if reactions_data:
-                (tmpdir_path / "reactions.json").write_text(
-                    json.dumps(reactions_data, indent=2, ensure_ascii=False)
-                )
-
-            # Create ZIP
-            with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
-                # Add artworks
-                for artwork_file in artworks_dir.iterdir():
-                    zf.write(artwork_file, f"artworks/{artwork_file.name}")
-
-                # Add metadata
-                zf.write(tmpdir_path / "metadata.json", "metadata.json")
-
-                if comments_data:
-                    zf.write(tmpdir_path / "comments.json", "comments.json")
-
-                if reactions_data:
-                    zf.write(tmpdir_path / "reactions.json", "reactions.json")
+        # Stream vault files straight into the ZIP; resumes a partial build
+        # left by a previous attempt.
+        file_size = write_bdr_archive(
+            contents,
+            zip_path,
+            on_progress=ProgressReporter(bdr, len(contents.artworks)),
+        )
 
         # Update BDR record
         now = datetime.now(timezone.utc)
         bdr.status = "ready"
         bdr.file_path = f"bdr/{user_sqid}/{zip_filename}"
-        bdr.file_size_bytes = zip_path.stat().st_size
+        bdr.file_size_bytes = file_size
         bdr.completed_at = now
         bdr.expires_at = now + timedelta(days=7)
         db.commit()
+        publish_bdr_update(bdr)
 
         # Send email notification if requested
         if bdr.send_email:
@@ -3209,7 +3474,7 @@ def process_bdr_job(self, bdr_id: str) -> dict[str, Any]:
                 send_bdr_ready_email(
                     to_email=user.email,
                     handle=user.handle,
-                    artwork_count=len(posts),
+                    artwork_count=len(contents.artworks),
                     download_url=f"{os.getenv('BASE_URL', 'https://makapix.club')}/u/{user_sqid}/posts?bdr={bdr_id}",
                     expires_at=bdr.expires_at,
                 )
@@ -3227,7 +3492,10 @@ def process_bdr_job(self, bdr_id: str) -> dict[str, Any]:
     except Exception as e:
         logger.error(f"Error processing BDR {bdr_id}: {e}", exc_info=True)
 
-        # Update status to failed
+        # Leave the BDR 'processing' (and the partial ZIP in place) while
+        # Celery still has retries left; the status check above would
+        # otherwise skip the retry.
+        final_attempt = self.request.retries >= self.max_retries
         try:
             db.rollback()
             bdr = (
@@ -3235,14 +3503,21 @@ def process_bdr_job(self, bdr_id: str) -> dict[str, Any]:
                 .filter(models.BatchDownloadRequest.id == UUID(bdr_id))
                 .first()
             )
-            if bdr:
+            if bdr and final_attempt:
                 bdr.status = "failed"
                 bdr.error_message = str(e)[:500]  # Truncate long errors
                 bdr.completed_at = datetime.now(timezone.utc)
                 db.commit()
+                publish_bdr_update(bdr)
         except Exception as update_error:
             logger.error(f"Failed to update BDR status: {update_error}")
 
+        if final_attempt and zip_path is not None:
+            try:
+                discard_partial_archive(zip_path)
+            except OSError as cleanup_error:
+                logger.warning(f"Failed to remove partial BDR ZIP: {cleanup_error}")
+
         raise  # Re-raise for Celery retry
 
     finally:
@@ -3271,6 +3546,7 @@ def cleanup_expired_bdrs(self) -> dict[str, Any]:
 
     from . import models
     from .db import SessionLocal
+    from .services.bdr_events import publish_bdr_update
 
     db = SessionLocal()
     try:
@@ -3291,6 +3567,7 @@ def cleanup_expired_bdrs(self) -> dict[str, Any]:
 
         cleaned_up = 0
         errors = []
+        expired_now = []
 
         for bdr in expired_bdrs:
             try:
@@ -3306,12 +3583,15 @@ def cleanup_expired_bdrs(self) -> dict[str, Any]:
                 bdr.file_path = None
                 bdr.file_size_bytes = None
                 cleaned_up += 1
+                expired_now.append(bdr)
 
             except Exception as e:
                 logger.error(f"Error cleaning up BDR {bdr.id}: {e}")
                 errors.append({"bdr_id": str(bdr.id), "error": str(e)})
 
         db.commit()
+        for bdr in expired_now:
+            publish_bdr_update(bdr)
 
         # Purge stale BDR rows so they drop off the PMD list for good
         purge_cutoff = now - timedelta(days=14)
@@ -3531,6 +3811,7 @@ def _purge_user_account(db: Session, user_id: int) -> dict[str, Any]:
     from . import models
     from .vault import delete_all_artwork_formats, get_vault_location
     from .avatar_vault import try_delete_avatar_by_public_url
+    from .utils.lineage import detach_post_from_lineage
 
     counts = {
         "reactions": 0,
@@ -3635,6 +3916,7 @@ def _purge_user_account(db: Session, user_id: int) -> dict[str, Any]:
                 delete_mkpx_from_vault(post.storage_key, post.storage_shard)
 
             # Delete the post (cascades to comments, reactions, admin_notes)
+            detach_post_from_lineage(db, post.id)
             db.delete(post)
             counts["posts"] += 1
 
@@ -3956,6 +4238,7 @@ def backfill_post_files(batch_size: int = 100) -> dict[str, Any]:
     """
     from . import models, vault
     from .db import get_session
+    from .services.storage_ledger import adjust_post_storage
 
     db = next(get_session())
     try:
@@ -4010,6 +4293,7 @@ def backfill_post_files(batch_size: int = 100) -> dict[str, Any]:
                             is_native=False,
                         )
                         db.add(pf)
+                        adjust_post_storage(db, post, derived=file_size)
                         created += 1
                     else:
                         skipped += 1
@@ -0,0 +1,42 @@
+"""Compact AMP feature encoding used for indexed player criteria filtering.
+
+``posts.amp_flags`` is a generated column packing the four AMP transparency
+booleans into one smallint (expression in ``models.Post.amp_flags``). Boolean
+criteria are answered by enumerating the 16 possible flag values and keeping
+those that satisfy every criterion, which turns any combination of
+``transparency_*``/``alpha_*`` criteria into a single ``amp_flags IN (...)``
+predicate served by ``ix_posts_amp_flags``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+AMP_FLAG_TRANSPARENCY_META = 1
+AMP_FLAG_ALPHA_META = 2
+AMP_FLAG_TRANSPARENCY_ACTUAL = 4
+AMP_FLAG_ALPHA_ACTUAL = 8
+
+AMP_FLAG_BITS: dict[str, int] = {
+    "transparency_meta": AMP_FLAG_TRANSPARENCY_META,
+    "alpha_meta": AMP_FLAG_ALPHA_META,
+    "transparency_actual": AMP_FLAG_TRANSPARENCY_ACTUAL,
+    "alpha_actual": AMP_FLAG_ALPHA_ACTUAL,
+}
+
+_ALL_FLAG_VALUES = range(1 << len(AMP_FLAG_BITS))
+
+
+def allowed_flag_values(criteria: Iterable[tuple[str, str, bool]]) -> list[int]:
+    """Return the ``amp_flags`` values satisfying every boolean criterion.
+
+    Each criterion is ``(field, op, value)`` with ``op`` in ``{"eq", "neq"}``
+    (the only operators the protocol accepts for boolean fields). An empty
+    result means the criteria are contradictory and nothing can match.
+    """
+    allowed = set(_ALL_FLAG_VALUES)
+    for field, op, value in criteria:
+        bit = AMP_FLAG_BITS[field]
+        want = bool(value) if op == "eq" else not bool(value)
+        allowed = {v for v in allowed if bool(v & bit) == want}
+    return sorted(allowed)
@@ -0,0 +1,94 @@
+"""Compact column types for high-volume raw event rows (view_events).
+
+The ORM keeps seeing the same Python values as before — hex digest strings
+and plain labels — while the database stores:
+
+- ``HexDigest``: 32-byte ``bytea`` for SHA-256 hex digests (64 chars as
+  text). A value that is not valid hex is stored as its own SHA-256, so
+  distinct inputs stay distinct (the migration applies the same rule).
+- ``CodedLabel``: a ``smallint`` code for a low-cardinality label. Codes are
+  positions in an append-only tuple (1-based); 0 stores any label outside
+  the tuple and reads back as ``OTHER``.
+
+Code tuples are persisted data: only ever append to them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+
+from sqlalchemy import LargeBinary, SmallInteger
+from sqlalchemy.types import TypeDecorator
+
+OTHER = "other"
+
+DEVICE_TYPES = ("desktop", "mobile", "tablet", "player")
+VIEW_SOURCES = ("web", "api", "widget", "player")
+# Canonical values first, then the pre-redesign ones (view_metrics).
+VIEW_TYPES = ("view", "impression", "intentional", "listing", "search", "widget")
+CHANNELS = ("all", "promoted", "user", "by_user", "artwork", "hashtag", "reactions")
+
+
+def label_code(labels: tuple[str, ...], label: str) -> int:
+    """Stored code for ``label`` (0 when it is not in ``labels``)."""
+    try:
+        return labels.index(label) + 1
+    except ValueError:
+        return 0
+
+
+def label_case_sql(labels: tuple[str, ...], column: str) -> str:
+    """SQL CASE mapping a text column to codes, for migrations."""
+    whens = " ".join(
+        f"WHEN {column} = '{label}' THEN {code}"
+        for code, label in enumerate(labels, start=1)
+    )
+    return f"CASE WHEN {column} IS NULL THEN NULL {whens} ELSE 0 END"
+
+
+def digest_sql(column: str) -> str:
+    """SQL converting a hex-digest text column to bytea, for migrations."""
+    return (
+        f"CASE WHEN {column} ~ '^([0-9a-fA-F]{{2}})*$' THEN decode({column}, 'hex') "
+        f"ELSE sha256(convert_to({column}, 'UTF8')) END"
+    )
+
+
+class HexDigest(TypeDecorator):
+    """Hex digest string in Python, raw bytes in the database."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            return bytes.fromhex(value)
+        except ValueError:
+            return hashlib.sha256(value.encode("utf-8")).digest()
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else bytes(value).hex()
+
+
+class CodedLabel(TypeDecorator):
+    """String label in Python, smallint code in the database."""
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, labels: tuple[str, ...]):
+        super().__init__()
+        self.labels = labels
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else label_code(self.labels, value)
+
+    def process_literal_param(self, value, dialect):
+        return "NULL" if value is None else str(label_code(self.labels, value))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self.labels[value - 1] if 0 < value <= len(self.labels) else OTHER
@@ -13,6 +13,14 @@ Normative rules enforced here:
 - Links are append-only: replace-artwork may add parents, never removes.
 - Cycle rejection keeps Lineage a DAG (only reachable at replace time —
   a fresh upload can't be anyone's ancestor yet).
+
+Whole-Lineage reads go through the ``post_lineage_closure`` table (every
+ancestor/descendant pair with its shortest depth). It is maintained here:
+``create_lineage_links`` composes the new pairs, ``refresh_closure_below``
+recomputes a severed child's subtree, ``detach_post_from_lineage`` runs
+before a post hard-delete, and ``rebuild_lineage_closure`` re-derives the
+whole table (nightly task / migration backfill). Recomputation uses
+depth-limited recursive CTEs over post_lineage.
 """
 
 from __future__ import annotations
@@ -20,6 +28,7 @@ from __future__ import annotations
 import logging
 
 from fastapi import status
+from sqlalchemy import and_, func, or_
 from sqlalchemy import text as sa_text
 from sqlalchemy.orm import Session
 
@@ -31,6 +40,9 @@ from ..services.social_notifications import SocialNotificationService
 logger = logging.getLogger(__name__)
 
 MAX_PARENTS = 8
+# Longest ancestor/descendant path recorded in the closure (and walked by the
+# recomputing CTEs). Far beyond any real remix chain; bounds runaway walks.
+MAX_LINEAGE_DEPTH = 64
 
 _DESCENDANT_CHECK_SQL = sa_text("""
     WITH RECURSIVE descendants AS (
@@ -43,6 +55,55 @@ _DESCENDANT_CHECK_SQL = sa_text("""
     SELECT 1 FROM descendants WHERE child_post_id = :candidate_id LIMIT 1
     """)
 
+# Composes the pairs a new link child→parent creates: every ancestor of the
+# parent (and the parent) × every descendant of the child (and the child).
+_LINK_CLOSURE_SQL = sa_text("""
+    INSERT INTO post_lineage_closure (ancestor_post_id, descendant_post_id, depth)
+    SELECT a.ancestor_id, d.descendant_id, a.depth + d.depth + 1
+    FROM (
+        SELECT CAST(:parent_id AS integer) AS ancestor_id, 0 AS depth
+        UNION ALL
+        SELECT ancestor_post_id, depth FROM post_lineage_closure
+        WHERE descendant_post_id = :parent_id
+    ) a
+    CROSS JOIN (
+        SELECT CAST(:child_id AS integer) AS descendant_id, 0 AS depth
+        UNION ALL
+        SELECT descendant_post_id, depth FROM post_lineage_closure
+        WHERE ancestor_post_id = :child_id
+    ) d
+    WHERE a.depth + d.depth + 1 <= :max_depth
+    ON CONFLICT (ancestor_post_id, descendant_post_id)
+    DO UPDATE SET depth = least(post_lineage_closure.depth, EXCLUDED.depth)
+    """)
+
+# Re-derives the ancestors of the posts in :ids by walking live links
+# upwards (skipping :excluded, a post about to be hard-deleted; 0 = none).
+_ANCESTORS_CTE = """
+    WITH RECURSIVE up(descendant_id, ancestor_id, depth) AS (
+        SELECT pl.child_post_id, pl.parent_post_id, 1
+        FROM post_lineage pl
+        WHERE pl.parent_post_id IS NOT NULL
+          AND pl.parent_post_id <> :excluded
+          {seed}
+        UNION
+        SELECT up.descendant_id, pl.parent_post_id, up.depth + 1
+        FROM up
+        JOIN post_lineage pl ON pl.child_post_id = up.ancestor_id
+        WHERE pl.parent_post_id IS NOT NULL
+          AND pl.parent_post_id <> :excluded
+          AND up.depth < :max_depth
+    )
+    INSERT INTO post_lineage_closure (ancestor_post_id, descendant_post_id, depth)
+    SELECT ancestor_id, descendant_id, min(depth)
+    FROM up
+    GROUP BY ancestor_id, descendant_id
+"""
+_RECOMPUTE_ANCESTORS_SQL = sa_text(
+    _ANCESTORS_CTE.format(seed="AND pl.child_post_id = ANY(CAST(:ids AS integer[]))")
+)
+_REBUILD_CLOSURE_SQL = sa_text(_ANCESTORS_CTE.format(seed=""))
+
 
 def parse_remixed_from(raw: str | None) -> list[str]:
     """Split the comma-separated ``remixed_from`` field, deduped, order kept."""
@@ -155,6 +216,15 @@ def create_lineage_links(
         created.append(link)
     if created:
         db.flush()
+        for link in created:
+            db.execute(
+                _LINK_CLOSURE_SQL,
+                {
+                    "parent_id": link.parent_post_id,
+                    "child_id": child.id,
+                    "max_depth": MAX_LINEAGE_DEPTH,
+                },
+            )
     return created
 
 
@@ -168,16 +238,133 @@ def notify_remix_published(
 
     Content denormalizes from the *child*, so the notification leads to the
     new Remix. Self-remixes are skipped by the service's self-action guard.
+    Queued in the notification outbox: call before the caller's commit.
     """
     notified: set[int] = set()
     for parent in parents:
         if parent.owner_id in notified:
             continue
         notified.add(parent.owner_id)
-        SocialNotificationService.create_notification(
+        SocialNotificationService.enqueue_notification(
             db=db,
             user_id=parent.owner_id,
             notification_type=NotificationType.REMIX,
             post=child,
             actor=actor,
         )
+
+
+# ---------------------------------------------------------------------------
+# Closure maintenance
+# ---------------------------------------------------------------------------
+
+
+def _descendant_ids(db: Session, post_id: int) -> list[int]:
+    return [
+        row[0]
+        for row in db.query(models.PostLineageClosure.descendant_post_id).filter(
+            models.PostLineageClosure.ancestor_post_id == post_id
+        )
+    ]
+
+
+def _recompute_ancestors(db: Session, ids: list[int], excluded: int = 0) -> None:
+    """Drop and re-derive every closure row whose descendant is in ``ids``."""
+    if not ids:
+        return
+    db.query(models.PostLineageClosure).filter(
+        models.PostLineageClosure.descendant_post_id.in_(ids)
+    ).delete(synchronize_session=False)
+    db.execute(
+        _RECOMPUTE_ANCESTORS_SQL,
+        {"ids": ids, "excluded": excluded, "max_depth": MAX_LINEAGE_DEPTH},
+    )
+
+
+def refresh_closure_below(db: Session, child_id: int) -> None:
+    """Recompute closure rows for ``child_id`` and its descendants after one
+    of its links was removed (moderator severing). Call after the delete is
+    flushed; does not commit."""
+    db.flush()
+    _recompute_ancestors(db, [child_id, *_descendant_ids(db, child_id)])
+
+
+def detach_post_from_lineage(db: Session, post_id: int) -> None:
+    """Prepare the closure for hard-deleting ``post_id``.
+
+    The post's own rows cascade away with it, but its descendants may have
+    reached other ancestors only through it; recompute them without it.
+    Call before ``db.delete(post)``; does not commit.
+    """
+    _recompute_ancestors(db, _descendant_ids(db, post_id), excluded=post_id)
+
+
+def rebuild_lineage_closure(db: Session) -> int:
+    """Re-derive the whole closure table from post_lineage and commit.
+
+    Returns the number of closure rows written.
+    """
+    db.query(models.PostLineageClosure).delete(synchronize_session=False)
+    written = db.execute(
+        _REBUILD_CLOSURE_SQL, {"excluded": 0, "max_depth": MAX_LINEAGE_DEPTH}
+    ).rowcount
+    db.commit()
+    return written
+
+
+# ---------------------------------------------------------------------------
+# Whole-Lineage reads
+# ---------------------------------------------------------------------------
+
+
+def lineage_of(
+    db: Session, post_id: int, max_depth: int = MAX_LINEAGE_DEPTH
+) -> list[tuple[int, int]]:
+    """Every post in ``post_id``'s Lineage as (post_id, signed depth).
+
+    Ancestors carry negative depths, descendants positive (shortest path);
+    nearest first, ancestors before descendants at equal distance. One
+    indexed read per direction on the closure table.
+    """
+    C = models.PostLineageClosure
+    ancestors = (
+        db.query(C.ancestor_post_id, -C.depth)
+        .filter(C.descendant_post_id == post_id, C.depth <= max_depth)
+        .order_by(C.depth, C.ancestor_post_id)
+        .all()
+    )
+    descendants = (
+        db.query(C.descendant_post_id, C.depth)
+        .filter(C.ancestor_post_id == post_id, C.depth <= max_depth)
+        .order_by(C.depth, C.descendant_post_id)
+        .all()
+    )
+    return sorted(ancestors + descendants, key=lambda row: (abs(row[1]), row[1]))
+
+
+def descendant_counts(db: Session, post_ids: list[int]) -> dict[int, int]:
+    """Publicly visible descendants at any depth per post (same visibility
+    rule as post_stats' child_count)."""
+    if not post_ids:
+        return {}
+    C = models.PostLineageClosure
+    rows = (
+        db.query(C.ancestor_post_id, func.count())
+        .join(models.Post, models.Post.id == C.descendant_post_id)
+        .filter(
+            C.ancestor_post_id.in_(post_ids),
+            and_(
+                models.Post.deleted_by_user == False,
+                models.Post.visible == True,
+                models.Post.hidden_by_user == False,
+                models.Post.hidden_by_mod == False,
+                or_(
+                    models.Post.public_visibility == True,
+                    models.Post.promoted == True,
+                ),
+            ),
+        )
+        .group_by(C.ancestor_post_id)
+        .all()
+    )
+    return dict(rows)
@@ -0,0 +1,355 @@
+"""Minimal ZIP encoder for Batch Download Request (BDR) archives.
+
+``zipfile`` cannot resume a half-written archive (it needs the central
+directory at the end) and always recompresses whatever it is given, so BDR
+archives are encoded here instead. Only what BDRs need is supported:
+
+- STORED and DEFLATE members, with CRC and sizes known before the local
+  header is written (no data descriptors — every unzipper handles these);
+- UTF-8 names; no ZIP64 — archives stop at ``MAX_ARCHIVE_BYTES`` (a BDR is
+  at most 128 artworks, far below it).
+
+:class:`ResumableZipWriter` journals each finished member next to the
+partial file, so a retried build continues after the last complete member
+instead of starting over. :func:`stored_layout` / :func:`iter_range` serve
+an all-STORED archive on the fly, straight from the source files.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import zlib
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+
+STORED = 0
+DEFLATED = 8
+
+# Without ZIP64 every offset and size must fit in 32 bits.
+MAX_ARCHIVE_BYTES = 0xFFFFFFFF
+
+_VERSION = 20  # 2.0: deflate
+_FLAG_UTF8 = 0x0800
+
+
+@dataclass
+class ZipMember:
+    """One archive member as recorded in the central directory."""
+
+    name: str
+    method: int
+    crc: int
+    size: int
+    compressed_size: int
+    dos_time: int
+    dos_date: int
+    offset: int = 0
+
+    @property
+    def header_size(self) -> int:
+        return 30 + len(self.name.encode("utf-8"))
+
+    @property
+    def end(self) -> int:
+        """Offset just past this member's data."""
+        return self.offset + self.header_size + self.compressed_size
+
+
+def dos_datetime(when: datetime | None) -> tuple[int, int]:
+    """(time, date) in MS-DOS format; ZIP cannot represent years before 1980."""
+    if when is None or when.year < 1980:
+        return 0, (0 << 9) | (1 << 5) | 1
+    return (
+        (when.hour << 11) | (when.minute << 5) | (when.second // 2),
+        ((when.year - 1980) << 9) | (when.month << 5) | when.day,
+    )
+
+
+def deflate(data: bytes) -> bytes:
+    """Raw DEFLATE stream (no zlib header), as ZIP method 8 expects."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush()
+
+
+def make_member(
+    name: str,
+    data: bytes,
+    *,
+    compress: bool,
+    mtime: datetime | None,
+) -> tuple[ZipMember, bytes]:
+    """Encode ``data`` for ``name``; returns the member and its payload bytes."""
+    payload = deflate(data) if compress else data
+    dos_time, dos_date = dos_datetime(mtime)
+    member = ZipMember(
+        name=name,
+        method=DEFLATED if compress else STORED,
+        crc=zlib.crc32(data) & 0xFFFFFFFF,
+        size=len(data),
+        compressed_size=len(payload),
+        dos_time=dos_time,
+        dos_date=dos_date,
+    )
+    return member, payload
+
+
+def local_header(member: ZipMember) -> bytes:
+    name = member.name.encode("utf-8")
+    return (
+        struct.pack(
+            "<IHHHHHIIIHH",
+            0x04034B50,
+            _VERSION,
+            _FLAG_UTF8,
+            member.method,
+            member.dos_time,
+            member.dos_date,
+            member.crc,
+            member.compressed_size,
+            member.size,
+            len(name),
+            0,
+        )
+        + name
+    )
+
+
+def central_directory(members: list[ZipMember], start: int) -> bytes:
+    """Central directory records plus end-of-central-directory, at ``start``."""
+    records = []
+    for member in members:
+        name = member.name.encode("utf-8")
+        records.append(
+            struct.pack(
+                "<IHHHHHHIIIHHHHHII",
+                0x02014B50,
+                (3 << 8) | _VERSION,  # made by: Unix
+                _VERSION,
+                _FLAG_UTF8,
+                member.method,
+                member.dos_time,
+                member.dos_date,
+                member.crc,
+                member.compressed_size,
+                member.size,
+                len(name),
+                0,
+                0,
+                0,
+                0,
+                0o100644 << 16,  # regular file, rw-r--r--
+                member.offset,
+            )
+            + name
+        )
+    directory = b"".join(records)
+    if len(members) > 0xFFFF or start + len(directory) > MAX_ARCHIVE_BYTES:
+        raise ValueError("Archive too large without ZIP64")
+    eocd = struct.pack(
+        "<IHHHHIIH",
+        0x06054B50,
+        0,
+        0,
+        len(members),
+        len(members),
+        len(directory),
+        start,
+        0,
+    )
+    return directory + eocd
+
+
+class ResumableZipWriter:
+    """Append members to ``{path}.part``; ``finish()`` moves it to ``path``.
+
+    Each completed member is journaled to ``{path}.journal`` (one JSON line,
+    written after the member's bytes are flushed). Opening a writer over an
+    existing partial build keeps the journaled members whose bytes are fully
+    on disk, truncates anything after them, and exposes their names in
+    ``completed`` so the caller can skip them.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.part_path = self.path.with_name(self.path.name + ".part")
+        self.journal_path = self.path.with_name(self.path.name + ".journal")
+        self.members: list[ZipMember] = self._load_journal()
+        offset = self.members[-1].end if self.members else 0
+
+        self._file = open(self.part_path, "r+b" if self.members else "wb")
+        self._file.truncate(offset)
+        self._file.seek(offset)
+        self._journal = open(self.journal_path, "a" if self.members else "w")
+
+    @property
+    def completed(self) -> set[str]:
+        return {member.name for member in self.members}
+
+    @property
+    def offset(self) -> int:
+        return self._file.tell()
+
+    def _load_journal(self) -> list[ZipMember]:
+        if not (self.part_path.exists() and self.journal_path.exists()):
+            return []
+        on_disk = self.part_path.stat().st_size
+        members: list[ZipMember] = []
+        expected = 0
+        for line in self.journal_path.read_text().splitlines():
+            try:
+                member = ZipMember(**json.loads(line))
+            except (ValueError, TypeError):
+                break  # torn final line
+            if member.offset != expected or member.end > on_disk:
+                break
+            members.append(member)
+            expected = member.end
+        # Rewrite the journal to exactly the members being kept.
+        self.journal_path.write_text(
+            "".join(json.dumps(asdict(m)) + "\n" for m in members)
+        )
+        return members
+
+    def add(
+        self,
+        name: str,
+        data: bytes,
+        *,
+        compress: bool,
+        mtime: datetime | None = None,
+    ) -> ZipMember:
+        member, payload = make_member(name, data, compress=compress, mtime=mtime)
+        return self.add_encoded(member, payload)
+
+    def add_encoded(self, member: ZipMember, payload: bytes) -> ZipMember:
+        """Append a member already encoded by :func:`make_member`."""
+        member.offset = self.offset
+        if member.end > MAX_ARCHIVE_BYTES:
+            raise ValueError("Archive too large without ZIP64")
+        self._file.write(local_header(member))
+        self._file.write(payload)
+        self._file.flush()
+        self.members.append(member)
+        self._journal.write(json.dumps(asdict(member)) + "\n")
+        self._journal.flush()
+        return member
+
+    def finish(self) -> int:
+        """Write the central directory, publish the archive, return its size."""
+        self._file.write(central_directory(self.members, self.offset))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        size = self._file.tell()
+        self.close()
+        os.replace(self.part_path, self.path)
+        self.journal_path.unlink(missing_ok=True)
+        return size
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+        if not self._journal.closed:
+            self._journal.close()
+
+    def discard(self) -> None:
+        """Abandon the build and delete its partial files."""
+        self.close()
+        discard_partial_archive(self.path)
+
+
+def discard_partial_archive(path: Path) -> None:
+    """Delete the ``.part`` and ``.journal`` files of an unfinished build."""
+    path = Path(path)
+    path.with_name(path.name + ".part").unlink(missing_ok=True)
+    path.with_name(path.name + ".journal").unlink(missing_ok=True)
+
+
+# ---------------------------------------------------------------------------
+# On-the-fly archives
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class Segment:
+    """A contiguous byte run of a streamed archive.
+
+    Exactly one of ``data`` (literal bytes: headers, directory, small
+    documents) or ``path`` (a file copied verbatim) is set.
+    """
+
+    offset: int
+    length: int
+    data: bytes | None = None
+    path: Path | None = None
+
+    @property
+    def end(self) -> int:
+        return self.offset + self.length
+
+
+def stored_layout(
+    entries: list[tuple[ZipMember, bytes | Path]],
+) -> tuple[list[Segment], int]:
+    """
+    Lay out an all-STORED archive without reading any file contents.
+
+    Each entry is a member (CRC and sizes already known) with its payload as
+    bytes or a path. Because STORED payloads are copied verbatim, every
+    offset — and so the total size — is known up front, which is what lets
+    an on-the-fly archive send Content-Length and serve byte ranges.
+
+    Returns:
+        (segments in archive order, total archive size)
+    """
+    segments: list[Segment] = []
+    members: list[ZipMember] = []
+    offset = 0
+    for member, source in entries:
+        if member.method != STORED or member.size != member.compressed_size:
+            raise ValueError(f"{member.name}: on-the-fly members must be STORED")
+        member.offset = offset
+        header = local_header(member)
+        segments.append(Segment(offset, len(header), data=header))
+        offset += len(header)
+        if isinstance(source, bytes):
+            segments.append(Segment(offset, member.size, data=source))
+        else:
+            segments.append(Segment(offset, member.size, path=Path(source)))
+        offset += member.size
+        if offset > MAX_ARCHIVE_BYTES:
+            raise ValueError("Archive too large without ZIP64")
+        members.append(member)
+    directory = central_directory(members, offset)
+    segments.append(Segment(offset, len(directory), data=directory))
+    return segments, offset + len(directory)
+
+
+def iter_range(
+    segments: list[Segment], start: int, stop: int, chunk_size: int = 64 * 1024
+):
+    """Yield archive bytes ``[start, stop)`` from a :func:`stored_layout`.
+
+    Raises:
+        OSError: If a source file is shorter than its manifest entry (it
+            changed after the layout was computed).
+    """
+    for segment in segments:
+        if segment.end <= start or segment.offset >= stop:
+            continue
+        lo = max(start, segment.offset) - segment.offset
+        hi = min(stop, segment.end) - segment.offset
+        if segment.data is not None:
+            yield segment.data[lo:hi]
+            continue
+        with open(segment.path, "rb") as f:
+            f.seek(lo)
+            remaining = hi - lo
+            while remaining:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    raise OSError(f"{segment.path} is shorter than expected")
+                remaining -= len(chunk)
+                yield chunk
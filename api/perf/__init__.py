@@ -0,0 +1,11 @@
+"""Reproducible load-test and benchmark suite (``python -m perf``).
+
+  - seed.py: synthetic data generator for a scratch database, plus the
+    manifest the scenarios read;
+  - http_load.py: feeds, search, post pages and player RPC over HTTP;
+  - mqtt_load.py: player request and view storms on the broker;
+  - pipelines.py: upload + SSAFPP, and the nightly view-events rollup;
+  - results.py: the JSON result format and the commit-to-commit compare.
+
+Not imported by the app; see docs/load-testing/README.md.
+"""
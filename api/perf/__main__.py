@@ -0,0 +1,261 @@
+"""Command line for the load-test suite (run from api/: ``python -m perf``).
+
+Usage:
+    python -m perf seed    --manifest perf-manifest.json [--posts N ...]
+    python -m perf http    --manifest perf-manifest.json --scenario mixed
+    python -m perf mqtt    --manifest perf-manifest.json --scenario views
+    python -m perf upload  --manifest perf-manifest.json --count 50
+    python -m perf rollup  --manifest perf-manifest.json --repeats 3
+    python -m perf compare base.json head.json
+
+Every scenario prints its JSON result, or writes it with ``--out`` (a file, or
+a directory for ``<scenario>-<commit>-<time>.json``). ``compare`` exits 1 when
+the head result regressed against the base one. See
+docs/load-testing/README.md for setting up the scratch database and stack.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from dataclasses import fields
+from datetime import datetime, timezone
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+# httpx logs every request at INFO, which floods the console under load.
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logger = logging.getLogger("perf")
+
+
+def _session():
+    from app.db import SessionLocal
+
+    return SessionLocal()
+
+
+def _record(scenario: str, args: argparse.Namespace, manifest: dict, run) -> int:
+    from .results import build_result, write_result
+
+    params = {
+        k: v
+        for k, v in vars(args).items()
+        if k not in ("command", "func", "out", "metrics_token", "password")
+    }
+    params["seed_config"] = manifest.get("config")
+    started_at = datetime.now(timezone.utc)
+    started = time.perf_counter()
+    metrics = run()
+    result = build_result(
+        scenario, params, metrics, started_at, time.perf_counter() - started
+    )
+    write_result(result, args.out)
+    return 0
+
+
+def cmd_seed(args: argparse.Namespace) -> int:
+    from .config import SeedConfig
+    from .seed import seed, write_manifest
+
+    cfg = SeedConfig(**{f.name: getattr(args, f.name) for f in fields(SeedConfig)})
+    db = _session()
+    try:
+        manifest = seed(db, cfg)
+    finally:
+        db.close()
+    write_manifest(manifest, args.manifest)
+    return 0
+
+
+def cmd_http(args: argparse.Namespace) -> int:
+    from . import http_load
+    from .seed import load_manifest
+
+    manifest = load_manifest(args.manifest)
+    return _record(
+        f"http:{args.scenario}",
+        args,
+        manifest,
+        lambda: asyncio.run(
+            http_load.run(
+                args.base_url,
+                manifest,
+                args.scenario,
+                args.concurrency,
+                args.duration,
+                args.warmup,
+                args.seed,
+                args.metrics_token,
+            )
+        ),
+    )
+
+
+def cmd_mqtt(args: argparse.Namespace) -> int:
+    from . import mqtt_load
+    from .seed import load_manifest
+
+    manifest = load_manifest(args.manifest)
+    return _record(
+        f"mqtt:{args.scenario}",
+        args,
+        manifest,
+        lambda: mqtt_load.run(
+            manifest,
+            args.scenario,
+            args.host,
+            args.port,
+            args.username,
+            args.password,
+            args.tls,
+            args.rate,
+            args.duration,
+            args.batch_size,
+            args.timeout,
+            args.seed,
+        ),
+    )
+
+
+def cmd_upload(args: argparse.Namespace) -> int:
+    from .pipelines import run_upload
+    from .seed import load_manifest
+
+    manifest = load_manifest(args.manifest)
+    db = _session()
+    try:
+        return _record(
+            "upload",
+            args,
+            manifest,
+            lambda: run_upload(
+                db,
+                args.base_url,
+                manifest,
+                args.count,
+                args.concurrency,
+                args.ssafpp_timeout,
+                args.seed,
+            ),
+        )
+    finally:
+        db.close()
+
+
+def cmd_rollup(args: argparse.Namespace) -> int:
+    from .pipelines import run_rollup
+    from .seed import load_manifest
+
+    manifest = load_manifest(args.manifest)
+    db = _session()
+    try:
+        return _record(
+            "rollup", args, manifest, lambda: run_rollup(db, manifest, args.repeats)
+        )
+    finally:
+        db.close()
+
+
+def cmd_compare(args: argparse.Namespace) -> int:
+    from .results import compare, format_comparison, load_result
+
+    base, head = load_result(args.base), load_result(args.head)
+    rows, regressions = compare(base, head, args.threshold, args.floor_ms)
+    print(f"base {base['git'].get('commit')}  head {head['git'].get('commit')}")
+    print(format_comparison(rows))
+    if regressions:
+        print("\nREGRESSIONS:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+def _parser() -> argparse.ArgumentParser:
+    from .config import SeedConfig
+    from .http_load import SCENARIOS
+
+    parser = argparse.ArgumentParser(
+        prog="python -m perf", description=__doc__.split("\n\n")[0]
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def scenario_parser(name: str, help: str) -> argparse.ArgumentParser:
+        p = sub.add_parser(name, help=help)
+        p.add_argument("--manifest", default="perf-manifest.json")
+        p.add_argument("--seed", type=int, default=1)
+        p.add_argument("--out", help="result file or directory (default: stdout)")
+        return p
+
+    p = sub.add_parser("seed", help="fill a scratch database with synthetic data")
+    p.add_argument("--manifest", default="perf-manifest.json")
+    for f in fields(SeedConfig):
+        p.add_argument(f"--{f.name.replace('_', '-')}", type=int, default=f.default)
+    p.set_defaults(func=cmd_seed)
+
+    base_url = os.getenv("PERF_BASE_URL", "http://localhost:8000")
+
+    p = scenario_parser("http", "feeds, search, post pages and player RPC")
+    p.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    p.add_argument("--base-url", default=base_url)
+    p.add_argument("--concurrency", type=int, default=16)
+    p.add_argument("--duration", type=float, default=60.0)
+    p.add_argument("--warmup", type=float, default=10.0)
+    p.add_argument(
+        "--metrics-token",
+        default=os.getenv("METRICS_TOKEN"),
+        help="scrape /metrics for SQL statements per request (default: "
+        "$METRICS_TOKEN)",
+    )
+    p.set_defaults(func=cmd_http)
+
+    p = scenario_parser("mqtt", "player request / view storms on the broker")
+    p.add_argument("--scenario", choices=["requests", "views"], default="requests")
+    p.add_argument("--host", default=os.getenv("MQTT_BROKER_HOST", "mqtt"))
+    p.add_argument(
+        "--port", type=int, default=int(os.getenv("MQTT_BROKER_PORT", "1883"))
+    )
+    p.add_argument("--username", default=os.getenv("PERF_MQTT_USERNAME"))
+    p.add_argument("--password", default=os.getenv("PERF_MQTT_PASSWORD"))
+    p.add_argument("--tls", action="store_true")
+    p.add_argument("--rate", type=float, default=50.0, help="messages per second")
+    p.add_argument("--duration", type=float, default=60.0)
+    p.add_argument("--batch-size", type=int, default=20, help="events per batch")
+    p.add_argument("--timeout", type=float, default=10.0)
+    p.set_defaults(func=cmd_mqtt)
+
+    p = scenario_parser("upload", "upload artworks and time them through SSAFPP")
+    p.add_argument("--base-url", default=base_url)
+    p.add_argument("--count", type=int, default=50)
+    p.add_argument("--concurrency", type=int, default=4)
+    p.add_argument("--ssafpp-timeout", type=float, default=120.0)
+    p.set_defaults(func=cmd_upload)
+
+    p = scenario_parser("rollup", "time the nightly view-events rollup")
+    p.add_argument("--repeats", type=int, default=3)
+    p.set_defaults(func=cmd_rollup)
+
+    p = sub.add_parser("compare", help="compare two results; exit 1 on regression")
+    p.add_argument("base")
+    p.add_argument("head")
+    p.add_argument("--threshold", type=float, default=0.10)
+    p.add_argument("--floor-ms", type=float, default=1.0)
+    p.set_defaults(func=cmd_compare)
+    return parser
+
+
+def main() -> int:
+    args = _parser().parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
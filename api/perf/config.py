@@ -0,0 +1,26 @@
+"""Seed parameters, shared by the generator and the command line."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+# Watermark row (rollup_watermarks.name) marking a database as a load-test
+# target; written by the seed, required by the destructive scenarios.
+PERF_MARKER = "perf_seed"
+
+
+@dataclass
+class SeedConfig:
+    seed: int = 1
+    users: int = 5_000
+    uploaders: int = 20
+    viewers: int = 200
+    posts: int = 100_000
+    playlists: int = 500
+    follows: int = 100_000
+    reactions: int = 300_000
+    comments: int = 50_000
+    views: int = 2_000_000
+    days: int = 6
+    players: int = 200
+    history_days: int = 365
@@ -0,0 +1,230 @@
+"""HTTP scenarios: feeds, search and post pages against a running API.
+
+Closed-loop load: ``--concurrency`` workers each send the next request as soon
+as the previous one answered, for ``--duration`` seconds after a ``--warmup``
+that is not recorded. Each worker draws its requests from the scenario's
+weighted mix with its own ``random.Random(seed + worker)``, so the request
+sequence is the same on every run.
+
+Operations are labelled ``METHOD <route template>`` — the same route label
+app.metrics uses — so with ``--metrics-token`` the run also scrapes ``/metrics``
+before and after and records the SQL statements per request of every route,
+an exact number that catches N+1 regressions noisy latencies hide.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import httpx
+
+from .results import Recorder
+
+
+@dataclass(frozen=True)
+class Operation:
+    method: str
+    route: str  # route template, as labelled by app.metrics
+    build: Callable[[random.Random, dict], tuple[str, dict[str, Any]]]
+
+    @property
+    def label(self) -> str:
+        return f"{self.method} {self.route}"
+
+
+def _viewer(rng: random.Random, manifest: dict) -> dict[str, str]:
+    return {"Authorization": f"Bearer {rng.choice(manifest['viewers'])['token']}"}
+
+
+def _maybe_viewer(rng: random.Random, manifest: dict) -> dict[str, str]:
+    return _viewer(rng, manifest) if rng.random() < 0.5 else {}
+
+
+def _query(rng: random.Random, manifest: dict) -> str:
+    words = manifest["vocabulary"]
+    return " ".join(rng.sample(words, rng.choice([1, 1, 2])))
+
+
+RECENT = Operation("GET", "/v1/post/recent", lambda rng, m: ("/v1/post/recent", {}))
+PROMOTED = Operation(
+    "GET", "/v1/feed/promoted", lambda rng, m: ("/v1/feed/promoted", {})
+)
+FOLLOWING = Operation(
+    "GET",
+    "/v1/feed/following",
+    lambda rng, m: ("/v1/feed/following", {"headers": _viewer(rng, m)}),
+)
+POST_PAGE = Operation(
+    "GET",
+    "/v1/p/{public_sqid}",
+    lambda rng, m: (
+        f"/v1/p/{rng.choice(m['post_sqids'])}",
+        {"headers": _maybe_viewer(rng, m)},
+    ),
+)
+COMMENTS = Operation(
+    "GET",
+    "/v1/post/{id}/comments",
+    lambda rng, m: (f"/v1/post/{rng.choice(m['post_ids'])}/comments", {}),
+)
+SEARCH = Operation(
+    "GET",
+    "/v1/search",
+    lambda rng, m: (
+        "/v1/search",
+        {"params": {"q": _query(rng, m)}, "headers": _viewer(rng, m)},
+    ),
+)
+SUGGEST = Operation(
+    "GET",
+    "/v1/search/suggest",
+    lambda rng, m: (
+        "/v1/search/suggest",
+        {
+            "params": {"q": rng.choice(m["vocabulary"])[: rng.randint(1, 4)]},
+            "headers": _viewer(rng, m),
+        },
+    ),
+)
+HASHTAG_POSTS = Operation(
+    "GET",
+    "/v1/hashtags/{tag}/posts",
+    lambda rng, m: (f"/v1/hashtags/{rng.choice(m['vocabulary'])}/posts", {}),
+)
+PLAYER_QUERY = Operation(
+    "POST",
+    "/player/rpc",
+    lambda rng, m: (
+        "/player/rpc",
+        {
+            "json": {
+                "request_type": "query_posts",
+                "channel": rng.choice(["all", "promoted", "user"]),
+            },
+            "headers": {"Authorization": f"Bearer {rng.choice(m['players'])['token']}"},
+        },
+    ),
+)
+
+# Weighted mixes; "mixed" approximates the production request shares.
+SCENARIOS: dict[str, list[tuple[Operation, int]]] = {
+    "feeds": [(RECENT, 4), (PROMOTED, 3), (FOLLOWING, 3)],
+    "search": [(SEARCH, 3), (SUGGEST, 2), (HASHTAG_POSTS, 2)],
+    "posts": [(POST_PAGE, 4), (COMMENTS, 2)],
+    "player": [(PLAYER_QUERY, 1)],
+    "mixed": [
+        (RECENT, 6),
+        (PROMOTED, 4),
+        (FOLLOWING, 3),
+        (POST_PAGE, 8),
+        (COMMENTS, 3),
+        (SEARCH, 2),
+        (SUGGEST, 2),
+        (HASHTAG_POSTS, 1),
+        (PLAYER_QUERY, 4),
+    ],
+}
+
+
+async def _scrape_db_queries(
+    client: httpx.AsyncClient, token: str
+) -> dict[str, tuple[float, float]]:
+    """(sum, count) of makapix_http_request_db_queries per route label."""
+    from prometheus_client.parser import text_string_to_metric_families
+
+    resp = await client.get("/metrics", headers={"Authorization": f"Bearer {token}"})
+    resp.raise_for_status()
+    totals: dict[str, list[float]] = {}
+    for family in text_string_to_metric_families(resp.text):
+        if family.name != "makapix_http_request_db_queries":
+            continue
+        for sample in family.samples:
+            route = sample.labels.get("route")
+            if sample.name.endswith("_sum"):
+                totals.setdefault(route, [0.0, 0.0])[0] += sample.value
+            elif sample.name.endswith("_count"):
+                totals.setdefault(route, [0.0, 0.0])[1] += sample.value
+    return {route: (s, c) for route, (s, c) in totals.items()}
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    mix: list[tuple[Operation, int]],
+    manifest: dict,
+    rng: random.Random,
+    recorder: Recorder,
+    stop_at: float,
+) -> None:
+    operations, weights = zip(*mix, strict=True)
+    while time.perf_counter() < stop_at:
+        op = rng.choices(operations, weights=weights)[0]
+        path, kwargs = op.build(rng, manifest)
+        started = time.perf_counter()
+        try:
+            resp = await client.request(op.method, path, **kwargs)
+            outcome = str(resp.status_code)
+            ok = resp.status_code < 400
+        except httpx.HTTPError as e:
+            outcome, ok = type(e).__name__, False
+        recorder.observe(op.label, time.perf_counter() - started, ok, outcome)
+
+
+async def _run_workers(
+    client: httpx.AsyncClient,
+    mix: list[tuple[Operation, int]],
+    manifest: dict,
+    seeds: list[int],
+    recorder: Recorder,
+    seconds: float,
+) -> None:
+    stop_at = time.perf_counter() + seconds
+    await asyncio.gather(
+        *(
+            _worker(client, mix, manifest, random.Random(s), recorder, stop_at)
+            for s in seeds
+        )
+    )
+
+
+async def run(
+    base_url: str,
+    manifest: dict,
+    scenario: str,
+    concurrency: int,
+    duration: float,
+    warmup: float,
+    seed: int,
+    metrics_token: str | None = None,
+) -> dict[str, dict[str, Any]]:
+    """Run one scenario and return its per-operation metrics."""
+    mix = SCENARIOS[scenario]
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=30.0, limits=limits
+    ) as client:
+        if warmup > 0:
+            warmup_seeds = [-seed - i for i in range(concurrency)]
+            await _run_workers(client, mix, manifest, warmup_seeds, recorder, warmup)
+            recorder.restart()
+
+        before = {}
+        if metrics_token:
+            before = await _scrape_db_queries(client, metrics_token)
+        seeds = [seed + i for i in range(concurrency)]
+        await _run_workers(client, mix, manifest, seeds, recorder, duration)
+        metrics = recorder.metrics()
+
+        if metrics_token:
+            after = await _scrape_db_queries(client, metrics_token)
+            for label, values in metrics.items():
+                route = label.split(" ", 1)[1]
+                s1, c1 = after.get(route, (0.0, 0.0))
+                s0, c0 = before.get(route, (0.0, 0.0))
+                if c1 > c0:
+                    values["db_queries_per_request"] = round((s1 - s0) / (c1 - c0), 2)
+    return metrics
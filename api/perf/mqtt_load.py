@@ -0,0 +1,219 @@
+"""MQTT scenarios: player request and view storms against a local broker.
+
+Open-loop load: messages are published at a fixed ``--rate`` (per second)
+regardless of how fast the API answers, the way a fleet of players behaves
+after a broker restart. Each message is published for a seeded player, round
+robin, and correlated with its answer:
+
+  - ``requests``: query_posts / get_post on makapix/player/{key}/request/{id},
+    timed until makapix/player/{key}/response/{id};
+  - ``views``: P3A view batches (``--batch-size`` events) on
+    makapix/player/{key}/views with ``request_ack``, timed until the
+    views/ack carrying the same batch_id. Per-event outcomes (accepted,
+    duplicate, rate_limited, ...) are tallied.
+
+Anything unanswered ``--timeout`` seconds after the last publish counts as an
+error. The bench connects as ONE broker account publishing for many players,
+so that account needs the player-side ACL for every key (see
+docs/load-testing/README.md); never point this at a production broker.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+from paho.mqtt import client as mqtt_client
+
+from .results import Recorder
+
+REQUEST_MIX = [("query_posts", 3), ("get_post", 1)]
+
+
+class _Correlator:
+    """Pending publishes keyed by correlation id, shared with paho's thread."""
+
+    def __init__(self, recorder: Recorder) -> None:
+        self.recorder = recorder
+        self.pending: dict[str, tuple[str, float]] = {}
+        self.view_items: dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def sent(self, key: str, label: str) -> None:
+        with self.lock:
+            self.pending[key] = (label, time.perf_counter())
+
+    def answered(self, key: str | None, ok: bool, outcome: str) -> None:
+        with self.lock:
+            entry = self.pending.pop(key, None) if key else None
+        if entry is not None:
+            label, started = entry
+            self.recorder.observe(label, time.perf_counter() - started, ok, outcome)
+
+    def count_items(self, results: list[dict]) -> None:
+        with self.lock:
+            for item in results:
+                status = item.get("status", "unknown")
+                self.view_items[status] = self.view_items.get(status, 0) + 1
+
+    def expire(self, timeout: float) -> None:
+        with self.lock:
+            leftover, self.pending = self.pending, {}
+        for label, _started in leftover.values():
+            self.recorder.observe(label, timeout, ok=False, outcome="timeout")
+
+
+def _on_message(correlator: _Correlator):
+    def handler(client, userdata, msg):
+        try:
+            payload = json.loads(msg.payload)
+        except ValueError:
+            return
+        if msg.topic.endswith("/views/ack"):
+            correlator.count_items(payload.get("results") or [])
+            correlator.answered(
+                payload.get("batch_id"),
+                bool(payload.get("success")),
+                payload.get("error_code") or "ack",
+            )
+        else:
+            ok = bool(payload.get("success", True))
+            outcome = "ok" if ok else payload.get("error_code") or "error"
+            correlator.answered(payload.get("request_id"), ok, outcome)
+
+    return handler
+
+
+def _connect(
+    host: str,
+    port: int,
+    username: str | None,
+    password: str | None,
+    tls: bool,
+    correlator: _Correlator,
+) -> mqtt_client.Client:
+    client = mqtt_client.Client(
+        callback_api_version=mqtt_client.CallbackAPIVersion.VERSION2,
+        client_id=f"perf-{uuid.uuid4().hex[:8]}",
+        protocol=mqtt_client.MQTTv5,
+    )
+    if username:
+        client.username_pw_set(username, password or "")
+    if tls:
+        client.tls_set()
+    client.on_message = _on_message(correlator)
+    connected = threading.Event()
+
+    def on_connect(c, userdata, flags, reason_code, properties):
+        if reason_code == 0:
+            c.subscribe("makapix/player/+/response/+", qos=1)
+            c.subscribe("makapix/player/+/views/ack", qos=1)
+            connected.set()
+
+    client.on_connect = on_connect
+    client.connect(host, port, keepalive=60)
+    client.loop_start()
+    if not connected.wait(10):
+        client.loop_stop()
+        raise SystemExit(f"Could not connect/subscribe to MQTT broker {host}:{port}")
+    return client
+
+
+def _request(rng: random.Random, manifest: dict, player_key: str) -> tuple[str, dict]:
+    request_type = rng.choices(*zip(*REQUEST_MIX, strict=True))[0]
+    body: dict[str, Any] = {
+        "request_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "request_type": request_type,
+        "player_key": player_key,
+    }
+    if request_type == "query_posts":
+        body["channel"] = rng.choice(["all", "promoted", "user"])
+    else:
+        body["post_id"] = rng.choice(manifest["post_ids"])
+    return f"mqtt {request_type}", body
+
+
+def _view_batch(
+    rng: random.Random, manifest: dict, player_key: str, batch_size: int
+) -> dict:
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return {
+        "player_key": player_key,
+        "batch_id": uuid.UUID(int=rng.getrandbits(128), version=4).hex,
+        "request_ack": True,
+        "events": [
+            {
+                "post_id": rng.choice(manifest["post_ids"]),
+                "timestamp": now,
+                "timezone": "",
+                "intent": "channel",
+                "play_order": 0,
+                "channel": rng.choice(["all", "promoted"]),
+            }
+            for _ in range(batch_size)
+        ],
+    }
+
+
+def run(
+    manifest: dict,
+    scenario: str,
+    host: str,
+    port: int,
+    username: str | None,
+    password: str | None,
+    tls: bool,
+    rate: float,
+    duration: float,
+    batch_size: int,
+    timeout: float,
+    seed: int,
+) -> dict[str, dict[str, Any]]:
+    """Publish the storm and return per-operation metrics."""
+    recorder = Recorder()
+    correlator = _Correlator(recorder)
+    client = _connect(host, port, username, password, tls, correlator)
+    rng = random.Random(seed)
+    players = [p["player_key"] for p in manifest["players"]]
+    interval = 1.0 / rate
+    try:
+        started = time.perf_counter()
+        sent = 0
+        while time.perf_counter() - started < duration:
+            player_key = players[sent % len(players)]
+            if scenario == "requests":
+                label, body = _request(rng, manifest, player_key)
+                correlator.sent(body["request_id"], label)
+                topic = f"makapix/player/{player_key}/request/{body['request_id']}"
+            else:
+                body = _view_batch(rng, manifest, player_key, batch_size)
+                correlator.sent(body["batch_id"], "mqtt views")
+                topic = f"makapix/player/{player_key}/views"
+            client.publish(topic, json.dumps(body), qos=1)
+            sent += 1
+            # Pace against the schedule, not the previous publish, so a slow
+            # publish does not lower the offered rate.
+            delay = started + sent * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        deadline = time.perf_counter() + timeout
+        while correlator.pending and time.perf_counter() < deadline:
+            time.sleep(0.05)
+        correlator.expire(timeout)
+    finally:
+        client.loop_stop()
+        client.disconnect()
+
+    metrics = recorder.metrics()
+    if "mqtt views" in metrics:
+        items = dict(sorted(correlator.view_items.items()))
+        metrics["mqtt views"]["view_items"] = items
+    for values in metrics.values():
+        values["offered_rate"] = rate
+    return metrics
@@ -0,0 +1,183 @@
+"""Pipeline scenarios: upload + SSAFPP, and the nightly view-events rollup.
+
+``upload`` posts ``--count`` generated PNGs to POST /v1/post/upload (spread
+over the seeded high-reputation uploaders, ``--concurrency`` at a time) and
+records two timings per artwork: the upload request itself, and upload to
+SSAFPP completion — the moment the worker commits the converted post_files
+rows, polled in the database. The second one includes the Celery queue wait,
+so run it against an otherwise idle worker.
+
+``rollup`` times app.tasks.rollup_view_events in process over the seeded view
+window. The rollup merges into post_stats_daily and advances a watermark, so
+before every repeat the window's daily rows are deleted and the watermark is
+moved back; the run therefore only works on a database carrying the seed mark
+(config.PERF_MARKER), and only while the seeded events are younger than the
+raw-event retention (the rollup drops older ones — reseed then).
+
+Both run inside the api container (or anywhere with its DB_* environment
+pointing at the seeded database).
+"""
+
+from __future__ import annotations
+
+import io
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Any
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .config import PERF_MARKER
+from .results import Recorder
+
+
+def _require_seeded(db: Session) -> None:
+    from app.services.view_metrics import get_watermark
+
+    if get_watermark(db, PERF_MARKER) is None:
+        raise SystemExit(
+            "Refusing to run: this database carries no perf_seed mark "
+            "(python -m perf seed)."
+        )
+
+
+def _png(rng: random.Random, size: int = 64) -> bytes:
+    from PIL import Image
+
+    image = Image.new("RGBA", (size, size))
+    palette = [tuple(rng.randrange(256) for _ in range(3)) + (255,) for _ in range(8)]
+    image.putdata([rng.choice(palette) for _ in range(size * size)])
+    # A random top row keeps every upload's hash unique across runs (the
+    # vault rejects duplicate artwork).
+    for x, byte in enumerate(uuid.uuid4().bytes * (size // 16)):
+        image.putpixel((x, 0), (byte, byte, byte, 255))
+    out = io.BytesIO()
+    image.save(out, format="PNG")
+    return out.getvalue()
+
+
+def _upload(
+    client: httpx.Client, token: str, image: bytes, title: str
+) -> tuple[float, int | None, str]:
+    started = time.perf_counter()
+    try:
+        resp = client.post(
+            "/v1/post/upload",
+            files={"image": ("bench.png", image, "image/png")},
+            data={"title": title, "hashtags": "bench"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+    except httpx.HTTPError as e:
+        return time.perf_counter() - started, None, type(e).__name__
+    elapsed = time.perf_counter() - started
+    if resp.status_code != 201:
+        return elapsed, None, str(resp.status_code)
+    return elapsed, resp.json()["post"]["id"], "201"
+
+
+def _wait_for_ssafpp(
+    db: Session,
+    uploaded: dict[int, float],
+    recorder: Recorder,
+    timeout: float,
+) -> None:
+    """Record upload->SSAFPP completion for each post (converted files exist)."""
+    pending = dict(uploaded)
+    deadline = time.perf_counter() + timeout
+    while pending and time.perf_counter() < deadline:
+        rows = db.execute(
+            text(
+                "SELECT post_id FROM post_files WHERE post_id = ANY(:ids) "
+                "GROUP BY post_id HAVING count(*) > 1"
+            ),
+            {"ids": list(pending)},
+        ).scalars()
+        now = time.perf_counter()
+        for post_id in rows:
+            recorder.observe("ssafpp end-to-end", now - pending.pop(post_id))
+        db.rollback()  # end the snapshot so the next poll sees new commits
+        time.sleep(0.2)
+    for _ in pending:
+        recorder.observe("ssafpp end-to-end", timeout, ok=False, outcome="timeout")
+
+
+def run_upload(
+    db: Session,
+    base_url: str,
+    manifest: dict,
+    count: int,
+    concurrency: int,
+    ssafpp_timeout: float,
+    seed: int,
+) -> dict[str, dict[str, Any]]:
+    _require_seeded(db)
+    rng = random.Random(seed)
+    uploaders = manifest["uploaders"]
+    jobs = [
+        (uploaders[i % len(uploaders)]["token"], _png(rng), f"bench upload {i}")
+        for i in range(count)
+    ]
+    recorder = Recorder()
+    uploaded: dict[int, float] = {}
+
+    with httpx.Client(base_url=base_url, timeout=60.0) as client:
+
+        def work(job):
+            result = _upload(client, *job)
+            return result, time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for (elapsed, post_id, outcome), done_at in pool.map(work, jobs):
+                recorder.observe("upload", elapsed, post_id is not None, outcome)
+                if post_id is not None:
+                    uploaded[post_id] = done_at
+
+    _wait_for_ssafpp(db, uploaded, recorder, ssafpp_timeout)
+    return recorder.metrics()
+
+
+def _reset_view_rollup(db: Session, first_day: date) -> None:
+    from app.services.view_metrics import set_view_watermark
+
+    db.execute(text("DELETE FROM post_stats_daily WHERE date >= :d"), {"d": first_day})
+    db.execute(text("DELETE FROM site_stats_daily WHERE date >= :d"), {"d": first_day})
+    set_view_watermark(db, first_day - timedelta(days=1))
+    db.commit()
+
+
+def run_rollup(db: Session, manifest: dict, repeats: int) -> dict[str, dict[str, Any]]:
+    from app.services.event_partitions import PARTITION_RETENTION_DAYS
+    from app.services.view_metrics import utc_today
+    from app.tasks import rollup_view_events
+
+    _require_seeded(db)
+    first_day = date.fromisoformat(manifest["view_window"]["first_day"])
+    if first_day < utc_today() - timedelta(days=PARTITION_RETENTION_DAYS):
+        raise SystemExit(
+            f"Seeded view events start {first_day}, past the raw-event retention; "
+            "reseed a fresh database."
+        )
+
+    recorder = Recorder()
+    rolled: list[int] = []
+    for _ in range(repeats):
+        _reset_view_rollup(db, first_day)
+        started = time.perf_counter()
+        result = rollup_view_events.apply().get()
+        elapsed = time.perf_counter() - started
+        ok = result.get("status") == "success"
+        recorder.observe("rollup_view_events", elapsed, ok, result.get("status"))
+        rolled.append(result.get("rolled_up", 0))
+
+    metrics = recorder.metrics()
+    if rolled:
+        metrics["rollup_view_events"]["rolled_up"] = rolled[-1]
+        mean_s = metrics["rollup_view_events"]["mean_ms"] / 1000
+        if mean_s:
+            metrics["rollup_view_events"]["events_per_s"] = round(rolled[-1] / mean_s)
+    return metrics
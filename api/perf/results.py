@@ -0,0 +1,234 @@
+"""Result records for the load-test suite, and the commit-to-commit compare.
+
+Every scenario writes one JSON document:
+
+    {
+      "suite": "makapix-perf", "format": 1,
+      "scenario": "http", "git": {"commit": "...", "dirty": false},
+      "started_at": "...", "duration_s": 61.2,
+      "params": {...},              # CLI arguments + seed manifest summary
+      "metrics": {                  # one entry per operation label
+        "GET /v1/post/recent": {"count": 1200, "errors": 0, "rps": 20.0,
+                                "mean_ms": ..., "p50_ms": ..., "p95_ms": ...,
+                                "p99_ms": ..., "max_ms": ...,
+                                "db_queries_per_request": 3.0},
+        ...
+      }
+    }
+
+``compare`` flags an operation as regressed when its p95 (or p50) grew by more
+than the threshold *and* by more than a small absolute floor (sub-millisecond
+noise is never a regression), when its error rate grew, or when it runs more
+SQL statements per request than before — the one metric that is exact.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import subprocess
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+SUITE = "makapix-perf"
+FORMAT = 1
+
+
+def git_revision() -> dict[str, Any]:
+    """Commit of the tree under test ($GIT_COMMIT wins, e.g. in containers)."""
+    commit = os.getenv("GIT_COMMIT")
+    if commit:
+        return {"commit": commit, "dirty": None}
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(
+            subprocess.run(
+                ["git", "status", "--porcelain", "--untracked-files=no"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(
+    latencies_ms: list[float], errors: int, elapsed_s: float
+) -> dict[str, Any]:
+    """Latency/throughput summary for one operation."""
+    values = sorted(latencies_ms)
+    count = len(values)
+    return {
+        "count": count,
+        "errors": errors,
+        "rps": round(count / elapsed_s, 2) if elapsed_s > 0 else 0.0,
+        "mean_ms": round(sum(values) / count, 3) if count else 0.0,
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+        "max_ms": round(values[-1], 3) if values else 0.0,
+    }
+
+
+@dataclass
+class Recorder:
+    """Collects per-operation latencies and errors while a scenario runs."""
+
+    latencies: dict[str, list[float]] = field(default_factory=dict)
+    errors: dict[str, int] = field(default_factory=dict)
+    outcomes: dict[str, dict[str, int]] = field(default_factory=dict)
+    started: float = field(default_factory=time.perf_counter)
+
+    def observe(
+        self, label: str, seconds: float, ok: bool = True, outcome: str | None = None
+    ) -> None:
+        """Record one operation; ``outcome`` (e.g. an HTTP status) is tallied."""
+        self.latencies.setdefault(label, []).append(seconds * 1000)
+        if not ok:
+            self.errors[label] = self.errors.get(label, 0) + 1
+        if outcome is not None:
+            tally = self.outcomes.setdefault(label, {})
+            tally[outcome] = tally.get(outcome, 0) + 1
+
+    def restart(self) -> None:
+        """Drop everything recorded so far (end of warm-up)."""
+        self.latencies.clear()
+        self.errors.clear()
+        self.outcomes.clear()
+        self.started = time.perf_counter()
+
+    def metrics(self) -> dict[str, dict[str, Any]]:
+        elapsed = time.perf_counter() - self.started
+        labels = sorted(set(self.latencies) | set(self.errors))
+        metrics = {}
+        for label in labels:
+            metrics[label] = summarize(
+                self.latencies.get(label, []), self.errors.get(label, 0), elapsed
+            )
+            if label in self.outcomes:
+                metrics[label]["outcomes"] = dict(sorted(self.outcomes[label].items()))
+        return metrics
+
+
+def build_result(
+    scenario: str,
+    params: dict[str, Any],
+    metrics: dict[str, dict[str, Any]],
+    started_at: datetime,
+    duration_s: float,
+) -> dict[str, Any]:
+    return {
+        "suite": SUITE,
+        "format": FORMAT,
+        "scenario": scenario,
+        "git": git_revision(),
+        "started_at": started_at.isoformat(),
+        "duration_s": round(duration_s, 3),
+        "params": params,
+        "metrics": metrics,
+    }
+
+
+def write_result(result: dict[str, Any], out: str | None) -> None:
+    """Write the result to ``out`` (a file, or a directory for an auto name)."""
+    text = json.dumps(result, indent=2, sort_keys=True)
+    if not out:
+        print(text)
+        return
+    path = Path(out)
+    if path.is_dir() or out.endswith("/"):
+        path.mkdir(parents=True, exist_ok=True)
+        commit = (result["git"].get("commit") or "nogit")[:12]
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        name = result["scenario"].replace(":", "-")
+        path = path / f"{name}-{commit}-{stamp}.json"
+    path.write_text(text + "\n")
+    print(f"Wrote {path}")
+
+
+def load_result(path: str) -> dict[str, Any]:
+    result = json.loads(Path(path).read_text())
+    if result.get("suite") != SUITE:
+        raise ValueError(f"{path} is not a {SUITE} result")
+    return result
+
+
+def _error_rate(metric: dict[str, Any]) -> float:
+    total = metric.get("count", 0)
+    return metric.get("errors", 0) / total if total else 0.0
+
+
+def compare(
+    base: dict[str, Any],
+    head: dict[str, Any],
+    threshold: float = 0.10,
+    floor_ms: float = 1.0,
+) -> tuple[list[dict[str, Any]], list[str]]:
+    """Rows comparing ``head`` to ``base``, and the regressions among them."""
+    if base["scenario"] != head["scenario"]:
+        raise ValueError(
+            f"cannot compare scenario {base['scenario']!r} with {head['scenario']!r}"
+        )
+    rows = []
+    regressions = []
+    for label in sorted(set(base["metrics"]) | set(head["metrics"])):
+        before = base["metrics"].get(label)
+        after = head["metrics"].get(label)
+        if before is None or after is None:
+            note = "only in base" if after is None else "new"
+            rows.append({"label": label, "note": note})
+            continue
+        row: dict[str, Any] = {"label": label}
+        for key in ("p50_ms", "p95_ms"):
+            old, new = before.get(key, 0.0), after.get(key, 0.0)
+            row[key] = (old, new)
+            grew = new - old
+            if grew > floor_ms and grew > threshold * old:
+                regressions.append(f"{label}: {key} {old:.1f} -> {new:.1f}")
+        if _error_rate(after) > _error_rate(before) + 0.001:
+            regressions.append(
+                f"{label}: error rate {_error_rate(before):.2%} -> "
+                f"{_error_rate(after):.2%}"
+            )
+        old_q = before.get("db_queries_per_request")
+        new_q = after.get("db_queries_per_request")
+        if old_q is not None and new_q is not None:
+            row["db_queries_per_request"] = (old_q, new_q)
+            if new_q > old_q + 0.5:
+                regressions.append(
+                    f"{label}: SQL statements/request {old_q:g} -> {new_q:g}"
+                )
+        rows.append(row)
+    return rows, regressions
+
+
+def format_comparison(rows: list[dict[str, Any]]) -> str:
+    lines = [f"{'operation':<44} {'p50 ms':>17} {'p95 ms':>17} {'sql/req':>11}"]
+    for row in rows:
+        if "note" in row:
+            lines.append(f"{row['label']:<44} ({row['note']})")
+            continue
+        cells = []
+        for key in ("p50_ms", "p95_ms"):
+            old, new = row[key]
+            cells.append(f"{old:>7.1f} -> {new:<7.1f}")
+        queries = row.get("db_queries_per_request")
+        cells.append(f"{queries[0]:>4g} -> {queries[1]:<4g}" if queries else "")
+        lines.append(f"{row['label']:<44} " + " ".join(cells))
+    return "\n".join(lines)
@@ -0,0 +1,478 @@
+"""Synthetic data generator for the load-test suite.
+
+Fills the database the app's DB_* environment points at — a migrated SCRATCH
+database, never the dev or prod one — with a reproducible catalog:
+
+  - users (a few high-reputation uploaders, the rest ordinary accounts);
+  - artwork posts with the AMP metadata players filter on (canvas size,
+    frame count and durations, unique colours, transparency/alpha flags,
+    native format and bytes) and their native post_files row, plus playlists;
+  - follows, reactions and comments, skewed towards popular artists and
+    recent posts the way real traffic is;
+  - millions of raw view events spread over the last complete UTC days
+    (``--days``), so the nightly rollup has whole days to roll;
+  - registered players with HTTPS device tokens.
+
+Rows that must go through Python (handles, sqids, AMP metadata) are bulk
+inserted through the ORM; the high-volume social and event rows are generated
+server side with generate_series after ``setseed``, so a given ``--seed``
+produces the same catalog on every run. Dates are relative to the current UTC
+day.
+
+The run ends by writing a manifest (JSON) with what the scenarios need: bearer
+tokens for a set of viewers and uploaders, player keys and tokens, a sample of
+post sqids/ids, and the vocabulary. The database is marked as seeded (a
+``perf_seed`` row in rollup_watermarks); seeding refuses to touch a database
+that holds posts without that mark, and the destructive pipeline scenarios
+refuse to run without it.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import random
+import time
+import uuid
+from dataclasses import asdict
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import insert, text, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.auth import create_access_token
+from app.services import player_tokens
+from app.services.event_partitions import ensure_event_partitions
+from app.services.search_index import rebuild_search_documents
+from app.services.view_metrics import get_watermark, set_watermark, utc_today
+from app.sqids_config import encode_id, encode_user_id
+from app.utils.event_encoding import (
+    CHANNELS,
+    DEVICE_TYPES,
+    VIEW_SOURCES,
+    VIEW_TYPES,
+    label_code,
+)
+from app.utils.handle_normalize import compute_handle_skeleton
+from app.vault import compute_storage_shard
+
+from .config import PERF_MARKER, SeedConfig
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 5000
+
+# Pixel-art flavoured vocabulary for titles, hashtags, comments and searches.
+VOCABULARY = [
+    "pixel", "dragon", "sunset", "forest", "castle", "knight", "cat", "slime",
+    "robot", "ocean", "night", "city", "sprite", "tile", "wizard", "potion",
+    "space", "ship", "mushroom", "ghost", "retro", "neon", "rain", "snow",
+    "desert", "temple", "sword", "shield", "heart", "star", "moon", "flower",
+]  # fmt: skip
+
+# Canvas sizes the upload endpoint accepts, weighted towards the common ones.
+CANVASES = [
+    ((8, 8), 1), ((16, 16), 6), ((16, 32), 1), ((32, 32), 10), ((32, 64), 2),
+    ((64, 64), 12), ((64, 128), 2), ((128, 128), 6), ((160, 160), 1),
+    ((192, 192), 1), ((256, 256), 2),
+]  # fmt: skip
+
+FORMATS = [("png", 6), ("gif", 3), ("webp", 2), ("bmp", 1)]
+EMOJIS = ["❤️", "🔥", "👍", "😂", "😮", "✨"]
+COUNTRIES = ["US", "BR", "DE", "JP", "FR", "GB", "CA", "KR", "MX", "PL"]
+
+
+def _weighted(rng: random.Random, choices: list[tuple[Any, int]]) -> Any:
+    values, weights = zip(*choices, strict=True)
+    return rng.choices(values, weights=weights)[0]
+
+
+def _check_target(db: Session) -> None:
+    if get_watermark(db, PERF_MARKER) is not None:
+        raise SystemExit(
+            "This database is already seeded; seed a fresh scratch database."
+        )
+    if db.execute(text("SELECT EXISTS (SELECT 1 FROM posts)")).scalar():
+        raise SystemExit(
+            "Refusing to seed: the database has posts and no perf_seed mark. "
+            "Point DB_DATABASE at a migrated scratch database."
+        )
+
+
+def _insert_returning_ids(db: Session, model, rows: list[dict]) -> list[int]:
+    ids: list[int] = []
+    for start in range(0, len(rows), BATCH_SIZE):
+        batch = rows[start : start + BATCH_SIZE]
+        ids.extend(db.scalars(insert(model).returning(model.id), batch).all())
+    return ids
+
+
+def _bulk_update(db: Session, model, rows: list[dict]) -> None:
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.execute(update(model), rows[start : start + BATCH_SIZE])
+
+
+def _seed_users(db: Session, rng: random.Random, cfg: SeedConfig) -> list[int]:
+    rows = []
+    for i in range(cfg.users):
+        handle = f"bench{i:06d}"
+        rows.append(
+            {
+                "handle": handle,
+                "handle_normalized": compute_handle_skeleton(handle),
+                "email": f"{handle}@bench.invalid",
+                "email_verified": True,
+                "welcome_completed": True,
+                "auto_public_approval": True,
+                "reputation": 1000 if i < cfg.uploaders else rng.randint(0, 400),
+                "roles": ["user"],
+                "tagline": " ".join(rng.sample(VOCABULARY, 2)),
+            }
+        )
+    ids = _insert_returning_ids(db, models.User, rows)
+    _bulk_update(
+        db, models.User, [{"id": i, "public_sqid": encode_user_id(i)} for i in ids]
+    )
+    db.commit()
+    return ids
+
+
+def _amp_metadata(rng: random.Random) -> dict[str, Any]:
+    width, height = _weighted(rng, CANVASES)
+    animated = rng.random() < 0.25
+    frames = rng.randint(2, 64) if animated else 1
+    frame_ms = rng.choice([40, 50, 80, 100, 150, 250]) if animated else None
+    native_format = "png" if not animated else _weighted(rng, FORMATS[1:3])
+    transparency = rng.random() < 0.4
+    alpha = transparency and rng.random() < 0.3
+    return {
+        "width": width,
+        "height": height,
+        "base": min(width, height),
+        "size": max(width, height),
+        "frame_count": frames,
+        "min_frame_duration_ms": frame_ms,
+        "max_frame_duration_ms": frame_ms * rng.choice([1, 2]) if animated else None,
+        "total_duration_ms": frame_ms * frames if animated else None,
+        "unique_colors": rng.randint(2, 256),
+        "transparency_meta": transparency,
+        "alpha_meta": alpha,
+        "transparency_actual": transparency and rng.random() < 0.9,
+        "alpha_actual": alpha and rng.random() < 0.8,
+        "native_format": native_format,
+        "native_file_bytes": width * height * frames // rng.randint(2, 8) + 200,
+    }
+
+
+def _post_row(
+    rng: random.Random, owner_id: int, kind: str, created_at: datetime
+) -> dict[str, Any]:
+    storage_key = uuid.UUID(int=rng.getrandbits(128), version=4)
+    words = rng.sample(VOCABULARY, 3)
+    row = {
+        "storage_key": storage_key,
+        "storage_shard": compute_storage_shard(storage_key),
+        "owner_id": owner_id,
+        "kind": kind,
+        "title": f"{words[0].title()} {words[1]}",
+        "description": f"A {words[0]} with a {words[2]}, drawn for the bench.",
+        "hashtags": rng.sample(VOCABULARY, rng.randint(0, 4)),
+        "visible": True,
+        "public_visibility": rng.random() < 0.95,
+        "promoted": rng.random() < 0.05,
+        "created_at": created_at,
+        "metadata_modified_at": created_at,
+        "artwork_modified_at": created_at,
+        "view_count": 0,
+    }
+    row["promoted_category"] = "frontpage" if row["promoted"] else None
+    if kind == "artwork":
+        row.update(_amp_metadata(rng))
+        row["art_url"] = f"https://bench.invalid/{storage_key}.png"
+        row["hash"] = f"{rng.getrandbits(256):064x}"
+    else:
+        # Playlists carry no files; NULL native_* marks them for AMP filters.
+        row.update({"native_format": None, "native_file_bytes": None})
+    return row
+
+
+def _seed_posts(
+    db: Session, rng: random.Random, cfg: SeedConfig, user_ids: list[int]
+) -> tuple[list[int], list[int]]:
+    now = datetime.now(timezone.utc)
+    # Zipf-like: the first users (by id) own most of the catalog.
+    owner_weights = [1 / (rank + 1) ** 1.1 for rank in range(len(user_ids))]
+    owners = rng.choices(user_ids, weights=owner_weights, k=cfg.posts)
+    rows = []
+    for owner_id in owners:
+        age = timedelta(days=cfg.history_days * rng.random() ** 2)
+        rows.append(_post_row(rng, owner_id, "artwork", now - age))
+    post_ids = _insert_returning_ids(db, models.Post, rows)
+
+    db.execute(
+        insert(models.PostFile),
+        [
+            {
+                "post_id": post_id,
+                "format": row["native_format"],
+                "file_bytes": row["native_file_bytes"],
+                "is_native": True,
+            }
+            for post_id, row in zip(post_ids, rows, strict=True)
+        ],
+    )
+
+    playlist_rows = [
+        _post_row(rng, rng.choice(user_ids[: cfg.uploaders]), "playlist", now)
+        for _ in range(cfg.playlists)
+    ]
+    playlist_ids = _insert_returning_ids(db, models.Post, playlist_rows)
+    items = []
+    per_playlist = min(20, len(post_ids))
+    for playlist_id in playlist_ids:
+        for position, artwork_id in enumerate(rng.sample(post_ids, per_playlist)):
+            items.append(
+                {
+                    "playlist_post_id": playlist_id,
+                    "artwork_post_id": artwork_id,
+                    "position": position,
+                }
+            )
+    if items:
+        db.execute(insert(models.PlaylistItem), items)
+
+    _bulk_update(
+        db,
+        models.Post,
+        [{"id": i, "public_sqid": encode_id(i)} for i in post_ids + playlist_ids],
+    )
+    db.commit()
+    return post_ids, playlist_ids
+
+
+# Social rows. Users and posts are addressed by position in id arrays; a
+# cubed random() index skews choices towards the front (popular artists,
+# which own most posts) and, for posts sorted newest first, recent art.
+_FOLLOWS_SQL = """
+WITH u AS (SELECT array_agg(id ORDER BY id) AS ids FROM users
+           WHERE handle LIKE 'bench%')
+INSERT INTO follows (follower_id, following_id)
+SELECT f, t FROM (
+    SELECT u.ids[1 + floor(random() * cardinality(u.ids))::int] AS f,
+           u.ids[1 + floor(power(random(), 3) * cardinality(u.ids))::int] AS t
+    FROM u, generate_series(1, :n)
+) pairs
+WHERE f <> t
+ON CONFLICT DO NOTHING
+"""
+
+_REACTIONS_SQL = """
+WITH u AS (SELECT array_agg(id ORDER BY id) AS ids FROM users
+           WHERE handle LIKE 'bench%'),
+     p AS (SELECT array_agg(id ORDER BY created_at DESC) AS ids FROM posts
+           WHERE kind = 'artwork')
+INSERT INTO reactions (post_id, user_id, emoji, created_at)
+SELECT p.ids[1 + floor(power(random(), 3) * cardinality(p.ids))::int],
+       u.ids[1 + floor(random() * cardinality(u.ids))::int],
+       (CAST(:emojis AS text[]))[1 + floor(random() * :n_emojis)::int],
+       now() - random() * interval '30 days'
+FROM u, p, generate_series(1, :n)
+ON CONFLICT DO NOTHING
+"""
+
+_COMMENTS_SQL = """
+WITH u AS (SELECT array_agg(id ORDER BY id) AS ids FROM users
+           WHERE handle LIKE 'bench%'),
+     p AS (SELECT array_agg(id ORDER BY created_at DESC) AS ids FROM posts
+           WHERE kind = 'artwork'),
+     v AS (SELECT CAST(:vocabulary AS text[]) AS words)
+INSERT INTO comments (id, post_id, author_id, depth, body, hidden_by_mod,
+                      deleted_by_owner, deleted_by_mod, created_at)
+SELECT gen_random_uuid(),
+       p.ids[1 + floor(power(random(), 3) * cardinality(p.ids))::int],
+       u.ids[1 + floor(random() * cardinality(u.ids))::int],
+       0,
+       'Love the ' || v.words[1 + floor(random() * 32)::int] || ' and the '
+           || v.words[1 + floor(random() * 32)::int] || '!',
+       false, false, false,
+       now() - random() * interval '30 days'
+FROM u, p, v, generate_series(1, :n)
+"""
+
+# Raw view events over the last :days complete UTC days. ~20% are player
+# views (device/source "player", a seeded player, a channel); the rest are web
+# views and impressions from a pool of anonymous visitors and signed-in users.
+_VIEW_EVENTS_SQL = """
+WITH u AS (SELECT array_agg(id ORDER BY id) AS ids FROM users
+           WHERE handle LIKE 'bench%'),
+     p AS (SELECT array_agg(id ORDER BY created_at DESC) AS ids FROM posts
+           WHERE kind = 'artwork'),
+     pl AS (SELECT array_agg(id ORDER BY player_key) AS ids FROM players),
+     draws AS (
+        SELECT random() AS r_source, random() AS r_type, random() AS r_user,
+               random() AS r_post, random() AS r_visitor, random() AS r_day,
+               random() AS r_time, random() AS r_misc
+        FROM generate_series(1, :n)
+     )
+INSERT INTO view_events (post_id, viewer_user_id, viewer_ip_hash, country_code,
+                         device_type, view_source, view_type, player_id,
+                         channel, created_at)
+SELECT p.ids[1 + floor(power(d.r_post, 2) * cardinality(p.ids))::int],
+       CASE WHEN d.r_user < 0.3
+            THEN u.ids[1 + floor(d.r_user / 0.3 * cardinality(u.ids))::int] END,
+       sha256(convert_to('visitor-' || floor(d.r_visitor * :visitors)::int, 'UTF8')),
+       (CAST(:countries AS text[]))[1 + floor(d.r_misc * :n_countries)::int],
+       CASE WHEN d.r_source < 0.2 THEN :device_player
+            WHEN d.r_misc < 0.6 THEN :device_desktop
+            ELSE :device_mobile END,
+       CASE WHEN d.r_source < 0.2 THEN :source_player ELSE :source_web END,
+       CASE WHEN d.r_type < 0.7 THEN :type_view ELSE :type_impression END,
+       CASE WHEN d.r_source < 0.2 AND cardinality(pl.ids) > 0
+            THEN pl.ids[1 + floor(d.r_source / 0.2 * cardinality(pl.ids))::int] END,
+       CASE WHEN d.r_source < 0.2
+            THEN (CAST(:channels AS smallint[]))[1 + floor(d.r_misc * 3)::int] END,
+       (CAST(:today AS date) - (1 + floor(d.r_day * :days)::int))::timestamp
+           AT TIME ZONE 'UTC' + d.r_time * interval '1 day'
+FROM draws d, u, p, pl
+"""
+
+
+def _seed_social(db: Session, cfg: SeedConfig) -> None:
+    db.execute(text("SELECT setseed(:s)"), {"s": (cfg.seed % 1000) / 1000})
+    logger.info(f"Seeding {cfg.follows} follows...")
+    db.execute(text(_FOLLOWS_SQL), {"n": cfg.follows})
+    logger.info(f"Seeding {cfg.reactions} reactions...")
+    db.execute(
+        text(_REACTIONS_SQL),
+        {"n": cfg.reactions, "emojis": EMOJIS, "n_emojis": len(EMOJIS)},
+    )
+    logger.info(f"Seeding {cfg.comments} comments...")
+    db.execute(text(_COMMENTS_SQL), {"n": cfg.comments, "vocabulary": VOCABULARY})
+    db.commit()
+
+
+def _seed_view_events(db: Session, cfg: SeedConfig) -> None:
+    today = utc_today()
+    # view_events is partitioned by day and the nightly task only keeps the
+    # retention window, so a longer --days needs its older partitions first.
+    ensure_event_partitions(
+        db, today - timedelta(days=cfg.days), today - timedelta(days=1)
+    )
+    db.commit()
+    params = {
+        "today": today,
+        "days": cfg.days,
+        "visitors": max(1000, cfg.views // 20),
+        "countries": COUNTRIES,
+        "n_countries": len(COUNTRIES),
+        "device_player": label_code(DEVICE_TYPES, "player"),
+        "device_desktop": label_code(DEVICE_TYPES, "desktop"),
+        "device_mobile": label_code(DEVICE_TYPES, "mobile"),
+        "source_player": label_code(VIEW_SOURCES, "player"),
+        "source_web": label_code(VIEW_SOURCES, "web"),
+        "type_view": label_code(VIEW_TYPES, "view"),
+        "type_impression": label_code(VIEW_TYPES, "impression"),
+        "channels": [label_code(CHANNELS, c) for c in ("all", "promoted", "user")],
+    }
+    chunk = 250_000
+    for start in range(0, cfg.views, chunk):
+        n = min(chunk, cfg.views - start)
+        logger.info(f"Seeding view events {start + n}/{cfg.views}...")
+        db.execute(text(_VIEW_EVENTS_SQL), {**params, "n": n})
+        db.commit()
+
+
+def _seed_players(
+    db: Session, rng: random.Random, cfg: SeedConfig, user_ids: list[int]
+) -> list[dict[str, str]]:
+    players = []
+    for i in range(cfg.players):
+        player = models.Player(
+            player_key=uuid.UUID(int=rng.getrandbits(128), version=4),
+            owner_id=user_ids[i % len(user_ids)],
+            device_model="bench",
+            firmware_version="bench",
+            registration_status="registered",
+            registered_at=datetime.now(timezone.utc),
+            name=f"bench player {i}",
+        )
+        db.add(player)
+        players.append(player)
+    db.commit()
+    return [
+        {"player_key": str(p.player_key), "token": player_tokens.issue_token(db, p)}
+        for p in players
+    ]
+
+
+def _user_tokens(db: Session, user_ids: list[int]) -> list[dict[str, Any]]:
+    users = db.query(models.User).filter(models.User.id.in_(user_ids)).all()
+    ttl = 30 * 86400
+    return [
+        {
+            "id": u.id,
+            "sqid": u.public_sqid,
+            "handle": u.handle,
+            "token": create_access_token(u, expires_in_seconds=ttl),
+        }
+        for u in sorted(users, key=lambda u: u.id)
+    ]
+
+
+def seed(db: Session, cfg: SeedConfig) -> dict[str, Any]:
+    """Seed the catalog and return the manifest."""
+    _check_target(db)
+    rng = random.Random(cfg.seed)
+    started = time.perf_counter()
+
+    logger.info(f"Seeding {cfg.users} users...")
+    user_ids = _seed_users(db, rng, cfg)
+    logger.info(f"Seeding {cfg.posts} posts and {cfg.playlists} playlists...")
+    post_ids, playlist_ids = _seed_posts(db, rng, cfg, user_ids)
+    _seed_social(db, cfg)
+    logger.info(f"Seeding {cfg.players} players...")
+    players = _seed_players(db, rng, cfg, user_ids)
+    _seed_view_events(db, cfg)
+
+    logger.info("Rebuilding search documents...")
+    rebuild_search_documents(db)
+    set_watermark(db, PERF_MARKER, utc_today())
+    db.commit()
+    db.execute(text("ANALYZE"))
+    db.commit()
+
+    # Viewers are drawn from the whole population; uploaders are the first
+    # users, which also own most of the catalog.
+    viewer_ids = rng.sample(user_ids, min(cfg.viewers, len(user_ids)))
+    sample = rng.sample(post_ids, min(5000, len(post_ids)))
+    manifest = {
+        "config": asdict(cfg),
+        "seeded_at": datetime.now(timezone.utc).isoformat(),
+        "view_window": {
+            "first_day": (utc_today() - timedelta(days=cfg.days)).isoformat(),
+            "last_day": (utc_today() - timedelta(days=1)).isoformat(),
+        },
+        "viewers": _user_tokens(db, viewer_ids),
+        "uploaders": _user_tokens(db, user_ids[: cfg.uploaders]),
+        "artists": [encode_user_id(i) for i in user_ids[:50]],
+        "players": players,
+        "post_ids": sample,
+        "post_sqids": [encode_id(i) for i in sample],
+        "playlist_ids": playlist_ids[:100],
+        "vocabulary": VOCABULARY,
+    }
+    logger.info(f"Seeded in {time.perf_counter() - started:.1f}s")
+    return manifest
+
+
+def write_manifest(manifest: dict[str, Any], path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    logger.info(f"Wrote manifest {path}")
+
+
+def load_manifest(path: str) -> dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
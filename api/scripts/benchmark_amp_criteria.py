@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+AMP Criteria Benchmark
+
+Compares the legacy player AMP criteria predicates (boolean columns, EXISTS on
+post_files for the native format/bytes) against the indexed form built by
+services/player_rpc._apply_criteria_filters (posts.native_format,
+posts.native_file_bytes, posts.amp_flags IN (...)) over a synthetic catalog.
+
+The script creates its own tables (``bench_posts`` / ``bench_post_files``)
+with the same columns and indexes as the real schema, fills them with
+generate_series, and reports EXPLAIN (ANALYZE, BUFFERS) timings as JSON.
+Point it at a SCRATCH database — it never touches the real tables but does
+drop/recreate the bench tables.
+
+Usage:
+    python scripts/benchmark_amp_criteria.py --database-url postgresql://.../scratch
+
+Options:
+    --database-url URL  Scratch database (default: $BENCH_DATABASE_URL)
+    --posts N           Synthetic catalog size (default: 1000000)
+    --runs N            Timed runs per query; the median is reported (default: 5)
+    --keep              Keep the bench tables afterwards
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+
+from app.models import PLAYABLE_POST_PREDICATE  # noqa: E402
+from app.utils.amp_features import allowed_flag_values  # noqa: E402
+
+SCHEMA_SQL = """
+DROP TABLE IF EXISTS bench_post_files;
+DROP TABLE IF EXISTS bench_posts;
+
+CREATE TABLE bench_posts (
+    id integer PRIMARY KEY,
+    kind varchar(20) NOT NULL,
+    width integer NOT NULL,
+    height integer NOT NULL,
+    frame_count integer NOT NULL,
+    unique_colors integer,
+    transparency_meta boolean NOT NULL,
+    alpha_meta boolean NOT NULL,
+    transparency_actual boolean NOT NULL,
+    alpha_actual boolean NOT NULL,
+    visible boolean NOT NULL,
+    deleted_by_user boolean NOT NULL,
+    hidden_by_user boolean NOT NULL,
+    hidden_by_mod boolean NOT NULL,
+    non_conformant boolean NOT NULL,
+    public_visibility boolean NOT NULL,
+    native_format varchar(10),
+    native_file_bytes integer,
+    amp_flags smallint GENERATED ALWAYS AS (
+        (transparency_meta::int
+         | (alpha_meta::int << 1)
+         | (transparency_actual::int << 2)
+         | (alpha_actual::int << 3))::smallint
+    ) STORED
+);
+
+CREATE TABLE bench_post_files (
+    id serial PRIMARY KEY,
+    post_id integer NOT NULL REFERENCES bench_posts(id),
+    format varchar(10) NOT NULL,
+    file_bytes integer NOT NULL,
+    is_native boolean NOT NULL
+);
+"""
+
+# Mirrors the real catalog's shape: mostly small PNG/GIF/WebP, most opaque,
+# ~5% withdrawn. Native file rows duplicate posts.native_* as the migration
+# backfill does.
+FILL_SQL = """
+INSERT INTO bench_posts (
+    id, kind, width, height, frame_count, unique_colors,
+    transparency_meta, alpha_meta, transparency_actual, alpha_actual,
+    visible, deleted_by_user, hidden_by_user, hidden_by_mod, non_conformant,
+    public_visibility, native_format, native_file_bytes
+)
+SELECT
+    g,
+    'artwork',
+    (ARRAY[16, 32, 64, 64, 64, 128, 128, 256])[1 + g % 8],
+    (ARRAY[16, 32, 64, 64, 64, 128, 128, 256])[1 + (g / 8) % 8],
+    CASE WHEN g % 3 = 0 THEN 1 + (g % 60) ELSE 1 END,
+    2 + (g * 7919) % 256,
+    g % 5 = 0,
+    g % 11 = 0,
+    g % 7 = 0,
+    g % 13 = 0,
+    g % 97 <> 0,
+    g % 101 = 0,
+    false,
+    g % 103 = 0,
+    false,
+    true,
+    (ARRAY['png', 'png', 'png', 'gif', 'gif', 'webp', 'bmp'])[1 + g % 7],
+    500 + (g * 104729) % 200000
+FROM generate_series(1, :n) AS g;
+
+INSERT INTO bench_post_files (post_id, format, file_bytes, is_native)
+SELECT id, native_format, native_file_bytes, true FROM bench_posts;
+
+INSERT INTO bench_post_files (post_id, format, file_bytes, is_native)
+SELECT id, 'webp', native_file_bytes / 2, false
+FROM bench_posts WHERE native_format <> 'webp';
+"""
+
+INDEX_SQL = f"""
+CREATE INDEX ON bench_post_files (post_id);
+CREATE INDEX ON bench_posts (id DESC);
+CREATE INDEX bench_amp_native_format ON bench_posts (native_format, id DESC)
+    WHERE {PLAYABLE_POST_PREDICATE};
+CREATE INDEX bench_amp_dims ON bench_posts (width, height, frame_count)
+    WHERE {PLAYABLE_POST_PREDICATE};
+CREATE INDEX bench_amp_flags ON bench_posts (amp_flags, id DESC)
+    WHERE {PLAYABLE_POST_PREDICATE};
+ANALYZE bench_posts;
+ANALYZE bench_post_files;
+"""
+
+
+def _flags_in(*criteria: tuple[str, str, bool]) -> str:
+    values = allowed_flag_values(criteria)
+    return f"amp_flags IN ({', '.join(map(str, values))})" if values else "false"
+
+
+# name -> (legacy predicate, indexed predicate). Both run under the same
+# playable filter, ORDER BY id DESC and LIMIT 50, as a query_posts page does.
+CRITERIA_SETS: dict[str, tuple[str, str]] = {
+    "native_format_gif": (
+        "EXISTS (SELECT 1 FROM bench_post_files pf WHERE pf.post_id = p.id"
+        " AND pf.is_native AND pf.format = 'gif')",
+        "native_format = 'gif'",
+    ),
+    "native_format_bmp_small": (
+        "EXISTS (SELECT 1 FROM bench_post_files pf WHERE pf.post_id = p.id"
+        " AND pf.is_native AND pf.format = 'bmp')"
+        " AND width <= 32 AND height <= 32",
+        "native_format = 'bmp' AND width <= 32 AND height <= 32",
+    ),
+    "exact_64x64_static": (
+        "width = 64 AND height = 64 AND frame_count = 1",
+        "width = 64 AND height = 64 AND frame_count = 1",
+    ),
+    "opaque_only": (
+        "transparency_meta = false AND transparency_actual = false",
+        _flags_in(
+            ("transparency_meta", "eq", False), ("transparency_actual", "eq", False)
+        ),
+    ),
+    "rare_alpha": (
+        "alpha_meta = true AND alpha_actual = true",
+        _flags_in(("alpha_meta", "eq", True), ("alpha_actual", "eq", True)),
+    ),
+    "animated_gif_with_alpha": (
+        "frame_count > 1 AND alpha_actual = true"
+        " AND EXISTS (SELECT 1 FROM bench_post_files pf WHERE pf.post_id = p.id"
+        " AND pf.is_native AND pf.format = 'gif')",
+        "frame_count > 1 AND native_format = 'gif'"
+        f" AND {_flags_in(('alpha_actual', 'eq', True))}",
+    ),
+}
+
+
+def _explain(conn, predicate: str, runs: int) -> dict:
+    sql = text(
+        "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) "
+        f"SELECT p.id FROM bench_posts p WHERE {PLAYABLE_POST_PREDICATE}"
+        f" AND public_visibility AND {predicate} ORDER BY p.id DESC LIMIT 50"
+    )
+    timings = []
+    plan = None
+    for _ in range(runs):
+        plan = conn.execute(sql).scalar()[0]
+        timings.append(plan["Execution Time"])
+    top = plan["Plan"]
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+        "shared_hit_blocks": top.get("Shared Hit Blocks"),
+        "shared_read_blocks": top.get("Shared Read Blocks"),
+        "plan_nodes": _node_types(top),
+    }
+
+
+def _node_types(node: dict) -> list[str]:
+    label = node["Node Type"]
+    if "Index Name" in node:
+        label += f" using {node['Index Name']}"
+    out = [label]
+    for child in node.get("Plans", []):
+        out.extend(_node_types(child))
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=os.environ.get("BENCH_DATABASE_URL"))
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--keep", action="store_true")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("--database-url (or BENCH_DATABASE_URL) is required")
+
+    engine = create_engine(args.database_url)
+    with engine.begin() as conn:
+        logger.info(f"Creating synthetic catalog of {args.posts} posts...")
+        conn.execute(text(SCHEMA_SQL))
+        conn.execute(text(FILL_SQL), {"n": args.posts})
+        logger.info("Building indexes...")
+        conn.execute(text(INDEX_SQL))
+
+    results: dict = {"posts": args.posts, "runs": args.runs, "criteria": {}}
+    try:
+        with engine.connect() as conn:
+            for name, (legacy, indexed) in CRITERIA_SETS.items():
+                logger.info(f"Benchmarking {name}...")
+                results["criteria"][name] = {
+                    "legacy": _explain(conn, legacy, args.runs),
+                    "indexed": _explain(conn, indexed, args.runs),
+                }
+    finally:
+        if not args.keep:
+            with engine.begin() as conn:
+                conn.execute(text("DROP TABLE IF EXISTS bench_post_files"))
+                conn.execute(text("DROP TABLE IF EXISTS bench_posts"))
+
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
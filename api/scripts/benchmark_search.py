@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Search Benchmark
+
+Compares the legacy GET /search post query (trigram ``similarity()`` over
+posts.title and posts.description, ranked by the greater of the two) with the
+search-document query built by services/search_index.search_documents
+(prefix full-text on a weighted tsvector OR trigram ``word_similarity`` on
+normalized text, ranked by their sum) over a synthetic catalog.
+
+The script creates its own tables (``bench_search_posts`` /
+``bench_search_documents``) with the same columns and indexes as the real
+schema, fills them with generate_series from a fixed vocabulary, and reports
+EXPLAIN (ANALYZE, BUFFERS) timings as JSON. Point it at a SCRATCH database —
+it never touches the real tables but does drop/recreate the bench tables.
+
+Usage:
+    python scripts/benchmark_search.py --database-url postgresql://.../scratch
+
+Options:
+    --database-url URL  Scratch database (default: $BENCH_DATABASE_URL)
+    --posts N           Synthetic catalog size (default: 1000000)
+    --runs N            Timed runs per query; the median is reported (default: 5)
+    --keep              Keep the bench tables afterwards
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+
+from sqlalchemy import create_engine, text
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.search_index import query_terms  # noqa: E402
+
+# Pixel-art flavoured vocabulary; titles, tags and descriptions draw from it
+# with different strides so term frequencies vary like a real catalog.
+VOCABULARY = [
+    "pixel", "dragon", "sunset", "forest", "castle", "knight", "cat", "slime",
+    "robot", "ocean", "night", "city", "sprite", "tile", "wizard", "potion",
+    "space", "ship", "mushroom", "ghost", "retro", "neon", "rain", "snow",
+    "desert", "temple", "sword", "shield", "heart", "star", "moon", "flower",
+]  # fmt: skip
+
+SCHEMA_SQL = """
+DROP TABLE IF EXISTS bench_search_documents;
+DROP TABLE IF EXISTS bench_search_posts;
+
+CREATE TABLE bench_search_posts (
+    id integer PRIMARY KEY,
+    title varchar(200) NOT NULL,
+    description text,
+    hashtags text[] NOT NULL
+);
+
+CREATE TABLE bench_search_documents (
+    id serial PRIMARY KEY,
+    entity_type varchar(10) NOT NULL,
+    entity_id integer NOT NULL,
+    search_text text NOT NULL,
+    tsv tsvector NOT NULL,
+    UNIQUE (entity_type, entity_id)
+);
+"""
+
+FILL_SQL = """
+INSERT INTO bench_search_posts (id, title, description, hashtags)
+SELECT
+    g,
+    initcap(v[1 + g % 32] || ' ' || v[1 + (g / 32) % 32]),
+    CASE WHEN g % 4 = 0 THEN NULL ELSE
+        'A ' || v[1 + (g * 7) % 32] || ' with a ' || v[1 + (g * 13) % 32]
+        || ' at ' || v[1 + (g * 17) % 32] || ', drawn in ' || (g % 40)
+        || ' colours.'
+    END,
+    ARRAY[v[1 + (g * 3) % 32], v[1 + (g * 5) % 32]]
+FROM generate_series(1, :n) AS g,
+     (SELECT CAST(:vocabulary AS text[]) AS v) AS vocab;
+
+INSERT INTO bench_search_documents (entity_type, entity_id, search_text, tsv)
+SELECT 'post', p.id,
+       lower(concat_ws(' ', p.title, array_to_string(p.hashtags, ' '))),
+       setweight(to_tsvector('simple', coalesce(p.title, '')), 'A')
+       || setweight(to_tsvector('simple', array_to_string(p.hashtags, ' ')), 'B')
+       || setweight(to_tsvector('simple', coalesce(p.description, '')), 'C')
+FROM bench_search_posts p;
+"""
+
+INDEX_SQL = """
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX ON bench_search_posts USING gin (title gin_trgm_ops);
+CREATE INDEX ON bench_search_posts USING gin (description gin_trgm_ops);
+CREATE INDEX ON bench_search_documents USING gin (tsv);
+CREATE INDEX ON bench_search_documents USING gin (search_text gin_trgm_ops);
+ANALYZE bench_search_posts;
+ANALYZE bench_search_documents;
+"""
+
+QUERIES = ["dragon", "pixel cat", "sunset forest", "drgon", "wiz", "neon city"]
+
+LEGACY_SQL = """
+SELECT p.id FROM bench_search_posts p
+WHERE similarity(p.title, :q) > 0.1 OR similarity(p.description, :q) > 0.1
+ORDER BY greatest(similarity(p.title, :q),
+                  coalesce(similarity(p.description, :q), 0)) DESC, p.id DESC
+LIMIT 51
+"""
+
+DOCUMENTS_SQL = """
+SELECT d.id, round((ts_rank_cd(d.tsv, to_tsquery('simple', :tsq), 1)
+                    + word_similarity(:q, d.search_text))::numeric, 6) AS score
+FROM bench_search_documents d
+WHERE d.tsv @@ to_tsquery('simple', :tsq) OR :q <% d.search_text
+ORDER BY score DESC, d.id DESC
+LIMIT 51
+"""
+
+
+def _explain(conn, sql: str, params: dict, runs: int) -> dict:
+    statement = text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")
+    timings = []
+    plan = None
+    for _ in range(runs):
+        plan = conn.execute(statement, params).scalar()[0]
+        timings.append(plan["Execution Time"])
+    top = plan["Plan"]
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+        "shared_hit_blocks": top.get("Shared Hit Blocks"),
+        "shared_read_blocks": top.get("Shared Read Blocks"),
+        "plan_nodes": _node_types(top),
+    }
+
+
+def _node_types(node: dict) -> list[str]:
+    label = node["Node Type"]
+    if "Index Name" in node:
+        label += f" using {node['Index Name']}"
+    out = [label]
+    for child in node.get("Plans", []):
+        out.extend(_node_types(child))
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=os.environ.get("BENCH_DATABASE_URL"))
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--keep", action="store_true")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("--database-url (or BENCH_DATABASE_URL) is required")
+
+    engine = create_engine(args.database_url)
+    with engine.begin() as conn:
+        logger.info(f"Creating synthetic catalog of {args.posts} posts...")
+        conn.execute(text(SCHEMA_SQL))
+        conn.execute(text(FILL_SQL), {"n": args.posts, "vocabulary": VOCABULARY})
+        logger.info("Building indexes...")
+        conn.execute(text(INDEX_SQL))
+
+    results: dict = {"posts": args.posts, "runs": args.runs, "queries": {}}
+    try:
+        with engine.connect() as conn:
+            for q in QUERIES:
+                logger.info(f"Benchmarking {q!r}...")
+                terms = query_terms(q)
+                params = {
+                    "q": " ".join(terms),
+                    "tsq": " & ".join(f"{t}:*" for t in terms),
+                }
+                results["queries"][q] = {
+                    "legacy": _explain(conn, LEGACY_SQL, params, args.runs),
+                    "documents": _explain(conn, DOCUMENTS_SQL, params, args.runs),
+                }
+    finally:
+        if not args.keep:
+            with engine.begin() as conn:
+                conn.execute(text("DROP TABLE IF EXISTS bench_search_documents"))
+                conn.execute(text("DROP TABLE IF EXISTS bench_search_posts"))
+
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
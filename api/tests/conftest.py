@@ -8,7 +8,10 @@ are imported during test collection.
 from __future__ import annotations
 
 import os
-from typing import TYPE_CHECKING, Generator
+import re
+from collections import Counter
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Generator
 from urllib.parse import quote_plus
 
 import pytest
@@ -57,6 +60,8 @@ def get_test_admin_url() -> str:
 # Lazy initialization of test engine and session factory
 _test_engine = None
 _TestSessionLocal = None
+_TestAsyncSessionLocal = None
+_TestAsyncReadSessionLocal = None
 
 
 def _get_test_engine():
@@ -82,6 +87,47 @@ def _get_test_session_local():
     return _TestSessionLocal
 
 
+def _get_test_async_session_local():
+    """Async sessions for the test database.
+
+    NullPool: every TestClient runs the app on its own event loop, so pooled
+    async connections must not outlive a request.
+    """
+    global _TestAsyncSessionLocal
+    if _TestAsyncSessionLocal is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        from sqlalchemy.pool import NullPool
+
+        _TestAsyncSessionLocal = async_sessionmaker(
+            bind=create_async_engine(
+                os.environ["TEST_DATABASE_URL"], poolclass=NullPool
+            ),
+            autoflush=False,
+        )
+    return _TestAsyncSessionLocal
+
+
+def _get_test_async_read_session_local():
+    """Async read-only sessions (app.db.AsyncReadSessionLocal) for tests.
+
+    TEST_READ_DATABASE_URL points them at a replica of the test database
+    (e.g. a second local Postgres); by default they read the test database.
+    """
+    global _TestAsyncReadSessionLocal
+    if _TestAsyncReadSessionLocal is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        from sqlalchemy.pool import NullPool
+
+        url = os.getenv("TEST_READ_DATABASE_URL") or os.environ["TEST_DATABASE_URL"]
+        _TestAsyncReadSessionLocal = async_sessionmaker(
+            bind=create_async_engine(url, poolclass=NullPool).execution_options(
+                postgresql_readonly=True
+            ),
+            autoflush=False,
+        )
+    return _TestAsyncReadSessionLocal
+
+
 @pytest.fixture(scope="session", autouse=True)
 def setup_test_database() -> Generator[None, None, None]:
     """Create test database schema at session start."""
@@ -110,6 +156,12 @@ def setup_test_database() -> Generator[None, None, None]:
         # the squashed migration so registration-path tests work. Created before the
         # ALL SEQUENCES grant below so api_worker gets USAGE on it.
         conn.execute(text("CREATE SEQUENCE IF NOT EXISTS handle_sequence START WITH 1"))
+        # Likewise the event tables' default partitions and partition DDL
+        # functions (create_all only creates the partitioned parents). Rows
+        # land in the default partitions unless a test creates day partitions.
+        from app.services.event_partitions import install_event_partitioning
+
+        install_event_partitioning(conn)
 
     # Grant permissions to api_worker on all tables and sequences
     with admin_engine.begin() as conn:
@@ -166,6 +218,7 @@ def client(db: "Session") -> Generator["TestClient", None, None]:
     """Provide a test client with database dependency overridden."""
     from fastapi.testclient import TestClient
     from app.db import get_session
+    from app.deps import get_async_db, get_async_read_db
     from app.main import app
 
     def _get_test_session():
@@ -176,14 +229,26 @@ def client(db: "Session") -> Generator["TestClient", None, None]:
         finally:
             session.close()
 
+    async def _get_test_async_session():
+        async with _get_test_async_session_local()() as session:
+            yield session
+
+    async def _get_test_async_read_session():
+        async with _get_test_async_read_session_local()() as session:
+            yield session
+
     # Override the get_session dependency to use test database
     app.dependency_overrides[get_session] = _get_test_session
+    app.dependency_overrides[get_async_db] = _get_test_async_session
+    app.dependency_overrides[get_async_read_db] = _get_test_async_read_session
 
     with TestClient(app) as test_client:
         yield test_client
 
     # Clean up override
     app.dependency_overrides.pop(get_session, None)
+    app.dependency_overrides.pop(get_async_db, None)
+    app.dependency_overrides.pop(get_async_read_db, None)
 
 
 @pytest.fixture(autouse=True)
@@ -210,7 +275,8 @@ def _no_live_celery(monkeypatch) -> None:
 
 @pytest.fixture(autouse=True)
 def _reset_rate_limits() -> Generator[None, None, None]:
-    """Flush rate-limit / view-dedup / view-observability keys before each test.
+    """Flush rate-limit / view-dedup / view-observability / timeline / cached
+    principal / artwork-file / player channel list keys before each test.
 
     These live in the shared dev Redis, which is not reset between test runs;
     without this, throttle counters and the per-UTC-day view dedup slots
@@ -224,10 +290,77 @@ def _reset_rate_limits() -> Generator[None, None, None]:
         r = get_redis_client()
         if r:
             keys = []
-            for prefix in ("ratelimit:*", "viewdedup:*", "viewobs:*"):
+            for prefix in (
+                "ratelimit:*",
+                "viewdedup:*",
+                "viewobs:*",
+                "timeline:*",
+                "notif:unread:*",
+                "social_notif:rate:*",
+                "auth:principal:*",
+                "artfile:*",
+                "player:channel*",
+            ):
                 keys.extend(r.scan_iter(prefix))
             if keys:
                 r.delete(*keys)
     except Exception:
         pass
     yield
+
+
+# Literals that vary between otherwise identical statements: bind markers
+# (psycopg pyformat, asyncpg $n), quoted strings and bare numbers.
+_SQL_LITERALS = re.compile(r"%\([^)]+\)s|%s|\$\d+|'(?:[^']|'')*'|\b\d+\b")
+_SQL_LISTS = re.compile(r"\?(?:\s*,\s*\?)+")
+
+
+def _statement_shape(statement: str) -> str:
+    """Statement with its literals blanked, so N+1 repeats compare equal."""
+    shape = _SQL_LITERALS.sub("?", statement)
+    shape = _SQL_LISTS.sub("?", shape)
+    return " ".join(shape.split())
+
+
+@pytest.fixture()
+def query_budget() -> Callable:
+    """Assert a block stays within a SQL statement budget.
+
+        with query_budget(8):
+            client.get("/post/recent")
+
+    Counts every statement any Engine (sync or async, app or test) executes
+    inside the block. Fails when there are more than ``max_queries``, or when
+    one statement shape runs more than ``max_repeats`` times -- the signature
+    of a per-row lazy load (N+1). The failure lists the statements in order.
+    Tests should create more rows than ``max_repeats`` so an N+1 shows.
+    """
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @contextmanager
+    def _budget(max_queries: int, max_repeats: int = 2):
+        statements: list[str] = []
+
+        def _capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(Engine, "before_cursor_execute", _capture)
+        try:
+            yield statements
+        finally:
+            event.remove(Engine, "before_cursor_execute", _capture)
+
+        problems = []
+        if len(statements) > max_queries:
+            problems.append(f"{len(statements)} statements, budget {max_queries}")
+        for shape, count in Counter(map(_statement_shape, statements)).items():
+            if count > max_repeats:
+                problems.append(f"N+1 suspect (x{count}): {shape}")
+        if problems:
+            listing = "\n".join(
+                f"  {i}. {' '.join(s.split())}" for i, s in enumerate(statements, 1)
+            )
+            pytest.fail("\n".join(problems) + "\nStatements:\n" + listing)
+
+    return _budget
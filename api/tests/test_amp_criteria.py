@@ -0,0 +1,179 @@
+"""Tests for indexed AMP criteria filtering (utils/amp_features.py, posts.amp_flags)."""
+
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import Session
+
+from app.models import Player, Post, PostFile, User
+from app.player_protocol.schemas import FilterCriterion, QueryPostsRequest
+from app.services import player_rpc
+from app.utils.amp_features import (
+    AMP_FLAG_ALPHA_ACTUAL,
+    AMP_FLAG_TRANSPARENCY_META,
+    allowed_flag_values,
+)
+
+
+def _make_user(db: Session) -> User:
+    unique_id = str(uuid.uuid4())[:8]
+    user = User(
+        handle=f"amp_{unique_id}",
+        email=f"amp_{unique_id}@example.com",
+        roles=["user"],
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def _make_player(db: Session, owner: User) -> Player:
+    player = Player(
+        player_key=uuid.uuid4(),
+        owner_id=owner.id,
+        device_model="TestDevice",
+        firmware_version="1.0.0",
+        registration_status="registered",
+        name="AMP Player",
+    )
+    db.add(player)
+    db.commit()
+    db.refresh(player)
+    return player
+
+
+def _make_post(
+    db: Session,
+    owner: User,
+    *,
+    native_format: str = "png",
+    transparency_meta: bool = False,
+    alpha_actual: bool = False,
+) -> Post:
+    from app.sqids_config import encode_id
+    from app.vault import compute_storage_shard
+
+    storage_key = uuid.uuid4()
+    now = datetime.now(timezone.utc)
+    post = Post(
+        storage_key=storage_key,
+        storage_shard=compute_storage_shard(storage_key),
+        owner_id=owner.id,
+        kind="artwork",
+        title="amp",
+        art_url=f"https://example.com/{storage_key}.{native_format}",
+        width=64,
+        height=64,
+        frame_count=1,
+        metadata_modified_at=now,
+        artwork_modified_at=now,
+        hash=str(storage_key).replace("-", "") + "a" * 32,
+        visible=True,
+        public_visibility=True,
+        transparency_meta=transparency_meta,
+        alpha_actual=alpha_actual,
+        native_format=native_format,
+        native_file_bytes=1000,
+    )
+    db.add(post)
+    db.flush()
+    post.public_sqid = encode_id(post.id)
+    db.add(
+        PostFile(post_id=post.id, format=native_format, file_bytes=1000, is_native=True)
+    )
+    db.commit()
+    db.refresh(post)
+    return post
+
+
+def _query_ids(player: Player, db: Session, criteria: list[dict]) -> list[int]:
+    request = QueryPostsRequest(
+        request_id="amp-1",
+        player_key=player.player_key,
+        criteria=[FilterCriterion(**c) for c in criteria],
+    )
+    return [p.post_id for p in player_rpc.query_posts(player, request, db).posts]
+
+
+class TestAllowedFlagValues:
+    def test_no_criteria_allows_everything(self):
+        assert allowed_flag_values([]) == list(range(16))
+
+    def test_single_bit(self):
+        values = allowed_flag_values([("alpha_actual", "eq", True)])
+        assert len(values) == 8
+        assert all(v & AMP_FLAG_ALPHA_ACTUAL for v in values)
+
+    def test_neq_inverts(self):
+        values = allowed_flag_values([("transparency_meta", "neq", True)])
+        assert len(values) == 8
+        assert not any(v & AMP_FLAG_TRANSPARENCY_META for v in values)
+
+    def test_contradiction_is_empty(self):
+        assert (
+            allowed_flag_values(
+                [("alpha_meta", "eq", True), ("alpha_meta", "eq", False)]
+            )
+            == []
+        )
+
+
+class TestIndexedCriteria:
+    def test_amp_flags_generated_from_booleans(self, db):
+        post = _make_post(db, _make_user(db), transparency_meta=True, alpha_actual=True)
+        assert post.amp_flags == AMP_FLAG_TRANSPARENCY_META | AMP_FLAG_ALPHA_ACTUAL
+
+    def test_boolean_criteria_use_flags(self, db):
+        owner = _make_user(db)
+        player = _make_player(db, owner)
+        opaque = _make_post(db, owner)
+        alpha = _make_post(db, owner, alpha_actual=True)
+        both = _make_post(db, owner, transparency_meta=True, alpha_actual=True)
+
+        assert _query_ids(
+            player, db, [{"field": "alpha_actual", "op": "eq", "value": True}]
+        ) == [both.id, alpha.id]
+        assert _query_ids(
+            player,
+            db,
+            [
+                {"field": "alpha_actual", "op": "eq", "value": True},
+                {"field": "transparency_meta", "op": "neq", "value": True},
+            ],
+        ) == [alpha.id]
+        assert _query_ids(
+            player, db, [{"field": "alpha_actual", "op": "eq", "value": False}]
+        ) == [opaque.id]
+
+    def test_contradictory_criteria_match_nothing(self, db):
+        owner = _make_user(db)
+        player = _make_player(db, owner)
+        _make_post(db, owner)
+
+        assert (
+            _query_ids(
+                player,
+                db,
+                [
+                    {"field": "alpha_meta", "op": "eq", "value": True},
+                    {"field": "alpha_meta", "op": "eq", "value": False},
+                ],
+            )
+            == []
+        )
+
+    def test_native_format_uses_denormalized_column(self, db):
+        owner = _make_user(db)
+        player = _make_player(db, owner)
+        _make_post(db, owner, native_format="png")
+        gif = _make_post(db, owner, native_format="gif")
+
+        assert _query_ids(
+            player, db, [{"field": "native_file_format", "op": "eq", "value": "gif"}]
+        ) == [gif.id]
+        assert _query_ids(
+            player,
+            db,
+            [{"field": "native_file_format", "op": "in", "value": ["gif", "webp"]}],
+        ) == [gif.id]
@@ -0,0 +1,124 @@
+"""Artwork download delivery (services/artwork_files.py): validators and
+304s, the X-Accel-Redirect hand-off, and remembered public resolutions."""
+
+from __future__ import annotations
+
+import uuid
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import models
+from app.cache import get_redis_client
+from app.sqids_config import encode_id
+from app.vault import compute_storage_shard, save_artwork_to_vault
+
+
+def make_png_bytes() -> bytes:
+    from PIL import Image
+    import io
+
+    buf = io.BytesIO()
+    Image.new("RGBA", (16, 16), (0, 0, 255, 255)).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+@pytest.fixture()
+def vault_tmp(tmp_path, monkeypatch):
+    monkeypatch.setenv("VAULT_LOCATION", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture()
+def post(db, vault_tmp):
+    owner = models.User(
+        handle=f"ad_{uuid.uuid4().hex[:8]}", email=f"{uuid.uuid4().hex[:8]}@e.com"
+    )
+    db.add(owner)
+    db.commit()
+
+    key = uuid.uuid4()
+    shard = compute_storage_shard(key)
+    save_artwork_to_vault(key, make_png_bytes(), "png", storage_shard=shard)
+    p = models.Post(
+        owner_id=owner.id,
+        title="blue",
+        storage_key=key,
+        storage_shard=shard,
+        kind="artwork",
+        hash=uuid.uuid4().hex * 2,
+        native_format="png",
+        public_visibility=True,
+    )
+    db.add(p)
+    db.commit()
+    p.public_sqid = encode_id(p.id)
+    db.add(models.PostFile(post_id=p.id, format="png", file_bytes=123, is_native=True))
+    db.commit()
+    return p
+
+
+@pytest.fixture()
+def posts_queries():
+    seen: list[str] = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if "FROM posts" in statement:
+            seen.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", _capture)
+    yield seen
+    event.remove(Engine, "before_cursor_execute", _capture)
+
+
+def test_download_carries_validators_and_answers_304(client, post):
+    resp = client.get(f"/d/{post.public_sqid}")
+    assert resp.status_code == 200, resp.text
+    etag = resp.headers["etag"]
+    assert etag == f'"{post.hash}.native"'
+    assert resp.headers["cache-control"] == "no-cache"
+
+    resp = client.get(f"/d/{post.public_sqid}", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.content == b""
+
+    resp = client.get(
+        f"/d/{post.public_sqid}.png",
+        headers={"If-Modified-Since": resp.headers["last-modified"]},
+    )
+    assert resp.status_code == 304
+
+    # A different variant's tag does not match
+    resp = client.get(f"/d/{post.public_sqid}.png", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+
+
+def test_accel_redirect_hands_off_to_proxy(client, post, vault_tmp, monkeypatch):
+    monkeypatch.setenv("VAULT_ACCEL_REDIRECT_PREFIX", "/_vault/")
+
+    resp = client.get(f"/d/{post.public_sqid}.png")
+    assert resp.status_code == 200, resp.text
+    assert resp.content == b""
+    assert resp.headers["content-type"] == "image/png"
+    target = resp.headers["x-accel-redirect"]
+    assert target.startswith("/_vault/")
+    assert (vault_tmp / target.removeprefix("/_vault/")).is_file()
+    assert 'filename="blue.png"' in resp.headers["content-disposition"]
+
+
+def test_public_resolution_is_remembered_until_post_changes(
+    client, db, post, posts_queries
+):
+    if get_redis_client() is None:
+        pytest.skip("Redis not available")
+
+    assert client.get(f"/d/{post.public_sqid}").status_code == 200
+    posts_queries.clear()
+    assert client.get(f"/d/{post.public_sqid}").status_code == 200
+    assert posts_queries == []
+
+    post.hidden_by_user = True
+    db.commit()
+
+    assert client.get(f"/d/{post.public_sqid}").status_code == 404
@@ -5,7 +5,7 @@ Remixable enforcement + grandfathering, self-remix bypass, replace-artwork
 append-only semantics + cycle rejection, deleted/hidden parent handling
 (tombstones, anonymous slots), children/me-remixes visibility filtering, the
 remix notification fan-out, the mkpx Remixable gate (L11), moderator severing,
-and public lineage counts.
+public lineage counts, and the closure table behind GET /post/{id}/lineage.
 """
 
 from __future__ import annotations
@@ -17,8 +17,15 @@ import pytest
 from sqlalchemy.orm import Session
 
 from app.auth import create_access_token
-from app.models import Post, PostLineage, SocialNotification, User
+from app.models import (
+    Post,
+    PostLineage,
+    PostLineageClosure,
+    SocialNotification,
+    User,
+)
 from app.services.post_stats import annotate_posts_with_counts
+from app.utils.lineage import detach_post_from_lineage, rebuild_lineage_closure
 from app.sqids_config import encode_user_id
 from app.vault import MKPX_MAGIC_COMPACT
 
@@ -489,3 +496,98 @@ def test_lineage_counts_annotation(client, db, vault_tmp):
     _make_public(db, child["id"])
     annotate_posts_with_counts(db, rows, None)
     assert by_id[parent["id"]].child_count == 1
+
+
+# --- closure table / whole lineage -------------------------------------------
+
+
+def _closure(db: Session) -> set[tuple[int, int, int]]:
+    db.expire_all()
+    return {
+        (row.ancestor_post_id, row.descendant_post_id, row.depth)
+        for row in db.query(PostLineageClosure).all()
+    }
+
+
+def _diamond(client, db):
+    """a ← b, a ← c, (b, c) ← d, d ← e."""
+    u1, u2 = _make_user(db), _make_user(db)
+    a = _upload(client, u1)
+    b = _upload(client, u2, data={"remixed_from": a["public_sqid"]})
+    c = _upload(client, u2, data={"remixed_from": a["public_sqid"]})
+    d = _upload(
+        client, u1, data={"remixed_from": f"{b['public_sqid']},{c['public_sqid']}"}
+    )
+    e = _upload(client, u2, data={"remixed_from": d["public_sqid"]})
+    return u1, u2, [p["id"] for p in (a, b, c, d, e)], (a, b, c, d, e)
+
+
+def test_closure_maintained_on_link_creation(client, db, vault_tmp):
+    _, _, (a, b, c, d, e), _ = _diamond(client, db)
+
+    expected = {
+        (a, b, 1), (a, c, 1), (a, d, 2), (a, e, 3),
+        (b, d, 1), (b, e, 2), (c, d, 1), (c, e, 2), (d, e, 1),
+    }  # fmt: skip
+    assert _closure(db) == expected
+    assert rebuild_lineage_closure(db) == len(expected)
+    assert _closure(db) == expected
+
+
+def test_closure_recomputed_on_sever_and_hard_delete(client, db, vault_tmp):
+    _, _, (a, b, c, d, e), _ = _diamond(client, db)
+    mod = _make_user(db, roles=["user", "moderator"])
+
+    # Severing d→b keeps a reachable from d/e through c.
+    link = next(l for l in _links_of(db, d) if l.parent_post_id == b)
+    r = client.delete(f"/v1/admin/lineage/{link.id}", headers=_headers(mod))
+    assert r.status_code == 204, r.text
+    assert _closure(db) == {
+        (a, b, 1), (a, c, 1), (a, d, 2), (a, e, 3),
+        (c, d, 1), (c, e, 2), (d, e, 1),
+    }  # fmt: skip
+
+    # Hard-deleting c leaves d and e without any live path to a.
+    row = db.query(Post).filter(Post.id == c).first()
+    detach_post_from_lineage(db, c)
+    db.delete(row)
+    db.commit()
+    assert _closure(db) == {(a, b, 1), (d, e, 1)}
+
+
+def test_lineage_endpoint_returns_visible_graph(client, db, vault_tmp):
+    u1, u2, ids, posts = _diamond(client, db)
+    a, b, c, d, e = posts
+    for post_id in ids:
+        _make_public(db, post_id)
+    row = db.query(Post).filter(Post.id == c["id"]).first()
+    row.hidden_by_mod = True
+    db.commit()
+
+    viewer = _make_user(db)
+    r = client.get(f"/v1/post/{b['id']}/lineage", headers=_headers(viewer))
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["root_sqid"] == b["public_sqid"]
+    assert [(n["post"]["public_sqid"], n["depth"]) for n in body["nodes"]] == [
+        (a["public_sqid"], -1),
+        (d["public_sqid"], 1),
+        (e["public_sqid"], 2),
+    ]
+    assert {(x["parent_sqid"], x["child_sqid"]) for x in body["edges"]} == {
+        (a["public_sqid"], b["public_sqid"]),
+        (b["public_sqid"], d["public_sqid"]),
+        (d["public_sqid"], e["public_sqid"]),
+    }
+    assert body["descendant_count"] == 2
+    assert body["truncated"] is False
+
+    r2 = client.get(
+        f"/v1/post/{a['id']}/lineage",
+        params={"max_depth": 1, "limit": 1},
+        headers=_headers(viewer),
+    )
+    assert r2.status_code == 200, r2.text
+    assert [n["depth"] for n in r2.json()["nodes"]] == [1]
+    assert r2.json()["truncated"] is True
+    assert r2.json()["descendant_count"] == 3
@@ -0,0 +1,167 @@
+"""Hot read endpoints on the async session (db.async_engine, deps.get_async_db).
+
+The ported endpoints must not touch the sync session at all, and the
+endpoint and its auth dependency must share the request's one AsyncSession.
+"""
+
+from __future__ import annotations
+
+import uuid
+
+import pytest
+
+from app import models
+from app.auth import create_access_token
+from app.deps import get_async_db, get_db
+from app.main import app
+from app.sqids_config import encode_id, encode_user_id
+
+
+def _user(db):
+    u = models.User(
+        handle=f"as_{uuid.uuid4().hex[:8]}",
+        email=f"{uuid.uuid4().hex[:8]}@e.com",
+        roles=["user"],
+    )
+    db.add(u)
+    db.commit()
+    u.public_sqid = encode_user_id(u.id)
+    db.commit()
+    db.refresh(u)
+    return u
+
+
+def _post(db, owner):
+    p = models.Post(
+        owner_id=owner.id,
+        title="async-art",
+        storage_key=uuid.uuid4(),
+        kind="artwork",
+        art_url="https://example.com/a.png",
+        width=64,
+        height=64,
+        visible=True,
+        public_visibility=True,
+        promoted=True,
+    )
+    db.add(p)
+    db.commit()
+    p.public_sqid = encode_id(p.id)
+    db.commit()
+    db.refresh(p)
+    return p
+
+
+def _auth(user):
+    return {"Authorization": f"Bearer {create_access_token(user)}"}
+
+
+@pytest.fixture()
+def no_sync_session(client):
+    """Fail any request that opens the sync session."""
+
+    def _forbidden():
+        raise AssertionError("sync session used by an async-session endpoint")
+        yield  # pragma: no cover
+
+    app.dependency_overrides[get_db] = _forbidden
+    yield
+    app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture()
+def async_sessions(client):
+    """Ids of the AsyncSessions opened while the test runs."""
+    opened: list[int] = []
+    inner = app.dependency_overrides[get_async_db]
+
+    async def _tracking():
+        async for session in inner():
+            opened.append(id(session))
+            yield session
+
+    app.dependency_overrides[get_async_db] = _tracking
+    yield opened
+    app.dependency_overrides[get_async_db] = inner
+
+
+@pytest.mark.parametrize("authenticated", [False, True])
+def test_hot_reads_skip_sync_session(client, db, no_sync_session, authenticated):
+    owner = _user(db)
+    post = _post(db, owner)
+    headers = _auth(owner) if authenticated else {}
+
+    resp = client.get(f"/p/{post.public_sqid}", headers=headers)
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["id"] == post.id
+
+    for path in ("/post/recent", "/feed/promoted", f"/post/{post.id}/comments"):
+        resp = client.get(path, headers=headers)
+        assert resp.status_code == 200, (path, resp.text)
+
+
+def test_redis_and_site_events_stay_off_the_event_loop(client, db, monkeypatch):
+    import asyncio
+
+    from app import auth, cache
+    from app.routers import artwork, posts, search
+
+    called, on_loop = set(), []
+
+    def _off_loop(fn):
+        def wrapper(*args, **kwargs):
+            called.add(fn.__name__)
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(fn.__name__)
+            except RuntimeError:
+                pass
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    for module in (posts, search):
+        monkeypatch.setattr(module, "cache_get", _off_loop(cache.cache_get))
+        monkeypatch.setattr(module, "cache_set", _off_loop(cache.cache_set))
+    for module in (posts, artwork):
+        monkeypatch.setattr(
+            module, "record_site_event", _off_loop(module.record_site_event)
+        )
+    monkeypatch.setattr(auth, "fetch_principal", _off_loop(auth.fetch_principal))
+    monkeypatch.setattr(auth, "remember_principal", _off_loop(auth.remember_principal))
+
+    cache.cache_invalidate("feed:*")
+    owner = _user(db)
+    post = _post(db, owner)
+    for _ in range(2):  # cache miss, then hit
+        for path in (f"/p/{post.public_sqid}", "/post/recent", "/feed/promoted"):
+            resp = client.get(path, headers=_auth(owner))
+            assert resp.status_code == 200, (path, resp.text)
+
+    assert called == {
+        "cache_get",
+        "cache_set",
+        "record_site_event",
+        "fetch_principal",
+        "remember_principal",
+    }
+    assert on_loop == []
+
+
+def test_endpoint_and_auth_share_one_session(client, db, async_sessions):
+    owner = _user(db)
+    post = _post(db, owner)
+
+    resp = client.get(f"/p/{post.public_sqid}", headers=_auth(owner))
+    assert resp.status_code == 200, resp.text
+    assert len(async_sessions) == 1
+
+
+def test_hidden_post_still_404(client, db):
+    owner = _user(db)
+    post = _post(db, owner)
+    post.hidden_by_user = True
+    db.commit()
+
+    assert client.get(f"/p/{post.public_sqid}").status_code == 404
+    assert client.get(f"/post/{post.id}/comments").status_code == 404
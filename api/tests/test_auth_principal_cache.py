@@ -0,0 +1,154 @@
+"""Cached authenticated principals (services/auth_principal.py)."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import jwt
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import models
+from app.auth import create_access_token
+from app.cache import get_redis_client
+from app.services.auth_principal import PRINCIPAL_KEY
+from app.sqids_config import encode_user_id
+
+
+@pytest.fixture(autouse=True)
+def _redis():
+    client = get_redis_client()
+    if client is None:
+        pytest.skip("Redis not available")
+    yield client
+
+
+@pytest.fixture()
+def user(db):
+    u = models.User(
+        handle=f"ap_{uuid.uuid4().hex[:8]}",
+        email=f"{uuid.uuid4().hex[:6]}@e.com",
+        roles=["user"],
+    )
+    db.add(u)
+    db.commit()
+    u.public_sqid = encode_user_id(u.id)
+    db.commit()
+    return u
+
+
+@pytest.fixture()
+def users_queries():
+    """Statements that read the users table, captured while the test runs."""
+    seen: list[str] = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            seen.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", _capture)
+    yield seen
+    event.remove(Engine, "before_cursor_execute", _capture)
+
+
+def _iat(token: str) -> int:
+    return jwt.decode(token, options={"verify_signature": False})["iat"]
+
+
+def _me(client, token):
+    return client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+
+
+def test_second_request_skips_users_lookup(client, user, users_queries, _redis):
+    token = create_access_token(user)
+
+    assert _me(client, token).status_code == 200
+    assert users_queries
+    assert _redis.exists(PRINCIPAL_KEY.format(sqid=user.public_sqid))
+
+    users_queries.clear()
+    resp = _me(client, token)
+    assert resp.status_code == 200
+    assert resp.json()["user"]["handle"] == user.handle
+    assert users_queries == []
+
+
+def test_ban_drops_cached_principal(client, db, user, _redis):
+    token = create_access_token(user)
+    assert _me(client, token).status_code == 200
+
+    user.banned_until = datetime.now(timezone.utc) + timedelta(days=1)
+    db.commit()
+
+    assert not _redis.exists(PRINCIPAL_KEY.format(sqid=user.public_sqid))
+    resp = _me(client, token)
+    assert resp.status_code == 401
+    assert resp.json()["detail"] == "Account banned"
+
+
+def test_role_change_visible_on_next_request(client, db, user):
+    token = create_access_token(user)
+    assert _me(client, token).json()["roles"] == ["user"]
+
+    user.roles = ["user", "moderator"]
+    db.commit()
+
+    assert _me(client, token).json()["roles"] == ["user", "moderator"]
+
+
+def test_rolled_back_change_keeps_cache(client, db, user, _redis):
+    token = create_access_token(user)
+    assert _me(client, token).status_code == 200
+
+    user.tagline = "draft"
+    db.flush()
+    db.rollback()
+
+    assert _redis.exists(PRINCIPAL_KEY.format(sqid=user.public_sqid))
+
+
+def test_load_before_ban_cannot_recache_stale_principal(client, db, user, _redis):
+    from app.db import SessionLocal
+    from app.services.auth_principal import cache_principal, fetch_principal
+
+    token = create_access_token(user)
+    iat = _iat(token)
+    key = PRINCIPAL_KEY.format(sqid=user.public_sqid)
+
+    # A request misses the cache and loads the row before the ban commits...
+    snapshot, generation = fetch_principal(user.public_sqid, iat)
+    assert snapshot is None
+    request_db = SessionLocal()
+    try:
+        stale = request_db.get(models.User, user.id)
+        assert stale.banned_until is None
+
+        # ...the ban commits and drops the hash...
+        user.banned_until = datetime.now(timezone.utc) + timedelta(days=1)
+        db.commit()
+
+        # ...and the request's late write of the pre-ban row is refused.
+        cache_principal(user.public_sqid, iat, stale, generation)
+    finally:
+        request_db.close()
+
+    assert not _redis.exists(key)
+    resp = _me(client, token)
+    assert resp.status_code == 401
+    assert resp.json()["detail"] == "Account banned"
+
+
+def test_load_after_invalidation_is_cached(db, user, _redis):
+    from app.services.auth_principal import (
+        cache_principal,
+        fetch_principal,
+        invalidate_principal,
+    )
+
+    invalidate_principal(user.public_sqid)
+    _, generation = fetch_principal(user.public_sqid, 1)
+    cache_principal(user.public_sqid, 1, user, generation)
+
+    assert _redis.hexists(PRINCIPAL_KEY.format(sqid=user.public_sqid), "1")
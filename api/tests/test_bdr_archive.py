@@ -0,0 +1,226 @@
+"""Streaming BDR archive writer (utils/zipstream, services/bdr_archive)."""
+
+from __future__ import annotations
+
+import io
+import uuid
+import zipfile
+from datetime import datetime, timedelta, timezone
+
+from app import models, vault
+from app.auth import create_access_token
+from app.services.bdr_archive import (
+    BDRArtworkFile,
+    BDRContents,
+    build_stream_manifest,
+    get_stream_manifest,
+    manifest_layout,
+    write_bdr_archive,
+)
+from app.utils.zipstream import ResumableZipWriter, iter_range
+
+WHEN = datetime(2026, 3, 4, 5, 6, 8, tzinfo=timezone.utc)
+
+
+def _contents(tmp_path, count=5):
+    artworks = []
+    for i in range(count):
+        fmt = "bmp" if i == 0 else "png"
+        source = tmp_path / f"src{i}.{fmt}"
+        source.write_bytes(bytes([i]) * (1000 + i))
+        artworks.append(
+            BDRArtworkFile(
+                archive_name=f"artworks/a{i}.{fmt}",
+                source_path=source,
+                file_format=fmt,
+                size=source.stat().st_size,
+                mtime=WHEN,
+            )
+        )
+    return BDRContents(
+        artworks=artworks,
+        documents={"metadata.json": b'{"artwork_count": %d}' % count},
+        generated_at=WHEN,
+    )
+
+
+def test_archive_round_trips_through_zipfile(tmp_path):
+    contents = _contents(tmp_path)
+    zip_path = tmp_path / "out.zip"
+
+    size = write_bdr_archive(contents, zip_path, read_workers=2)
+
+    assert size == zip_path.stat().st_size
+    assert not (tmp_path / "out.zip.part").exists()
+    assert not (tmp_path / "out.zip.journal").exists()
+    with zipfile.ZipFile(zip_path) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == [a.archive_name for a in contents.artworks] + [
+            "metadata.json"
+        ]
+        infos = {i.filename: i for i in zf.infolist()}
+        assert infos["artworks/a1.png"].compress_type == zipfile.ZIP_STORED
+        assert infos["artworks/a0.bmp"].compress_type == zipfile.ZIP_DEFLATED
+        assert infos["metadata.json"].compress_type == zipfile.ZIP_DEFLATED
+        assert infos["artworks/a1.png"].date_time == (2026, 3, 4, 5, 6, 8)
+        assert zf.read("artworks/a3.png") == bytes([3]) * 1003
+
+
+def test_interrupted_build_resumes_after_last_complete_member(tmp_path):
+    contents = _contents(tmp_path)
+    zip_path = tmp_path / "out.zip"
+
+    writer = ResumableZipWriter(zip_path)
+    for artwork in contents.artworks[:3]:
+        writer.add(
+            artwork.archive_name, artwork.source_path.read_bytes(), compress=False
+        )
+    writer.close()
+    # Simulate a crash midway through the third member.
+    part = tmp_path / "out.zip.part"
+    with open(part, "r+b") as f:
+        f.truncate(part.stat().st_size - 10)
+
+    resumed = ResumableZipWriter(zip_path)
+    assert resumed.completed == {"artworks/a0.bmp", "artworks/a1.png"}
+    resumed.close()
+
+    write_bdr_archive(contents, zip_path)
+
+    with zipfile.ZipFile(zip_path) as zf:
+        assert zf.testzip() is None
+        assert len(zf.namelist()) == 6
+        assert zf.read("artworks/a2.png") == bytes([2]) * 1002
+
+
+def test_streamed_layout_is_a_valid_zip_and_ranges_compose(tmp_path):
+    manifest = build_stream_manifest(_contents(tmp_path))
+    segments, size = manifest_layout(manifest)
+
+    body = b"".join(iter_range(segments, 0, size))
+    assert len(body) == size == manifest["size"]
+    with zipfile.ZipFile(io.BytesIO(body)) as zf:
+        assert zf.testzip() is None
+        assert all(i.compress_type == zipfile.ZIP_STORED for i in zf.infolist())
+        assert zf.read("artworks/a0.bmp") == bytes([0]) * 1000
+
+    cut = size // 3
+    head = b"".join(iter_range(segments, 0, cut))
+    tail = b"".join(iter_range(segments, cut, size))
+    assert head + tail == body
+
+
+def test_streamed_bdr_download_supports_ranges(client, db, tmp_path, monkeypatch):
+    user = models.User(
+        handle=f"bdr_{uuid.uuid4().hex[:6]}",
+        email=f"{uuid.uuid4().hex[:6]}@e.com",
+        roles=["user"],
+    )
+    db.add(user)
+    db.commit()
+    now = datetime.now(timezone.utc)
+    bdr = models.BatchDownloadRequest(
+        user_id=user.id,
+        post_ids=[1],
+        artwork_count=1,
+        delivery="stream",
+        status="ready",
+        completed_at=now,
+        expires_at=now + timedelta(days=7),
+    )
+    db.add(bdr)
+    db.commit()
+    manifest = build_stream_manifest(_contents(tmp_path))
+    monkeypatch.setattr("app.routers.pmd.get_stream_manifest", lambda *a: manifest)
+    headers = {"Authorization": f"Bearer {create_access_token(user)}"}
+    url = f"/pmd/bdr/{bdr.id}/download"
+
+    full = client.get(url, headers=headers)
+    assert full.status_code == 200
+    assert int(full.headers["content-length"]) == manifest["size"]
+    assert full.headers["accept-ranges"] == "bytes"
+
+    part = client.get(
+        url,
+        headers={**headers, "Range": "bytes=100-", "If-Range": full.headers["etag"]},
+    )
+    assert part.status_code == 206
+    assert part.headers["content-range"] == (
+        f"bytes 100-{manifest['size'] - 1}/{manifest['size']}"
+    )
+    assert part.content == full.content[100:]
+
+    stale = client.get(
+        url, headers={**headers, "Range": "bytes=100-", "If-Range": '"x"'}
+    )
+    assert stale.status_code == 200
+
+    beyond = client.get(url, headers={**headers, "Range": f"bytes={manifest['size']}-"})
+    assert beyond.status_code == 416
+
+
+def test_stream_manifest_is_rebuilt_when_posts_or_files_change(
+    db, tmp_path, monkeypatch
+):
+    monkeypatch.setenv("VAULT_LOCATION", str(tmp_path))
+    store: dict = {}
+    monkeypatch.setattr(
+        "app.services.bdr_archive.cache_get", lambda key: store.get(key)
+    )
+    monkeypatch.setattr(
+        "app.services.bdr_archive.cache_set",
+        lambda key, value, ttl=300: store.__setitem__(key, value),
+    )
+    user = models.User(
+        handle=f"bdr_{uuid.uuid4().hex[:6]}",
+        email=f"{uuid.uuid4().hex[:6]}@e.com",
+        roles=["user"],
+    )
+    db.add(user)
+    db.commit()
+    posts, paths = [], []
+    for i in range(2):
+        storage_key = uuid.uuid4()
+        post = models.Post(
+            owner_id=user.id,
+            title=f"s{i}",
+            kind="artwork",
+            storage_key=storage_key,
+            storage_shard=vault.compute_storage_shard(storage_key),
+            public_sqid=f"bdrs{uuid.uuid4().hex[:6]}",
+        )
+        db.add(post)
+        db.flush()
+        db.add(
+            models.PostFile(
+                post_id=post.id, format="png", file_bytes=100, is_native=True
+            )
+        )
+        path = vault.get_artwork_file_path(storage_key, ".png", post.storage_shard)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(bytes([i]) * 100)
+        posts.append(post)
+        paths.append(path)
+    bdr = models.BatchDownloadRequest(
+        user_id=user.id,
+        post_ids=[p.id for p in posts],
+        artwork_count=2,
+        delivery="stream",
+        status="ready",
+    )
+    db.add(bdr)
+    db.commit()
+
+    first = get_stream_manifest(db, bdr, user)
+    assert get_stream_manifest(db, bdr, user) == first
+
+    paths[0].write_bytes(b"x" * 150)
+    edited = get_stream_manifest(db, bdr, user)
+    assert edited["etag"] != first["etag"]
+    assert edited["members"][0]["size"] == 150
+
+    posts[1].deleted_by_user = True
+    db.commit()
+    trimmed = get_stream_manifest(db, bdr, user)
+    names = [m["name"] for m in trimmed["members"]]
+    assert names == [f"artworks/{posts[0].public_sqid}.png", "metadata.json"]
@@ -0,0 +1,73 @@
+"""Push-based BDR updates (services/bdr_events.py)."""
+
+from __future__ import annotations
+
+import json
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from app.services import bdr_events
+
+
+def _bdr(**overrides):
+    fields = dict(
+        id=uuid.uuid4(),
+        user_id=7,
+        status="processing",
+        delivery="archive",
+        file_path=None,
+        artwork_count=4,
+        created_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        completed_at=None,
+        expires_at=None,
+        error_message=None,
+    )
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channel, message):
+        self.published.append((channel, json.loads(message)))
+
+
+def test_progress_is_published_once_per_percent(monkeypatch):
+    redis = _FakeRedis()
+    monkeypatch.setattr(bdr_events, "get_redis_client", lambda: redis)
+    reporter = bdr_events.ProgressReporter(_bdr(), total=400)
+
+    for packed in range(401):
+        reporter(packed)
+
+    progress = [m["bdr"]["progress"] for _, m in redis.published]
+    assert progress == list(range(101))
+    channel, message = redis.published[0]
+    assert channel == bdr_events.BDR_EVENTS_CHANNEL
+    assert message["user_id"] == 7
+
+
+def test_relay_forwards_to_the_owner_on_the_bus(monkeypatch):
+    forwarded = []
+    monkeypatch.setattr(
+        bdr_events.bdr_bus,
+        "publish_threadsafe",
+        lambda user_id, event: forwarded.append((user_id, event)),
+    )
+    payload = bdr_events.bdr_to_dict(_bdr(status="ready", file_path="bdr/x.zip"))
+
+    bdr_events._forward(json.dumps({"user_id": 7, "bdr": payload}))
+    bdr_events._forward("not json")
+
+    assert forwarded == [(7, payload)]
+    assert payload["download_url"] == f"/api/pmd/bdr/{payload['id']}/download"
+
+
+def test_download_url_only_when_downloadable():
+    assert bdr_events.bdr_download_url(_bdr(status="ready")) is None
+    assert bdr_events.bdr_download_url(_bdr(status="ready", delivery="stream"))
+    processing = _bdr(status="processing", delivery="stream")
+    assert bdr_events.bdr_download_url(processing) is None
@@ -0,0 +1,210 @@
+"""Tests for the shared player channel result cache (services/channel_cache.py)."""
+
+import hashlib
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models import Player, Post, PostFile, User
+from app.player_protocol.schemas import QueryPostsRequest
+from app.services import channel_cache, player_rpc
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.data: dict = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+
+@pytest.fixture
+def fake_cache(monkeypatch) -> _FakeRedis:
+    """Back the version counter and cached lists with an in-memory store."""
+    fake = _FakeRedis()
+    monkeypatch.setattr("app.services.channel_cache.get_redis_client", lambda: fake)
+    monkeypatch.setattr("app.services.channel_cache.cache_get", fake.get)
+    monkeypatch.setattr(
+        "app.services.channel_cache.cache_set",
+        lambda key, value, ttl=300: fake.data.__setitem__(key, value) or True,
+    )
+    return fake
+
+
+def _make_user(db: Session, prefix: str, approved: list[str] | None = None) -> User:
+    unique_id = str(uuid.uuid4())[:8]
+    user = User(
+        handle=f"{prefix}_{unique_id}",
+        email=f"{prefix}_{unique_id}@example.com",
+        roles=["user"],
+        approved_hashtags=approved or [],
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def _make_player(db: Session, owner: User) -> Player:
+    player = Player(
+        player_key=uuid.uuid4(),
+        owner_id=owner.id,
+        device_model="TestDevice",
+        firmware_version="1.0.0",
+        registration_status="registered",
+        name="Cache Player",
+    )
+    db.add(player)
+    db.commit()
+    db.refresh(player)
+    return player
+
+
+def _make_post(db: Session, owner: User, title: str, hashtags: list[str]) -> Post:
+    from app.sqids_config import encode_id
+    from app.vault import compute_storage_shard
+
+    storage_key = uuid.uuid4()
+    now = datetime.now(timezone.utc)
+    post = Post(
+        storage_key=storage_key,
+        storage_shard=compute_storage_shard(storage_key),
+        owner_id=owner.id,
+        kind="artwork",
+        title=title,
+        hashtags=hashtags,
+        art_url=f"https://example.com/{title}.png",
+        width=64,
+        height=64,
+        frame_count=1,
+        metadata_modified_at=now,
+        artwork_modified_at=now,
+        hash=str(storage_key).replace("-", "") + "e" * 32,
+        visible=True,
+        public_visibility=True,
+    )
+    db.add(post)
+    db.flush()
+    post.public_sqid = encode_id(post.id)
+    db.add(PostFile(post_id=post.id, format="png", file_bytes=1000, is_native=True))
+    db.commit()
+    db.refresh(post)
+    return post
+
+
+def _query(player: Player, **kwargs) -> QueryPostsRequest:
+    return QueryPostsRequest(
+        request_id="cache-1", player_key=player.player_key, **kwargs
+    )
+
+
+def _ids(response) -> list[int]:
+    return [p.post_id for p in response.posts]
+
+
+class TestSharedChannelCache:
+    def test_players_share_one_list_query(self, db, fake_cache):
+        artist = _make_user(db, "artist")
+        posts = [_make_post(db, artist, f"shared{i}", ["pixel"]) for i in range(3)]
+        players = [_make_player(db, _make_user(db, f"viewer{i}")) for i in range(3)]
+
+        with patch.object(
+            channel_cache, "_compute_entry", wraps=channel_cache._compute_entry
+        ) as compute:
+            results = [
+                player_rpc.query_posts(p, _query(p, channel="all"), db) for p in players
+            ]
+
+        assert compute.call_count == 1
+        expected = sorted((p.id for p in posts), reverse=True)
+        assert all(_ids(r) == expected for r in results)
+
+    def test_monitored_hashtags_filtered_per_owner(self, db, fake_cache):
+        artist = _make_user(db, "artist")
+        plain = _make_post(db, artist, "plain", ["pixel"])
+        flagged = _make_post(db, artist, "flagged", ["nsfw"])
+
+        default_player = _make_player(db, _make_user(db, "default"))
+        opted_in = _make_player(db, _make_user(db, "optedin", approved=["nsfw"]))
+
+        default_ids = _ids(
+            player_rpc.query_posts(default_player, _query(default_player), db)
+        )
+        opted_ids = _ids(player_rpc.query_posts(opted_in, _query(opted_in), db))
+
+        assert default_ids == [plain.id]
+        assert opted_ids == [flagged.id, plain.id]
+
+    def test_version_bump_invalidates(self, db, fake_cache):
+        artist = _make_user(db, "artist")
+        first = _make_post(db, artist, "first", [])
+        player = _make_player(db, _make_user(db, "viewer"))
+
+        assert _ids(player_rpc.query_posts(player, _query(player), db)) == [first.id]
+
+        second = _make_post(db, artist, "second", [])
+        # Without a bump the cached list is served.
+        assert _ids(player_rpc.query_posts(player, _query(player), db)) == [first.id]
+
+        channel_cache.bump_channel_version()
+        assert _ids(player_rpc.query_posts(player, _query(player), db)) == [
+            second.id,
+            first.id,
+        ]
+
+    def test_pagination_matches_offset_cursor(self, db, fake_cache):
+        artist = _make_user(db, "artist")
+        posts = [_make_post(db, artist, f"page{i}", []) for i in range(5)]
+        player = _make_player(db, _make_user(db, "viewer"))
+        expected = sorted((p.id for p in posts), reverse=True)
+
+        page1 = player_rpc.query_posts(player, _query(player, limit=2), db)
+        page2 = player_rpc.query_posts(
+            player, _query(player, limit=2, cursor=page1.next_cursor), db
+        )
+        page3 = player_rpc.query_posts(
+            player, _query(player, limit=2, cursor=page2.next_cursor), db
+        )
+
+        assert _ids(page1) + _ids(page2) + _ids(page3) == expected
+        assert page3.has_more is False and page3.next_cursor is None
+
+    def test_viewer_specific_channels_bypass_cache(self, db, fake_cache):
+        owner = _make_user(db, "owner")
+        player = _make_player(db, owner)
+        _make_post(db, owner, "mine", [])
+
+        with patch.object(channel_cache, "_compute_entry") as compute:
+            player_rpc.query_posts(player, _query(player, channel="user"), db)
+            player_rpc.query_posts(player, _query(player, sort="random"), db)
+
+        compute.assert_not_called()
+
+    def test_hash_check_flips_invalidate(self, db, fake_cache, monkeypatch, tmp_path):
+        from app import vault
+        from app.tasks import check_post_hash
+
+        artist = _make_user(db, "artist")
+        post = _make_post(db, artist, "checked", [])
+        artwork = tmp_path / "artwork.png"
+        artwork.write_bytes(b"original")
+        post.hash = hashlib.sha256(b"original").hexdigest()
+        db.commit()
+        monkeypatch.setattr(vault, "get_artwork_file_path", lambda *a, **k: artwork)
+        player = _make_player(db, _make_user(db, "viewer"))
+
+        artwork.write_bytes(b"tampered")
+        check_post_hash.apply(args=[post.id])
+        assert _ids(player_rpc.query_posts(player, _query(player), db)) == []
+
+        # The cleared flag must not wait for the cached empty list to expire.
+        artwork.write_bytes(b"original")
+        check_post_hash.apply(args=[post.id])
+        assert _ids(player_rpc.query_posts(player, _query(player), db)) == [post.id]
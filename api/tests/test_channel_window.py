@@ -0,0 +1,237 @@
+"""Tests for server-pushed channel windows (open/advance_channel_window)."""
+
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models import Player, Post, PostFile, User
+from app.mqtt.player_requests import _handle_open_channel_window
+from app.player_protocol.schemas import (
+    AdvanceChannelWindowRequest,
+    OpenChannelWindowRequest,
+)
+from app.services import channel_cache, channel_window
+from app.services.player_rpc import PlayerRpcError
+
+
+@pytest.fixture
+def window_store(monkeypatch) -> dict:
+    """Replace the Redis-backed window store with a dict."""
+    store: dict = {}
+
+    def _get(key):
+        return store.get(key)
+
+    def _set(key, value, ttl=300):
+        store[key] = value
+        return True
+
+    monkeypatch.setattr("app.services.channel_window.cache_get", _get)
+    monkeypatch.setattr("app.services.channel_window.cache_set", _set)
+    return store
+
+
+@pytest.fixture
+def owner(db: Session) -> User:
+    unique_id = str(uuid.uuid4())[:8]
+    user = User(
+        handle=f"winowner_{unique_id}",
+        email=f"winowner_{unique_id}@example.com",
+        roles=["user"],
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def player(owner: User, db: Session) -> Player:
+    player = Player(
+        player_key=uuid.uuid4(),
+        owner_id=owner.id,
+        device_model="TestDevice",
+        firmware_version="1.0.0",
+        registration_status="registered",
+        name="Window Player",
+    )
+    db.add(player)
+    db.commit()
+    db.refresh(player)
+    return player
+
+
+@pytest.fixture
+def posts(owner: User, db: Session) -> list[Post]:
+    """Seven public posts, newest id last."""
+    from app.sqids_config import encode_id
+    from app.vault import compute_storage_shard
+
+    now = datetime.now(timezone.utc)
+    created = []
+    for i in range(7):
+        storage_key = uuid.uuid4()
+        post = Post(
+            storage_key=storage_key,
+            storage_shard=compute_storage_shard(storage_key),
+            owner_id=owner.id,
+            kind="artwork",
+            title=f"Window Art {i}",
+            hashtags=[],
+            art_url=f"https://example.com/w{i}.png",
+            width=64,
+            height=64,
+            frame_count=1,
+            metadata_modified_at=now,
+            artwork_modified_at=now,
+            hash=str(storage_key).replace("-", "") + "d" * 32,
+            visible=True,
+            public_visibility=True,
+        )
+        db.add(post)
+        db.flush()
+        post.public_sqid = encode_id(post.id)
+        db.add(PostFile(post_id=post.id, format="png", file_bytes=1000, is_native=True))
+        created.append(post)
+    db.commit()
+    return created
+
+
+def _open(player: Player, **kwargs) -> OpenChannelWindowRequest:
+    return OpenChannelWindowRequest(
+        request_id="win-1", player_key=player.player_key, **kwargs
+    )
+
+
+class TestOpenChannelWindow:
+    def test_open_delivers_first_page_plus_lookahead(
+        self, db, player, posts, window_store
+    ):
+        resp = channel_window.open_channel_window(
+            player, _open(player, limit=2, lookahead=1), db
+        )
+
+        assert resp.total_posts == 7
+        assert resp.page_count == 4
+        assert [p.page for p in resp.pages] == [0, 1]
+        expected = [p.id for p in sorted(posts, key=lambda p: p.id, reverse=True)]
+        delivered = [post.post_id for page in resp.pages for post in page.posts]
+        assert delivered == expected[:4]
+
+    def test_window_matches_query_posts_ordering(self, db, player, posts, window_store):
+        resp = channel_window.open_channel_window(
+            player, _open(player, limit=50, lookahead=0, sort="created_at"), db
+        )
+        assert len(resp.pages) == 1
+        assert resp.pages[0].is_last is True
+        assert len(resp.pages[0].posts) == 7
+
+    def test_players_share_one_id_list_per_channel(
+        self, db, owner, player, posts, window_store
+    ):
+        other = Player(
+            player_key=uuid.uuid4(),
+            owner_id=owner.id,
+            device_model="TestDevice",
+            firmware_version="1.0.0",
+            registration_status="registered",
+            name="Second Window Player",
+        )
+        db.add(other)
+        db.commit()
+
+        with patch(
+            "app.services.channel_cache._compute_entry",
+            wraps=channel_cache._compute_entry,
+        ) as compute:
+            first = channel_window.open_channel_window(
+                player, _open(player, limit=2, lookahead=0), db
+            )
+            second = channel_window.open_channel_window(
+                other, _open(other, limit=2, lookahead=0), db
+            )
+
+        assert compute.call_count == 1
+        assert first.total_posts == second.total_posts == 7
+        states = list(window_store.values())
+        assert len(states) == 2
+        assert all("ids" not in state for state in states)
+        assert states[0]["list_key"] == states[1]["list_key"]
+
+
+class TestAdvanceChannelWindow:
+    def test_advance_pushes_only_undelivered_pages(
+        self, db, player, posts, window_store
+    ):
+        opened = channel_window.open_channel_window(
+            player, _open(player, limit=2, lookahead=1), db
+        )
+
+        advance = AdvanceChannelWindowRequest(
+            request_id="win-2",
+            player_key=player.player_key,
+            window_id=opened.window_id,
+            page=1,
+        )
+        resp = channel_window.advance_channel_window(player, advance, db)
+        assert [p.page for p in resp.pages] == [2]
+
+        # Re-sending the same page is a no-op.
+        resp = channel_window.advance_channel_window(player, advance, db)
+        assert resp.pages == []
+
+    def test_hidden_post_is_dropped_from_later_pages(
+        self, db, player, posts, window_store
+    ):
+        opened = channel_window.open_channel_window(
+            player, _open(player, limit=2, lookahead=0), db
+        )
+        newest_first = sorted(posts, key=lambda p: p.id, reverse=True)
+        newest_first[2].hidden_by_mod = True
+        db.commit()
+
+        resp = channel_window.advance_channel_window(
+            player,
+            AdvanceChannelWindowRequest(
+                request_id="win-3",
+                player_key=player.player_key,
+                window_id=opened.window_id,
+                page=1,
+            ),
+            db,
+        )
+        assert [p.post_id for p in resp.pages[0].posts] == [newest_first[3].id]
+
+    def test_unknown_window_raises(self, db, player, window_store):
+        with pytest.raises(PlayerRpcError) as exc:
+            channel_window.advance_channel_window(
+                player,
+                AdvanceChannelWindowRequest(
+                    request_id="win-4",
+                    player_key=player.player_key,
+                    window_id="deadbeef",
+                    page=0,
+                ),
+                db,
+            )
+        assert exc.value.error_code == "window_expired"
+
+
+class TestMqttAdapter:
+    def test_pages_published_to_channel_topic(self, db, player, posts, window_store):
+        with patch("app.mqtt.player_requests.publish") as mock_publish:
+            _handle_open_channel_window(player, _open(player, limit=3, lookahead=1), db)
+
+        topics = [c.kwargs["topic"] for c in mock_publish.call_args_list]
+        assert topics[0] == f"makapix/player/{player.player_key}/response/win-1"
+        response = mock_publish.call_args_list[0].kwargs["payload"]
+        assert response["pages"] == []
+
+        window_id = response["window_id"]
+        window_topic = f"makapix/player/{player.player_key}/channel/{window_id}"
+        assert topics[1:] == [window_topic, window_topic]
+        pages = [c.kwargs["payload"]["page"] for c in mock_publish.call_args_list[1:]]
+        assert pages == [0, 1]
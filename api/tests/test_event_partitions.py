@@ -0,0 +1,174 @@
+"""Daily partitions of the raw event tables (services/event_partitions.py).
+
+Day partitions are created ahead by maintain_event_partitions (moving any
+rows the default partition caught for that day), and the rollups retire
+rolled days by dropping partitions instead of deleting rows.
+"""
+
+from __future__ import annotations
+
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+
+from app import models
+from app.services.event_partitions import (
+    PARTITIONED_EVENT_TABLES,
+    drop_event_partitions,
+    ensure_event_partitions,
+    maintain_event_partitions,
+    partition_name,
+)
+
+
+@pytest.fixture()
+def partitions(db):
+    """Drop every day partition a test created (they are owned by the
+    schema owner, so the fixture's TRUNCATE cannot reach them)."""
+    yield
+    db.rollback()
+    for table in PARTITIONED_EVENT_TABLES:
+        drop_event_partitions(db, table, date.max)
+    db.commit()
+
+
+@pytest.fixture()
+def post(db):
+    user = models.User(
+        handle=f"pt_{uuid.uuid4().hex[:6]}", email=f"{uuid.uuid4().hex[:6]}@e.com"
+    )
+    db.add(user)
+    db.commit()
+    p = models.Post(
+        owner_id=user.id, title="t", storage_key=uuid.uuid4(), kind="artwork"
+    )
+    db.add(p)
+    db.commit()
+    return p
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def _at(day: date, hour: int = 12) -> datetime:
+    return datetime.combine(day, time(hour=hour), tzinfo=timezone.utc)
+
+
+def _view(db, post_id, when):
+    db.add(
+        models.ViewEvent(
+            post_id=post_id,
+            viewer_ip_hash=uuid.uuid4().hex,
+            device_type="desktop",
+            view_source="web",
+            view_type="view",
+            created_at=when,
+        )
+    )
+
+
+def _site_event(db, when):
+    db.add(
+        models.SiteEvent(
+            event_type="page_view",
+            page_path="/recent",
+            visitor_ip_hash=uuid.uuid4().hex,
+            device_type="desktop",
+            created_at=when,
+        )
+    )
+
+
+def _exists(db, name: str) -> bool:
+    return db.execute(text("SELECT to_regclass(:n) IS NOT NULL"), {"n": name}).scalar()
+
+
+def _partition_of_views(db) -> list[str]:
+    return (
+        db.execute(text("SELECT tableoid::regclass::text FROM view_events"))
+        .scalars()
+        .all()
+    )
+
+
+def test_maintain_creates_window_and_moves_default_rows(db, post, partitions):
+    today = _today()
+    _view(db, post.id, _at(today))
+    db.commit()
+    assert _partition_of_views(db) == ["view_events_default"]
+
+    created = maintain_event_partitions(db, today)
+    db.commit()
+
+    # 7 days back + today + 7 ahead, for each of the three tables
+    assert created == 15 * len(PARTITIONED_EVENT_TABLES)
+    for table in PARTITIONED_EVENT_TABLES:
+        assert _exists(db, partition_name(table, today + timedelta(days=7)))
+    assert _partition_of_views(db) == [partition_name("view_events", today)]
+
+    # Idempotent
+    assert maintain_event_partitions(db, today) == 0
+    db.commit()
+
+
+def test_view_rollup_drops_rolled_partitions(db, post, partitions):
+    from app.services.view_metrics import set_view_watermark
+    from app.tasks import rollup_view_events
+
+    today = _today()
+    ensure_event_partitions(db, today - timedelta(days=12), today)
+    set_view_watermark(db, today - timedelta(days=12))
+    _view(db, post.id, _at(today - timedelta(days=10)))  # rolled, >7d: dropped
+    _view(db, post.id, _at(today - timedelta(days=2)))  # rolled, retained
+    db.commit()
+
+    result = rollup_view_events.apply().get()
+    assert result["status"] == "success"
+    assert result["deleted"] == 0  # nothing went to the default partition
+    # Days -12..-8 are past retention (day -10 held the only row)
+    assert result["dropped_partitions"] == 5
+    db.expire_all()
+
+    assert not _exists(db, partition_name("view_events", today - timedelta(days=10)))
+    assert _exists(db, partition_name("view_events", today - timedelta(days=7)))
+    assert db.query(models.ViewEvent).count() == 1
+    rolled = (
+        db.query(models.PostStatsDaily)
+        .filter(models.PostStatsDaily.post_id == post.id)
+        .count()
+    )
+    assert rolled == 2
+
+
+def test_site_rollup_rolls_whole_days_and_drops_them(db, partitions):
+    from app.services.view_metrics import SITE_EVENTS_WATERMARK, get_watermark
+    from app.tasks import rollup_site_events
+
+    today = _today()
+    ensure_event_partitions(db, today - timedelta(days=9), today)
+    _site_event(db, _at(today - timedelta(days=8), hour=23))  # rolled, dropped
+    _site_event(db, _at(today - timedelta(days=7), hour=0))  # cutoff day: kept
+    db.commit()
+
+    result = rollup_site_events.apply().get()
+    assert result["status"] == "success"
+    assert result["dropped_partitions"] == 2  # days -9 and -8
+    db.expire_all()
+
+    assert db.query(models.SiteEvent).count() == 1
+    assert get_watermark(db, SITE_EVENTS_WATERMARK) == today - timedelta(days=8)
+    row = (
+        db.query(models.SiteStatsDaily)
+        .filter(models.SiteStatsDaily.date == today - timedelta(days=8))
+        .one()
+    )
+    assert row.total_page_views == 1
+
+
+def test_partition_functions_reject_other_tables(db):
+    with pytest.raises(Exception, match="not a partitioned event table"):
+        drop_event_partitions(db, "users", _today())
+    db.rollback()
@@ -0,0 +1,222 @@
+"""Home timeline behind GET /feed/following (services/home_timeline.py)."""
+
+from __future__ import annotations
+
+import hashlib
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import models
+from app.auth import create_access_token
+from app.cache import get_redis_client
+from app.services import home_timeline
+from app.sqids_config import encode_id, encode_user_id
+
+BASE = datetime(2026, 5, 1, tzinfo=timezone.utc)
+
+
+def _user(db):
+    u = models.User(
+        handle=f"ht_{uuid.uuid4().hex[:6]}",
+        email=f"{uuid.uuid4().hex[:6]}@e.com",
+        email_verified=True,
+    )
+    db.add(u)
+    db.commit()
+    db.refresh(u)
+    u.public_sqid = encode_user_id(u.id)
+    db.commit()
+    return u
+
+
+def _post(db, owner, minutes, **flags):
+    key = uuid.uuid4()
+    p = models.Post(
+        owner_id=owner.id,
+        title="t",
+        storage_key=key,
+        art_url=f"https://example.com/{key}.png",
+        hash=str(key).replace("-", "") + "e" * 32,
+        kind="artwork",
+        visible=True,
+        public_visibility=True,
+        width=64,
+        height=64,
+        frame_count=1,
+        created_at=BASE + timedelta(minutes=minutes),
+        **flags,
+    )
+    db.add(p)
+    db.commit()
+    p.public_sqid = encode_id(p.id)
+    db.commit()
+    return p
+
+
+def _follow(db, follower, *authors):
+    for author in authors:
+        db.add(models.Follow(follower_id=follower.id, following_id=author.id))
+    db.commit()
+
+
+def _walk(client, viewer, limit):
+    headers = {"Authorization": f"Bearer {create_access_token(viewer)}"}
+    seen, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        resp = client.get("/feed/following", params=params, headers=headers)
+        assert resp.status_code == 200, resp.text
+        body = resp.json()
+        seen += [item["public_sqid"] for item in body["items"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            return seen
+
+
+def _scenario(db):
+    viewer, a, b, blocked, stranger = (_user(db) for _ in range(5))
+    _follow(db, viewer, a, b, blocked)
+    db.add(models.UserBlock(blocker_id=viewer.id, blocked_id=blocked.id))
+    db.commit()
+    expected = [_post(db, a if i % 2 else b, minutes=i) for i in range(7)]
+    _post(db, a, minutes=20, hidden_by_user=True)
+    _post(db, blocked, minutes=21)
+    _post(db, stranger, minutes=22)
+    return viewer, a, [p.public_sqid for p in reversed(expected)]
+
+
+def test_database_path_pages_with_cursor_and_filters(client, db, monkeypatch):
+    monkeypatch.setattr(home_timeline, "get_redis_client", lambda: None)
+    viewer, _, expected = _scenario(db)
+
+    assert _walk(client, viewer, limit=3) == expected
+
+
+def test_timeline_path_matches_database_and_takes_fan_out(client, db, monkeypatch):
+    if get_redis_client() is None:
+        pytest.skip("Redis not available")
+    viewer, author, expected = _scenario(db)
+
+    assert _walk(client, viewer, limit=3) == expected
+    assert get_redis_client().exists(home_timeline.timeline_key(viewer.id))
+
+    newest = _post(db, author, minutes=30)
+    assert home_timeline.fan_out_post(db, newest) == 1
+    assert _walk(client, viewer, limit=3) == [newest.public_sqid] + expected
+
+    # Heavy authors are merged on read instead of fanned out.
+    monkeypatch.setattr(home_timeline, "HEAVY_AUTHOR_FOLLOWERS", 1)
+    get_redis_client().delete(home_timeline.HEAVY_AUTHORS_KEY)
+    heavy_post = _post(db, author, minutes=40)
+    assert home_timeline.fan_out_post(db, heavy_post) == 0
+    assert _walk(client, viewer, limit=4)[:2] == [
+        heavy_post.public_sqid,
+        newest.public_sqid,
+    ]
+
+
+def test_demoted_heavy_author_reappears_in_timelines(client, db, monkeypatch):
+    if get_redis_client() is None:
+        pytest.skip("Redis not available")
+    viewer, author, expected = _scenario(db)
+
+    # While heavy, the author's posts are merged on read, never fanned out.
+    monkeypatch.setattr(home_timeline, "HEAVY_AUTHOR_FOLLOWERS", 1)
+    assert _walk(client, viewer, limit=3) == expected
+    while_heavy = _post(db, author, minutes=30)
+    assert home_timeline.fan_out_post(db, while_heavy) == 0
+
+    # Back under the threshold: the next recomputation demotes the author
+    # and drops the followers' timelines so they rebuild with those posts.
+    monkeypatch.setattr(home_timeline, "HEAVY_AUTHOR_FOLLOWERS", 5000)
+    get_redis_client().delete(home_timeline.HEAVY_AUTHORS_KEY)
+    assert _walk(client, viewer, limit=3) == [while_heavy.public_sqid] + expected
+    assert get_redis_client().zscore(
+        home_timeline.timeline_key(viewer.id), str(while_heavy.id)
+    )
+
+
+def test_posts_without_a_public_sqid_are_not_fanned_out(db):
+    author = _user(db)
+    post = _post(db, author, minutes=0)
+    post.public_sqid = None
+    assert not home_timeline.is_feed_eligible(post)
+
+
+def test_unblock_drops_the_timeline(client, db):
+    if get_redis_client() is None:
+        pytest.skip("Redis not available")
+    viewer, blocked = _user(db), _user(db)
+    db.add(models.UserBlock(blocker_id=viewer.id, blocked_id=blocked.id))
+    db.commit()
+    assert _walk(client, viewer, limit=3) == []
+    assert get_redis_client().exists(home_timeline.timeline_key(viewer.id))
+
+    resp = client.delete(
+        f"/v1/user/u/{blocked.public_sqid}/block",
+        headers={"Authorization": f"Bearer {create_access_token(viewer)}"},
+    )
+    assert resp.status_code == 204, resp.text
+    assert not get_redis_client().exists(home_timeline.timeline_key(viewer.id))
+
+
+def _run_fan_out_eagerly(monkeypatch):
+    from app.tasks import fan_out_post_to_timelines
+
+    monkeypatch.setattr(
+        fan_out_post_to_timelines,
+        "delay",
+        lambda post_id: fan_out_post_to_timelines.apply(args=[post_id]),
+    )
+
+
+def test_post_cleared_by_the_hash_check_returns_to_timelines(
+    client, db, monkeypatch, tmp_path
+):
+    if get_redis_client() is None:
+        pytest.skip("Redis not available")
+    from app import vault
+    from app.tasks import check_post_hash
+
+    _run_fan_out_eagerly(monkeypatch)
+    viewer, author, expected = _scenario(db)
+    post = _post(db, author, minutes=30)
+    artwork = tmp_path / "artwork.png"
+    artwork.write_bytes(b"original")
+    post.hash = hashlib.sha256(b"original").hexdigest()
+    db.add(models.PostFile(post_id=post.id, format="png", file_bytes=8, is_native=True))
+    db.commit()
+    monkeypatch.setattr(vault, "get_artwork_file_path", lambda *a, **k: artwork)
+    assert _walk(client, viewer, limit=3) == [post.public_sqid] + expected
+
+    artwork.write_bytes(b"tampered")
+    assert check_post_hash.apply(args=[post.id]).get()["status"] == "mismatch"
+    assert _walk(client, viewer, limit=3) == expected
+
+    artwork.write_bytes(b"original")
+    assert check_post_hash.apply(args=[post.id]).get()["status"] == "match"
+    assert _walk(client, viewer, limit=3) == [post.public_sqid] + expected
+
+
+def test_unhidden_playlist_is_fanned_out_again(client, db, monkeypatch):
+    if get_redis_client() is None:
+        pytest.skip("Redis not available")
+    _run_fan_out_eagerly(monkeypatch)
+    viewer, author, _ = _scenario(db)
+    playlist = _post(db, author, minutes=30, hidden_by_user=True)
+    playlist.kind = "playlist"
+    legacy_id = uuid.uuid4()
+    db.add(models.PlaylistPost(post_id=playlist.id, legacy_playlist_id=legacy_id))
+    db.commit()
+    _walk(client, viewer, limit=3)
+    key = home_timeline.timeline_key(viewer.id)
+    assert get_redis_client().zscore(key, str(playlist.id)) is None
+
+    resp = client.delete(
+        f"/playlist/{legacy_id}/hide",
+        headers={"Authorization": f"Bearer {create_access_token(author)}"},
+    )
+    assert resp.status_code == 204, resp.text
+    assert get_redis_client().zscore(key, str(playlist.id))
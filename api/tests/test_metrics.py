@@ -0,0 +1,147 @@
+"""Prometheus instrumentation (app/metrics.py, middleware.MetricsMiddleware)."""
+
+from __future__ import annotations
+
+import uuid
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app import metrics, models
+from app.sqids_config import encode_id, encode_user_id
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.fixture()
+def post(db):
+    owner = models.User(
+        handle=f"mx_{uuid.uuid4().hex[:8]}",
+        email=f"{uuid.uuid4().hex[:8]}@e.com",
+        roles=["user"],
+    )
+    db.add(owner)
+    db.commit()
+    owner.public_sqid = encode_user_id(owner.id)
+    p = models.Post(
+        owner_id=owner.id,
+        title="metrics-art",
+        storage_key=uuid.uuid4(),
+        kind="artwork",
+        art_url="https://example.com/a.png",
+        width=64,
+        height=64,
+        visible=True,
+        public_visibility=True,
+    )
+    db.add(p)
+    db.commit()
+    p.public_sqid = encode_id(p.id)
+    db.commit()
+    return p
+
+
+def test_metrics_endpoint_off_without_token(client, monkeypatch):
+    monkeypatch.delenv("METRICS_TOKEN", raising=False)
+    assert client.get("/metrics").status_code == 404
+
+
+def test_metrics_endpoint_requires_token(client, monkeypatch):
+    monkeypatch.setenv("METRICS_TOKEN", "scrape-secret")
+    assert client.get("/metrics").status_code == 404
+    wrong = {"Authorization": "Bearer nope"}
+    assert client.get("/metrics", headers=wrong).status_code == 404
+
+    client.get("/health")
+    resp = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert 'makapix_http_request_duration_seconds_count{method="GET",' in resp.text
+    assert 'route="/health"' in resp.text
+
+
+def test_request_labelled_by_route_template(client, post):
+    labels = {"route": "/p/{public_sqid}", "method": "GET", "status": "200"}
+    before = _sample("makapix_http_request_duration_seconds_count", **labels)
+
+    assert client.get(f"/p/{post.public_sqid}").status_code == 200
+
+    after = _sample("makapix_http_request_duration_seconds_count", **labels)
+    assert after == before + 1
+
+
+def test_request_counts_sql_statements(client, post):
+    route = {"route": "/p/{public_sqid}"}
+    count_before = _sample("makapix_http_request_db_queries_count", **route)
+    sum_before = _sample("makapix_http_request_db_queries_sum", **route)
+
+    assert client.get(f"/p/{post.public_sqid}").status_code == 200
+
+    assert _sample("makapix_http_request_db_queries_count", **route) == count_before + 1
+    assert _sample("makapix_http_request_db_queries_sum", **route) > sum_before
+
+
+def test_unmatched_paths_share_one_label(client):
+    labels = {"route": "unmatched", "method": "GET", "status": "404"}
+    before = _sample("makapix_http_request_duration_seconds_count", **labels)
+
+    client.get(f"/no-such-path/{uuid.uuid4().hex}")
+    client.get(f"/no-such-path/{uuid.uuid4().hex}")
+
+    after = _sample("makapix_http_request_duration_seconds_count", **labels)
+    assert after == before + 2
+
+
+@pytest.mark.parametrize(
+    "key,family",
+    [
+        ("feed:recent:first:50", "feed:recent"),
+        ("post_stats:123", "post_stats"),
+        ("sitewide_stats", "sitewide_stats"),
+        ("hashtags:posts:cats:first:50", "hashtags:posts"),
+        ("user_verify:k5Xa", "user_verify"),
+        ("42:anything", "other"),
+    ],
+)
+def test_cache_key_family(key, family):
+    assert metrics.cache_key_family(key) == family
+
+
+def test_cache_get_records_hit_and_miss():
+    from app.cache import cache_get, cache_set, get_redis_client
+
+    if get_redis_client() is None:
+        pytest.skip("Redis not available")
+
+    key = f"post_stats:{uuid.uuid4().int % 10**9}"
+    miss = {"family": "post_stats", "result": "miss"}
+    hit = {"family": "post_stats", "result": "hit"}
+    misses = _sample("makapix_cache_requests_total", **miss)
+    hits = _sample("makapix_cache_requests_total", **hit)
+
+    assert cache_get(key) is None
+    cache_set(key, {"v": 1}, ttl=30)
+    assert cache_get(key) == {"v": 1}
+
+    assert _sample("makapix_cache_requests_total", **miss) == misses + 1
+    assert _sample("makapix_cache_requests_total", **hit) == hits + 1
+
+
+def test_celery_task_duration_recorded():
+    from celery.signals import task_postrun, task_prerun
+
+    from app.tasks import celery_app
+
+    task = celery_app.tasks["app.tasks.rollup_view_events"]
+    labels = {"task": task.name, "state": "SUCCESS"}
+    before = _sample("makapix_celery_task_duration_seconds_count", **labels)
+
+    task_id = uuid.uuid4().hex
+    task_prerun.send(sender=task, task_id=task_id, task=task, args=(), kwargs={})
+    task_postrun.send(
+        sender=task, task_id=task_id, task=task, args=(), kwargs={}, state="SUCCESS"
+    )
+
+    assert _sample("makapix_celery_task_duration_seconds_count", **labels) == before + 1
@@ -1,7 +1,8 @@
 """Tests for the plane-separation notification rework
 (docs/notification-architecture/): live dispatch via the in-process bus with
-block gating, DB-derived unread count, (created_at, id) cursor tiebreaker with
-legacy-cursor compatibility, retention task, and comment-preview scrubbing.
+block gating, the notification outbox, the maintained unread counter,
+(created_at, id) cursor tiebreaker with legacy-cursor compatibility, retention
+task, and comment-preview scrubbing.
 """
 
 from __future__ import annotations
@@ -14,7 +15,16 @@ import pytest
 from sqlalchemy.orm import Session
 
 from app.auth import create_access_token
-from app.models import Post, PostFile, SocialNotification, User, UserBlock
+from app.models import (
+    NotificationOutbox,
+    Post,
+    PostFile,
+    SocialNotification,
+    User,
+    UserBlock,
+)
+from app.cache import get_redis_client
+from app.services import notification_counts, notification_outbox
 from app.services import social_notifications as sn_module
 from app.services.social_notifications import SocialNotificationService
 from app.sqids_config import encode_id, encode_user_id
@@ -171,6 +181,60 @@ class TestDispatchBlockGating:
         assert captured_events[0][0] == recipient.id
 
 
+class TestNotificationOutbox:
+    def _enqueue(self, db, recipient, actor, post, emoji="❤️"):
+        return SocialNotificationService.enqueue_notification(
+            db,
+            user_id=recipient.id,
+            notification_type="reaction",
+            post=post,
+            actor=actor,
+            emoji=emoji,
+        )
+
+    def test_intent_delivered_with_callers_commit(
+        self, db, recipient, actor, post, captured_events
+    ):
+        assert self._enqueue(db, recipient, actor, post) is not None
+        db.flush()
+        assert db.query(SocialNotification).count() == 0
+
+        db.commit()  # no drainer thread under pytest: drains inline
+
+        rows = db.query(SocialNotification).all()
+        assert [(n.user_id, n.emoji, n.content_sqid) for n in rows] == [
+            (recipient.id, "❤️", post.public_sqid)
+        ]
+        assert db.query(NotificationOutbox).count() == 0
+        assert [user_id for user_id, _ in captured_events] == [recipient.id]
+
+    def test_rollback_discards_intent_and_self_action_skipped(
+        self, db, recipient, actor, post
+    ):
+        self._enqueue(db, recipient, actor, post)
+        db.rollback()
+        assert self._enqueue(db, recipient, recipient, post) is None
+        db.commit()
+        assert db.query(SocialNotification).count() == 0
+        assert db.query(NotificationOutbox).count() == 0
+
+    def test_batch_rate_limit(
+        self, db, recipient, actor, post, captured_events, monkeypatch
+    ):
+        if get_redis_client() is None:
+            pytest.skip("Redis not available")
+        monkeypatch.setattr(
+            notification_outbox, "MAX_NOTIFICATIONS_PER_HOUR_PER_PAIR", 2
+        )
+        for emoji in ("❤️", "🔥", "⭐"):
+            self._enqueue(db, recipient, actor, post, emoji=emoji)
+        db.commit()
+
+        assert db.query(SocialNotification).count() == 2
+        assert db.query(NotificationOutbox).count() == 0
+        assert len(captured_events) == 2
+
+
 class TestUnreadCount:
     def test_counts_only_unread(self, client, db, recipient, actor):
         for _ in range(3):
@@ -224,6 +288,68 @@ class TestUnreadCount:
         assert r.json()["unread_count"] == 0
 
 
+class TestUnreadCounter:
+    @pytest.fixture(autouse=True)
+    def _needs_redis(self):
+        if get_redis_client() is None:
+            pytest.skip("Redis not available")
+
+    def _count(self, client, user):
+        r = client.get("/v1/social-notifications/unread-count", headers=_auth(user))
+        assert r.status_code == 200
+        return r.json()["unread_count"]
+
+    def test_counter_follows_create_read_and_delete(
+        self, client, db, recipient, actor, post, captured_events
+    ):
+        _seed_notification(db, user_id=recipient.id, actor_id=actor.id)
+        assert self._count(client, recipient) == 1
+        assert get_redis_client().get(f"notif:unread:{recipient.id}") == "1"
+
+        created = SocialNotificationService.create_notification(
+            db,
+            user_id=recipient.id,
+            notification_type="reaction",
+            post=post,
+            actor=actor,
+            emoji="❤️",
+        )
+        assert get_redis_client().get(f"notif:unread:{recipient.id}") == "2"
+
+        r = client.delete(
+            f"/v1/social-notifications/{created.id}", headers=_auth(recipient)
+        )
+        assert r.status_code == 204
+        assert self._count(client, recipient) == 1
+
+    def test_block_and_unblock_drop_the_counter(self, client, db, recipient, actor):
+        _seed_notification(db, user_id=recipient.id, actor_id=actor.id)
+        assert self._count(client, recipient) == 1
+
+        r = client.post(
+            f"/v1/user/u/{actor.public_sqid}/block", headers=_auth(recipient)
+        )
+        assert r.status_code in (200, 204), r.text
+        assert self._count(client, recipient) == 0
+
+        r = client.delete(
+            f"/v1/user/u/{actor.public_sqid}/block", headers=_auth(recipient)
+        )
+        assert r.status_code == 204, r.text
+        assert self._count(client, recipient) == 1
+
+    def test_reconcile_repairs_drift(self, client, db, recipient, actor):
+        _seed_notification(db, user_id=recipient.id, actor_id=actor.id)
+        assert self._count(client, recipient) == 1
+        # A cascade (e.g. post hard-delete) bypasses the counter.
+        _seed_notification(db, user_id=recipient.id, actor_id=None)
+        assert self._count(client, recipient) == 1
+
+        result = notification_counts.reconcile_unread_counts(db)
+        assert result["repaired"] >= 1
+        assert self._count(client, recipient) == 2
+
+
 class TestCursorPagination:
     def test_tiebreaker_no_skip_on_shared_timestamp(self, client, db, recipient):
         ts = datetime(2026, 8, 1, 12, 0, 0, tzinfo=timezone.utc)
@@ -0,0 +1,115 @@
+"""Load-test result records and the commit-to-commit compare (perf/results.py).
+
+The compare is what gates a change on a benchmark run, so it must flag real
+regressions (p95, error rate, SQL statements per request) without flagging
+sub-millisecond noise on fast routes.
+"""
+
+import json
+
+from perf.results import (
+    Recorder,
+    compare,
+    load_result,
+    percentile,
+    summarize,
+    write_result,
+)
+
+
+def _result(metrics: dict, scenario: str = "http:feeds") -> dict:
+    return {
+        "suite": "makapix-perf",
+        "format": 1,
+        "scenario": scenario,
+        "git": {"commit": "abc", "dirty": False},
+        "metrics": metrics,
+    }
+
+
+def _metric(p50: float, p95: float, count: int = 1000, errors: int = 0, **extra):
+    return {"count": count, "errors": errors, "p50_ms": p50, "p95_ms": p95, **extra}
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 100) == 100.0
+    assert percentile([], 95) == 0.0
+
+
+def test_summarize_reports_latency_and_throughput():
+    summary = summarize([30.0, 10.0, 20.0], errors=1, elapsed_s=2.0)
+    assert summary["count"] == 3
+    assert summary["errors"] == 1
+    assert summary["rps"] == 1.5
+    assert summary["mean_ms"] == 20.0
+    assert summary["p50_ms"] == 20.0
+    assert summary["max_ms"] == 30.0
+
+
+def test_recorder_tallies_outcomes_and_restart_drops_warmup():
+    recorder = Recorder()
+    recorder.observe("GET /v1/post/recent", 0.5, ok=False, outcome="500")
+    recorder.restart()
+    recorder.observe("GET /v1/post/recent", 0.010, outcome="200")
+    recorder.observe("GET /v1/post/recent", 0.020, ok=False, outcome="429")
+
+    metrics = recorder.metrics()["GET /v1/post/recent"]
+    assert metrics["count"] == 2
+    assert metrics["errors"] == 1
+    assert metrics["outcomes"] == {"200": 1, "429": 1}
+    assert metrics["max_ms"] == 20.0
+
+
+def test_compare_flags_p95_growth():
+    base = _result({"GET /v1/post/recent": _metric(10.0, 40.0)})
+    head = _result({"GET /v1/post/recent": _metric(10.0, 60.0)})
+    _, regressions = compare(base, head)
+    assert regressions == ["GET /v1/post/recent: p95_ms 40.0 -> 60.0"]
+
+
+def test_compare_ignores_sub_floor_noise():
+    # +50% on a sub-millisecond route is below the absolute floor.
+    base = _result({"GET /v1/feed/promoted": _metric(0.4, 0.8)})
+    head = _result({"GET /v1/feed/promoted": _metric(0.6, 1.2)})
+    _, regressions = compare(base, head)
+    assert regressions == []
+
+
+def test_compare_flags_error_rate_and_sql_per_request():
+    base = _result(
+        {"GET /v1/feed/following": _metric(10.0, 20.0, db_queries_per_request=4.0)}
+    )
+    head = _result(
+        {
+            "GET /v1/feed/following": _metric(
+                10.0, 20.0, errors=50, db_queries_per_request=24.0
+            )
+        }
+    )
+    rows, regressions = compare(base, head)
+    assert rows[0]["db_queries_per_request"] == (4.0, 24.0)
+    assert len(regressions) == 2
+    assert "error rate 0.00% -> 5.00%" in regressions[0]
+    assert "SQL statements/request 4 -> 24" in regressions[1]
+
+
+def test_compare_notes_operations_present_on_one_side_only():
+    base = _result({"GET /v1/search": _metric(5.0, 9.0)})
+    head = _result({"GET /v1/search/suggest": _metric(2.0, 3.0)})
+    rows, regressions = compare(base, head)
+    assert {row["label"]: row["note"] for row in rows} == {
+        "GET /v1/search": "only in base",
+        "GET /v1/search/suggest": "new",
+    }
+    assert regressions == []
+
+
+def test_write_result_names_files_in_a_directory(tmp_path):
+    result = _result({}, scenario="mqtt:views")
+    write_result(result, str(tmp_path) + "/")
+    (written,) = tmp_path.iterdir()
+    assert written.name.startswith("mqtt-views-abc-")
+    assert load_result(str(written)) == json.loads(written.read_text())
@@ -0,0 +1,237 @@
+"""Batched player view submission (services/player_views.record_view_batch)."""
+
+from __future__ import annotations
+
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from app import models
+from app.mqtt.player_views import _on_view_batch_message
+from app.services import player_views, rate_limit
+
+
+@pytest.fixture
+def owner(db):
+    user = models.User(
+        handle=f"vb_{uuid.uuid4().hex[:6]}", email=f"{uuid.uuid4().hex[:6]}@e.com"
+    )
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def artist(db):
+    user = models.User(
+        handle=f"va_{uuid.uuid4().hex[:6]}", email=f"{uuid.uuid4().hex[:6]}@e.com"
+    )
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def player(db, owner):
+    p = models.Player(
+        player_key=uuid.uuid4(),
+        owner_id=owner.id,
+        device_model="TestDevice",
+        firmware_version="1.1.0",
+        registration_status="registered",
+        name="Batcher",
+    )
+    db.add(p)
+    db.commit()
+    return p
+
+
+@pytest.fixture
+def posts(db, artist):
+    created = []
+    for i in range(3):
+        p = models.Post(
+            owner_id=artist.id, title=f"b{i}", storage_key=uuid.uuid4(), kind="artwork"
+        )
+        db.add(p)
+        created.append(p)
+    db.commit()
+    return created
+
+
+@pytest.fixture
+def dispatched(monkeypatch):
+    batches: list[list[dict]] = []
+    monkeypatch.setattr(
+        "app.tasks.write_view_events",
+        SimpleNamespace(delay=lambda events: batches.append(events)),
+    )
+    return batches
+
+
+def _event(post_id, second=0, **overrides):
+    event = {
+        "post_id": post_id,
+        "timestamp": f"2099-01-01T00:00:{second:02d}Z",
+        "timezone": "",
+        "intent": "channel",
+        "play_order": 0,
+        "channel": "all",
+    }
+    event.update(overrides)
+    return event
+
+
+def _statuses(results):
+    return [r.status for r in results]
+
+
+def test_batch_is_recorded_with_one_dispatch(db, player, posts, dispatched):
+    events = [_event(p.id, i) for i, p in enumerate(posts)]
+
+    results = player_views.record_view_batch(player, events, db)
+
+    assert _statuses(results) == [player_views.RECORDED] * 3
+    assert len(dispatched) == 1
+    assert [d["post_id"] for d in dispatched[0]] == [str(p.id) for p in posts]
+
+
+def test_per_item_outcomes(db, player, posts, dispatched):
+    events = [
+        _event(posts[0].id, 1),
+        _event(posts[0].id, 1),  # repeated inside the batch
+        {"post_id": "not-a-number"},
+        _event(999_999_999, 2),
+        _event(posts[1].id, 3),
+    ]
+
+    results = player_views.record_view_batch(player, events, db)
+
+    assert _statuses(results) == [
+        player_views.RECORDED,
+        player_views.DUPLICATE,
+        player_views.INVALID,
+        player_views.POST_NOT_FOUND,
+        player_views.RECORDED,
+    ]
+    assert len(dispatched[0]) == 2
+
+
+def test_retransmitted_batch_is_deduplicated(db, player, posts, dispatched):
+    events = [_event(p.id, i) for i, p in enumerate(posts)]
+
+    player_views.record_view_batch(player, events, db)
+    again = player_views.record_view_batch(player, events, db)
+
+    assert _statuses(again) == [player_views.DUPLICATE] * 3
+    assert len(dispatched) == 1
+
+
+def test_budget_grants_in_order_and_rate_limited_can_resend(
+    db, player, posts, dispatched, monkeypatch
+):
+    monkeypatch.setattr(rate_limit, "PLAYER_VIEW_BATCH_LIMIT", 2)
+    events = [_event(p.id, i) for i, p in enumerate(posts)]
+
+    results = player_views.record_view_batch(player, events, db)
+
+    assert _statuses(results) == [
+        player_views.RECORDED,
+        player_views.RECORDED,
+        player_views.RATE_LIMITED,
+    ]
+    assert results[2].retry_after is not None
+    # The rejected view did not burn budget or a dedup slot.
+    monkeypatch.setattr(rate_limit, "PLAYER_VIEW_BATCH_LIMIT", 3)
+    resent = player_views.record_view_batch(player, events[2:], db)
+    assert _statuses(resent) == [player_views.RECORDED]
+
+
+def test_budget_is_charged_only_for_recorded_views(
+    db, player, posts, dispatched, monkeypatch
+):
+    monkeypatch.setattr(rate_limit, "PLAYER_VIEW_BATCH_LIMIT", 2)
+    # Daily dedup is pipelined for the whole batch, never checked per item.
+    monkeypatch.setattr(
+        rate_limit,
+        "check_and_set_daily_view_dedup",
+        MagicMock(side_effect=AssertionError),
+    )
+    events = [
+        _event(999_999_999, 0),
+        _event(posts[0].id, 1, intent="artwork"),
+        _event(posts[0].id, 2, intent="artwork"),  # same artwork, same day
+        _event(posts[1].id, 3),
+    ]
+
+    results = player_views.record_view_batch(player, events, db)
+
+    assert _statuses(results) == [
+        player_views.POST_NOT_FOUND,
+        player_views.RECORDED,
+        player_views.DUPLICATE,
+        player_views.RECORDED,
+    ]
+    again = player_views.record_view_batch(
+        player, [_event(posts[0].id, 4, intent="artwork")], db
+    )
+    assert _statuses(again) == [player_views.DUPLICATE]
+    assert len(dispatched) == 1
+
+
+def test_self_views_are_accepted_but_not_written(db, owner, player, dispatched):
+    own = models.Post(
+        owner_id=owner.id, title="mine", storage_key=uuid.uuid4(), kind="artwork"
+    )
+    db.add(own)
+    db.commit()
+
+    results = player_views.record_view_batch(player, [_event(own.id)], db)
+
+    assert _statuses(results) == [player_views.SELF_VIEW]
+    assert dispatched == []
+    ack = player_views.build_view_batch_ack("b1", results)
+    assert ack.accepted == 1 and ack.results[0].status == "accepted"
+
+
+def test_original_timestamp_kept_only_within_today():
+    now = datetime(2026, 5, 26, 18, 0, tzinfo=timezone.utc)
+    earlier_today = "2026-05-26T09:15:00Z"
+    yesterday = (now - timedelta(days=1)).isoformat()
+
+    assert player_views._batch_created_at(earlier_today, now) == datetime(
+        2026, 5, 26, 9, 15, tzinfo=timezone.utc
+    )
+    assert player_views._batch_created_at(yesterday, now) == now
+    assert player_views._batch_created_at(player_views.UNSYNC_TIMESTAMP, now) == now
+    assert player_views._batch_created_at("garbage", now) == now
+
+
+def test_mqtt_batch_ack(db, player, posts, dispatched, monkeypatch):
+    monkeypatch.setattr("app.mqtt.player_views.get_session", lambda: iter([db]))
+    monkeypatch.setattr(db, "close", lambda: None)
+    client = MagicMock()
+    msg = SimpleNamespace(
+        topic=f"makapix/player/{player.player_key}/views",
+        payload=json.dumps(
+            {
+                "player_key": str(player.player_key),
+                "batch_id": "b-7",
+                "request_ack": True,
+                "events": [_event(posts[0].id), {"bogus": True}],
+            }
+        ).encode(),
+    )
+
+    _on_view_batch_message(client, None, msg)
+
+    topic, payload = client.publish.call_args.args[:2]
+    assert topic == f"makapix/player/{player.player_key}/views/ack"
+    ack = json.loads(payload)
+    assert ack["batch_id"] == "b-7"
+    assert ack["accepted"] == 1
+    assert [r["status"] for r in ack["results"]] == ["accepted", "invalid"]
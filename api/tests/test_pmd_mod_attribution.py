@@ -94,3 +94,23 @@ def test_self_hide_stays_hidden_by_user(client, db):
         .count()
         == 0
     )
+
+
+def test_unhide_invalidates_listings(client, db, monkeypatch):
+    calls: list[str] = []
+    monkeypatch.setattr("app.routers.pmd.cache_invalidate", calls.append)
+    monkeypatch.setattr(
+        "app.routers.pmd.bump_channel_version", lambda: calls.append("channels")
+    )
+    author = _user(db)
+    post = _post(db, author)
+    post.hidden_by_user = True
+    db.commit()
+
+    resp = client.post(
+        "/pmd/action",
+        json={"action": "unhide", "post_ids": [post.id]},
+        headers=_auth(author),
+    )
+    assert resp.status_code == 200, resp.text
+    assert calls == ["feed:recent:*", "feed:promoted:*", "hashtags:*", "channels"]
@@ -38,6 +38,8 @@ def many_posts(db):
             height=16 + i,
             frame_count=1 + i,
             unique_colors=2 + i,
+            native_format="png",
+            native_file_bytes=100 + i,
         )
         db.add(p)
         db.commit()
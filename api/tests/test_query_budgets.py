@@ -0,0 +1,177 @@
+"""SQL statement budgets for hot endpoints (the ``query_budget`` fixture).
+
+Each test seeds more rows, from more distinct owners, than the fixture's
+repeat threshold, so a per-row lazy load (N+1) fails the test even when the
+total stays within budget. Budgets are the statement counts each request runs
+today, cache misses and timeline rebuilds included; a failure prints every
+statement the request ran. Lower a budget when a change saves a query.
+"""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app import models
+from app.auth import create_access_token
+from app.cache import cache_invalidate
+from app.services import player_tokens
+from app.sqids_config import encode_id, encode_user_id
+from app.vault import compute_storage_shard
+
+ROWS = 5
+
+
+def _user(db, badge: str | None = None):
+    u = models.User(
+        handle=f"qb_{uuid.uuid4().hex[:8]}",
+        email=f"{uuid.uuid4().hex[:8]}@e.com",
+        roles=["user"],
+    )
+    db.add(u)
+    db.commit()
+    u.public_sqid = encode_user_id(u.id)
+    if badge:
+        db.add(models.BadgeGrant(user_id=u.id, badge=badge))
+    db.commit()
+    db.refresh(u)
+    return u
+
+
+def _post(db, owner, *, kind: str = "artwork", promoted: bool = True):
+    storage_key = uuid.uuid4()
+    now = datetime.now(timezone.utc)
+    p = models.Post(
+        owner_id=owner.id,
+        title=f"qb-{kind}",
+        storage_key=storage_key,
+        storage_shard=compute_storage_shard(storage_key),
+        kind=kind,
+        art_url="https://example.com/a.png",
+        width=64,
+        height=64,
+        metadata_modified_at=now,
+        artwork_modified_at=now,
+        visible=True,
+        public_visibility=True,
+        promoted=promoted,
+    )
+    db.add(p)
+    db.commit()
+    p.public_sqid = encode_id(p.id)
+    db.commit()
+    db.refresh(p)
+    return p
+
+
+def _auth(user):
+    return {"Authorization": f"Bearer {create_access_token(user)}"}
+
+
+@pytest.fixture()
+def owners(db):
+    return [_user(db, badge="early-adopter") for _ in range(ROWS)]
+
+
+@pytest.fixture()
+def posts(db, owners):
+    return [_post(db, owner) for owner in owners]
+
+
+def test_post_page_budget(client, posts, query_budget):
+    with query_budget(9):
+        resp = client.get(f"/p/{posts[0].public_sqid}")
+    assert resp.status_code == 200, resp.text
+
+
+@pytest.mark.parametrize(
+    "path,cache_pattern",
+    [("/post/recent", "feed:recent:*"), ("/feed/promoted", "feed:promoted:*")],
+)
+def test_discovery_feed_budget(client, posts, query_budget, path, cache_pattern):
+    cache_invalidate(cache_pattern)
+    with query_budget(7):
+        resp = client.get(path)
+    assert resp.status_code == 200, resp.text
+    assert len(resp.json()["items"]) >= ROWS
+
+
+def test_following_feed_budget(client, db, owners, posts, query_budget):
+    viewer = _user(db)
+    for owner in owners:
+        db.add(models.Follow(follower_id=viewer.id, following_id=owner.id))
+    db.commit()
+
+    with query_budget(12):
+        resp = client.get("/feed/following", headers=_auth(viewer))
+    assert resp.status_code == 200, resp.text
+    assert len(resp.json()["items"]) == ROWS
+
+
+def test_comments_budget(client, db, owners, posts, query_budget):
+    post = posts[0]
+    for author in owners:
+        db.add(models.Comment(post_id=post.id, author_id=author.id, body="nice"))
+    db.commit()
+
+    with query_budget(10):
+        resp = client.get(f"/post/{post.id}/comments", headers=_auth(owners[0]))
+    assert resp.status_code == 200, resp.text
+    assert len(resp.json()["items"]) == ROWS
+
+
+def test_player_query_posts_budget(client, db, owners, posts, query_budget):
+    player_owner = owners[0]
+    for i in range(ROWS):
+        playlist = _post(db, player_owner, kind="playlist")
+        for position, artwork in enumerate(posts[: i + 1]):
+            db.add(
+                models.PlaylistItem(
+                    playlist_post_id=playlist.id,
+                    artwork_post_id=artwork.id,
+                    position=position,
+                )
+            )
+    player = models.Player(
+        player_key=uuid.uuid4(),
+        owner_id=player_owner.id,
+        registration_status="registered",
+        name="qb player",
+    )
+    db.add(player)
+    db.commit()
+    auth = {"Authorization": f"Bearer {player_tokens.issue_token(db, player)}"}
+
+    with query_budget(8):
+        resp = client.post(
+            "/player/rpc",
+            json={"request_type": "query_posts", "channel": "user"},
+            headers=auth,
+        )
+    assert resp.status_code == 200, resp.text
+    kinds = [p["kind"] for p in resp.json()["posts"]]
+    assert kinds.count("playlist") == ROWS
+
+
+def test_playlist_list_budget(client, db, owners, posts, query_budget):
+    for owner in owners:
+        playlist = _post(db, owner, kind="playlist")
+        db.add(
+            models.PlaylistPost(post_id=playlist.id, legacy_playlist_id=uuid.uuid4())
+        )
+        for position, artwork in enumerate(posts):
+            db.add(
+                models.PlaylistItem(
+                    playlist_post_id=playlist.id,
+                    artwork_post_id=artwork.id,
+                    position=position,
+                )
+            )
+    db.commit()
+
+    with query_budget(4):
+        resp = client.get("/playlist")
+    assert resp.status_code == 200, resp.text
+    assert len(resp.json()["items"]) >= ROWS
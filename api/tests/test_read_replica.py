@@ -0,0 +1,91 @@
+"""Read-replica routing (db.get_read_database_url, deps.get_read_db)."""
+
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import make_url, text
+from sqlalchemy.exc import DBAPIError
+
+from app.db import ReadSessionLocal, get_database_url, get_read_database_url
+from app.deps import get_async_read_db, get_db
+from app.main import app
+
+
+@pytest.fixture()
+def primary_env(monkeypatch):
+    monkeypatch.delenv("TEST_DATABASE_URL", raising=False)
+    monkeypatch.delenv("TEST_READ_DATABASE_URL", raising=False)
+    monkeypatch.delenv("DB_READ_HOST", raising=False)
+    monkeypatch.delenv("DB_READ_PORT", raising=False)
+    monkeypatch.setenv("DB_API_WORKER_USER", "api_worker")
+    monkeypatch.setenv("DB_API_WORKER_PASSWORD", "p@ss/word")
+    monkeypatch.setenv("DB_DATABASE", "makapix")
+    monkeypatch.setenv("DB_HOST", "db")
+    monkeypatch.setenv("DB_PORT", "5432")
+
+
+def test_read_url_falls_back_to_primary(primary_env):
+    assert get_read_database_url() == get_database_url()
+
+
+def test_read_url_targets_replica(primary_env, monkeypatch):
+    monkeypatch.setenv("DB_READ_HOST", "db-replica")
+    monkeypatch.setenv("DB_READ_PORT", "6432")
+
+    url = make_url(get_read_database_url())
+    primary = make_url(get_database_url())
+    assert (url.host, url.port) == ("db-replica", 6432)
+    assert url.username == primary.username
+    assert url.password == "p@ss/word"
+    assert url.database == primary.database
+
+
+def test_read_url_in_tests(monkeypatch):
+    monkeypatch.setenv("TEST_DATABASE_URL", "postgresql+psycopg://u:p@a/t")
+    monkeypatch.delenv("TEST_READ_DATABASE_URL", raising=False)
+    assert get_read_database_url() == "postgresql+psycopg://u:p@a/t"
+
+    monkeypatch.setenv("TEST_READ_DATABASE_URL", "postgresql+psycopg://u:p@b/t")
+    assert get_read_database_url() == "postgresql+psycopg://u:p@b/t"
+
+
+def test_read_session_rejects_writes(db):
+    session = ReadSessionLocal()
+    try:
+        assert session.execute(text("SELECT 1")).scalar() == 1
+        with pytest.raises(DBAPIError):
+            session.execute(text("UPDATE users SET tagline = tagline"))
+    finally:
+        session.close()
+
+
+def test_sitemap_reads_without_primary_session(client):
+    def _forbidden():
+        raise AssertionError("primary session used by a read-routed endpoint")
+        yield  # pragma: no cover
+
+    app.dependency_overrides[get_db] = _forbidden
+    try:
+        resp = client.get("/sitemap.xml")
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+    assert resp.status_code == 200, resp.text
+
+
+@pytest.mark.parametrize("path", ["/post/recent", "/feed/promoted"])
+def test_discovery_feeds_use_read_session(client, path):
+    opened = []
+    inner = app.dependency_overrides[get_async_read_db]
+
+    async def _tracking():
+        async for session in inner():
+            opened.append(session)
+            yield session
+
+    app.dependency_overrides[get_async_read_db] = _tracking
+    try:
+        resp = client.get(path)
+    finally:
+        app.dependency_overrides[get_async_read_db] = inner
+    assert resp.status_code == 200, resp.text
+    assert len(opened) == 1
@@ -297,6 +297,29 @@ class TestModeratorTriage:
         assert post.visible is False
         assert post.hidden_by_mod is False  # take_down only flips visibility
 
+    def test_hide_post_invalidates_listings(
+        self, client: TestClient, db: Session, moderator, reporter, artist, monkeypatch
+    ):
+        calls: list[str] = []
+        monkeypatch.setattr("app.routers.reports.cache_invalidate", calls.append)
+        monkeypatch.setattr(
+            "app.routers.reports.bump_channel_version",
+            lambda: calls.append("channels"),
+        )
+        post = _make_post(db, owner=artist, title="hd1")
+        r = client.post(
+            "/v1/report", json=_report_payload(post), headers=_auth(reporter)
+        )
+        calls.clear()
+
+        r2 = client.patch(
+            f"/v1/report/{r.json()['id']}",
+            json={"status": "resolved", "action_taken": "hide"},
+            headers=_auth(moderator),
+        )
+        assert r2.status_code == 200, r2.text
+        assert calls == ["feed:recent:*", "feed:promoted:*", "hashtags:*", "channels"]
+
     def test_delete_is_legacy_alias_for_take_down(
         self, client: TestClient, db: Session, moderator, reporter, artist
     ):
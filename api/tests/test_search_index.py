@@ -0,0 +1,141 @@
+"""Search documents and ranked GET /search (services/search_index.py)."""
+
+from __future__ import annotations
+
+import uuid
+
+from app import models
+from app.auth import create_access_token
+from app.services.search_index import (
+    index_post,
+    query_terms,
+    rebuild_search_documents,
+)
+from app.sqids_config import encode_id, encode_user_id
+
+
+def _user(db, handle=None, **kw):
+    u = models.User(
+        handle=handle or f"si_{uuid.uuid4().hex[:6]}",
+        email=f"{uuid.uuid4().hex[:6]}@e.com",
+        email_verified=True,
+        **kw,
+    )
+    db.add(u)
+    db.commit()
+    db.refresh(u)
+    u.public_sqid = encode_user_id(u.id)
+    db.commit()
+    return u
+
+
+def _post(db, owner, title, description=None, hashtags=None, **flags):
+    key = uuid.uuid4()
+    p = models.Post(
+        owner_id=owner.id,
+        title=title,
+        description=description,
+        storage_key=key,
+        art_url=f"https://example.com/{key}.png",
+        hash=str(key).replace("-", "") + "f" * 32,
+        kind="artwork",
+        hashtags=hashtags or [],
+        visible=True,
+        public_visibility=True,
+        width=64,
+        height=64,
+        frame_count=1,
+        **flags,
+    )
+    db.add(p)
+    db.commit()
+    p.public_sqid = encode_id(p.id)
+    db.commit()
+    return p
+
+
+def _search(client, viewer, q, **params):
+    headers = {"Authorization": f"Bearer {create_access_token(viewer)}"}
+    resp = client.get("/search", params={"q": q, **params}, headers=headers)
+    assert resp.status_code == 200, resp.text
+    return resp.json()
+
+
+def test_query_terms_drop_punctuation():
+    assert query_terms("  Pixel-Cat's  'drop' ") == ["pixel", "cat", "s", "drop"]
+
+
+def test_title_outranks_description_and_prefixes_match(client, db):
+    viewer, author = _user(db), _user(db)
+    in_desc = _post(db, author, "Evening", description="a quiet zephyrine lake")
+    in_title = _post(db, author, "Zephyrine Lake")
+    _post(db, author, "Zephyrine hidden", hidden_by_user=True)
+    rebuild_search_documents(db)
+
+    items = _search(client, viewer, "zephyr", types=["posts"])["items"]
+
+    assert [i["post"]["public_sqid"] for i in items] == [
+        in_title.public_sqid,
+        in_desc.public_sqid,
+    ]
+
+
+def test_cursor_pages_ties_without_gaps_or_repeats(client, db):
+    viewer, author = _user(db), _user(db)
+    expected = {_post(db, author, "Quillfeather").public_sqid for _ in range(7)}
+    rebuild_search_documents(db)
+
+    seen, cursor = [], None
+    while True:
+        params = {"types": ["posts"], "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = _search(client, viewer, "quillfeather", **params)
+        seen += [i["post"]["public_sqid"] for i in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(seen) == len(expected) and set(seen) == expected
+
+
+def test_users_and_posts_rank_together_and_respect_blocks(client, db):
+    viewer = _user(db)
+    artist = _user(db, handle=f"marrowind{uuid.uuid4().hex[:4]}")
+    blocked = _user(db)
+    post = _post(db, artist, "Marrowind keep")
+    _post(db, blocked, "Marrowind ruins")
+    db.add(models.UserBlock(blocker_id=viewer.id, blocked_id=blocked.id))
+    db.commit()
+    rebuild_search_documents(db)
+
+    items = _search(client, viewer, "marrowind")["items"]
+
+    found = {
+        i["user"]["handle"] if "user" in i else i["post"]["public_sqid"] for i in items
+    }
+    assert found == {artist.handle, post.public_sqid}
+
+
+def test_hashtags_type_matches_the_tag_without_a_hash(client, db):
+    viewer, artist = _user(db), _user(db)
+    tag = f"glimmer{uuid.uuid4().hex[:6]}"
+    post = _post(db, artist, "Untitled", hashtags=[tag])
+    rebuild_search_documents(db)
+
+    for q in (tag, f"#{tag}"):
+        items = _search(client, viewer, q, types=["hashtags"])["items"]
+        assert [i["post"]["public_sqid"] for i in items] == [post.public_sqid]
+
+
+def test_title_edit_reindexes_post(db, client):
+    viewer, author = _user(db), _user(db)
+    post = _post(db, author, "Before")
+    rebuild_search_documents(db)
+
+    post.title = "Obsidianwing"
+    index_post(db, post.id)
+    db.commit()
+
+    items = _search(client, viewer, "obsidianwing", types=["posts"])["items"]
+    assert [i["post"]["public_sqid"] for i in items] == [post.public_sqid]
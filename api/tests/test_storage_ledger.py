@@ -0,0 +1,146 @@
+"""Per-user storage ledger (services/storage_ledger.py)."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import Session
+
+from app.auth import create_access_token
+from app.models import Post, PostFile, User, UserStorageUsage
+from app.services.storage_ledger import (
+    adjust_post_storage,
+    get_storage_usage,
+    reconcile_storage_usage,
+    release_post_storage,
+    seed_storage_usage,
+)
+from app.services.storage_quota import get_user_storage_used
+from app.sqids_config import encode_id
+from app.vault import compute_storage_shard
+
+
+def _make_user(db: Session, roles=None) -> User:
+    unique_id = str(uuid.uuid4())[:8]
+    user = User(
+        handle=f"u_{unique_id}",
+        email=f"u_{unique_id}@example.com",
+        roles=roles or ["user"],
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def _make_post(db: Session, owner: User, *, native=1000, variants=(), mkpx=None):
+    storage_key = uuid.uuid4()
+    now = datetime.now(timezone.utc)
+    post = Post(
+        storage_key=storage_key,
+        storage_shard=compute_storage_shard(storage_key),
+        owner_id=owner.id,
+        kind="artwork",
+        title="ledger",
+        description="",
+        hashtags=[],
+        art_url=f"https://example.com/{storage_key}.png",
+        width=64,
+        height=64,
+        frame_count=1,
+        transparency_meta=False,
+        alpha_meta=False,
+        metadata_modified_at=now,
+        artwork_modified_at=now,
+        hash=str(storage_key).replace("-", "") + "d" * 32,
+        mkpx_file_bytes=mkpx,
+    )
+    db.add(post)
+    db.flush()
+    post.public_sqid = encode_id(post.id)
+    db.add(PostFile(post_id=post.id, format="png", file_bytes=native, is_native=True))
+    for fmt, size in variants:
+        db.add(PostFile(post_id=post.id, format=fmt, file_bytes=size))
+    db.commit()
+    db.refresh(post)
+    return post
+
+
+def test_missing_row_is_read_from_the_aggregate_without_writing(db: Session):
+    user = _make_user(db)
+    _make_post(db, user, native=1000, variants=[("gif", 300), ("webp", 200)], mkpx=50)
+    _make_post(db, user, native=500)
+
+    usage = get_storage_usage(db, user.id)
+
+    assert (usage.native_bytes, usage.derived_bytes, usage.mkpx_bytes) == (
+        1500,
+        500,
+        50,
+    )
+    assert get_user_storage_used(db, user.id) == 2050
+    assert not db.new
+    assert db.get(UserStorageUsage, user.id) is None
+
+    seed_storage_usage(db, user.id)
+    assert db.get(UserStorageUsage, user.id).total_bytes == 2050
+
+
+def test_deltas_and_release_keep_the_row_in_step(db: Session):
+    user = _make_user(db)
+    post = _make_post(db, user, native=1000)
+    seed_storage_usage(db, user.id)
+
+    db.add(PostFile(post_id=post.id, format="gif", file_bytes=400))
+    post.mkpx_file_bytes = 70
+    adjust_post_storage(db, post, derived=400, mkpx=70)
+    db.commit()
+    assert get_user_storage_used(db, user.id) == 1470
+
+    release_post_storage(db, post)
+    post.deleted_by_user = True
+    db.commit()
+    # Deleted posts are ignored by later deltas.
+    adjust_post_storage(db, post, native=999)
+    db.commit()
+    db.expire_all()
+    assert get_user_storage_used(db, user.id) == 0
+
+
+def test_reconcile_repairs_drift(db: Session):
+    user = _make_user(db)
+    _make_post(db, user, native=800, variants=[("gif", 100)])
+    seed_storage_usage(db, user.id)
+    db.query(UserStorageUsage).filter_by(user_id=user.id).update(
+        {UserStorageUsage.native_bytes: 5}
+    )
+    db.commit()
+    other = _make_user(db)
+    _make_post(db, other, native=300)
+
+    result = reconcile_storage_usage(db)
+
+    assert result == {"users": 1, "repaired": 1, "created": 1}
+    db.expire_all()
+    assert get_user_storage_used(db, user.id) == 900
+    assert db.get(UserStorageUsage, other.id).native_bytes == 300
+
+
+def test_admin_breakdown_lists_top_consumers(client, db: Session):
+    moderator = _make_user(db, roles=["user", "moderator"])
+    user = _make_user(db)
+    _make_post(db, user, native=2048, mkpx=10)
+    seed_storage_usage(db, user.id)
+    db.commit()
+
+    response = client.get(
+        "/admin/storage-usage",
+        headers={"Authorization": f"Bearer {create_access_token(moderator)}"},
+    )
+
+    assert response.status_code == 200
+    item = response.json()["items"][0]
+    assert item["handle"] == user.handle
+    assert item["total_bytes"] == 2058
+    assert item["mkpx_bytes"] == 10
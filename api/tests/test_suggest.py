@@ -0,0 +1,170 @@
+"""Prefix suggestions for GET /search/suggest (services/suggest.py)."""
+
+from __future__ import annotations
+
+import uuid
+
+import pytest
+
+from app import models
+from app.auth import create_access_token
+from app.cache import get_redis_client
+from app.services import suggest
+from app.sqids_config import encode_id, encode_user_id
+
+
+@pytest.fixture(autouse=True)
+def _redis():
+    client = get_redis_client()
+    if client is None:
+        pytest.skip("Redis not available")
+    for key in client.scan_iter("suggest:*"):
+        client.delete(key)
+    yield client
+    for key in client.scan_iter("suggest:*"):
+        client.delete(key)
+
+
+def _user(db, handle):
+    u = models.User(
+        handle=handle,
+        email=f"{uuid.uuid4().hex[:6]}@e.com",
+        email_verified=True,
+    )
+    db.add(u)
+    db.commit()
+    db.refresh(u)
+    u.public_sqid = encode_user_id(u.id)
+    db.commit()
+    return u
+
+
+def _followers(db, target, n):
+    for _ in range(n):
+        fan = _user(db, f"fan_{uuid.uuid4().hex[:8]}")
+        db.add(models.Follow(follower_id=fan.id, following_id=target.id))
+    db.commit()
+
+
+def _post(db, owner, hashtags):
+    key = uuid.uuid4()
+    p = models.Post(
+        owner_id=owner.id,
+        title="t",
+        storage_key=key,
+        art_url=f"https://example.com/{key}.png",
+        hash=str(key).replace("-", "") + "f" * 32,
+        kind="artwork",
+        visible=True,
+        public_visibility=True,
+        hashtags=hashtags,
+        width=64,
+        height=64,
+        frame_count=1,
+    )
+    db.add(p)
+    db.commit()
+    p.public_sqid = encode_id(p.id)
+    db.commit()
+    return p
+
+
+def test_users_ranked_by_followers_and_updated_incrementally(db):
+    quiet = _user(db, "pixelquiet")
+    loud = _user(db, "pixelloud")
+    _user(db, "other")
+    _followers(db, loud, 2)
+
+    suggest.rebuild_suggestions(db)
+    hits = suggest.suggest_users(db, None, "Pix", 10)
+    assert [(u.id, n) for u, n in hits] == [(loud.id, 2), (quiet.id, 0)]
+
+    for _ in range(3):
+        suggest.bump_user(quiet.id, quiet.handle, 1)
+    assert [u.id for u, _ in suggest.suggest_users(db, None, "pix", 10)] == [
+        quiet.id,
+        loud.id,
+    ]
+
+    old = quiet.handle
+    quiet.handle = "zebra"
+    db.commit()
+    suggest.rename_user(quiet.id, old, "zebra")
+    assert [u.id for u, _ in suggest.suggest_users(db, None, "pix", 10)] == [loud.id]
+    assert [(u.id, n) for u, n in suggest.suggest_users(db, None, "zeb", 10)] == [
+        (quiet.id, 3)
+    ]
+
+
+def test_blocked_and_ineligible_users_are_dropped(db):
+    viewer = _user(db, "viewer")
+    blocked = _user(db, "drawblocked")
+    hidden = _user(db, "drawhidden")
+    shown = _user(db, "drawshown")
+    db.add(models.UserBlock(blocker_id=viewer.id, blocked_id=blocked.id))
+    db.commit()
+
+    suggest.rebuild_suggestions(db)
+    hidden.hidden_by_mod = True
+    db.commit()
+
+    hits = suggest.suggest_users(db, viewer, "draw", 10)
+    assert [u.id for u, _ in hits] == [shown.id]
+
+
+def test_hashtags_counted_and_monitored_tags_hidden(db, monkeypatch):
+    owner = _user(db, "tagger")
+    _post(db, owner, ["sunset", "sunrise"])
+    _post(db, owner, ["sunset"])
+    monkeypatch.setattr(suggest, "MONITORED_HASHTAGS", frozenset({"sunrise"}))
+
+    suggest.rebuild_suggestions(db)
+    assert suggest.suggest_hashtags(None, "#sun", 10) == [("sunset", 2)]
+
+    suggest.bump_hashtags(["sunny"])
+    assert suggest.suggest_hashtags(None, "sun", 10) == [
+        ("sunset", 2),
+        ("sunny", 1),
+    ]
+
+    owner.approved_hashtags = ["sunrise"]
+    db.commit()
+    assert ("sunrise", 1) in suggest.suggest_hashtags(owner, "sun", 10)
+
+
+def test_suggest_endpoint(client, db):
+    viewer = _user(db, "seeker")
+    artist = _user(db, "moonartist")
+    _post(db, artist, ["moonlight"])
+    suggest.rebuild_suggestions(db)
+
+    headers = {"Authorization": f"Bearer {create_access_token(viewer)}"}
+    resp = client.get("/search/suggest", params={"q": "moon"}, headers=headers)
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert [u["public_sqid"] for u in body["users"]] == [artist.public_sqid]
+    assert [h["tag"] for h in body["hashtags"]] == ["moonlight"]
+
+    resp = client.get(
+        "/search/suggest", params={"q": "moon", "types": "hashtags"}, headers=headers
+    )
+    assert resp.status_code == 200
+    assert resp.json()["users"] == []
+
+
+def test_hidden_and_deleted_posts_stop_counting(client, db):
+    owner = _user(db, "tidesetter")
+    first = _post(db, owner, ["tidepool"])
+    second = _post(db, owner, ["tidepool"])
+    suggest.rebuild_suggestions(db)
+    assert suggest.suggest_hashtags(None, "tide", 10) == [("tidepool", 2)]
+
+    headers = {"Authorization": f"Bearer {create_access_token(owner)}"}
+    assert client.post(f"/post/{first.id}/hide", headers=headers).status_code == 201
+    assert suggest.suggest_hashtags(None, "tide", 10) == [("tidepool", 1)]
+
+    assert client.delete(f"/post/{second.id}", headers=headers).status_code == 204
+    assert suggest.suggest_hashtags(None, "tide", 10) == []
+
+    assert client.delete(f"/post/{first.id}/hide", headers=headers).status_code == 204
+    assert suggest.suggest_hashtags(None, "tide", 10) == [("tidepool", 1)]
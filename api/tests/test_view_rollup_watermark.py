@@ -237,6 +237,42 @@ def test_rollup_retention_delete_is_watermark_and_age_gated(db, post):
     assert post.view_count == 2  # both days rolled, one View each
 
 
+def test_view_events_store_compact_encoding(db, post):
+    """Digests are 32-byte bytea and labels smallint codes on disk
+    (utils/event_encoding.py); the ORM reads back the original strings."""
+    from sqlalchemy import text
+
+    _event(db, post.id, _utc_day(0), ip="ab" * 32, device="player")
+    db.add(
+        models.ViewEvent(
+            post_id=post.id,
+            viewer_ip_hash="cd" * 32,
+            device_type="desktop",
+            view_source="web",
+            view_type="impression",
+            channel="someday-channel",
+            created_at=_utc_day(0),
+        )
+    )
+    db.commit()
+
+    raw = db.execute(
+        text(
+            "SELECT octet_length(viewer_ip_hash), pg_typeof(view_type)::text "
+            "FROM view_events ORDER BY id"
+        )
+    ).all()
+    assert raw == [(32, "smallint"), (32, "smallint")]
+
+    first, second = db.query(models.ViewEvent).order_by(models.ViewEvent.id).all()
+    assert first.viewer_ip_hash == "ab" * 32
+    assert (first.device_type, first.view_source) == ("player", "player")
+    assert first.view_type == "view"
+    assert second.view_type == "impression"
+    assert second.channel == "other"  # not in the code table
+    assert isinstance(first.id, int) and second.id > first.id
+
+
 def test_rollup_failure_leaves_everything_intact(db, post, monkeypatch):
     from app.services.view_metrics import get_view_watermark, set_view_watermark
 
@@ -0,0 +1,140 @@
+"""Bounded MQTT view-ingestion pool (mqtt/view_workers.py)."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.mqtt import player_views as mqtt_views
+from app.mqtt.view_workers import ViewIngestPool
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(
+        "app.services.view_metrics.record_ingest_snapshot", lambda *a, **k: None
+    )
+    p = ViewIngestPool(workers=1, max_queue=1, name="test-ingest")
+    p.start()
+    yield p
+    p.shutdown(timeout=2)
+
+
+def test_tasks_run_off_the_calling_thread(pool):
+    done = threading.Event()
+    seen = {}
+
+    def task(value):
+        seen["value"] = value
+        seen["thread"] = threading.current_thread().name
+        done.set()
+
+    assert pool.submit(task, 42)
+    assert done.wait(2)
+    assert seen["value"] == 42
+    assert seen["thread"].startswith("test-ingest-")
+
+
+def test_full_queue_rejects_without_blocking(pool):
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocker():
+        started.set()
+        release.wait(2)
+
+    assert pool.submit(blocker)
+    assert started.wait(2)
+    assert pool.submit(lambda: None)  # fills the single queue slot
+    assert pool.submit(lambda: None) is False
+
+    release.set()
+    pool.shutdown(timeout=2)
+    stats = pool.stats()
+    assert stats["rejected"] == 1
+    assert stats["processed"] == 2
+    assert stats["latency_p50_ms"] is not None
+
+
+def test_failures_are_counted_and_do_not_kill_workers(pool):
+    started = threading.Event()
+    done = threading.Event()
+
+    def boom():
+        started.set()
+        raise RuntimeError("boom")
+
+    assert pool.submit(boom)
+    assert started.wait(2)  # the single queue slot is free again
+    assert pool.submit(done.set)
+    assert done.wait(2)
+    pool.shutdown(timeout=2)
+    assert pool.stats()["failed"] == 1
+
+
+def test_shutdown_is_bounded_when_workers_are_stuck(pool):
+    release = threading.Event()
+    started = threading.Event()
+
+    def stuck():
+        started.set()
+        release.wait(5)
+
+    assert pool.submit(stuck)
+    assert started.wait(2)
+    assert pool.submit(lambda: None)  # queue full, no room for the sentinel
+
+    began = time.monotonic()
+    pool.shutdown(timeout=0.2)
+    assert time.monotonic() - began < 1
+    release.set()
+
+
+def test_saturated_subscriber_nacks_when_ack_requested(monkeypatch):
+    monkeypatch.setattr(
+        mqtt_views,
+        "get_view_pool",
+        lambda: SimpleNamespace(submit=lambda *a: False),
+    )
+    handler = MagicMock()
+    on_message = mqtt_views._enqueue(handler)
+    client = MagicMock()
+
+    msg = SimpleNamespace(
+        topic="makapix/player/abc/views",
+        payload=json.dumps(
+            {"player_key": "abc", "batch_id": "b-1", "request_ack": True}
+        ).encode(),
+    )
+    on_message(client, None, msg)
+
+    handler.assert_not_called()
+    topic, payload = client.publish.call_args.args[:2]
+    assert topic == "makapix/player/abc/views/ack"
+    nack = json.loads(payload)
+    assert nack["error_code"] == "server_busy"
+    assert nack["batch_id"] == "b-1"
+
+    client.reset_mock()
+    quiet = SimpleNamespace(
+        topic="makapix/player/abc/view", payload=b'{"request_ack": false}'
+    )
+    on_message(client, None, quiet)
+    client.publish.assert_not_called()
+
+
+def test_snapshots_are_kept_per_process(monkeypatch):
+    from app.services import view_metrics
+
+    view_metrics.record_ingest_snapshot("test-ingest", {"rejected": 0})
+    monkeypatch.setattr(view_metrics, "_instance_id", lambda: "other-host:1")
+    view_metrics.record_ingest_snapshot("test-ingest", {"rejected": 2})
+
+    snapshots = view_metrics.get_ingest_snapshots("test-ingest")
+    assert len(snapshots) == 2
+    assert snapshots["other-host:1"] == {"rejected": 2}
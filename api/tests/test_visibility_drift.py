@@ -9,6 +9,7 @@ import pytest
 
 from app import models
 from app.auth import create_access_token
+from app.services.search_index import rebuild_search_documents
 from app.sqids_config import encode_id, encode_user_id
 
 
@@ -88,8 +89,55 @@ def test_search_excludes_banned_users(client, db):
     searcher = _user(db)
     handle = f"bannedvd{uuid.uuid4().hex[:6]}"
     _user(db, handle=handle, banned_until=models.PERMANENT_BAN_UNTIL)
+    rebuild_search_documents(db)
 
     resp = client.get(f"/search?q={handle}&types=users", headers=_auth(searcher))
     assert resp.status_code == 200, resp.text
     handles = {u["handle"] for u in resp.json().get("users", [])}
     assert handle not in handles
+
+
+@pytest.mark.parametrize(
+    "flags",
+    [
+        {"visible": False},
+        {"hidden_by_mod": True},
+        {"hidden_by_user": True},
+        {"non_conformant": True},
+        {"public_visibility": False},
+        {"deleted_by_user": True},
+    ],
+)
+def test_discoverable_flag_tracks_each_predicate(db, flags):
+    p = _post(db, _user(db))
+    assert p.discoverable is True
+
+    for name, value in flags.items():
+        setattr(p, name, value)
+    db.commit()
+    db.refresh(p)
+    assert p.discoverable is False
+
+
+def test_recent_feed_served_from_discoverable_index(db):
+    from sqlalchemy import text
+
+    # On an empty table every created_at index costs the same and the pick is
+    # arbitrary; with some hidden rows the partial index is the cheapest.
+    owner = _user(db)
+    for i in range(20):
+        _post(db, owner, hidden_by_user=i % 4 != 0)
+    db.execute(text("ANALYZE posts"))
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    db.execute(text("SET LOCAL enable_bitmapscan = off"))
+    db.execute(text("SET LOCAL enable_sort = off"))
+    plan = "\n".join(
+        db.execute(
+            text(
+                "EXPLAIN SELECT id FROM posts WHERE kind = 'artwork' "
+                "AND discoverable = true ORDER BY created_at DESC LIMIT 50"
+            )
+        ).scalars()
+    )
+    db.rollback()
+    assert "ix_posts_discoverable_created" in plan, plan
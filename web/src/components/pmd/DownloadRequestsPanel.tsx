@@ -88,6 +88,7 @@ export function DownloadRequestsPanel({ bdrs }: DownloadRequestsPanelProps) {
               <div className="request-header">
                 <span className="status-badge">
                   {statusConfig.icon} {statusConfig.label}
+                  {bdr.status === 'processing' && bdr.progress != null && ` ${bdr.progress}%`}
                 </span>
                 <span className="artwork-count">{bdr.artwork_count} artworks</span>
               </div>
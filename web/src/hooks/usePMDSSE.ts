@@ -10,6 +10,7 @@ export interface BDRItem {
   expires_at: string | null;
   error_message: string | null;
   download_url: string | null;
+  progress?: number | null; // percent of artworks packed while processing
 }
 
 interface UsePMDSSEOptions {
@@ -367,9 +367,9 @@ export default function PostManagementDashboard() {
             artwork_count: result.artwork_count,
             created_at: result.created_at,
             completed_at: null,
-            expires_at: null,
+            expires_at: result.expires_at ?? null,
             error_message: null,
-            download_url: null,
+            download_url: result.download_url ?? null,
           },
           ...prev,
         ]);
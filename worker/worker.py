@@ -1,8 +1,17 @@
 from __future__ import annotations
 
 import os
+import shutil
 from sqlalchemy import create_engine, inspect
 
+# Prometheus multiprocess mode (app/metrics.py): prefork children write their
+# samples here. It must exist, and start empty, before any app module defines
+# its metrics.
+_multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+if _multiproc_dir:
+    shutil.rmtree(_multiproc_dir, ignore_errors=True)
+    os.makedirs(_multiproc_dir)
+
 from app.tasks import celery_app
 
 def get_database_url() -> str:
@@ -58,9 +67,11 @@ if __name__ == "__main__":
     # Error monitoring + beat-task dead-man's-switches (both no-op unless their
     # env var is set). Registered before the worker starts so signals are wired.
     from app.observability import init_sentry, register_beat_heartbeats
+    from app.metrics import start_worker_metrics_server
 
     init_sentry("worker")
     register_beat_heartbeats()
+    start_worker_metrics_server()
 
     # Start the Celery worker with beat scheduler
     # Beat runs periodic tasks like rollup_view_events, rollup_site_events